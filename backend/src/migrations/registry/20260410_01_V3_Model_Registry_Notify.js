@@ -0,0 +1,34 @@
+import logger from '../../utils/logger.js';
+
+// The ML service keeps an in-memory snapshot of the active registry entries and
+// LISTENs on this channel to reload it when a trainer or
+// activate_recommended_horizons.py writes V3_Model_Registry.
+const CHANNEL = 'model_registry_changed';
+
+export const up = async (db) => {
+    logger.info('Creating V3_Model_Registry change notification trigger...');
+
+    await db.run(`
+        CREATE OR REPLACE FUNCTION notify_model_registry_changed() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('${CHANNEL}', COALESCE(NEW.name, OLD.name));
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    `);
+
+    await db.run('DROP TRIGGER IF EXISTS trg_model_registry_notify ON V3_Model_Registry');
+    await db.run(`
+        CREATE TRIGGER trg_model_registry_notify
+        AFTER INSERT OR UPDATE OR DELETE ON V3_Model_Registry
+        FOR EACH ROW EXECUTE FUNCTION notify_model_registry_changed()
+    `);
+
+    logger.info('V3_Model_Registry change notification trigger created');
+};
+
+export const down = async (db) => {
+    await db.run('DROP TRIGGER IF EXISTS trg_model_registry_notify ON V3_Model_Registry');
+    await db.run('DROP FUNCTION IF EXISTS notify_model_registry_changed()');
+    logger.info('V3_Model_Registry change notification trigger dropped');
+};
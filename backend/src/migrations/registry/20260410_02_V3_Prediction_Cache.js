@@ -0,0 +1,12 @@
+export const up = async (db) => {
+    // V3_Prediction_Cache
+    // Shared tier of the ML service prediction cache: the last master prediction per
+    // fixture, valid while cache_key (feature calculated_at + model fingerprint) matches
+    await db.run(`CREATE TABLE IF NOT EXISTS V3_Prediction_Cache (
+        fixture_id INTEGER PRIMARY KEY,
+        cache_key TEXT NOT NULL,
+        result_json TEXT NOT NULL,
+        created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (fixture_id) REFERENCES V3_Fixtures(fixture_id) ON DELETE CASCADE
+    )`);
+};
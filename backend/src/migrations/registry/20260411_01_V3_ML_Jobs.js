@@ -0,0 +1,24 @@
+export const up = async (db) => {
+    // V3_ML_Jobs
+    // Background jobs of the ML service (feature builds, retraining). Shared by all
+    // API workers: the scheduler claims QUEUED rows, RUNNING rows carry a heartbeat
+    // and the pid of the current stage, and cancel_requested is polled by the runner
+    await db.run(`CREATE TABLE IF NOT EXISTS V3_ML_Jobs (
+        id SERIAL PRIMARY KEY,
+        job_type TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'QUEUED',
+        stage TEXT,
+        owner TEXT,
+        pid INTEGER,
+        cancel_requested BOOLEAN NOT NULL DEFAULT FALSE,
+        exit_code INTEGER,
+        error TEXT,
+        log_path TEXT,
+        created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+        started_at TIMESTAMPTZ,
+        finished_at TIMESTAMPTZ,
+        heartbeat_at TIMESTAMPTZ
+    )`);
+    await db.run('CREATE INDEX IF NOT EXISTS idx_ml_jobs_status_type ON V3_ML_Jobs(status, job_type)');
+    await db.run('CREATE INDEX IF NOT EXISTS idx_ml_jobs_type_id ON V3_ML_Jobs(job_type, id DESC)');
+};
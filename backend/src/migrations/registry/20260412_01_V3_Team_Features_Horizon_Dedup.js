@@ -0,0 +1,15 @@
+export const up = async (db) => {
+    // BASELINE_V1 and PROCESS_V1 vectors do not depend on the training horizon: the
+    // feature scripts used to write identical copies under 5Y_ROLLING and 3Y_ROLLING.
+    // They now store only the FULL_HISTORICAL row (see ml-service/horizon_utils.py,
+    // feature_storage_horizon), so drop the copies that match it.
+    await db.run(`DELETE FROM V3_Team_Features_PreMatch dup
+        USING V3_Team_Features_PreMatch kept
+        WHERE dup.feature_set_id IN ('BASELINE_V1', 'PROCESS_V1')
+          AND dup.horizon_type IN ('5Y_ROLLING', '3Y_ROLLING')
+          AND kept.fixture_id = dup.fixture_id
+          AND kept.team_id = dup.team_id
+          AND kept.feature_set_id = dup.feature_set_id
+          AND kept.horizon_type = 'FULL_HISTORICAL'
+          AND kept.features_json = dup.features_json`);
+};
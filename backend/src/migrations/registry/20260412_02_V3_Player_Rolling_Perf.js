@@ -0,0 +1,16 @@
+export const up = async (db) => {
+    // V3_Player_Rolling_Perf
+    // Per player and fixture: perf_score of the match and the mean perf_score of the
+    // player's previous 20 matches (NULL for a debut). Written incrementally by
+    // ml-service/scripts/generate_baseline_features.py (player_performance.py) and
+    // joined to starting lineups for BASELINE_V1 lineup strength
+    await db.run(`CREATE TABLE IF NOT EXISTS V3_Player_Rolling_Perf (
+        player_id INTEGER NOT NULL,
+        fixture_id INTEGER NOT NULL,
+        match_date TIMESTAMPTZ,
+        perf_score REAL NOT NULL,
+        rolling_perf_avg REAL,
+        calculated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (player_id, fixture_id)
+    )`);
+};
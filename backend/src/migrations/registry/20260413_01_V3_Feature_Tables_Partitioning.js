@@ -0,0 +1,72 @@
+// Same layout as ml-service/feature_store_layout.py (used for synthetic and benchmark databases).
+const PARTITIONED_FEATURE_SETS = ['BASELINE_V1', 'PROCESS_V1'];
+const SEASON_LOOKAHEAD = 2;
+const COLUMNS = 'fixture_id, team_id, league_id, season_year, feature_set_id, horizon_type, as_of, features_json, calculated_at';
+
+export const up = async (db) => {
+    const relation = await db.get(`SELECT relkind FROM pg_class WHERE oid = to_regclass('v3_team_features_prematch')`);
+
+    // 1. V3_Team_Features_PreMatch: LIST (feature_set_id) -> RANGE (season_year).
+    // Every reader filters on feature_set_id, so loads and inference lookups only touch
+    // their feature set; season partitions keep each one small. season_year joins the
+    // primary key because partition keys must be part of it.
+    if (relation && relation.relkind !== 'p') {
+        await db.run('ALTER TABLE V3_Team_Features_PreMatch RENAME TO V3_Team_Features_PreMatch_Flat');
+
+        const rows = await db.all(`
+            SELECT season_year FROM V3_Fixtures WHERE season_year IS NOT NULL
+            UNION
+            SELECT season_year FROM V3_Team_Features_PreMatch_Flat
+        `);
+        const known = [...new Set(rows.map((row) => Number(row.season_year)))].sort((a, b) => a - b);
+        const seasons = known.length
+            ? [...known, ...Array.from({ length: SEASON_LOOKAHEAD }, (_, i) => known[known.length - 1] + 1 + i)]
+            : [];
+
+        await db.run(`CREATE TABLE V3_Team_Features_PreMatch (
+            fixture_id INTEGER NOT NULL,
+            team_id INTEGER NOT NULL,
+            league_id INTEGER NOT NULL,
+            season_year INTEGER NOT NULL,
+            feature_set_id TEXT NOT NULL,
+            horizon_type TEXT NOT NULL,
+            as_of TIMESTAMPTZ NOT NULL,
+            features_json TEXT NOT NULL,
+            calculated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+            CONSTRAINT v3_team_features_prematch_partitioned_pkey
+                PRIMARY KEY (fixture_id, team_id, feature_set_id, horizon_type, season_year),
+            FOREIGN KEY (fixture_id) REFERENCES V3_Fixtures(fixture_id) ON DELETE CASCADE
+        ) PARTITION BY LIST (feature_set_id)`);
+
+        for (const featureSetId of PARTITIONED_FEATURE_SETS) {
+            const parent = `v3_team_features_prematch_${featureSetId.toLowerCase()}`;
+            await db.run(`CREATE TABLE ${parent} PARTITION OF V3_Team_Features_PreMatch
+                FOR VALUES IN ('${featureSetId}') PARTITION BY RANGE (season_year)`);
+            for (const season of seasons) {
+                await db.run(`CREATE TABLE ${parent}_s${season} PARTITION OF ${parent}
+                    FOR VALUES FROM (${season}) TO (${season + 1})`);
+            }
+            await db.run(`CREATE TABLE ${parent}_default PARTITION OF ${parent} DEFAULT`);
+        }
+        await db.run('CREATE TABLE v3_team_features_prematch_default PARTITION OF V3_Team_Features_PreMatch DEFAULT');
+
+        await db.run(`INSERT INTO V3_Team_Features_PreMatch (${COLUMNS})
+            SELECT ${COLUMNS} FROM V3_Team_Features_PreMatch_Flat`);
+        await db.run('DROP TABLE V3_Team_Features_PreMatch_Flat');
+
+        await db.run('CREATE INDEX IF NOT EXISTS idx_ml_features_prematch_team ON V3_Team_Features_PreMatch(team_id)');
+        await db.run(`CREATE INDEX IF NOT EXISTS idx_ml_features_prematch_set_horizon
+            ON V3_Team_Features_PreMatch(feature_set_id, horizon_type, fixture_id, team_id)`);
+        await db.run('CREATE INDEX IF NOT EXISTS idx_ml_features_prematch_league_asof ON V3_Team_Features_PreMatch(league_id, as_of)');
+    }
+
+    // 2. V3_ML_Feature_Store: indexes only. Its lookups are by fixture_id without a
+    // season, so season partitions would probe every partition. The covering index
+    // answers get_completed_fixture_ids and the prediction cache freshness check alone.
+    const store = await db.get(`SELECT to_regclass('v3_ml_feature_store') IS NOT NULL AS present`);
+    if (store && store.present) {
+        await db.run(`CREATE INDEX IF NOT EXISTS idx_v3_ml_feature_store_fixture_calculated
+            ON V3_ML_Feature_Store(fixture_id) INCLUDE (calculated_at)`);
+        await db.run('CREATE INDEX IF NOT EXISTS idx_v3_ml_feature_store_league ON V3_ML_Feature_Store(league_id, fixture_id)');
+    }
+};
@@ -0,0 +1,110 @@
+import logger from '../../utils/logger.js';
+
+// Same objects as ml-service/fixture_stats_wide.py (used for synthetic and benchmark databases).
+// V3_Fixture_Stats_Wide: one row per fixture with home/away x FT/1H/2H stat columns, so the
+// ML loaders stop joining V3_Fixture_Stats two to four times. Statement-level triggers re-pivot
+// only the fixtures each INSERT/UPDATE/DELETE on V3_Fixture_Stats touched.
+const SIDES = ['home', 'away'];
+const HALVES = ['FT', '1H', '2H'];
+const STAT_COLUMNS = [
+    'shots_on_goal', 'shots_off_goal', 'shots_inside_box', 'shots_outside_box', 'shots_total',
+    'shots_blocked', 'fouls', 'corner_kicks', 'offsides', 'yellow_cards', 'red_cards',
+    'goalkeeper_saves', 'passes_total', 'passes_accurate', 'pass_accuracy_pct', 'ball_possession_pct',
+];
+
+const STATS_TRIGGERS = [
+    ['trg_fixture_stats_wide_insert', 'fixture_stats_wide_on_insert', 'INSERT',
+        'REFERENCING NEW TABLE AS new_rows', 'SELECT fixture_id FROM new_rows'],
+    ['trg_fixture_stats_wide_update', 'fixture_stats_wide_on_update', 'UPDATE',
+        'REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows',
+        'SELECT fixture_id FROM new_rows UNION SELECT fixture_id FROM old_rows'],
+    ['trg_fixture_stats_wide_delete', 'fixture_stats_wide_on_delete', 'DELETE',
+        'REFERENCING OLD TABLE AS old_rows', 'SELECT fixture_id FROM old_rows'],
+];
+
+const pairs = () => SIDES.flatMap((side) => HALVES.map((half) => [side, half]));
+const flagColumns = () => pairs().map(([side, half]) => `has_${side}_${half.toLowerCase()}`);
+const statColumns = () => pairs().flatMap(([side, half]) => STAT_COLUMNS.map((stat) => `${side}_${half.toLowerCase()}_${stat}`));
+
+export const up = async (db) => {
+    logger.info('Creating V3_Fixture_Stats_Wide...');
+
+    // V3_Fixture_Stats.ball_possession_pct is added by 20260302_00_V19_ML_Pipeline.
+    await db.run(`CREATE TABLE IF NOT EXISTS V3_Fixture_Stats_Wide (
+        fixture_id INTEGER PRIMARY KEY REFERENCES V3_Fixtures(fixture_id) ON DELETE CASCADE,
+        home_team_id INTEGER,
+        away_team_id INTEGER,
+        ${flagColumns().map((column) => `${column} BOOLEAN NOT NULL DEFAULT FALSE`).join(',\n        ')},
+        ${statColumns().map((column) => `${column} INTEGER`).join(',\n        ')},
+        refreshed_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+    )`);
+
+    const columns = ['fixture_id', 'home_team_id', 'away_team_id', ...flagColumns(), ...statColumns()];
+    const selects = [
+        'f.fixture_id', 'f.home_team_id', 'f.away_team_id',
+        ...pairs().map(([side, half]) => `COUNT(*) FILTER (WHERE s.team_id = f.${side}_team_id AND s.half = '${half}') > 0`),
+        ...pairs().flatMap(([side, half]) => STAT_COLUMNS.map(
+            (stat) => `MAX(s.${stat}) FILTER (WHERE s.team_id = f.${side}_team_id AND s.half = '${half}')`,
+        )),
+    ];
+    const updates = columns.slice(1).map((column) => `${column} = EXCLUDED.${column}`).join(', ');
+
+    await db.run(`CREATE OR REPLACE FUNCTION refresh_fixture_stats_wide(fixture_ids INTEGER[]) RETURNS INTEGER AS $$
+    DECLARE
+        refreshed INTEGER;
+    BEGIN
+        INSERT INTO V3_Fixture_Stats_Wide (${columns.join(', ')})
+        SELECT ${selects.join(', ')}
+        FROM V3_Fixtures f
+        JOIN V3_Fixture_Stats s ON s.fixture_id = f.fixture_id
+        WHERE f.fixture_id = ANY(fixture_ids)
+        GROUP BY f.fixture_id, f.home_team_id, f.away_team_id
+        ON CONFLICT (fixture_id) DO UPDATE SET ${updates}, refreshed_at = CURRENT_TIMESTAMP;
+        GET DIAGNOSTICS refreshed = ROW_COUNT;
+        DELETE FROM V3_Fixture_Stats_Wide w
+        WHERE w.fixture_id = ANY(fixture_ids)
+          AND NOT EXISTS (SELECT 1 FROM V3_Fixture_Stats s WHERE s.fixture_id = w.fixture_id);
+        RETURN refreshed;
+    END;
+    $$ LANGUAGE plpgsql`);
+
+    for (const [trigger, fn, event, referencing, touched] of STATS_TRIGGERS) {
+        await db.run(`CREATE OR REPLACE FUNCTION ${fn}() RETURNS trigger AS $$
+        BEGIN
+            PERFORM refresh_fixture_stats_wide(ARRAY(SELECT DISTINCT fixture_id FROM (${touched}) touched));
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql`);
+        await db.run(`DROP TRIGGER IF EXISTS ${trigger} ON V3_Fixture_Stats`);
+        await db.run(`CREATE TRIGGER ${trigger} AFTER ${event} ON V3_Fixture_Stats ${referencing}
+            FOR EACH STATEMENT EXECUTE FUNCTION ${fn}()`);
+    }
+
+    await db.run(`CREATE OR REPLACE FUNCTION fixture_stats_wide_on_fixture_teams() RETURNS trigger AS $$
+        BEGIN
+            PERFORM refresh_fixture_stats_wide(ARRAY[NEW.fixture_id]);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql`);
+    await db.run('DROP TRIGGER IF EXISTS trg_fixture_stats_wide_fixture_teams ON V3_Fixtures');
+    await db.run(`CREATE TRIGGER trg_fixture_stats_wide_fixture_teams
+        AFTER UPDATE OF home_team_id, away_team_id ON V3_Fixtures
+        FOR EACH ROW WHEN (OLD.home_team_id IS DISTINCT FROM NEW.home_team_id OR OLD.away_team_id IS DISTINCT FROM NEW.away_team_id)
+        EXECUTE FUNCTION fixture_stats_wide_on_fixture_teams()`);
+
+    await db.run('SELECT refresh_fixture_stats_wide(ARRAY(SELECT DISTINCT fixture_id FROM V3_Fixture_Stats))');
+
+    logger.info('V3_Fixture_Stats_Wide created and backfilled');
+};
+
+export const down = async (db) => {
+    for (const [trigger, fn] of STATS_TRIGGERS) {
+        await db.run(`DROP TRIGGER IF EXISTS ${trigger} ON V3_Fixture_Stats`);
+        await db.run(`DROP FUNCTION IF EXISTS ${fn}()`);
+    }
+    await db.run('DROP TRIGGER IF EXISTS trg_fixture_stats_wide_fixture_teams ON V3_Fixtures');
+    await db.run('DROP FUNCTION IF EXISTS fixture_stats_wide_on_fixture_teams()');
+    await db.run('DROP FUNCTION IF EXISTS refresh_fixture_stats_wide(INTEGER[])');
+    await db.run('DROP TABLE IF EXISTS V3_Fixture_Stats_Wide');
+    logger.info('V3_Fixture_Stats_Wide dropped');
+};
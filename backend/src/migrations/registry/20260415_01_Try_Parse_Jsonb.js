@@ -0,0 +1,23 @@
+import logger from '../../utils/logger.js';
+
+// Same function as ml-service/lineup_quality.py (TRY_PARSE_JSONB_SQL). The lineup quality query
+// reads V3_Fixture_Lineups.starting_xi (TEXT) as JSON; a plain ::jsonb cast would abort the whole
+// query on the first malformed row, this returns NULL for it instead.
+export const up = async (db) => {
+    logger.info('Creating try_parse_jsonb...');
+
+    await db.run(`CREATE OR REPLACE FUNCTION try_parse_jsonb(value TEXT) RETURNS JSONB AS $$
+    BEGIN
+        RETURN value::jsonb;
+    EXCEPTION WHEN invalid_text_representation THEN
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql IMMUTABLE`);
+
+    logger.info('try_parse_jsonb created');
+};
+
+export const down = async (db) => {
+    await db.run('DROP FUNCTION IF EXISTS try_parse_jsonb(TEXT)');
+    logger.info('try_parse_jsonb dropped');
+};
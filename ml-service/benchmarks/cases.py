@@ -0,0 +1,136 @@
+"""
+Benchmark cases for the ML hot paths.
+
+Each case is ``(name, group, setup, run, items)``: ``setup(ctx)`` runs once
+and returns the argument passed to ``run``; ``run`` is the timed call and
+processes ``items`` fixtures (or rows) so per-item latencies can be compared
+across dataset sizes.
+"""
+
+import os
+import tempfile
+from dataclasses import dataclass, field
+
+SAMPLE_FIXTURES = 20
+
+
+@dataclass
+class BenchmarkContext:
+    conn: object
+    fixture_ids: list
+    league_id: int
+    season_year: int
+    simulation_id: int
+    scratch_dir: str = field(default_factory=tempfile.mkdtemp)
+
+
+@dataclass
+class BenchmarkCase:
+    name: str
+    group: str
+    run: object
+    setup: object = None
+    items: int = 1
+    rounds: int = None
+
+
+def _advanced_features(ctx):
+    import features
+
+    return features.compute_advanced_features(ctx.conn)
+
+
+def _feature_rows(ctx):
+    import features
+
+    f_features = features.compute_advanced_features(ctx.conn)
+    process_df = features.load_team_feature_set("PROCESS_V1", prefix="p_")
+    f_features = features.merge_team_features(f_features, process_df, "home")
+    f_features = features.merge_team_features(f_features, process_df, "away")
+    return [row for _, row in f_features.iterrows()]
+
+
+def _build_row_features(rows):
+    import features
+
+    for row in rows:
+        features.compute_competition_context(row)
+        features.build_style_matchup_features(row)
+
+
+def _run_feature_pipeline(ctx):
+    import features
+
+    # Keep the pipeline's progress file out of the working tree.
+    features.PROGRESS_PATH = os.path.join(ctx.scratch_dir, "feature_pipeline_progress.json")
+    features.run_feature_pipeline(reset=True)
+
+
+def _temporal_vectors(ctx):
+    from time_travel import TemporalFeatureFactory
+
+    factory = TemporalFeatureFactory()
+    for fixture_id in ctx.fixture_ids:
+        factory.get_vector(fixture_id, conn=ctx.conn)
+
+
+def _predict_each(predict, **kwargs):
+    def run(ctx):
+        for fixture_id in ctx.fixture_ids:
+            predict(fixture_id, **kwargs)
+    return run
+
+
+def _master_predictions(ctx):
+    from src.orchestrator.predictor import generate_master_prediction
+
+    for fixture_id in ctx.fixture_ids:
+        generate_master_prediction(fixture_id)
+
+
+def _season_simulation(ctx):
+    from season_simulation_runner import run_season_simulation
+
+    run_season_simulation(ctx.simulation_id, ctx.league_id, ctx.season_year)
+
+
+def build_cases(ctx):
+    import features
+    from src.models.cards_total.inference import predict_total_cards
+    from src.models.corners_total.inference import predict_total_corners
+    from src.models.ft_result.inference import predict_ft_result
+    from src.models.goals_total.inference import predict_total_goals
+    from src.models.ht_result.inference import predict_ht_result
+
+    fixtures = len(ctx.fixture_ids)
+    return [
+        BenchmarkCase("features.compute_advanced_features", "features", _advanced_features),
+        BenchmarkCase("features.compute_lineup_quality", "features", lambda c: features.compute_lineup_quality(c.conn)),
+        BenchmarkCase(
+            "features.load_team_feature_set[BASELINE_V1]", "features",
+            lambda c: features.load_team_feature_set("BASELINE_V1"),
+        ),
+        BenchmarkCase(
+            "features.load_team_feature_set[PROCESS_V1]", "features",
+            lambda c: features.load_team_feature_set("PROCESS_V1"),
+        ),
+        BenchmarkCase(
+            "features.compute_narrative_context", "features",
+            lambda f_features: features.compute_narrative_context(ctx.conn, f_features),
+            setup=_advanced_features,
+        ),
+        BenchmarkCase("features.row_features", "features", _build_row_features, setup=_feature_rows),
+        BenchmarkCase("features.run_feature_pipeline", "features", _run_feature_pipeline, rounds=3),
+        BenchmarkCase("time_travel.TemporalFeatureFactory.get_vector", "features", _temporal_vectors, items=fixtures),
+        BenchmarkCase("inference.predict_ft_result", "inference", _predict_each(predict_ft_result), items=fixtures),
+        BenchmarkCase(
+            "inference.predict_ht_result", "inference", _predict_each(predict_ht_result, version="v2"), items=fixtures,
+        ),
+        BenchmarkCase("inference.predict_total_corners", "inference", _predict_each(predict_total_corners), items=fixtures),
+        BenchmarkCase("inference.predict_total_cards", "inference", _predict_each(predict_total_cards), items=fixtures),
+        BenchmarkCase("inference.predict_total_goals", "inference", _predict_each(predict_total_goals), items=fixtures),
+        BenchmarkCase(
+            "orchestrator.generate_master_prediction", "orchestrator", _master_predictions, items=fixtures, rounds=3,
+        ),
+        BenchmarkCase("simulation.run_season_simulation", "simulation", _season_simulation, rounds=3),
+    ]
@@ -0,0 +1,180 @@
+"""
+Query plans of the feature table access paths before and after the
+partitioned layout (see feature_store_layout.py).
+
+Runs against the disposable database in DATABASE_URL. ``--seed`` rebuilds it
+with scripts/generate_synthetic_data.py in the flat (pre-migration) layout;
+otherwise the feature tables must still be flat. Each query is run with
+``EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)``, the layout is applied, the tables
+are vacuumed and analyzed, and the queries are explained again. The report
+(plan summaries and full plans) is written to
+benchmarks/results/plans/feature_store_plans_<timestamp>.json.
+"""
+
+import argparse
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from db_config import get_connection
+from feature_store_layout import apply_feature_store_layout, is_partitioned
+from scripts.generate_synthetic_data import check_disposable, create_schema, generate
+
+# Kept out of results/ so run_benchmarks.py does not take a plan report for a baseline.
+RESULTS_DIR = Path(__file__).resolve().parent / "results" / "plans"
+
+# name -> (query, parameter names); parameters come from sample_parameters.
+ACCESS_PATHS = {
+    "load_team_feature_set": (
+        "SELECT fixture_id, team_id, features_json FROM V3_Team_Features_PreMatch "
+        "WHERE feature_set_id = 'PROCESS_V1' AND horizon_type = 'FULL_HISTORICAL'",
+        (),
+    ),
+    "inference_team_features": (
+        "SELECT team_id, features_json FROM V3_Team_Features_PreMatch "
+        "WHERE fixture_id = %(fixture_id)s AND feature_set_id = 'BASELINE_V1'",
+        ("fixture_id",),
+    ),
+    "team_features_league_season": (
+        "SELECT fixture_id, team_id, features_json FROM V3_Team_Features_PreMatch "
+        "WHERE feature_set_id = 'BASELINE_V1' AND league_id = %(league_id)s AND season_year = %(season_year)s",
+        ("league_id", "season_year"),
+    ),
+    "inference_feature_vector": (
+        "SELECT feature_vector FROM V3_ML_Feature_Store WHERE fixture_id = %(fixture_id)s",
+        ("fixture_id",),
+    ),
+    "completed_fixture_ids": ("SELECT DISTINCT fixture_id FROM V3_ML_Feature_Store", ()),
+    "feature_store_freshness": (
+        "SELECT MAX(calculated_at) FROM V3_ML_Feature_Store WHERE fixture_id = %(fixture_id)s",
+        ("fixture_id",),
+    ),
+}
+
+
+def sample_parameters(conn):
+    """A recent fixture with stored features and its league-season."""
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT f.fixture_id, f.league_id, f.season_year
+        FROM V3_Fixtures f
+        JOIN V3_Team_Features_PreMatch tf ON tf.fixture_id = f.fixture_id
+        ORDER BY f.date DESC, f.fixture_id DESC
+        LIMIT 1
+        """
+    )
+    row = cur.fetchone()
+    cur.close()
+    conn.rollback()
+    if row is None:
+        raise RuntimeError("No fixtures with team features; run with --seed first.")
+    return {"fixture_id": row[0], "league_id": row[1], "season_year": row[2]}
+
+
+def _walk(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk(child)
+
+
+def summarize_plan(explained):
+    """Timing, buffers, node types and scanned relations of one ``EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)`` result."""
+    plan = explained[0]
+    root = plan["Plan"]
+    nodes = list(_walk(root))
+    relations = sorted({node["Relation Name"] for node in nodes if "Relation Name" in node})
+    return {
+        "planning_ms": plan.get("Planning Time"),
+        "execution_ms": plan.get("Execution Time"),
+        "total_cost": root.get("Total Cost"),
+        "rows": root.get("Actual Rows"),
+        "shared_hit_blocks": root.get("Shared Hit Blocks", 0),
+        "shared_read_blocks": root.get("Shared Read Blocks", 0),
+        "node_types": [node["Node Type"] for node in nodes],
+        "relations_scanned": relations,
+    }
+
+
+def explain_access_paths(conn, params):
+    results = {}
+    cur = conn.cursor()
+    for name, (query, names) in ACCESS_PATHS.items():
+        cur.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}", {key: params[key] for key in names})
+        explained = cur.fetchone()[0]
+        if isinstance(explained, str):
+            explained = json.loads(explained)
+        results[name] = {"summary": summarize_plan(explained), "plan": explained}
+    cur.close()
+    conn.rollback()
+    return results
+
+
+def vacuum_analyze(conn, tables=("V3_Team_Features_PreMatch", "V3_ML_Feature_Store")):
+    # VACUUM sets the visibility map that index-only scans rely on; it cannot run in a transaction.
+    conn.autocommit = True
+    try:
+        cur = conn.cursor()
+        for table in tables:
+            cur.execute(f"VACUUM ANALYZE {table}")
+        cur.close()
+    finally:
+        conn.autocommit = False
+
+
+def print_comparison(before, after):
+    print(f"\n{'access path':<30} {'before':>10} {'after':>10} {'buffers':>17}  plan after")
+    for name in ACCESS_PATHS:
+        old, new = before[name]["summary"], after[name]["summary"]
+        buffers = f"{old['shared_hit_blocks'] + old['shared_read_blocks']}->{new['shared_hit_blocks'] + new['shared_read_blocks']}"
+        nodes = " > ".join(dict.fromkeys(new["node_types"]))
+        print(
+            f"{name:<30} {old['execution_ms']:>8.2f}ms {new['execution_ms']:>8.2f}ms {buffers:>17}  "
+            f"{nodes} ({len(new['relations_scanned'])} relations)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare feature table query plans before and after partitioning.")
+    parser.add_argument("--seed", action="store_true", help="Rebuild the database with synthetic data (flat layout).")
+    parser.add_argument("--leagues", type=int, default=4, help="Leagues to generate with --seed.")
+    parser.add_argument("--teams", type=int, default=16, help="Teams per league to generate with --seed.")
+    parser.add_argument("--seasons", type=int, default=4, help="Seasons to generate with --seed.")
+    parser.add_argument("--force", action="store_true", help="Allow a database name without a disposable marker.")
+    args = parser.parse_args()
+
+    conn = get_connection()
+    try:
+        database = check_disposable(conn, force=args.force)
+        if args.seed:
+            print(f"🧪 Seeding '{database}' with synthetic data (flat feature tables)...")
+            create_schema(conn)
+            generate(conn, leagues=args.leagues, teams_per_league=args.teams, seasons=args.seasons,
+                     partition_feature_tables=False)
+        if is_partitioned(conn):
+            raise SystemExit("V3_Team_Features_PreMatch is already partitioned; run with --seed to start from the flat layout.")
+
+        params = sample_parameters(conn)
+        vacuum_analyze(conn)
+        before = explain_access_paths(conn, params)
+        moved = apply_feature_store_layout(conn)
+        print(f"🧱 Applied the partitioned layout ({moved} team feature rows moved)")
+        vacuum_analyze(conn)
+        after = explain_access_paths(conn, params)
+        print_comparison(before, after)
+
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        output = RESULTS_DIR / f"feature_store_plans_{datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}.json"
+        output.write_text(json.dumps({"database": database, "parameters": params, "before": before, "after": after}, indent=2))
+        print(f"\n📝 Plans written to {output}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
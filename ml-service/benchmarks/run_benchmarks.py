@@ -0,0 +1,247 @@
+"""
+Benchmark runner for the ML hot paths (see benchmarks/cases.py).
+
+Runs against the database in DATABASE_URL, which must be a disposable
+database (its name contains "bench", "synthetic" or "test"); ``--seed``
+rebuilds it with scripts/generate_synthetic_data.py and trains dummy models
+into benchmarks/.models so production artifacts are never touched. Each case
+gets one untimed warmup call (reported as ``first_call_seconds``) followed by
+``--rounds`` timed calls. Results are written to
+benchmarks/results/<timestamp>_<commit>.json and medians are compared with
+the previous results file (or ``--baseline``); ``--fail-on-regression``
+exits non-zero when a case is slower than ``--threshold``.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+BENCH_DIR = Path(__file__).resolve().parent
+RESULTS_DIR = BENCH_DIR / "results"
+MODELS_DIR = BENCH_DIR / ".models"
+
+# model_paths and the prediction cache read these at import time.
+os.environ.setdefault("ML_MODELS_ROOT", str(MODELS_DIR))
+os.environ.setdefault("ML_GLOBAL_1X2_MODEL_PATH", str(MODELS_DIR / "model_1x2.joblib"))
+os.environ.setdefault("ML_PREDICTION_CACHE_DB", "0")
+
+from benchmarks.cases import SAMPLE_FIXTURES, BenchmarkContext, build_cases
+from db_config import get_connection, track_queries
+from scripts.generate_synthetic_data import check_disposable, create_schema, generate, write_dummy_models
+
+DEFAULT_ROUNDS = 5
+DEFAULT_THRESHOLD = 0.15
+
+
+def summarize(samples, items=1):
+    ordered = sorted(samples)
+    median = statistics.median(ordered)
+    p95_index = min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))
+    return {
+        "rounds": len(ordered),
+        "items": items,
+        "min": round(ordered[0], 6),
+        "median": round(median, 6),
+        "mean": round(statistics.fmean(ordered), 6),
+        "stdev": round(statistics.stdev(ordered), 6) if len(ordered) > 1 else 0.0,
+        "p95": round(ordered[p95_index], 6),
+        "per_item_median": round(median / max(items, 1), 6),
+    }
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Per-case median ratio against ``baseline``; regressions exceed ``1 + threshold``."""
+    comparison = {}
+    for name, stats in results.items():
+        previous = baseline.get(name)
+        if not previous or not previous.get("median"):
+            continue
+        ratio = stats["median"] / previous["median"]
+        comparison[name] = {
+            "baseline_median": previous["median"],
+            "ratio": round(ratio, 3),
+            "regression": ratio > 1 + threshold,
+        }
+    return comparison
+
+
+def latest_results_file(exclude=None):
+    files = sorted(path for path in RESULTS_DIR.glob("*.json") if path != exclude)
+    return files[-1] if files else None
+
+
+def git_info():
+    def run(*args):
+        try:
+            return subprocess.run(["git", *args], cwd=ROOT_DIR, capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ""
+    return {"commit": run("rev-parse", "--short", "HEAD") or "unknown", "dirty": bool(run("status", "--porcelain"))}
+
+
+def dataset_counts(conn):
+    cur = conn.cursor()
+    counts = {}
+    for table in ("V3_Fixtures", "V3_Fixture_Stats", "V3_Fixture_Lineups", "V3_Team_Features_PreMatch", "V3_ML_Feature_Store"):
+        cur.execute(f"SELECT COUNT(*) FROM {table}")
+        counts[table.lower()] = cur.fetchone()[0]
+    cur.close()
+    return counts
+
+
+def build_context(conn, sample_size=SAMPLE_FIXTURES):
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT f.fixture_id
+        FROM V3_Fixtures f
+        JOIN V3_ML_Feature_Store fs ON fs.fixture_id = f.fixture_id
+        WHERE f.status_short = 'FT'
+        ORDER BY f.date DESC, f.fixture_id DESC
+        LIMIT %s
+        """,
+        (sample_size,),
+    )
+    fixture_ids = [row[0] for row in cur.fetchall()]
+    if not fixture_ids:
+        raise RuntimeError("No finished fixtures with feature vectors; run with --seed first.")
+
+    # The smallest finished league-season keeps the simulation case short.
+    cur.execute(
+        """
+        SELECT league_id, season_year
+        FROM V3_Fixtures
+        WHERE status_short = 'FT'
+        GROUP BY league_id, season_year
+        ORDER BY COUNT(*) ASC, league_id ASC, season_year ASC
+        LIMIT 1
+        """
+    )
+    league_id, season_year = cur.fetchone()
+    cur.execute(
+        "INSERT INTO V3_Forge_Simulations (league_id, season_year, status, horizon_type) "
+        "VALUES (%s, %s, 'PENDING', 'FULL_HISTORICAL') RETURNING id",
+        (league_id, season_year),
+    )
+    simulation_id = cur.fetchone()[0]
+    conn.commit()
+    cur.close()
+    return BenchmarkContext(conn, fixture_ids, league_id, season_year, simulation_id)
+
+
+def run_case(case, ctx, rounds):
+    argument = case.setup(ctx) if case.setup else ctx
+    started = time.perf_counter()
+    case.run(argument)
+    first_call = time.perf_counter() - started
+
+    samples = []
+    queries = 0
+    for _ in range(case.rounds or rounds):
+        with track_queries() as stats:
+            started = time.perf_counter()
+            case.run(argument)
+            samples.append(time.perf_counter() - started)
+        queries += stats["queries"]
+
+    result = summarize(samples, items=case.items)
+    result["group"] = case.group
+    result["first_call_seconds"] = round(first_call, 6)
+    result["queries_per_call"] = round(queries / len(samples), 1)
+    return result
+
+
+def print_table(results, comparison):
+    print(f"\n{'case':<52} {'median':>10} {'per item':>10} {'p95':>10} {'queries':>8} {'vs base':>8}")
+    for name, stats in results.items():
+        delta = comparison.get(name)
+        marker = ""
+        if delta:
+            marker = f"{delta['ratio']:.2f}x" + (" ⚠️" if delta["regression"] else "")
+        print(
+            f"{name:<52} {stats['median'] * 1000:>8.1f}ms {stats['per_item_median'] * 1000:>8.2f}ms "
+            f"{stats['p95'] * 1000:>8.1f}ms {stats['queries_per_call']:>8} {marker:>8}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ML feature, inference and simulation hot paths.")
+    parser.add_argument("--seed", action="store_true", help="Rebuild the database with synthetic data and dummy models.")
+    parser.add_argument("--leagues", type=int, default=2, help="Leagues to generate with --seed.")
+    parser.add_argument("--teams", type=int, default=10, help="Teams per league to generate with --seed.")
+    parser.add_argument("--seasons", type=int, default=2, help="Seasons to generate with --seed.")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS, help="Timed rounds per case.")
+    parser.add_argument("--filter", default=None, help="Only run cases whose name contains this string.")
+    parser.add_argument("--baseline", default=None, help="Results file to compare with (default: the latest one).")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed median slowdown (0.15 = 15%%).")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit 1 when a case regresses.")
+    parser.add_argument("--force", action="store_true", help="Allow a database name without a disposable marker.")
+    args = parser.parse_args()
+
+    conn = get_connection()
+    try:
+        database = check_disposable(conn, force=args.force)
+        if args.seed:
+            print(f"🧪 Seeding '{database}' with synthetic data...")
+            create_schema(conn)
+            generate(conn, leagues=args.leagues, teams_per_league=args.teams, seasons=args.seasons)
+            write_dummy_models(conn)
+
+        ctx = build_context(conn)
+        cases = [case for case in build_cases(ctx) if not args.filter or args.filter in case.name]
+        print(f"⏱️  Running {len(cases)} benchmarks on '{database}' ({len(ctx.fixture_ids)} sample fixtures)...")
+
+        results = {}
+        for case in cases:
+            try:
+                results[case.name] = run_case(case, ctx, args.rounds)
+                print(f"   {case.name}: {results[case.name]['median'] * 1000:.1f}ms")
+            except Exception as exc:
+                conn.rollback()
+                print(f"❌ {case.name} failed: {exc}")
+        meta = {
+            **git_info(),
+            "created_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "rounds": args.rounds,
+            "dataset": dataset_counts(conn),
+        }
+    finally:
+        conn.close()
+
+    baseline_path = Path(args.baseline) if args.baseline else latest_results_file()
+    baseline = json.loads(baseline_path.read_text())["results"] if baseline_path else {}
+    comparison = compare(results, baseline, threshold=args.threshold)
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    output = RESULTS_DIR / f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')}_{meta['commit']}.json"
+    output.write_text(json.dumps({
+        "meta": {**meta, "baseline": baseline_path.name if baseline_path else None},
+        "results": results,
+        "comparison": comparison,
+    }, indent=2))
+
+    print_table(results, comparison)
+    print(f"\n✅ Results written to {output.relative_to(ROOT_DIR)}")
+    regressions = [name for name, delta in comparison.items() if delta["regression"]]
+    if regressions:
+        print(f"⚠️  {len(regressions)} regression(s) above {args.threshold:.0%}: {', '.join(regressions)}")
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
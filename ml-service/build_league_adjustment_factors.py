@@ -35,26 +35,26 @@ def fetch_league_style_frame(min_date: str) -> pd.DataFrame:
                 COUNT(*) AS fixture_count,
                 AVG(COALESCE(f.goals_home, 0) + COALESCE(f.goals_away, 0)) AS goals_per_match,
                 AVG(COALESCE(f.xg_home, 0) + COALESCE(f.xg_away, 0)) AS xg_per_match,
-                AVG(COALESCE(fs_home.shots_total, 0) + COALESCE(fs_away.shots_total, 0)) AS shots_per_match,
-                AVG(COALESCE(fs_home.shots_on_goal, 0) + COALESCE(fs_away.shots_on_goal, 0)) AS shots_on_goal_per_match,
-                AVG(COALESCE(fs_home.corner_kicks, 0) + COALESCE(fs_away.corner_kicks, 0)) AS corners_per_match,
-                AVG(COALESCE(fs_home.fouls, 0) + COALESCE(fs_away.fouls, 0)) AS fouls_per_match,
+                AVG(COALESCE(sw.home_ft_shots_total, 0) + COALESCE(sw.away_ft_shots_total, 0)) AS shots_per_match,
+                AVG(COALESCE(sw.home_ft_shots_on_goal, 0) + COALESCE(sw.away_ft_shots_on_goal, 0)) AS shots_on_goal_per_match,
+                AVG(COALESCE(sw.home_ft_corner_kicks, 0) + COALESCE(sw.away_ft_corner_kicks, 0)) AS corners_per_match,
+                AVG(COALESCE(sw.home_ft_fouls, 0) + COALESCE(sw.away_ft_fouls, 0)) AS fouls_per_match,
                 AVG(
-                    COALESCE(fs_home.yellow_cards, 0) + COALESCE(fs_home.red_cards, 0) +
-                    COALESCE(fs_away.yellow_cards, 0) + COALESCE(fs_away.red_cards, 0)
+                    COALESCE(sw.home_ft_yellow_cards, 0) + COALESCE(sw.home_ft_red_cards, 0) +
+                    COALESCE(sw.away_ft_yellow_cards, 0) + COALESCE(sw.away_ft_red_cards, 0)
                 ) AS cards_per_match,
                 AVG(
                     (
-                        COALESCE(fs_home.pass_accuracy_pct, 0) +
-                        COALESCE(fs_away.pass_accuracy_pct, 0)
+                        COALESCE(sw.home_ft_pass_accuracy_pct, 0) +
+                        COALESCE(sw.away_ft_pass_accuracy_pct, 0)
                     ) / 2.0
                 ) AS pass_accuracy_pct_avg,
                 AVG(
-                    ABS(COALESCE(fs_home.ball_possession_pct, 50) - 50) +
-                    ABS(COALESCE(fs_away.ball_possession_pct, 50) - 50)
+                    ABS(COALESCE(sw.home_ft_ball_possession_pct, 50) - 50) +
+                    ABS(COALESCE(sw.away_ft_ball_possession_pct, 50) - 50)
                 ) / 2.0 AS possession_gap_avg,
                 AVG(
-                    COALESCE(fs_home_2h.shots_total, 0) + COALESCE(fs_away_2h.shots_total, 0)
+                    COALESCE(sw.home_2h_shots_total, 0) + COALESCE(sw.away_2h_shots_total, 0)
                 ) AS second_half_shots_per_match,
                 AVG(
                     (CASE WHEN (COALESCE(f.goals_home, 0) + COALESCE(f.goals_away, 0)) > 0
@@ -63,23 +63,10 @@ def fetch_league_style_frame(min_date: str) -> pd.DataFrame:
                 ) AS non_zero_goals_per_match
             FROM V3_Fixtures f
             JOIN V3_Leagues l ON l.league_id = f.league_id
-            JOIN V3_Fixture_Stats fs_home
-              ON fs_home.fixture_id = f.fixture_id
-             AND fs_home.team_id = f.home_team_id
-             AND fs_home.half = 'FT'
-            JOIN V3_Fixture_Stats fs_away
-              ON fs_away.fixture_id = f.fixture_id
-             AND fs_away.team_id = f.away_team_id
-             AND fs_away.half = 'FT'
-            LEFT JOIN V3_Fixture_Stats fs_home_2h
-              ON fs_home_2h.fixture_id = f.fixture_id
-             AND fs_home_2h.team_id = f.home_team_id
-             AND fs_home_2h.half = '2H'
-            LEFT JOIN V3_Fixture_Stats fs_away_2h
-              ON fs_away_2h.fixture_id = f.fixture_id
-             AND fs_away_2h.team_id = f.away_team_id
-             AND fs_away_2h.half = '2H'
+            JOIN V3_Fixture_Stats_Wide sw ON sw.fixture_id = f.fixture_id
             WHERE f.status_short IN ('FT', 'AET', 'PEN')
+              AND sw.has_home_ft
+              AND sw.has_away_ft
               AND f.date >= %s
             GROUP BY f.league_id, l.name
             HAVING COUNT(*) >= 120
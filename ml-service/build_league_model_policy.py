@@ -2,32 +2,15 @@ import json
 import os
 from datetime import datetime, timezone
 
-from db_config import get_connection
 from league_model_policy import REPORT_PATH, save_policy
+from src.models.model_registry import get_registry_entry
 
 
 def load_latest_registry_entry(model_name: str):
-    conn = get_connection()
-    try:
-        cur = conn.cursor()
-        cur.execute(
-            """
-            SELECT version, metadata_json
-            FROM V3_Model_Registry
-            WHERE name = %s AND is_active = 1
-            ORDER BY created_at DESC
-            LIMIT 1
-            """,
-            (model_name,),
-        )
-        row = cur.fetchone()
-        if not row:
-            return None
-        version, metadata_json = row
-        metadata = json.loads(metadata_json) if isinstance(metadata_json, str) else metadata_json
-        return {"version": version, **metadata}
-    finally:
-        conn.close()
+    entry = get_registry_entry(model_name)
+    if not entry:
+        return None
+    return {"version": entry["version"], **entry["metadata"]}
 
 
 def main():
@@ -1,8 +1,13 @@
+import argparse
+import hashlib
 import json
 import os
 import re
 import sys
+import time
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
 from pathlib import Path
 
 import joblib
@@ -13,12 +18,20 @@ from sklearn.metrics import log_loss
 
 from db_config import get_connection
 from feature_schema import GLOBAL_1X2_FEATURE_COLUMNS, normalize_feature_vector
-from src.models.model_utils import poisson_prob
+from src.models.model_registry import get_registry_entry
+from src.models.native_scoring import predict, predict_proba
+from src.models.poisson_markets import AWAY, DRAW, HOME, result_probabilities
 
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 REPORTS_DIR = os.path.join(BASE_DIR, "reports")
 REPORT_PATH = os.path.join(REPORTS_DIR, "league_specific_eligibility.json")
+TIMING_PATH = os.path.join(REPORTS_DIR, "league_eligibility_timing.json")
+# Holdout predictions per global model, keyed by (model version, fixture_id, feature calculated_at).
+HOLDOUT_CACHE_DIR = os.path.join(REPORTS_DIR, "eligibility_cache")
+
+FT_COLUMNS = ["prob_draw", "prob_home", "prob_away"]
+PAIR_COLUMNS = ["pred_home", "pred_away"]
 
 PRIORITY_PATTERNS = {
     "Premier League": [r"\bpremier league\b"],
@@ -47,52 +60,18 @@ def canonical_league_name(name: str) -> str:
     return name
 
 
-def load_registry_model_paths(model_name: str):
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
-        cur.execute(
-            """
-            SELECT path, metadata_json
-            FROM V3_Model_Registry
-            WHERE name = %s AND is_active = 1
-            ORDER BY created_at DESC
-            LIMIT 1
-            """,
-            (model_name,),
-        )
-        row = cur.fetchone()
-        if not row:
-            raise RuntimeError(f"Active registry entry not found for {model_name}")
-        path, metadata_json = row
-        metadata = json.loads(metadata_json) if isinstance(metadata_json, str) else metadata_json
-        return path, metadata
-    finally:
-        conn.close()
+def load_registry_model(model_name: str):
+    entry = get_registry_entry(model_name)
+    if not entry:
+        raise RuntimeError(f"Active registry entry not found for {model_name}")
+    return entry
 
 
 def load_latest_registry_entry(model_name: str):
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
-        cur.execute(
-            """
-            SELECT version, metadata_json
-            FROM V3_Model_Registry
-            WHERE name = %s AND is_active = 1
-            ORDER BY created_at DESC
-            LIMIT 1
-            """,
-            (model_name,),
-        )
-        row = cur.fetchone()
-        if not row:
-            return None
-        version, metadata_json = row
-        metadata = json.loads(metadata_json) if isinstance(metadata_json, str) else metadata_json
-        return {"version": version, **metadata}
-    finally:
-        conn.close()
+    entry = get_registry_entry(model_name)
+    if not entry:
+        return None
+    return {"version": entry["version"], **entry["metadata"]}
 
 
 def load_master_dataset():
@@ -108,23 +87,17 @@ def load_master_dataset():
                 f.goals_away,
                 f.score_halftime_home,
                 f.score_halftime_away,
-                fs_home.corner_kicks AS home_corners,
-                fs_away.corner_kicks AS away_corners,
-                fs_home.yellow_cards AS home_yellow_raw,
-                fs_away.yellow_cards AS away_yellow_raw,
-                COALESCE(fs_home.yellow_cards, 0) + COALESCE(fs_home.red_cards, 0) AS home_cards,
-                COALESCE(fs_away.yellow_cards, 0) + COALESCE(fs_away.red_cards, 0) AS away_cards,
-                fs.feature_vector
+                sw.home_ft_corner_kicks AS home_corners,
+                sw.away_ft_corner_kicks AS away_corners,
+                sw.home_ft_yellow_cards AS home_yellow_raw,
+                sw.away_ft_yellow_cards AS away_yellow_raw,
+                COALESCE(sw.home_ft_yellow_cards, 0) + COALESCE(sw.home_ft_red_cards, 0) AS home_cards,
+                COALESCE(sw.away_ft_yellow_cards, 0) + COALESCE(sw.away_ft_red_cards, 0) AS away_cards,
+                fs.feature_vector,
+                fs.calculated_at AS feature_calculated_at
             FROM V3_Fixtures f
             JOIN V3_ML_Feature_Store fs ON f.fixture_id = fs.fixture_id
-            LEFT JOIN V3_Fixture_Stats fs_home
-              ON f.fixture_id = fs_home.fixture_id
-             AND f.home_team_id = fs_home.team_id
-             AND fs_home.half = 'FT'
-            LEFT JOIN V3_Fixture_Stats fs_away
-              ON f.fixture_id = fs_away.fixture_id
-             AND f.away_team_id = fs_away.team_id
-             AND fs_away.half = 'FT'
+            LEFT JOIN V3_Fixture_Stats_Wide sw ON sw.fixture_id = f.fixture_id
             LEFT JOIN V3_Leagues l ON f.league_id = l.league_id
             WHERE f.status_short IN ('FT', 'AET', 'PEN')
             ORDER BY f.date ASC
@@ -134,6 +107,7 @@ def load_master_dataset():
         conn.close()
 
     df["match_date"] = pd.to_datetime(df["match_date"], utc=True)
+    df["feature_calculated_at"] = df["feature_calculated_at"].astype(str)
     raw_features = df["feature_vector"].apply(json.loads).tolist()
     feature_frame = pd.DataFrame(
         [normalize_feature_vector(vector) for vector in raw_features],
@@ -145,99 +119,176 @@ def load_master_dataset():
     return df
 
 
-def calculate_1n2_probs(home_mu: float, away_mu: float, max_goals: int = 8):
-    p_1 = p_n = p_2 = 0.0
-    for h in range(max_goals + 1):
-        for a in range(max_goals + 1):
-            prob = poisson_prob(home_mu, h) * poisson_prob(away_mu, a)
-            if h > a:
-                p_1 += prob
-            elif h == a:
-                p_n += prob
-            else:
-                p_2 += prob
-    total = p_1 + p_n + p_2 or 1.0
-    return [p_n / total, p_1 / total, p_2 / total]
-
-
-def summarize_ft(df: pd.DataFrame, model) -> dict:
-    split_idx = int(len(df) * 0.85)
-    test_df = df.iloc[split_idx:].copy()
-    probs = model.predict_proba(test_df[GLOBAL_1X2_FEATURE_COLUMNS])
-    preds = np.argmax(probs, axis=1)
-    test_df["pred_class"] = preds
-    test_df["prob_draw"] = probs[:, 0]
-    test_df["prob_home"] = probs[:, 1]
-    test_df["prob_away"] = probs[:, 2]
+def holdout(df: pd.DataFrame, fraction: float) -> pd.DataFrame:
+    """Most recent ``1 - fraction`` of a date-ordered dataset (the global models' out-of-sample split)."""
+    return df.iloc[int(len(df) * fraction):]
 
-    rows = []
-    for (league_id, league_name, canonical_name), group in test_df.groupby(["league_id", "league_name", "canonical_name"]):
-        y_true = group["actual_ft"].to_numpy()
-        group_probs = group[["prob_draw", "prob_home", "prob_away"]].to_numpy()
-        y_one_hot = np.zeros((len(y_true), 3))
-        y_one_hot[np.arange(len(y_true)), y_true] = 1
-        rows.append({
-            "league_id": int(league_id),
-            "league_name": league_name,
-            "canonical_name": canonical_name,
-            "ft_matches": int(len(group)),
-            "ft_accuracy": float(np.mean(group["pred_class"].to_numpy() == y_true)),
-            "ft_log_loss": float(log_loss(y_true, group_probs, labels=[0, 1, 2])),
-            "ft_brier": float(np.mean(np.sum((group_probs - y_one_hot) ** 2, axis=1))),
-        })
-    return {row["league_id"]: row for row in rows}
-
-
-def summarize_ht(df: pd.DataFrame, home_model, away_model) -> dict:
-    split_idx = int(len(df) * 0.8)
-    test_df = df.iloc[split_idx:].copy()
-    X_test = test_df[GLOBAL_1X2_FEATURE_COLUMNS]
-    home_mu = np.maximum(home_model.predict(X_test), 0.01)
-    away_mu = np.maximum(away_model.predict(X_test), 0.01)
-    probs = np.array([calculate_1n2_probs(h, a, max_goals=5) for h, a in zip(home_mu, away_mu)])
-    preds = np.argmax(probs, axis=1)
-    test_df["pred_class"] = preds
-    test_df["prob_draw"] = probs[:, 0]
-    test_df["prob_home"] = probs[:, 1]
-    test_df["prob_away"] = probs[:, 2]
-
-    rows = {}
-    for (league_id, _league_name), group in test_df.groupby(["league_id", "league_name"]):
-        y_true = group["actual_ht"].to_numpy()
-        group_probs = group[["prob_draw", "prob_home", "prob_away"]].to_numpy()
-        rows[int(league_id)] = {
-            "ht_matches": int(len(group)),
-            "ht_accuracy": float(np.mean(group["pred_class"].to_numpy() == y_true)),
-            "ht_log_loss": float(log_loss(y_true, group_probs, labels=[0, 1, 2])),
-        }
-    return rows
 
+def model_version_key(registry_name: str, version, paths) -> str:
+    """Registry version plus a digest of the model files, so a retrained file under the same version is re-scored."""
+    stamps = [[path, os.stat(path).st_mtime_ns if os.path.exists(path) else None] for path in paths]
+    digest = hashlib.sha1(json.dumps([registry_name, version, stamps]).encode()).hexdigest()[:12]
+    return f"{registry_name}@{version}-{digest}"
 
-def summarize_total_market(df: pd.DataFrame, home_model, away_model, target_home: str, target_away: str, threshold: float, prefix: str):
-    split_idx = int(len(df) * 0.8)
-    test_df = df.iloc[split_idx:].copy()
-    X_test = test_df[GLOBAL_1X2_FEATURE_COLUMNS]
-    pred_home = np.maximum(home_model.predict(X_test), 0.01)
-    pred_away = np.maximum(away_model.predict(X_test), 0.01)
-    actual_total = test_df[target_home].to_numpy() + test_df[target_away].to_numpy()
-    pred_total = pred_home + pred_away
-
-    rows = {}
-    for (league_id, _league_name), group in test_df.assign(actual_total=actual_total, pred_total=pred_total).groupby(["league_id", "league_name"]):
-        rows[int(league_id)] = {
-            f"{prefix}_matches": int(len(group)),
-            f"{prefix}_rmse": float(np.sqrt(np.mean((group["pred_total"] - group["actual_total"]) ** 2))),
-            f"{prefix}_over_accuracy": float(np.mean((group["pred_total"] > threshold) == (group["actual_total"] > threshold))),
-        }
-    return rows
 
+def cache_path(registry_name: str) -> str:
+    return os.path.join(HOLDOUT_CACHE_DIR, f"{registry_name}.joblib")
 
-def merge_rows(*maps):
-    merged = defaultdict(dict)
-    for mp in maps:
-        for league_id, payload in mp.items():
-            merged[league_id].update(payload)
-    return merged
+
+def load_cached_predictions(registry_name: str, model_key: str, columns) -> pd.DataFrame:
+    """Cached holdout predictions of ``model_key`` indexed by fixture_id (empty after a model change)."""
+    empty = pd.DataFrame(columns=["feature_calculated_at", *columns], index=pd.Index([], name="fixture_id"))
+    path = cache_path(registry_name)
+    if not os.path.exists(path):
+        return empty
+    try:
+        payload = joblib.load(path)
+    except Exception:
+        return empty
+    if payload.get("model_key") != model_key:
+        return empty
+    return payload["predictions"]
+
+
+def save_cached_predictions(registry_name: str, model_key: str, predictions: pd.DataFrame):
+    os.makedirs(HOLDOUT_CACHE_DIR, exist_ok=True)
+    joblib.dump({"model_key": model_key, "predictions": predictions}, cache_path(registry_name))
+
+
+def attach_cached_predictions(test_df: pd.DataFrame, cached: pd.DataFrame, columns) -> pd.DataFrame:
+    """Copy cached predictions onto ``test_df``; rows whose features were rebuilt since are left NaN."""
+    test_df = test_df.copy()
+    hits = cached[~cached.index.duplicated(keep="last")].reindex(test_df["fixture_id"].to_numpy())
+    fresh = hits["feature_calculated_at"].to_numpy() == test_df["feature_calculated_at"].to_numpy()
+    for column in columns:
+        test_df[column] = np.where(fresh, hits[column].to_numpy(dtype=float), np.nan)
+    return test_df
+
+
+def ft_metrics(group: pd.DataFrame) -> dict:
+    y_true = group["actual_ft"].to_numpy()
+    group_probs = group[["prob_draw", "prob_home", "prob_away"]].to_numpy()
+    y_one_hot = np.zeros((len(y_true), 3))
+    y_one_hot[np.arange(len(y_true)), y_true] = 1
+    return {
+        "ft_matches": int(len(group)),
+        "ft_accuracy": float(np.mean(np.argmax(group_probs, axis=1) == y_true)),
+        "ft_log_loss": float(log_loss(y_true, group_probs, labels=[0, 1, 2])),
+        "ft_brier": float(np.mean(np.sum((group_probs - y_one_hot) ** 2, axis=1))),
+    }
+
+
+def ht_metrics(group: pd.DataFrame) -> dict:
+    home_mu = np.maximum(group["pred_home"].to_numpy(), 0.01)
+    away_mu = np.maximum(group["pred_away"].to_numpy(), 0.01)
+    group_probs = result_probabilities(home_mu, away_mu, max_goals=5)[:, [DRAW, HOME, AWAY]]
+    y_true = group["actual_ht"].to_numpy()
+    return {
+        "ht_matches": int(len(group)),
+        "ht_accuracy": float(np.mean(np.argmax(group_probs, axis=1) == y_true)),
+        "ht_log_loss": float(log_loss(y_true, group_probs, labels=[0, 1, 2])),
+    }
+
+
+def total_market_metrics(group: pd.DataFrame, target_home: str, target_away: str, threshold: float, prefix: str) -> dict:
+    pred_total = np.maximum(group["pred_home"].to_numpy(), 0.01) + np.maximum(group["pred_away"].to_numpy(), 0.01)
+    actual_total = group[target_home].to_numpy() + group[target_away].to_numpy()
+    return {
+        f"{prefix}_matches": int(len(group)),
+        f"{prefix}_rmse": float(np.sqrt(np.mean((pred_total - actual_total) ** 2))),
+        f"{prefix}_over_accuracy": float(np.mean((pred_total > threshold) == (actual_total > threshold))),
+    }
+
+
+# market -> (registry name, holdout split, prediction columns, league group keys, metrics)
+MARKETS = {
+    "ft": ("global_1x2", 0.85, FT_COLUMNS, ["league_id", "league_name", "canonical_name"], ft_metrics),
+    "ht": ("global_ht_1x2", 0.8, PAIR_COLUMNS, ["league_id", "league_name"], ht_metrics),
+    "goals": ("global_goals_ou", 0.8, PAIR_COLUMNS, ["league_id", "league_name"],
+              partial(total_market_metrics, target_home="target_home_goals", target_away="target_away_goals", threshold=2.5, prefix="goals")),
+    "corners": ("global_corners_ou", 0.8, PAIR_COLUMNS, ["league_id", "league_name"],
+                partial(total_market_metrics, target_home="target_home_corners", target_away="target_away_corners", threshold=9.5, prefix="corners")),
+    "cards": ("global_cards_ou", 0.8, PAIR_COLUMNS, ["league_id", "league_name"],
+              partial(total_market_metrics, target_home="target_home_cards", target_away="target_away_cards", threshold=4.5, prefix="cards")),
+}
+
+_WORKER_MODELS = {}
+
+
+def load_market_models(model_paths: dict) -> dict:
+    models = {}
+    for market, paths in model_paths.items():
+        if market == "ft":
+            models[market] = joblib.load(paths["model"])
+            continue
+        home, away = CatBoostRegressor(), CatBoostRegressor()
+        home.load_model(paths["home"])
+        away.load_model(paths["away"])
+        models[market] = (home, away)
+    return models
+
+
+def _init_worker(model_paths: dict):
+    _WORKER_MODELS.clear()
+    _WORKER_MODELS.update(load_market_models(model_paths))
+
+
+def score_market(market: str, X: pd.DataFrame) -> np.ndarray:
+    model = _WORKER_MODELS[market]
+    columns = list(X.columns)
+    if market == "ft":
+        return predict_proba(model, X, columns)
+    home, away = model
+    return np.column_stack([predict(home, X, columns), predict(away, X, columns)])
+
+
+def evaluate_league(task: dict) -> dict:
+    """Score the uncached holdout rows of one league and compute its metrics for every market."""
+    started = time.perf_counter()
+    metrics, scored, rescored = {}, {}, 0
+    for market, group in task["markets"].items():
+        _registry_name, _split, columns, _keys, market_metrics = MARKETS[market]
+        missing = group[columns[0]].isna().to_numpy()
+        if missing.any():
+            group = group.copy()
+            group.loc[missing, columns] = score_market(market, group.loc[missing, GLOBAL_1X2_FEATURE_COLUMNS])
+            scored[market] = group.loc[missing, ["fixture_id", "feature_calculated_at", *columns]]
+            rescored += int(missing.sum())
+        metrics.update(market_metrics(group))
+    return {
+        "league_id": task["league_id"],
+        "identity": task["identity"],
+        "metrics": metrics,
+        "scored": scored,
+        "rescored": rescored,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def build_league_tasks(market_frames: dict) -> list:
+    """One task per league with its holdout rows (predictions attached where cached) for each market."""
+    tasks = {}
+    for market, test_df in market_frames.items():
+        keys = MARKETS[market][3]
+        for key, group in test_df.groupby(keys):
+            league_id = int(key[0])
+            task = tasks.setdefault(league_id, {"league_id": league_id, "identity": {}, "markets": {}})
+            if market == "ft":
+                task["identity"] = {"league_id": league_id, "league_name": key[1], "canonical_name": key[2]}
+            task["markets"][market] = group
+    # Largest leagues first so they do not end up alone on a worker at the end of the run.
+    return sorted(tasks.values(), key=lambda task: -sum(len(group) for group in task["markets"].values()))
+
+
+def run_league_tasks(tasks: list, model_paths: dict, workers: int):
+    if workers <= 1:
+        _init_worker(model_paths)
+        yield from (evaluate_league(task) for task in tasks)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_paths,)) as pool:
+        futures = [pool.submit(evaluate_league, task) for task in tasks]
+        for future in as_completed(futures):
+            yield future.result()
 
 
 def add_full_counts(merged, df: pd.DataFrame, column_name: str):
@@ -262,35 +313,17 @@ def build_policy(rows):
     return rows
 
 
-def main():
+def main(workers=None):
     os.makedirs(REPORTS_DIR, exist_ok=True)
-
-    ft_model_path, ft_meta = load_registry_model_paths("global_1x2")
-    ft_model = joblib.load(ft_model_path)
-
-    ht_dir, ht_meta = load_registry_model_paths("global_ht_1x2")
-    ht_home = CatBoostRegressor()
-    ht_away = CatBoostRegressor()
-    ht_home.load_model(ht_meta["model_paths"]["home"])
-    ht_away.load_model(ht_meta["model_paths"]["away"])
-
-    goals_dir, goals_meta = load_registry_model_paths("global_goals_ou")
-    goals_home = CatBoostRegressor()
-    goals_away = CatBoostRegressor()
-    goals_home.load_model(goals_meta["model_paths"]["home"])
-    goals_away.load_model(goals_meta["model_paths"]["away"])
-
-    corners_dir, corners_meta = load_registry_model_paths("global_corners_ou")
-    corners_home = CatBoostRegressor()
-    corners_away = CatBoostRegressor()
-    corners_home.load_model(corners_meta["model_paths"]["home"])
-    corners_away.load_model(corners_meta["model_paths"]["away"])
-
-    cards_dir, cards_meta = load_registry_model_paths("global_cards_ou")
-    cards_home = CatBoostRegressor()
-    cards_away = CatBoostRegressor()
-    cards_home.load_model(cards_meta["model_paths"]["home"])
-    cards_away.load_model(cards_meta["model_paths"]["away"])
+    workers = workers or os.cpu_count() or 1
+
+    entries = {market: load_registry_model(spec[0]) for market, spec in MARKETS.items()}
+    model_paths = {"ft": {"model": entries["ft"]["path"]}}
+    for market in ("ht", "goals", "corners", "cards"):
+        model_paths[market] = entries[market]["metadata"]["model_paths"]
+    ft_meta, ht_meta, goals_meta, corners_meta, cards_meta = (
+        entries[market]["metadata"] for market in ("ft", "ht", "goals", "corners", "cards")
+    )
 
     master_df = load_master_dataset()
     ht_df = master_df.dropna(subset=["score_halftime_home", "score_halftime_away"]).copy()
@@ -305,13 +338,39 @@ def main():
     cards_df["target_home_cards"] = pd.to_numeric(cards_df["home_cards"], errors="coerce").astype(int)
     cards_df["target_away_cards"] = pd.to_numeric(cards_df["away_cards"], errors="coerce").astype(int)
 
-    merged = merge_rows(
-        summarize_ft(master_df, ft_model),
-        summarize_ht(ht_df, ht_home, ht_away),
-        summarize_total_market(goals_df, goals_home, goals_away, "target_home_goals", "target_away_goals", 2.5, "goals"),
-        summarize_total_market(corners_df, corners_home, corners_away, "target_home_corners", "target_away_corners", 9.5, "corners"),
-        summarize_total_market(cards_df, cards_home, cards_away, "target_home_cards", "target_away_cards", 4.5, "cards"),
-    )
+    datasets = {"ft": master_df, "ht": ht_df, "goals": goals_df, "corners": corners_df, "cards": cards_df}
+    model_keys, cached, market_frames = {}, {}, {}
+    for market, (registry_name, split, columns, _keys, _metrics) in MARKETS.items():
+        paths = list(model_paths[market].values())
+        model_keys[market] = model_version_key(registry_name, entries[market]["version"], paths)
+        cached[market] = load_cached_predictions(registry_name, model_keys[market], columns)
+        market_frames[market] = attach_cached_predictions(holdout(datasets[market], split), cached[market], columns)
+        hits = int(market_frames[market][columns[0]].notna().sum())
+        print(f"{market}: {hits}/{len(market_frames[market])} holdout predictions cached for {model_keys[market]}")
+
+    tasks = build_league_tasks(market_frames)
+    print(f"Evaluating {len(tasks)} leagues on {workers} workers...")
+    started = time.perf_counter()
+    merged = defaultdict(dict)
+    scored = defaultdict(list)
+    timings = []
+    for result in run_league_tasks(tasks, model_paths, workers):
+        merged[result["league_id"]] = {**result["identity"], **result["metrics"]}
+        for market, frame in result["scored"].items():
+            scored[market].append(frame)
+        timings.append({"league_id": result["league_id"], "seconds": round(result["seconds"], 4), "rescored": result["rescored"]})
+        print(f"  league {result['league_id']}: {result['seconds']:.2f}s ({result['rescored']} fixtures scored)")
+    merged = defaultdict(dict, sorted(merged.items()))
+
+    for market, frames in scored.items():
+        registry_name, _split, columns, _keys, _metrics = MARKETS[market]
+        fresh = pd.concat(frames).set_index("fixture_id")[["feature_calculated_at", *columns]]
+        fresh = fresh[~fresh.index.duplicated(keep="last")]
+        # Fixtures that left the holdout are dropped so the cache tracks the current split.
+        holdout_ids = market_frames[market]["fixture_id"].unique()
+        previous = cached[market][cached[market].index.isin(holdout_ids)].drop(index=fresh.index, errors="ignore")
+        save_cached_predictions(registry_name, model_keys[market], pd.concat([previous, fresh]) if len(previous) else fresh)
+
     add_full_counts(merged, master_df, "ft_total_matches")
     add_full_counts(merged, ht_df, "ht_total_matches")
     add_full_counts(merged, goals_df, "goals_total_matches")
@@ -358,9 +417,20 @@ def main():
     }
 
     Path(REPORT_PATH).write_text(json.dumps(report, indent=2))
-    print(f"Wrote report to {REPORT_PATH}")
+    timings.sort(key=lambda timing: -timing["seconds"])
+    Path(TIMING_PATH).write_text(json.dumps({
+        "generated_at": report["generated_at"],
+        "workers": workers,
+        "total_seconds": round(time.perf_counter() - started, 4),
+        "rescored": {market: int(sum(len(frame) for frame in frames)) for market, frames in scored.items()},
+        "leagues": timings,
+    }, indent=2))
+    print(f"Wrote report to {REPORT_PATH} (league timings in {TIMING_PATH})")
     print(json.dumps(priority_rows[:12], indent=2))
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Evaluate global models per league and write the league eligibility report.")
+    parser.add_argument("--workers", type=int, default=None, help="League evaluation processes (default: CPU count).")
+    args = parser.parse_args()
+    main(workers=args.workers)
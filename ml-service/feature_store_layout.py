@@ -0,0 +1,320 @@
+"""
+Partitioned layout of the feature tables.
+
+V3_Team_Features_PreMatch is partitioned by LIST (feature_set_id), one
+partition per ``PARTITIONED_FEATURE_SETS`` entry plus a DEFAULT one, and
+each feature-set partition by RANGE (season_year), one partition per season
+plus a DEFAULT one for seasons created later. Every reader filters on
+feature_set_id, so ``load_team_feature_set`` and the inference lookups only
+touch their feature set. The primary key gains season_year (partition keys
+must be part of it); writers upsert on
+``(fixture_id, team_id, feature_set_id, horizon_type, season_year)``.
+
+V3_ML_Feature_Store is only indexed: all its lookups are by fixture_id
+without a season, so season partitions would fan every lookup out to each
+partition. ``(fixture_id) INCLUDE (calculated_at)`` answers
+``get_completed_fixture_ids`` and the prediction cache freshness check from
+the index alone.
+
+backend/src/migrations/registry/20260413_01_V3_Feature_Tables_Partitioning.js
+applies the same layout to the application database; ``apply_feature_store_layout``
+applies it to synthetic and benchmark databases.
+
+Full rebuilds of V3_ML_Feature_Store (``features.py --reset``) never empty
+the live table: they bulk load V3_ML_Feature_Store_Shadow, created without
+indexes or key constraints, check it with ``validate_feature_store``, copy
+the live table's indexes, primary key, unique and foreign keys onto it and
+swap it in with ``swap_feature_store``. The swap locks the live table
+against writers, first copies over the fixtures written to it during the
+rebuild (e.g. by ``forge_backfill.py``) and then renames the tables in the
+same transaction. The replaced table stays as V3_ML_Feature_Store_Previous
+until the next swap;
+``rollback_feature_store`` swaps it back. Views on V3_ML_Feature_Store follow
+the renamed table, so they must be recreated after a swap.
+"""
+
+import json
+
+from feature_schema import inspect_feature_vector
+
+TEAM_FEATURES_TABLE = "V3_Team_Features_PreMatch"
+FLAT_TEAM_FEATURES_TABLE = "V3_Team_Features_PreMatch_Flat"
+PARTITIONED_FEATURE_SETS = ("BASELINE_V1", "PROCESS_V1")
+# Season partitions created ahead of the latest known season.
+SEASON_LOOKAHEAD = 2
+
+TEAM_FEATURES_COLUMNS = (
+    "fixture_id", "team_id", "league_id", "season_year", "feature_set_id",
+    "horizon_type", "as_of", "features_json", "calculated_at",
+)
+
+TEAM_FEATURES_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_ml_features_prematch_team ON V3_Team_Features_PreMatch(team_id)",
+    "CREATE INDEX IF NOT EXISTS idx_ml_features_prematch_set_horizon "
+    "ON V3_Team_Features_PreMatch(feature_set_id, horizon_type, fixture_id, team_id)",
+    "CREATE INDEX IF NOT EXISTS idx_ml_features_prematch_league_asof ON V3_Team_Features_PreMatch(league_id, as_of)",
+)
+
+FEATURE_STORE_TABLE = "V3_ML_Feature_Store"
+SHADOW_FEATURE_STORE_TABLE = "V3_ML_Feature_Store_Shadow"
+PREVIOUS_FEATURE_STORE_TABLE = "V3_ML_Feature_Store_Previous"
+# Index name suffixes of the shadow and previous tables (index names are unique per schema).
+SHADOW_SUFFIX = "_shadow"
+PREVIOUS_SUFFIX = "_previous"
+# A swap waits at most this long for readers holding the tables instead of queueing /predict behind it.
+SWAP_LOCK_TIMEOUT = "10s"
+
+FEATURE_STORE_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_v3_ml_feature_store_fixture_calculated "
+    "ON V3_ML_Feature_Store(fixture_id) INCLUDE (calculated_at)",
+    "CREATE INDEX IF NOT EXISTS idx_v3_ml_feature_store_league ON V3_ML_Feature_Store(league_id, fixture_id)",
+)
+
+
+def feature_set_partition(feature_set_id):
+    return f"{TEAM_FEATURES_TABLE.lower()}_{feature_set_id.lower()}"
+
+
+def season_partition(feature_set_id, season_year):
+    return f"{feature_set_partition(feature_set_id)}_s{int(season_year)}"
+
+
+def partition_seasons(seasons, lookahead=SEASON_LOOKAHEAD):
+    """Sorted known seasons plus ``lookahead`` seasons after the latest one."""
+    known = sorted({int(season) for season in seasons if season is not None})
+    if not known:
+        return []
+    return known + list(range(known[-1] + 1, known[-1] + 1 + lookahead))
+
+
+def team_features_partition_ddl(seasons, feature_sets=PARTITIONED_FEATURE_SETS):
+    """CREATE statements for the partitioned V3_Team_Features_PreMatch and its partitions."""
+    statements = [f"""CREATE TABLE {TEAM_FEATURES_TABLE} (
+        fixture_id INTEGER NOT NULL,
+        team_id INTEGER NOT NULL,
+        league_id INTEGER NOT NULL,
+        season_year INTEGER NOT NULL,
+        feature_set_id TEXT NOT NULL,
+        horizon_type TEXT NOT NULL,
+        as_of TIMESTAMPTZ NOT NULL,
+        features_json TEXT NOT NULL,
+        calculated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+        CONSTRAINT v3_team_features_prematch_partitioned_pkey
+            PRIMARY KEY (fixture_id, team_id, feature_set_id, horizon_type, season_year),
+        FOREIGN KEY (fixture_id) REFERENCES V3_Fixtures(fixture_id) ON DELETE CASCADE
+    ) PARTITION BY LIST (feature_set_id)"""]
+    for feature_set_id in feature_sets:
+        parent = feature_set_partition(feature_set_id)
+        statements.append(
+            f"CREATE TABLE {parent} PARTITION OF {TEAM_FEATURES_TABLE} "
+            f"FOR VALUES IN ('{feature_set_id}') PARTITION BY RANGE (season_year)"
+        )
+        for season in partition_seasons(seasons):
+            statements.append(
+                f"CREATE TABLE {season_partition(feature_set_id, season)} PARTITION OF {parent} "
+                f"FOR VALUES FROM ({season}) TO ({season + 1})"
+            )
+        statements.append(f"CREATE TABLE {parent}_default PARTITION OF {parent} DEFAULT")
+    statements.append(f"CREATE TABLE {TEAM_FEATURES_TABLE.lower()}_default PARTITION OF {TEAM_FEATURES_TABLE} DEFAULT")
+    return statements
+
+
+def is_partitioned(conn, table=TEAM_FEATURES_TABLE):
+    cur = conn.cursor()
+    cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", (table.lower(),))
+    row = cur.fetchone()
+    cur.close()
+    return bool(row) and row[0] == "p"
+
+
+def partition_team_features(conn):
+    """Move a flat V3_Team_Features_PreMatch into the partitioned layout; returns rows moved (None if already done)."""
+    if is_partitioned(conn):
+        return None
+    columns = ", ".join(TEAM_FEATURES_COLUMNS)
+    cur = conn.cursor()
+    cur.execute(f"ALTER TABLE {TEAM_FEATURES_TABLE} RENAME TO {FLAT_TEAM_FEATURES_TABLE}")
+    cur.execute(f"""
+        SELECT season_year FROM V3_Fixtures WHERE season_year IS NOT NULL
+        UNION
+        SELECT season_year FROM {FLAT_TEAM_FEATURES_TABLE}
+    """)
+    seasons = [row[0] for row in cur.fetchall()]
+    for statement in team_features_partition_ddl(seasons):
+        cur.execute(statement)
+    cur.execute(f"INSERT INTO {TEAM_FEATURES_TABLE} ({columns}) SELECT {columns} FROM {FLAT_TEAM_FEATURES_TABLE}")
+    moved = cur.rowcount
+    cur.execute(f"DROP TABLE {FLAT_TEAM_FEATURES_TABLE}")
+    for statement in TEAM_FEATURES_INDEXES:
+        cur.execute(statement)
+    cur.close()
+    return moved
+
+
+def index_feature_store(conn):
+    cur = conn.cursor()
+    for statement in FEATURE_STORE_INDEXES:
+        cur.execute(statement)
+    cur.close()
+
+
+def apply_feature_store_layout(conn):
+    """Partition V3_Team_Features_PreMatch and index V3_ML_Feature_Store in one transaction."""
+    moved = partition_team_features(conn)
+    index_feature_store(conn)
+    conn.commit()
+    return moved
+
+
+def table_exists(conn, table):
+    cur = conn.cursor()
+    cur.execute("SELECT to_regclass(%s) IS NOT NULL", (table.lower(),))
+    present = cur.fetchone()[0]
+    cur.close()
+    return bool(present)
+
+
+def create_shadow_feature_store(conn):
+    """(Re)create the empty shadow table like the live one, minus its indexes and key constraints."""
+    cur = conn.cursor()
+    cur.execute(f"DROP TABLE IF EXISTS {SHADOW_FEATURE_STORE_TABLE}")
+    # Indexes (and the keys built on them) come after the bulk load, see index_shadow_feature_store.
+    cur.execute(
+        f"CREATE TABLE {SHADOW_FEATURE_STORE_TABLE} (LIKE {FEATURE_STORE_TABLE} INCLUDING ALL EXCLUDING INDEXES)"
+    )
+    cur.close()
+    conn.commit()
+    return SHADOW_FEATURE_STORE_TABLE
+
+
+def table_indexes(cur, table, constraint_indexes=True):
+    """(index name, definition) pairs of ``table`` in the current schema; optionally without those backing constraints."""
+    standalone = "" if constraint_indexes else (
+        " AND NOT EXISTS (SELECT 1 FROM pg_constraint c"
+        " WHERE c.conindid = (quote_ident(schemaname) || '.' || quote_ident(indexname))::regclass)"
+    )
+    cur.execute(
+        "SELECT indexname, indexdef FROM pg_indexes WHERE schemaname = current_schema() AND tablename = %s"
+        f"{standalone} ORDER BY indexname",
+        (table.lower(),),
+    )
+    return cur.fetchall()
+
+
+def table_constraints(cur, table):
+    """(name, type, definition) of the primary key, unique and foreign key constraints of ``table``, keys first."""
+    cur.execute(
+        "SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = to_regclass(%s) AND contype IN ('p', 'u', 'f') ORDER BY contype = 'f', conname",
+        (table.lower(),),
+    )
+    return cur.fetchall()
+
+
+def shadow_constraint_statement(name, kind, definition, table=SHADOW_FEATURE_STORE_TABLE):
+    """``ALTER TABLE`` adding a live table constraint to ``table``."""
+    # Key constraints are named like their index, and index names are unique per schema;
+    # foreign key names only need to be unique per table, so they keep theirs.
+    if kind in ("p", "u"):
+        name = renamed_index(name, "", SHADOW_SUFFIX)
+    return f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}"
+
+
+def retarget_index_definition(indexdef, name, table):
+    """Rewrite a ``pg_indexes.indexdef`` to build the same index as ``name`` on ``table``."""
+    _, method = indexdef.split(" USING ", 1)
+    unique = "UNIQUE " if indexdef.startswith("CREATE UNIQUE INDEX") else ""
+    return f"CREATE {unique}INDEX {name} ON {table} USING {method}"
+
+
+def renamed_index(name, old_suffix, new_suffix):
+    base = name[:-len(old_suffix)] if old_suffix and name.endswith(old_suffix) else name
+    return f"{base}{new_suffix}"
+
+
+def index_shadow_feature_store(conn):
+    """Build the live table's indexes, primary key, unique and foreign keys on the loaded shadow table."""
+    cur = conn.cursor()
+    for name, indexdef in table_indexes(cur, FEATURE_STORE_TABLE, constraint_indexes=False):
+        cur.execute(retarget_index_definition(
+            indexdef, renamed_index(name, "", SHADOW_SUFFIX), SHADOW_FEATURE_STORE_TABLE
+        ))
+    for name, kind, definition in table_constraints(cur, FEATURE_STORE_TABLE):
+        cur.execute(shadow_constraint_statement(name, kind, definition))
+    cur.close()
+    conn.commit()
+
+
+def validate_feature_store(conn, table, expected_rows=None, sample_size=20, itersize=10000):
+    """Stream every vector of ``table`` through ``inspect_feature_vector``; returns row and issue counts."""
+    cur = conn.cursor(name=f"validate_{table.lower()}")
+    cur.itersize = itersize
+    cur.execute(f"SELECT fixture_id, feature_vector FROM {table}")
+    rows = 0
+    invalid = []
+    for fixture_id, raw in cur:
+        rows += 1
+        try:
+            issues = inspect_feature_vector(json.loads(raw))
+        except (TypeError, ValueError):
+            issues = {"missing": ["<unparseable>"], "extra": []}
+        if issues["missing"] or issues["extra"]:
+            invalid.append(fixture_id)
+    cur.close()
+    conn.rollback()
+    errors = []
+    if rows == 0:
+        errors.append("no rows")
+    if expected_rows is not None and rows != expected_rows:
+        errors.append(f"{rows} rows stored, {expected_rows} written")
+    if invalid:
+        errors.append(f"{len(invalid)} vectors do not match the feature schema")
+    return {"rows": rows, "invalid": len(invalid), "invalid_sample": invalid[:sample_size], "errors": errors}
+
+
+def _rename_table(cur, table, new_table, old_suffix, new_suffix):
+    for name, _ in table_indexes(cur, table):
+        cur.execute(f"ALTER INDEX {name} RENAME TO {renamed_index(name, old_suffix, new_suffix)}")
+    cur.execute(f"ALTER TABLE {table} RENAME TO {new_table}")
+
+
+def swap_feature_store(conn):
+    """
+    Atomically replace the live table with the shadow one; the live table becomes the previous one.
+
+    Writers of the live table wait from the lock to the commit, so fixtures they wrote during
+    the rebuild are copied into the shadow table before the rename instead of being lost;
+    fixtures present in both keep the rebuilt vector. Returns the number of rows copied.
+    """
+    cur = conn.cursor()
+    cur.execute(f"SET LOCAL lock_timeout = '{SWAP_LOCK_TIMEOUT}'")
+    # EXCLUSIVE blocks writers only; readers keep going until the renames take their lock.
+    cur.execute(f"LOCK TABLE {FEATURE_STORE_TABLE} IN EXCLUSIVE MODE")
+    cur.execute(f"""
+        INSERT INTO {SHADOW_FEATURE_STORE_TABLE}
+        SELECT live.* FROM {FEATURE_STORE_TABLE} live
+        WHERE NOT EXISTS (
+            SELECT 1 FROM {SHADOW_FEATURE_STORE_TABLE} shadow WHERE shadow.fixture_id = live.fixture_id
+        )
+    """)
+    copied = cur.rowcount
+    cur.execute(f"DROP TABLE IF EXISTS {PREVIOUS_FEATURE_STORE_TABLE}")
+    _rename_table(cur, FEATURE_STORE_TABLE, PREVIOUS_FEATURE_STORE_TABLE, "", PREVIOUS_SUFFIX)
+    _rename_table(cur, SHADOW_FEATURE_STORE_TABLE, FEATURE_STORE_TABLE, SHADOW_SUFFIX, "")
+    cur.close()
+    conn.commit()
+    return copied
+
+
+def rollback_feature_store(conn):
+    """Swap the previous table back in; the replaced one becomes the previous table (rolling back twice is a no-op)."""
+    if not table_exists(conn, PREVIOUS_FEATURE_STORE_TABLE):
+        raise RuntimeError(f"{PREVIOUS_FEATURE_STORE_TABLE} does not exist; nothing to roll back to.")
+    cur = conn.cursor()
+    cur.execute(f"SET LOCAL lock_timeout = '{SWAP_LOCK_TIMEOUT}'")
+    cur.execute(f"DROP TABLE IF EXISTS {SHADOW_FEATURE_STORE_TABLE}")
+    _rename_table(cur, FEATURE_STORE_TABLE, SHADOW_FEATURE_STORE_TABLE, "", SHADOW_SUFFIX)
+    _rename_table(cur, PREVIOUS_FEATURE_STORE_TABLE, FEATURE_STORE_TABLE, PREVIOUS_SUFFIX, "")
+    _rename_table(cur, SHADOW_FEATURE_STORE_TABLE, PREVIOUS_FEATURE_STORE_TABLE, SHADOW_SUFFIX, PREVIOUS_SUFFIX)
+    cur.close()
+    conn.commit()
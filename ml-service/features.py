@@ -1,4 +1,5 @@
 import psycopg2
+from psycopg2.extras import execute_values
 import pandas as pd
 import numpy as np
 import json
@@ -8,6 +9,17 @@ import argparse
 from datetime import datetime
 from db_config import get_connection
 from feature_schema import GLOBAL_1X2_FEATURE_SCHEMA_VERSION, normalize_feature_vector
+from feature_store_layout import (
+    FEATURE_STORE_TABLE,
+    create_shadow_feature_store,
+    index_shadow_feature_store,
+    rollback_feature_store,
+    swap_feature_store,
+    validate_feature_store,
+)
+from frame_utils import JsonColumnBuilder, compact_frame, log_memory
+from horizon_utils import feature_storage_horizon
+from lineup_quality import load_lineup_quality
 
 PROGRESS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'feature_pipeline_progress.json')
 
@@ -43,16 +55,9 @@ def write_progress(**payload):
         json.dump(progress, handle, indent=2)
 
 
-def reset_feature_store(conn):
+def get_completed_fixture_ids(conn, table=FEATURE_STORE_TABLE):
     cur = conn.cursor()
-    cur.execute("DELETE FROM V3_ML_Feature_Store")
-    conn.commit()
-    cur.close()
-
-
-def get_completed_fixture_ids(conn):
-    cur = conn.cursor()
-    cur.execute("SELECT DISTINCT fixture_id FROM V3_ML_Feature_Store")
+    cur.execute(f"SELECT DISTINCT fixture_id FROM {table}")
     fixture_ids = {row[0] for row in cur.fetchall()}
     cur.close()
     return fixture_ids
@@ -86,6 +91,7 @@ def compute_advanced_features(conn):
     """
     fixtures_df = pd.read_sql_query(query, conn)
     fixtures_df['date'] = pd.to_datetime(fixtures_df['date'])
+    compact_frame(fixtures_df, categories=('status_short', 'round', 'league_type', 'country_name'))
     
     # 2. Create long-format for team performance
     # For finished games, we have goals. For NS, they are null.
@@ -96,18 +102,18 @@ def compute_advanced_features(conn):
     fixtures_df['xg_home'] = pd.to_numeric(fixtures_df['xg_home'], errors='coerce')
     fixtures_df['xg_away'] = pd.to_numeric(fixtures_df['xg_away'], errors='coerce')
     
-    # Create long-format for team performance
-    home = fixtures_df[['fixture_id', 'date', 'league_id', 'home_team_id', 'goals_home', 'goals_away', 'xg_home', 'xg_away']].copy()
-    home.columns = ['fixture_id', 'date', 'league_id', 'team_id', 'gf', 'ga', 'xg_f', 'xg_a']
-    home['is_home'] = 1
-    
-    away = fixtures_df[['fixture_id', 'date', 'league_id', 'away_team_id', 'goals_away', 'goals_home', 'xg_away', 'xg_home']].copy()
-    away.columns = ['fixture_id', 'date', 'league_id', 'team_id', 'gf', 'ga', 'xg_f', 'xg_a']
-    away['is_home'] = 0
-    
-    team_games = pd.concat([home, away]).sort_values(['team_id', 'date'])
+    # Create long-format for team performance (column selections, concatenated once)
+    long_columns = ['fixture_id', 'date', 'league_id', 'team_id', 'gf', 'ga', 'xg_f', 'xg_a']
+    home = fixtures_df[['fixture_id', 'date', 'league_id', 'home_team_id', 'goals_home', 'goals_away', 'xg_home', 'xg_away']]
+    away = fixtures_df[['fixture_id', 'date', 'league_id', 'away_team_id', 'goals_away', 'goals_home', 'xg_away', 'xg_home']]
+    team_games = pd.concat(
+        [home.set_axis(long_columns, axis=1).assign(is_home=np.int8(1)),
+         away.set_axis(long_columns, axis=1).assign(is_home=np.int8(0))]
+    ).sort_values(['team_id', 'date'])
     team_games['gd'] = team_games['gf'] - team_games['ga']
-    team_games['points'] = team_games.apply(lambda r: 3 if r.gf > r.ga else (1 if r.gf == r.ga else 0), axis=1)
+    team_games['points'] = np.select(
+        [team_games['gf'] > team_games['ga'], team_games['gf'] == team_games['ga']], [3, 1], 0
+    ).astype(np.int8)
     team_games['xg_f'] = team_games['xg_f'].fillna(team_games['gf'])
     team_games['xg_a'] = team_games['xg_a'].fillna(team_games['ga'])
 
@@ -165,7 +171,8 @@ def compute_advanced_features(conn):
     team_games['avg_pts_home'] = team_games.groupby('team_id').apply(lambda x: x['avg_pts_home'].ffill()).reset_index(level=0, drop=True)
     team_games['avg_pts_away'] = team_games.groupby('team_id').apply(lambda x: x['avg_pts_away'].ffill()).reset_index(level=0, drop=True)
     team_games['venue_diff'] = team_games['avg_pts_home'].fillna(1.0) - team_games['avg_pts_away'].fillna(1.0)
-
+    compact_frame(team_games)
+    log_memory("advanced features (team games)", team_games=team_games)
 
     # Merge back to fixture level
     f_features = team_games[team_games['is_home'] == 1].merge(
@@ -190,58 +197,59 @@ def compute_lineup_quality(conn):
     Computes LQI based on seasonal ratings of starting XI.
     """
     print("   📊 Computing Lineup Quality Index (LQI)...")
-    
-    # 1. Get average seasonal rating for all players
-    stats_query = "SELECT player_id, games_rating FROM V3_Player_Stats"
-    stats_df = pd.read_sql_query(stats_query, conn)
-    stats_df['games_rating'] = pd.to_numeric(stats_df['games_rating'], errors='coerce')
-    player_ratings = stats_df.groupby('player_id')['games_rating'].mean().to_dict()
-
-    # 2. Get all lineups
-    lineups_query = "SELECT fixture_id, team_id, starting_xi FROM V3_Fixture_Lineups"
-    cur = conn.cursor()
-    cur.execute(lineups_query)
-    lineups = cur.fetchall()
-    cur.close()
-    
-    lqi_results = {} # (fixture_id, team_id) -> lqi
-    
-    for row in lineups:
-        fid, tid, xi_json = row
-        try:
-            xi_data = json.loads(xi_json)
-            # xi_data is usually an array of objects with player.id
-            total_rating = 0
-            count = 0
-            for p in xi_data:
-                pid = p.get('player', {}).get('id')
-                rating = player_ratings.get(pid, 6.5) # Default/Average
-                total_rating += rating
-                count += 1
-            
-            lqi = total_rating / count if count > 0 else 6.5
-            lqi_results[(fid, tid)] = round(lqi, 3)
-        except:
-            continue
-            
-    return lqi_results
-
-
-def load_team_feature_set(conn, feature_set_id, horizon_type='FULL_HISTORICAL'):
-    query = """
-        SELECT fixture_id, team_id, features_json
-        FROM V3_Team_Features_PreMatch
-        WHERE feature_set_id = %s AND horizon_type = %s
-    """
-    df = pd.read_sql_query(query, conn, params=(feature_set_id, horizon_type))
-    if df.empty:
-        return df
+    lqi_df = load_lineup_quality(conn)
+    return dict(zip(zip(lqi_df['fixture_id'], lqi_df['team_id']), lqi_df['lqi']))
+
 
-    parsed = pd.json_normalize(df['features_json'].apply(json.loads))
-    for col in parsed.columns:
-        df[col] = parsed[col]
+TEAM_FEATURE_CHUNK_ROWS = 20000
 
-    return df.drop(columns=['features_json'])
+
+def load_team_feature_set(feature_set_id, horizon_type='FULL_HISTORICAL', prefix='', chunk_rows=TEAM_FEATURE_CHUNK_ROWS):
+    """
+    Stream one feature set of V3_Team_Features_PreMatch into a frame keyed by (fixture_id, team_id).
+
+    Rows come through a server-side cursor ``chunk_rows`` at a time and each chunk of
+    features_json is decoded straight into column arrays sized from a COUNT(*), so the raw
+    JSON of the whole set is never held at once. Feature columns get ``prefix``.
+    The named cursor needs a transaction of its own, so the set is read on a dedicated
+    connection that is closed afterwards; the pipeline's connection is left untouched.
+    """
+    params = (feature_set_id, feature_storage_horizon(feature_set_id, horizon_type))
+    where = "WHERE feature_set_id = %s AND horizon_type = %s"
+    conn = get_db_connection()
+    try:
+        count_cur = conn.cursor()
+        count_cur.execute(f"SELECT COUNT(*) FROM V3_Team_Features_PreMatch {where}", params)
+        expected_rows = count_cur.fetchone()[0]
+        count_cur.close()
+        builder = JsonColumnBuilder(expected_rows, key_columns=('fixture_id', 'team_id'))
+        if expected_rows:
+            cur = conn.cursor(name=f"team_features_{feature_set_id.lower()}")
+            cur.itersize = chunk_rows
+            cur.execute(f"SELECT fixture_id, team_id, features_json FROM V3_Team_Features_PreMatch {where}", params)
+            while True:
+                rows = cur.fetchmany(chunk_rows)
+                if not rows:
+                    break
+                builder.add_rows(rows)
+            cur.close()
+    finally:
+        conn.close()
+    return compact_frame(builder.frame(prefix))
+
+
+def merge_team_features(f_features, team_features, side):
+    """
+    Left-join per-team features (keyed by fixture_id, team_id) onto the fixture rows for
+    ``side`` ('home' or 'away'); feature columns get the ``<side>_`` prefix and no duplicate
+    key columns are carried over.
+    """
+    suffix = 'h' if side == 'home' else 'a'
+    renamed = team_features.rename(columns={
+        col: (f'team_id_{suffix}' if col == 'team_id' else col if col == 'fixture_id' else f'{side}_{col}')
+        for col in team_features.columns
+    })
+    return f_features.merge(renamed, on=['fixture_id', f'team_id_{suffix}'], how='left')
 
 # Narrative Context Data (Approximate coordinates for major cities)
 CITY_COORDS = {
@@ -427,61 +435,43 @@ def build_style_matchup_features(row):
 def run_feature_pipeline(reset=False):
     print(f"🚀 [US_153] Starting Feature Engineering Pipeline...")
     conn = get_db_connection()
+    # A reset rebuilds into an unindexed shadow table; the live table keeps serving until the swap.
+    target_table = FEATURE_STORE_TABLE
     if reset:
-        print("   🧹 Resetting V3_ML_Feature_Store...")
-        reset_feature_store(conn)
-        write_progress(status="reset_complete", processed=0, persisted=0)
+        target_table = create_shadow_feature_store(conn)
+        print(f"   🧹 Rebuilding into {target_table} (V3_ML_Feature_Store stays live until the swap)...")
+        write_progress(status="reset_complete", processed=0, persisted=0, table=target_table)
 
     print("   📋 Loading fast feature sources...")
     f_features = compute_advanced_features(conn)
     print(f"      Loaded advanced fixture features: {len(f_features)} rows")
-    baseline_df = load_team_feature_set(conn, 'BASELINE_V1')
+    baseline_df = load_team_feature_set('BASELINE_V1', prefix='b_')
     print(f"      Loaded BASELINE_V1 rows: {len(baseline_df)}")
-    process_df = load_team_feature_set(conn, 'PROCESS_V1')
+    process_df = load_team_feature_set('PROCESS_V1', prefix='p_')
     print(f"      Loaded PROCESS_V1 rows: {len(process_df)}")
     narrative_map = compute_narrative_context(conn, f_features)
     print(f"      Built narrative context for {len(narrative_map)} fixtures")
+    log_memory("sources loaded", fixtures=f_features, baseline=baseline_df, process=process_df)
 
-    print("   🔗 Merging BASELINE_V1...")
-    f_features = pd.merge(
-        f_features,
-        baseline_df.add_prefix('home_b_'),
-        left_on=['fixture_id', 'team_id_h'],
-        right_on=['home_b_fixture_id', 'home_b_team_id'],
-        how='left'
-    )
-    f_features = pd.merge(
-        f_features,
-        baseline_df.add_prefix('away_b_'),
-        left_on=['fixture_id', 'team_id_a'],
-        right_on=['away_b_fixture_id', 'away_b_team_id'],
-        how='left'
-    )
-    print(f"      After BASELINE merges: {len(f_features)} rows")
-
-    print("   🔗 Merging PROCESS_V1...")
-    f_features = pd.merge(
-        f_features,
-        process_df.add_prefix('home_p_'),
-        left_on=['fixture_id', 'team_id_h'],
-        right_on=['home_p_fixture_id', 'home_p_team_id'],
-        how='left'
-    )
-    f_features = pd.merge(
-        f_features,
-        process_df.add_prefix('away_p_'),
-        left_on=['fixture_id', 'team_id_a'],
-        right_on=['away_p_fixture_id', 'away_p_team_id'],
-        how='left'
-    )
-    print(f"      After PROCESS merges: {len(f_features)} rows")
-
-    completed_fixture_ids = get_completed_fixture_ids(conn)
+    completed_fixture_ids = get_completed_fixture_ids(conn, target_table)
     if completed_fixture_ids:
-        f_features = f_features[~f_features['fixture_id'].isin(completed_fixture_ids)].copy()
+        f_features = f_features[~f_features['fixture_id'].isin(completed_fixture_ids)]
         print(f"   ♻️ Resume mode: skipping {len(completed_fixture_ids)} already stored fixtures")
 
+    # BASELINE_V1 and PROCESS_V1 are joined per team first (narrow), so the wide fixture
+    # frame is copied by two merges (home, away) instead of four.
+    print("   🔗 Merging BASELINE_V1 and PROCESS_V1...")
+    team_features = baseline_df
+    if not process_df.empty:
+        team_features = team_features.merge(process_df, on=['fixture_id', 'team_id'], how='outer')
+    del baseline_df, process_df
+    f_features = merge_team_features(f_features, team_features, 'home')
+    f_features = merge_team_features(f_features, team_features, 'away')
+    del team_features
+    print(f"      After team feature merges: {len(f_features)} rows")
+
     f_features = f_features.sort_values('date_h')
+    log_memory("features merged", f_features=f_features)
     print(f"   ▶️ Pending fixtures to process: {len(f_features)}")
     write_progress(
         status="running",
@@ -491,17 +481,15 @@ def run_feature_pipeline(reset=False):
         reset=reset
     )
 
-    print("   💾 Saving features to V3_ML_Feature_Store...")
+    print(f"   💾 Saving features to {target_table}...")
 
     processed_count = 0
     total_fixtures = len(f_features)
     chunk = []
     chunk_size = 10000
     cur = conn.cursor()
-    sql = """
-        INSERT INTO V3_ML_Feature_Store (fixture_id, league_id, feature_vector, calculated_at)
-        VALUES (%s, %s, %s, CURRENT_TIMESTAMP)
-    """
+    sql = f"INSERT INTO {target_table} (fixture_id, league_id, feature_vector, calculated_at) VALUES %s"
+    template = "(%s, %s, %s, CURRENT_TIMESTAMP)"
 
     for _, row in f_features.iterrows():
         fid = int(row['fixture_id'])
@@ -645,7 +633,7 @@ def run_feature_pipeline(reset=False):
         chunk.append((fid, lid, json.dumps(vector)))
         processed_count += 1
         if len(chunk) >= chunk_size:
-            cur.executemany(sql, chunk)
+            execute_values(cur, sql, chunk, template=template, page_size=1000)
             conn.commit()
             print(f"      Stored {processed_count}/{total_fixtures} features...")
             write_progress(
@@ -659,7 +647,7 @@ def run_feature_pipeline(reset=False):
             chunk = []
 
     if chunk:
-        cur.executemany(sql, chunk)
+        execute_values(cur, sql, chunk, template=template, page_size=1000)
         conn.commit()
         print(f"      Stored {processed_count}/{total_fixtures} features...")
         write_progress(
@@ -672,19 +660,55 @@ def run_feature_pipeline(reset=False):
         )
 
     cur.close()
-    
+
+    if reset:
+        publish_rebuild(conn, target_table, processed_count)
     conn.close()
     write_progress(
         status="completed",
         processed=processed_count,
         persisted=len(completed_fixture_ids) + processed_count,
         remaining=0,
-        reset=reset
+        reset=reset,
+        memory=log_memory("feature store written"),
     )
     print(f"✅ [US_153] Pipeline Finished. {processed_count} features stored.")
 
+
+def publish_rebuild(conn, shadow_table, written):
+    """Validate the rebuilt shadow table, index it and swap it in; a failed check leaves the live table untouched."""
+    print(f"   🔎 Validating {shadow_table}...")
+    write_progress(status="validating", processed=written, persisted=written, remaining=0, table=shadow_table)
+    report = validate_feature_store(conn, shadow_table, expected_rows=written)
+    if report["errors"]:
+        write_progress(status="validation_failed", processed=written, persisted=report["rows"], remaining=0,
+                       table=shadow_table, validation=report)
+        conn.close()
+        raise RuntimeError(
+            f"{shadow_table} failed validation ({'; '.join(report['errors'])}; "
+            f"sample fixtures: {report['invalid_sample']}). V3_ML_Feature_Store was not replaced."
+        )
+    print(f"      {report['rows']} vectors match the feature schema")
+    print(f"   🗂️ Indexing {shadow_table}...")
+    index_shadow_feature_store(conn)
+    copied = swap_feature_store(conn)
+    print(f"      {copied} vectors written to the live table during the rebuild were carried over")
+    print("   🔁 Swapped the rebuilt table in; the previous one is kept as V3_ML_Feature_Store_Previous")
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Build V3_ML_Feature_Store with resumable batches.")
-    parser.add_argument("--reset", action="store_true", help="Delete existing rows before rebuilding from scratch.")
+    parser.add_argument("--reset", action="store_true",
+                        help="Rebuild from scratch into a shadow table and swap it in once validated.")
+    parser.add_argument("--rollback", action="store_true",
+                        help="Swap V3_ML_Feature_Store_Previous back in place of V3_ML_Feature_Store and exit.")
     args = parser.parse_args()
-    run_feature_pipeline(reset=args.reset)
+    if args.rollback:
+        connection = get_db_connection()
+        try:
+            rollback_feature_store(connection)
+        finally:
+            connection.close()
+        print("✅ Rolled V3_ML_Feature_Store back to the previous build.")
+    else:
+        run_feature_pipeline(reset=args.reset)
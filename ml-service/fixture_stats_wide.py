@@ -0,0 +1,153 @@
+"""
+One row per fixture of V3_Fixture_Stats, pivoted to home/away x FT/1H/2H.
+
+V3_Fixture_Stats_Wide holds ``{side}_{half}_{stat}`` columns (for example
+``home_ft_corner_kicks`` or ``away_2h_shots_total``) plus ``has_{side}_{half}``
+flags telling a missing stats row apart from a NULL stat, so loaders read one
+row by fixture_id instead of joining V3_Fixture_Stats two to four times.
+
+The table is kept current by triggers rather than refreshed in full: every
+INSERT, UPDATE or DELETE statement on V3_Fixture_Stats re-pivots only the
+fixtures it touched (statement-level triggers with transition tables, so a
+bulk import or COPY costs one refresh per statement), and a change of a
+fixture's home or away team re-pivots that fixture.
+``refresh_fixture_stats_wide(fixture_ids)`` is the SQL function behind both.
+
+backend/src/migrations/registry/20260414_01_V3_Fixture_Stats_Wide.js creates
+the same objects in the application database; ``create_fixture_stats_wide``
+creates them in synthetic and benchmark databases.
+"""
+
+WIDE_TABLE = "V3_Fixture_Stats_Wide"
+SIDES = ("home", "away")
+HALVES = ("FT", "1H", "2H")
+STAT_COLUMNS = (
+    "shots_on_goal", "shots_off_goal", "shots_inside_box", "shots_outside_box", "shots_total",
+    "shots_blocked", "fouls", "corner_kicks", "offsides", "yellow_cards", "red_cards",
+    "goalkeeper_saves", "passes_total", "passes_accurate", "pass_accuracy_pct", "ball_possession_pct",
+)
+
+
+def wide_column(side, half, stat):
+    return f"{side}_{half.lower()}_{stat}"
+
+
+def presence_column(side, half):
+    return f"has_{side}_{half.lower()}"
+
+
+def wide_columns():
+    """(presence flags, stat columns) in table order."""
+    flags = [presence_column(side, half) for side in SIDES for half in HALVES]
+    stats = [wide_column(side, half, stat) for side in SIDES for half in HALVES for stat in STAT_COLUMNS]
+    return flags, stats
+
+
+def create_table_sql():
+    flags, stats = wide_columns()
+    definitions = [
+        "fixture_id INTEGER PRIMARY KEY REFERENCES V3_Fixtures(fixture_id) ON DELETE CASCADE",
+        "home_team_id INTEGER",
+        "away_team_id INTEGER",
+        *(f"{flag} BOOLEAN NOT NULL DEFAULT FALSE" for flag in flags),
+        *(f"{column} INTEGER" for column in stats),
+        "refreshed_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP",
+    ]
+    body = ",\n        ".join(definitions)
+    return f"CREATE TABLE IF NOT EXISTS {WIDE_TABLE} (\n        {body}\n    )"
+
+
+def refresh_function_sql():
+    """``refresh_fixture_stats_wide(INTEGER[])``: upsert the pivot of the given fixtures, drop rows without stats."""
+    flags, stats = wide_columns()
+    selects = ["f.fixture_id", "f.home_team_id", "f.away_team_id"]
+    for side in SIDES:
+        for half in HALVES:
+            selects.append(f"COUNT(*) FILTER (WHERE s.team_id = f.{side}_team_id AND s.half = '{half}') > 0")
+    for side in SIDES:
+        for half in HALVES:
+            for stat in STAT_COLUMNS:
+                selects.append(f"MAX(s.{stat}) FILTER (WHERE s.team_id = f.{side}_team_id AND s.half = '{half}')")
+    columns = ["fixture_id", "home_team_id", "away_team_id", *flags, *stats]
+    updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in columns[1:])
+    return f"""CREATE OR REPLACE FUNCTION refresh_fixture_stats_wide(fixture_ids INTEGER[]) RETURNS INTEGER AS $$
+    DECLARE
+        refreshed INTEGER;
+    BEGIN
+        INSERT INTO {WIDE_TABLE} ({", ".join(columns)})
+        SELECT {", ".join(selects)}
+        FROM V3_Fixtures f
+        JOIN V3_Fixture_Stats s ON s.fixture_id = f.fixture_id
+        WHERE f.fixture_id = ANY(fixture_ids)
+        GROUP BY f.fixture_id, f.home_team_id, f.away_team_id
+        ON CONFLICT (fixture_id) DO UPDATE SET {updates}, refreshed_at = CURRENT_TIMESTAMP;
+        GET DIAGNOSTICS refreshed = ROW_COUNT;
+        DELETE FROM {WIDE_TABLE} w
+        WHERE w.fixture_id = ANY(fixture_ids)
+          AND NOT EXISTS (SELECT 1 FROM V3_Fixture_Stats s WHERE s.fixture_id = w.fixture_id);
+        RETURN refreshed;
+    END;
+    $$ LANGUAGE plpgsql"""
+
+
+# trigger name -> (function name, event, fixture ids touched by the statement)
+STATS_TRIGGERS = {
+    "trg_fixture_stats_wide_insert": (
+        "fixture_stats_wide_on_insert", "INSERT", "REFERENCING NEW TABLE AS new_rows",
+        "SELECT fixture_id FROM new_rows",
+    ),
+    "trg_fixture_stats_wide_update": (
+        "fixture_stats_wide_on_update", "UPDATE", "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+        "SELECT fixture_id FROM new_rows UNION SELECT fixture_id FROM old_rows",
+    ),
+    "trg_fixture_stats_wide_delete": (
+        "fixture_stats_wide_on_delete", "DELETE", "REFERENCING OLD TABLE AS old_rows",
+        "SELECT fixture_id FROM old_rows",
+    ),
+}
+
+
+def trigger_sql():
+    statements = []
+    for trigger, (function, event, referencing, touched) in STATS_TRIGGERS.items():
+        statements.append(f"""CREATE OR REPLACE FUNCTION {function}() RETURNS trigger AS $$
+        BEGIN
+            PERFORM refresh_fixture_stats_wide(ARRAY(SELECT DISTINCT fixture_id FROM ({touched}) touched));
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql""")
+        statements.append(f"DROP TRIGGER IF EXISTS {trigger} ON V3_Fixture_Stats")
+        statements.append(
+            f"CREATE TRIGGER {trigger} AFTER {event} ON V3_Fixture_Stats {referencing} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION {function}()"
+        )
+    statements.append("""CREATE OR REPLACE FUNCTION fixture_stats_wide_on_fixture_teams() RETURNS trigger AS $$
+        BEGIN
+            PERFORM refresh_fixture_stats_wide(ARRAY[NEW.fixture_id]);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql""")
+    statements.append("DROP TRIGGER IF EXISTS trg_fixture_stats_wide_fixture_teams ON V3_Fixtures")
+    statements.append(
+        "CREATE TRIGGER trg_fixture_stats_wide_fixture_teams AFTER UPDATE OF home_team_id, away_team_id ON V3_Fixtures "
+        "FOR EACH ROW WHEN (OLD.home_team_id IS DISTINCT FROM NEW.home_team_id "
+        "OR OLD.away_team_id IS DISTINCT FROM NEW.away_team_id) "
+        "EXECUTE FUNCTION fixture_stats_wide_on_fixture_teams()"
+    )
+    return statements
+
+
+def create_fixture_stats_wide(conn, backfill=True):
+    """Create the table, refresh function and triggers; ``backfill`` pivots the stats already stored."""
+    cur = conn.cursor()
+    cur.execute(create_table_sql())
+    cur.execute(refresh_function_sql())
+    for statement in trigger_sql():
+        cur.execute(statement)
+    refreshed = 0
+    if backfill:
+        cur.execute("SELECT refresh_fixture_stats_wide(ARRAY(SELECT DISTINCT fixture_id FROM V3_Fixture_Stats))")
+        refreshed = cur.fetchone()[0]
+    cur.close()
+    conn.commit()
+    return refreshed
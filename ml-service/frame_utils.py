@@ -0,0 +1,173 @@
+"""
+DataFrame memory helpers for the batch feature pipelines.
+
+``compact_frame`` downcasts a frame in place of the pandas defaults:
+int64 -> int32 (when the values fit) and the listed low-cardinality text
+columns -> category. Floats stay float64: feature values end up in JSON
+through ``float()``, where a float32 1.4 would be written as
+1.399999976158142.
+
+``JsonColumnBuilder`` decodes JSON documents with orjson straight into
+preallocated float64 column arrays, so a feature set stored as JSON text
+becomes a frame without a frame of raw strings or of parsed dicts in
+between.
+
+``log_memory`` prints the process RSS, its peak so far and the deep memory
+of the given frames, one line per pipeline stage, so the footprint of a
+nightly build can be read from its log.
+"""
+
+import resource
+import sys
+
+import numpy as np
+import orjson
+import pandas as pd
+
+INT32_MIN, INT32_MAX = np.iinfo(np.int32).min, np.iinfo(np.int32).max
+NUMERIC_TYPES = (int, float)
+BULK_TYPES = frozenset((int, float, bool, type(None)))
+
+
+def compact_frame(df, categories=(), exclude=()):
+    """Downcast integer columns and turn ``categories`` into category dtype; returns ``df``."""
+    for column in df.columns:
+        if column in exclude:
+            continue
+        series = df[column]
+        if column in categories:
+            df[column] = series.astype("category")
+        elif pd.api.types.is_integer_dtype(series) and series.dtype.itemsize > 4:
+            if series.empty or (series.min() >= INT32_MIN and series.max() <= INT32_MAX):
+                df[column] = series.astype("Int32" if isinstance(series.dtype, pd.Int64Dtype) else np.int32)
+    return df
+
+
+class JsonColumnBuilder:
+    """
+    Preallocated columns filled chunk by chunk from rows of JSON objects.
+
+    Numbers and booleans go to float64 arrays, which hold every JSON integer
+    below 2**53 exactly; other values, numeric-looking strings included, go
+    to object arrays; keys missing from a row stay NaN and
+    nested objects are flattened to ``parent.child`` like ``pd.json_normalize``.
+    The arrays grow by doubling if more rows arrive than ``capacity``.
+    """
+
+    def __init__(self, capacity, key_columns=()):
+        self.capacity = max(int(capacity), 1)
+        self.rows = 0
+        self.keys = {name: np.zeros(self.capacity, dtype=np.int64) for name in key_columns}
+        self.columns = {}
+
+    def _grow(self):
+        self.capacity *= 2
+        for name, array in self.keys.items():
+            self.keys[name] = np.concatenate([array, np.zeros_like(array)])
+        for name, array in self.columns.items():
+            self.columns[name] = np.concatenate([array, np.full_like(array, np.nan)])
+
+    def _column(self, name, value):
+        column = self.columns.get(name)
+        numeric = isinstance(value, NUMERIC_TYPES)
+        if column is None:
+            dtype = np.float64 if numeric else object
+            column = self.columns[name] = np.full(self.capacity, np.nan, dtype=dtype)
+        elif not numeric and column.dtype != object:
+            column = self.columns[name] = column.astype(object)
+        return column
+
+    def _fill(self, document, row, parent=""):
+        columns = self.columns
+        for key, value in document.items():
+            name = parent + key if parent else key
+            if value is None:
+                if name not in columns:
+                    self._column(name, 0.0)
+                continue
+            if isinstance(value, dict):
+                self._fill(value, row, f"{name}.")
+                continue
+            column = columns.get(name)
+            if column is None or (column.dtype != object and not isinstance(value, NUMERIC_TYPES)):
+                column = self._column(name, value)
+            column[row] = value
+
+    def _ensure_capacity(self, rows):
+        while self.rows + rows > self.capacity:
+            self._grow()
+
+    def _fill_uniform(self, documents):
+        """Bulk path for a chunk whose documents share one flat, numeric key list; False otherwise."""
+        names = tuple(documents[0])
+        if not all(tuple(document) == names for document in documents):
+            return False
+        rows = [tuple(document.values()) for document in documents]
+        # numpy would parse "1.5" as a number; strings and nested objects take the row-by-row path.
+        if not all(type(value) in BULK_TYPES for row in rows for value in row):
+            return False
+        # None becomes NaN.
+        values = np.array(rows, dtype=np.float64).reshape(len(rows), len(names))
+        start, end = self.rows, self.rows + len(documents)
+        for position, name in enumerate(names):
+            column = self.columns.get(name)
+            if column is None:
+                column = self._column(name, 0.0)
+            column[start:end] = values[:, position]
+        return True
+
+    def add_rows(self, rows):
+        """
+        Append a chunk of ``(*keys, raw_json)`` rows, keys in ``key_columns`` order.
+
+        A chunk of identically shaped numeric documents (the usual case) is
+        decoded into one matrix and copied column-wise into place.
+        """
+        if not rows:
+            return
+        self._ensure_capacity(len(rows))
+        width = len(self.keys)
+        documents = [orjson.loads(row[width]) for row in rows]
+        start = self.rows
+        for position, array in enumerate(self.keys.values()):
+            array[start:start + len(rows)] = [row[position] for row in rows]
+        if not self._fill_uniform(documents):
+            for offset, document in enumerate(documents):
+                self._fill(document, start + offset)
+        self.rows += len(rows)
+
+    def frame(self, prefix=""):
+        """Frame over the filled rows; the key columns keep their names, the others get ``prefix``."""
+        data = {name: array[:self.rows] for name, array in self.keys.items()}
+        data.update((f"{prefix}{name}", array[:self.rows]) for name, array in self.columns.items())
+        return pd.DataFrame(data, copy=False)
+
+
+def frame_memory_mb(df):
+    return float(df.memory_usage(deep=True).sum()) / (1024 * 1024)
+
+
+def rss_mb():
+    """Current resident set size (Linux ``/proc``), or ``None`` elsewhere."""
+    try:
+        with open("/proc/self/statm") as handle:
+            pages = int(handle.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return pages * resource.getpagesize() / (1024 * 1024)
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def log_memory(stage, **frames):
+    """Print and return RSS, peak RSS and per-frame memory (MB) at the end of ``stage``."""
+    report = {"stage": stage, "rss_mb": rss_mb(), "peak_rss_mb": peak_rss_mb()}
+    report["frames_mb"] = {name: round(frame_memory_mb(frame), 1) for name, frame in frames.items() if frame is not None}
+    rss = f"{report['rss_mb']:.0f} MB" if report["rss_mb"] is not None else "n/a"
+    sizes = ", ".join(f"{name}={size} MB" for name, size in report["frames_mb"].items())
+    print(f"      🧠 {stage}: rss {rss} (peak {report['peak_rss_mb']:.0f} MB){' | ' + sizes if sizes else ''}")
+    return report
@@ -1,12 +1,17 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 
 import pandas as pd
 
 
 SUPPORTED_HORIZONS = ("FULL_HISTORICAL", "5Y_ROLLING", "3Y_ROLLING")
 
+# Team feature sets whose vectors do not depend on the training horizon (rolling windows over
+# the full history; horizons only filter fixtures by date). They are stored once, under
+# FULL_HISTORICAL, and every horizon resolves to that row.
+HORIZON_INDEPENDENT_FEATURE_SETS = ("BASELINE_V1", "PROCESS_V1")
+
 
 @dataclass(frozen=True)
 class HorizonWindow:
@@ -32,6 +37,14 @@ def horizon_years(horizon_type: str) -> int | None:
     return None
 
 
+def feature_storage_horizon(feature_set_id: str, horizon_type: str) -> str:
+    """horizon_type under which ``feature_set_id`` rows for ``horizon_type`` are stored in V3_Team_Features_PreMatch."""
+    normalized = normalize_horizon_type(horizon_type)
+    if feature_set_id in HORIZON_INDEPENDENT_FEATURE_SETS:
+        return "FULL_HISTORICAL"
+    return normalized
+
+
 def filter_dataframe_by_horizon(df: pd.DataFrame, date_column: str, horizon_type: str) -> tuple[pd.DataFrame, HorizonWindow]:
     normalized = normalize_horizon_type(horizon_type)
     frame = df.copy()
@@ -48,3 +61,66 @@ def filter_dataframe_by_horizon(df: pd.DataFrame, date_column: str, horizon_type
     cutoff = max_date - pd.DateOffset(years=years)
     filtered = frame[frame[date_column] >= cutoff].copy()
     return filtered, HorizonWindow(normalized, max_date, cutoff, int(len(filtered)))
+
+
+def _utc_timestamp(value) -> pd.Timestamp:
+    stamp = pd.Timestamp(value)
+    return stamp.tz_localize("UTC") if stamp.tzinfo is None else stamp.tz_convert("UTC")
+
+
+def fixture_bounds_sql(league_id=None, min_date=None, max_date=None, alias: str = "f") -> tuple[str, list]:
+    """``AND ...`` conditions on V3_Fixtures ``alias`` for an optional league and date bounds."""
+    conditions = [f"{alias}.date IS NOT NULL"]
+    params = []
+    if league_id is not None:
+        conditions.append(f"{alias}.league_id = %s")
+        params.append(int(league_id))
+    if min_date is not None:
+        conditions.append(f"{alias}.date >= %s")
+        params.append(_utc_timestamp(min_date).to_pydatetime())
+    if max_date is not None:
+        conditions.append(f"{alias}.date <= %s")
+        params.append(_utc_timestamp(max_date).to_pydatetime())
+    return "".join(f" AND {condition}" for condition in conditions), params
+
+
+def resolve_horizon_sql(
+    conn,
+    horizon_type: str,
+    from_sql: str,
+    params=(),
+    league_id=None,
+    min_date=None,
+    max_date=None,
+    alias: str = "f",
+) -> tuple[str, list, HorizonWindow]:
+    """
+    SQL equivalent of ``filter_dataframe_by_horizon`` for a dataset query.
+
+    ``from_sql`` is the query's ``FROM ... WHERE ...`` over V3_Fixtures ``alias`` and ``params``
+    its parameters. The horizon cutoff is ``MAX(date)`` of the bounded rows, read from the
+    database, minus the horizon length. Returns the ``AND ...`` conditions to append to the
+    WHERE clause, their parameters and the window (``dataset_size`` is filled by
+    ``with_dataset_size`` once the rows are loaded).
+    """
+    normalized = normalize_horizon_type(horizon_type)
+    conditions, bound_params = fixture_bounds_sql(league_id, min_date, max_date, alias)
+    cur = conn.cursor()
+    cur.execute(f"SELECT MAX({alias}.date) {from_sql}{conditions}", [*params, *bound_params])
+    row = cur.fetchone()
+    cur.close()
+    if row is None or row[0] is None:
+        return conditions, bound_params, HorizonWindow(normalized, pd.NaT, None, 0)
+
+    max_date_value = _utc_timestamp(row[0])
+    years = horizon_years(normalized)
+    if years is None:
+        return conditions, bound_params, HorizonWindow(normalized, max_date_value, None, 0)
+
+    cutoff = max_date_value - pd.DateOffset(years=years)
+    conditions += f" AND {alias}.date >= %s"
+    return conditions, [*bound_params, cutoff.to_pydatetime()], HorizonWindow(normalized, max_date_value, cutoff, 0)
+
+
+def with_dataset_size(window: HorizonWindow, df: pd.DataFrame) -> HorizonWindow:
+    return replace(window, dataset_size=int(len(df)))
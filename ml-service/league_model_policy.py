@@ -7,6 +7,8 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 REPORT_PATH = os.path.join(BASE_DIR, "reports", "league_specific_eligibility.json")
 POLICY_PATH = os.path.join(BASE_DIR, "reports", "league_model_policy.json")
 
+_POLICY_CACHE = {}
+
 
 def load_json(path):
     if not os.path.exists(path):
@@ -26,8 +28,18 @@ def load_policy():
     }
 
 
+def get_policy():
+    """Read-only policy for the serving path, re-read only when the file changes."""
+    mtime_ns = os.stat(POLICY_PATH).st_mtime_ns if os.path.exists(POLICY_PATH) else None
+    cached = _POLICY_CACHE.get(POLICY_PATH)
+    if cached is None or cached[0] != mtime_ns:
+        cached = (mtime_ns, load_policy())
+        _POLICY_CACHE[POLICY_PATH] = cached
+    return cached[1]
+
+
 def get_ft_policy_for_league(league_id: int):
-    policy = load_policy()
+    policy = get_policy()
     ft_policy = policy.get("ft_1x2", {})
     if league_id in ft_policy.get("active", []):
         return "active"
@@ -37,7 +49,7 @@ def get_ft_policy_for_league(league_id: int):
 
 
 def get_market_policy_for_league(market_key: str, league_id: int):
-    policy = load_policy()
+    policy = get_policy()
     market_policy = policy.get(market_key, {})
     if league_id in market_policy.get("active", []):
         return "active"
@@ -47,7 +59,7 @@ def get_market_policy_for_league(market_key: str, league_id: int):
 
 
 def get_market_decision(market_key: str, league_id: int):
-    policy = load_policy()
+    policy = get_policy()
     market_policy = policy.get(market_key, {})
     for decision in market_policy.get("decisions", []):
         if decision.get("league_id") == league_id:
@@ -0,0 +1,103 @@
+"""
+Lineup Quality Index (LQI): the mean season rating of a team's starting XI.
+
+Computed in one grouped query from the normalized starters in
+V3_Fixture_Lineup_Players joined to per-player average ``games_rating`` from
+V3_Player_Stats. Lineups not normalized yet (e.g. published after the last
+``scripts/backfill_lineups.py`` run) are read from the ``starting_xi`` JSON of
+V3_Fixture_Lineups inside the same query. Unrated starters count as
+``DEFAULT_LQI``. The JSON is parsed with ``try_parse_jsonb`` (created by
+backend/src/migrations/registry/20260415_01_Try_Parse_Jsonb.js, or by
+``create_lineup_quality_functions`` in synthetic and benchmark databases),
+which returns NULL instead of raising, so one malformed ``starting_xi`` row
+is skipped rather than aborting the whole query.
+
+``load_lineup_quality`` returns the whole table for the feature pipeline;
+``lookup_lineup_quality`` answers a batch of fixtures for time travel.
+"""
+
+import pandas as pd
+
+DEFAULT_LQI = 6.5
+
+TRY_PARSE_JSONB_SQL = """CREATE OR REPLACE FUNCTION try_parse_jsonb(value TEXT) RETURNS JSONB AS $$
+BEGIN
+    RETURN value::jsonb;
+EXCEPTION WHEN invalid_text_representation THEN
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE"""
+
+_LQI_QUERY = """
+    WITH starters AS (
+        SELECT fixture_id, team_id, player_id
+        FROM V3_Fixture_Lineup_Players
+        WHERE is_starting = 1 {normalized_filter}
+        UNION ALL
+        SELECT l.fixture_id, l.team_id, (COALESCE(item -> 'player', item) ->> 'id')::int
+        FROM V3_Fixture_Lineups l
+        CROSS JOIN LATERAL try_parse_jsonb(l.starting_xi) AS parsed(doc)
+        CROSS JOIN LATERAL jsonb_array_elements(
+            CASE WHEN jsonb_typeof(parsed.doc) = 'array' THEN parsed.doc END
+        ) AS xi(item)
+        WHERE (COALESCE(item -> 'player', item) ->> 'id') ~ '^[0-9]{{1,9}}$' {lineups_filter}
+          AND NOT EXISTS (
+              SELECT 1 FROM V3_Fixture_Lineup_Players lp
+              WHERE lp.fixture_id = l.fixture_id AND lp.team_id = l.team_id
+          )
+    ),
+    player_ratings AS (
+        SELECT player_id,
+               AVG(CASE WHEN games_rating ~ '^\\s*[0-9]+(\\.[0-9]+)?\\s*$' THEN games_rating::double precision END) AS rating
+        FROM V3_Player_Stats
+        WHERE player_id IN (SELECT player_id FROM starters)
+        GROUP BY player_id
+    )
+    SELECT s.fixture_id,
+           s.team_id,
+           ROUND(AVG(COALESCE(r.rating, %(default)s))::numeric, 3)::double precision AS lqi,
+           COUNT(*) AS starters,
+           COUNT(r.rating) AS rated_starters
+    FROM starters s
+    LEFT JOIN player_ratings r ON r.player_id = s.player_id
+    GROUP BY s.fixture_id, s.team_id
+"""
+
+
+def create_lineup_quality_functions(conn):
+    """Create ``try_parse_jsonb`` (the migrated database gets it from the backend migration)."""
+    cur = conn.cursor()
+    cur.execute(TRY_PARSE_JSONB_SQL)
+    cur.close()
+    conn.commit()
+
+
+def _query(fixture_ids=None):
+    if fixture_ids is None:
+        return _LQI_QUERY.format(normalized_filter="", lineups_filter=""), {"default": DEFAULT_LQI}
+    return (
+        _LQI_QUERY.format(
+            normalized_filter="AND fixture_id = ANY(%(fixture_ids)s)",
+            lineups_filter="AND l.fixture_id = ANY(%(fixture_ids)s)",
+        ),
+        {"default": DEFAULT_LQI, "fixture_ids": [int(fixture_id) for fixture_id in fixture_ids]},
+    )
+
+
+def load_lineup_quality(conn, fixture_ids=None):
+    """One row per (fixture_id, team_id) with a starting XI: ``lqi``, ``starters``, ``rated_starters``."""
+    query, params = _query(fixture_ids)
+    return pd.read_sql_query(query, conn, params=params)
+
+
+def lookup_lineup_quality(conn, fixture_ids):
+    """``{(fixture_id, team_id): lqi}`` for the given fixtures; teams without a lineup are absent."""
+    fixture_ids = list(fixture_ids)
+    if not fixture_ids:
+        return {}
+    query, params = _query(fixture_ids)
+    cur = conn.cursor()
+    cur.execute(query, params)
+    rows = cur.fetchall()
+    cur.close()
+    return {(int(row[0]), int(row[1])): float(row[2]) for row in rows}
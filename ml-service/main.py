@@ -1,38 +1,47 @@
 import json
 import os
-import subprocess
-import sys
 import time
 import warnings
-from datetime import datetime
 from typing import List, Optional
 
-import joblib
-import pandas as pd
-from fastapi import BackgroundTasks, FastAPI, HTTPException
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Response
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 
 from db_config import get_connection
 from feature_schema import GLOBAL_1X2_FEATURE_COLUMNS, normalize_feature_vector
 from model_paths import get_global_1x2_model_path
-from season_simulation_runner import run_season_simulation
+from src.jobs.manager import FINAL_STATES, get_job_manager, read_log
+from src.models import native_scoring
+from src.models.model_cache import get_model_cache, load_joblib_model
+from src.models.model_registry import start_registry_listener
+from src.monitoring.metrics import MetricsMiddleware, register_state_provider, render_metrics
+from src.monitoring.profiling import (
+    PROFILING_ENABLED,
+    ProfilingMiddleware,
+    list_profiles,
+    profile_path,
+    profile_request,
+    profile_summary,
+)
+from src.orchestrator.warmup import is_ready, start_warmup, warmup_status
 
 warnings.filterwarnings('ignore', category=UserWarning, module='pandas')
 
 app = FastAPI(title="StatFoot V3 ML Service", version="2.0.0-postgres-only")
+app.add_middleware(MetricsMiddleware)
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
 
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 MODEL_PATH = get_global_1x2_model_path()
 IMPORTANCE_PATH = os.path.join(os.path.dirname(MODEL_PATH), 'model_1x2_importance.json')
 
-model = None
 importance = []
 
-training_status = {
-    "is_training": False,
-    "last_trained": None,
-    "last_metrics": None,
-    "error": None
+simulation_status = {
+    "running": 0,
+    "completed": 0,
+    "failed": 0,
 }
 
 
@@ -44,6 +53,10 @@ class BatchPredictionRequest(BaseModel):
     fixture_ids: List[int]
 
 
+class JobRequest(BaseModel):
+    job_type: str
+
+
 class SeasonSimulationRequest(BaseModel):
     simulation_id: int
     league_id: int
@@ -52,53 +65,64 @@ class SeasonSimulationRequest(BaseModel):
     mode: Optional[str] = "STATIC"
 
 
+def get_model():
+    return load_joblib_model("global_1x2_classifier", MODEL_PATH)
+
+
+def _prediction_cache_stats():
+    from src.orchestrator.prediction_cache import get_prediction_cache
+
+    return get_prediction_cache().stats()
+
+
+register_state_provider("model_cache", lambda: get_model_cache().stats())
+register_state_provider("prediction_cache", _prediction_cache_stats)
+register_state_provider("jobs", lambda: get_job_manager().stats())
+register_state_provider("simulations", lambda: dict(simulation_status))
+register_state_provider("warmup", lambda: {"ready": is_ready()})
+
+
 @app.on_event("startup")
 def load_model():
-    global model, importance
-    if os.path.exists(MODEL_PATH):
-        model = joblib.load(MODEL_PATH)
+    if get_model() is not None:
         print(f"✅ Model loaded: {MODEL_PATH}")
     else:
         print(f"⚠️ Warning: Model not found at {MODEL_PATH}")
+    start_registry_listener()
+    start_warmup()
+    get_job_manager().add_listener(on_job_finished)
+    get_job_manager().start()
+    reload_importance()
 
+
+def reload_importance():
+    global importance
     if os.path.exists(IMPORTANCE_PATH):
         with open(IMPORTANCE_PATH, 'r') as handle:
             importance = json.load(handle)
 
 
-def run_training_pipeline():
-    global training_status, model, importance
-    training_status["is_training"] = True
-    training_status["error"] = None
+def on_job_finished(job):
+    if job["job_type"] == "train_1x2" and job["status"] == "SUCCEEDED":
+        get_model()
+        reload_importance()
+
 
+def training_status():
+    """Summary of the latest ``train_1x2`` jobs in the shape ``/train/status`` always returned."""
     try:
-        feat_proc = subprocess.run(
-            [sys.executable, os.path.join(BASE_DIR, 'features.py')],
-            capture_output=True,
-            text=True,
-        )
-        if feat_proc.returncode != 0:
-            raise Exception(f"Feature engineering failed: {feat_proc.stderr}")
-
-        train_proc = subprocess.run(
-            [sys.executable, os.path.join(BASE_DIR, 'train_1x2.py')],
-            capture_output=True,
-            text=True,
-        )
-        if train_proc.returncode != 0:
-            raise Exception(f"Model training failed: {train_proc.stderr}")
-
-        model = joblib.load(MODEL_PATH)
-        if os.path.exists(IMPORTANCE_PATH):
-            with open(IMPORTANCE_PATH, 'r') as handle:
-                importance = json.load(handle)
-
-        training_status["last_trained"] = datetime.now().isoformat()
-        training_status["is_training"] = False
+        jobs = get_job_manager().list(job_type="train_1x2", limit=20)
     except Exception as exc:
-        print(f"❌ [ML] Retraining pipeline failed: {exc}")
-        training_status["is_training"] = False
-        training_status["error"] = str(exc)
+        return {"is_training": False, "last_trained": None, "last_metrics": None, "error": f"Job store unavailable: {exc}"}
+    latest = jobs[0] if jobs else None
+    last_success = next((job for job in jobs if job["status"] == "SUCCEEDED"), None)
+    return {
+        "is_training": bool(latest and latest["status"] not in FINAL_STATES),
+        "last_trained": last_success["finished_at"] if last_success else None,
+        "last_metrics": None,
+        "error": latest["error"] if latest and latest["status"] == "FAILED" else None,
+        "job": latest,
+    }
 
 
 def _load_feature_vector(fixture_id: int):
@@ -117,16 +141,56 @@ def _load_feature_vector(fixture_id: int):
 def health():
     return {
         "status": "online",
-        "model_loaded": model is not None,
+        "model_loaded": get_model() is not None,
         "version": app.version,
-        "training": training_status
+        "training": training_status(),
+        "model_cache": get_model_cache().stats(),
+    }
+
+
+@app.get("/metrics/cache")
+def cache_metrics():
+    from src.orchestrator.prediction_cache import get_prediction_cache
+
+    return {
+        "prediction_cache": get_prediction_cache().stats(),
+        "model_cache": get_model_cache().stats(),
     }
 
 
+@app.get("/metrics")
+def metrics():
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
+
+
+@app.get("/profiles")
+def get_profiles(limit: int = 50):
+    return {"enabled": PROFILING_ENABLED, "profiles": list_profiles(limit)}
+
+
+@app.get("/profiles/{profile_id}")
+def download_profile(profile_id: str, format: str = "prof"):
+    path = profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Profile not found: {profile_id}")
+    if format == "text":
+        return PlainTextResponse(profile_summary(path))
+    return FileResponse(path, media_type="application/octet-stream", filename=path.name)
+
+
+@app.get("/ready")
+def ready():
+    if not is_ready():
+        raise HTTPException(status_code=503, detail={"ready": False, "warmup": warmup_status})
+    return {"ready": True, "warmup": warmup_status}
+
+
 @app.post("/predict")
 def predict(request: PredictionRequest):
     start_time = time.time()
 
+    model = get_model()
     if model is None:
         raise HTTPException(status_code=503, detail="Model not loaded")
 
@@ -136,8 +200,7 @@ def predict(request: PredictionRequest):
             raise HTTPException(status_code=404, detail=f"Features not found for fixture {request.fixture_id}")
 
         vector = normalize_feature_vector(json.loads(row[0]))
-        features = pd.DataFrame([vector], columns=GLOBAL_1X2_FEATURE_COLUMNS)
-        probs = model.predict_proba(features)[0]
+        probs = native_scoring.predict_proba(model, vector, GLOBAL_1X2_FEATURE_COLUMNS)[0]
 
         duration = time.time() - start_time
         return {
@@ -160,6 +223,7 @@ def predict(request: PredictionRequest):
 
 @app.post("/batch_predict")
 def batch_predict(request: BatchPredictionRequest):
+    model = get_model()
     if model is None:
         raise HTTPException(status_code=503, detail="Model not loaded")
 
@@ -173,11 +237,10 @@ def batch_predict(request: BatchPredictionRequest):
         cur.close()
         conn.close()
 
+        vectors = [normalize_feature_vector(json.loads(vector_json)) for _, vector_json in rows]
+        batch_probs = native_scoring.predict_proba(model, vectors, GLOBAL_1X2_FEATURE_COLUMNS) if vectors else []
         results = []
-        for fixture_id, vector_json in rows:
-            vector = normalize_feature_vector(json.loads(vector_json))
-            features = pd.DataFrame([vector], columns=GLOBAL_1X2_FEATURE_COLUMNS)
-            probs = model.predict_proba(features)[0]
+        for (fixture_id, _), probs in zip(rows, batch_probs):
             results.append({
                 "fixture_id": fixture_id,
                 "probabilities": {
@@ -197,17 +260,89 @@ def batch_predict(request: BatchPredictionRequest):
 
 
 @app.post("/train")
-def train(background_tasks: BackgroundTasks):
-    if training_status["is_training"]:
-        return {"success": False, "message": "Training already in progress"}
-
-    background_tasks.add_task(run_training_pipeline)
-    return {"success": True, "message": "Training pipeline started in background"}
+def train():
+    job, created = get_job_manager().submit_exclusive("train_1x2")
+    if not created:
+        return {"success": False, "message": "Training already in progress", "job_id": job["id"]}
+    return {"success": True, "message": "Training job queued", "job_id": job["id"]}
 
 
 @app.get("/train/status")
 def get_train_status():
-    return training_status
+    return training_status()
+
+
+@app.post("/jobs")
+def submit_job(request: JobRequest):
+    try:
+        return get_job_manager().submit(request.job_type)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@app.get("/jobs")
+def list_jobs(job_type: Optional[str] = None, limit: int = 50):
+    return {"jobs": get_job_manager().list(job_type=job_type, limit=limit)}
+
+
+def _get_job_or_404(job_id):
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: int):
+    return _get_job_or_404(job_id)
+
+
+@app.post("/jobs/{job_id}/cancel")
+def cancel_job(job_id: int):
+    job = _get_job_or_404(job_id)
+    if job["status"] in FINAL_STATES:
+        return {"success": False, "message": f"Job already {job['status'].lower()}", "job": job}
+    return {"success": True, "job": get_job_manager().cancel(job_id)}
+
+
+@app.get("/jobs/{job_id}/logs")
+def get_job_logs(job_id: int, offset: int = 0, limit: int = 65536, follow: bool = False):
+    job = _get_job_or_404(job_id)
+    if not job["log_path"]:
+        return PlainTextResponse("", headers={"X-Log-Offset": str(offset)})
+    if not follow:
+        text, next_offset = read_log(job["log_path"], offset, limit)
+        return PlainTextResponse(text, headers={"X-Log-Offset": str(next_offset)})
+
+    def stream():
+        position = offset
+        while True:
+            text, position = read_log(job["log_path"], position, limit)
+            if text:
+                yield text
+                continue
+            if get_job_manager().get(job_id)["status"] in FINAL_STATES:
+                text, position = read_log(job["log_path"], position, limit)
+                if text:
+                    yield text
+                return
+            time.sleep(1.0)
+
+    return StreamingResponse(stream(), media_type="text/plain")
+
+
+def run_tracked_simulation(*args):
+    from season_simulation_runner import run_season_simulation
+
+    simulation_status["running"] += 1
+    try:
+        run_season_simulation(*args)
+        simulation_status["completed"] += 1
+    except Exception:
+        simulation_status["failed"] += 1
+        raise
+    finally:
+        simulation_status["running"] -= 1
 
 
 @app.post("/simulations/run")
@@ -216,7 +351,7 @@ def start_season_simulation(request: SeasonSimulationRequest, background_tasks:
         raise HTTPException(status_code=400, detail=f"Unsupported simulation mode: {request.mode}")
 
     background_tasks.add_task(
-        run_season_simulation,
+        run_tracked_simulation,
         request.simulation_id,
         request.league_id,
         request.season_year,
@@ -233,8 +368,9 @@ def start_season_simulation(request: SeasonSimulationRequest, background_tasks:
 @app.get("/predict/fixture/{fixture_id}")
 def predict_fixture_all(fixture_id: int):
     try:
-        from src.orchestrator.predictor import generate_master_prediction
-        return generate_master_prediction(fixture_id)
+        from src.orchestrator.predictor import get_master_prediction
+        with profile_request("/predict/fixture", fixture_id):
+            return get_master_prediction(fixture_id)
     except Exception as exc:
         import traceback
         traceback.print_exc()
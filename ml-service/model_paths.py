@@ -2,7 +2,9 @@ import os
 
 
 ML_SERVICE_ROOT = os.path.dirname(os.path.abspath(__file__))
-MODELS_ROOT = os.path.join(ML_SERVICE_ROOT, "models")
+# Overridable so benchmarks and load tests can point the service at dummy models.
+MODELS_ROOT = os.getenv("ML_MODELS_ROOT", os.path.join(ML_SERVICE_ROOT, "models"))
+GLOBAL_1X2_MODEL_PATH = os.getenv("ML_GLOBAL_1X2_MODEL_PATH", os.path.join(ML_SERVICE_ROOT, "model_1x2.joblib"))
 
 
 def get_models_root():
@@ -63,7 +65,7 @@ def get_goals_poisson_paths(version="v1"):
 
 
 def get_global_1x2_model_path():
-    return os.path.join(ML_SERVICE_ROOT, "model_1x2.joblib")
+    return GLOBAL_1X2_MODEL_PATH
 
 
 def get_global_1x2_model_dir():
@@ -0,0 +1,132 @@
+"""
+Rolling per-player performance for BASELINE_V1 lineup strength.
+
+``rolling_perf_avg`` of a player at a fixture is the mean ``perf_score`` of
+their previous (at most ``ROLLING_WINDOW``) matches, NULL for a debut. Rows
+are streamed from a server-side cursor ordered by ``(player_id, date)`` and
+a fixed-size ring buffer for the current player produces the averages, so
+memory stays bounded by the fetch size whatever the history length. Results
+are upserted into V3_Player_Rolling_Perf in batches.
+
+In incremental mode only players with stat rows missing from
+V3_Player_Rolling_Perf are read: their rows from the earliest missing
+fixture onward, seeded with the ``ROLLING_WINDOW`` matches just before it
+(which are not rewritten). Late-arriving stats for an old fixture therefore
+also refresh that player's later averages.
+"""
+
+from collections import deque
+
+from psycopg2.extras import execute_values
+
+ROLLING_WINDOW = 20
+FETCH_SIZE = 20000
+WRITE_BATCH_SIZE = 50000
+
+PERF_SCORE_SQL = """
+    (2.0 * COALESCE(fps.goals_total, 0)) +
+    (1.5 * COALESCE(fps.goals_assists, 0)) +
+    (0.05 * COALESCE(fps.passes_key, 0)) +
+    (0.03 * COALESCE(fps.duels_won, 0)) +
+    (0.04 * COALESCE(fps.shots_on, 0)) +
+    (0.02 * COALESCE(fps.tackles_total, 0)) -
+    (0.5 * COALESCE(fps.cards_yellow, 0)) -
+    (2.0 * COALESCE(fps.cards_red, 0))
+"""
+
+_SCORED = f"""
+    scored AS (
+        SELECT fps.player_id, fps.fixture_id, f.date, {PERF_SCORE_SQL} AS perf_score
+        FROM V3_Fixture_Player_Stats fps
+        JOIN V3_Fixtures f ON fps.fixture_id = f.fixture_id
+    )
+"""
+
+FULL_QUERY = f"""
+    WITH {_SCORED}
+    SELECT player_id, fixture_id, date, perf_score, TRUE AS emit
+    FROM scored
+    ORDER BY player_id, date, fixture_id
+"""
+
+INCREMENTAL_QUERY = f"""
+    WITH {_SCORED},
+    pending AS (
+        SELECT s.player_id, MIN(s.date) AS since
+        FROM scored s
+        WHERE NOT EXISTS (
+            SELECT 1 FROM V3_Player_Rolling_Perf rp
+            WHERE rp.player_id = s.player_id AND rp.fixture_id = s.fixture_id
+        )
+        GROUP BY s.player_id
+    ),
+    seed AS (
+        SELECT s.player_id, s.fixture_id, s.date, s.perf_score,
+               ROW_NUMBER() OVER (PARTITION BY s.player_id ORDER BY s.date DESC, s.fixture_id DESC) AS back
+        FROM scored s
+        JOIN pending p ON p.player_id = s.player_id AND s.date < p.since
+    )
+    SELECT player_id, fixture_id, date, perf_score, FALSE AS emit FROM seed WHERE back <= %(window)s
+    UNION ALL
+    SELECT s.player_id, s.fixture_id, s.date, s.perf_score, TRUE AS emit
+    FROM scored s
+    JOIN pending p ON p.player_id = s.player_id AND s.date >= p.since
+    ORDER BY player_id, date, fixture_id
+"""
+
+UPSERT_QUERY = """
+    INSERT INTO V3_Player_Rolling_Perf (player_id, fixture_id, match_date, perf_score, rolling_perf_avg)
+    VALUES %s
+    ON CONFLICT (player_id, fixture_id) DO UPDATE SET
+        match_date = excluded.match_date,
+        perf_score = excluded.perf_score,
+        rolling_perf_avg = excluded.rolling_perf_avg,
+        calculated_at = CURRENT_TIMESTAMP
+"""
+
+
+def stream_rolling_perf(rows, window=ROLLING_WINDOW):
+    """
+    Yield ``(player_id, fixture_id, date, perf_score, rolling_perf_avg)`` for every row with
+    ``emit`` set. ``rows`` are ``(player_id, fixture_id, date, perf_score, emit)`` ordered by
+    ``(player_id, date)``; rows without ``emit`` only fill the buffer.
+    """
+    current_player = None
+    buffer = deque(maxlen=window)
+    for player_id, fixture_id, date, perf_score, emit in rows:
+        if player_id != current_player:
+            current_player = player_id
+            buffer.clear()
+        if emit:
+            rolling = sum(buffer) / len(buffer) if buffer else None
+            yield player_id, fixture_id, date, float(perf_score), rolling
+        buffer.append(float(perf_score))
+
+
+def update_player_rolling_perf(conn, incremental=False, window=ROLLING_WINDOW, fetch_size=FETCH_SIZE,
+                               batch_size=WRITE_BATCH_SIZE):
+    """Refresh V3_Player_Rolling_Perf (everything, or only pending players) in one transaction; returns rows written."""
+    write_cur = conn.cursor()
+    if not incremental:
+        write_cur.execute("TRUNCATE V3_Player_Rolling_Perf")
+
+    read_cur = conn.cursor(name="player_rolling_perf")
+    read_cur.itersize = fetch_size
+    read_cur.execute(INCREMENTAL_QUERY if incremental else FULL_QUERY, {"window": window})
+
+    written = 0
+    batch = []
+    for row in stream_rolling_perf(read_cur, window):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            execute_values(write_cur, UPSERT_QUERY, batch, page_size=batch_size)
+            written += len(batch)
+            batch = []
+            print(f"      Stored {written} player rolling-performance rows...")
+    if batch:
+        execute_values(write_cur, UPSERT_QUERY, batch, page_size=batch_size)
+        written += len(batch)
+    read_cur.close()
+    write_cur.close()
+    conn.commit()
+    return written
@@ -1,8 +1,6 @@
 import json
 import os
-import subprocess
 import sys
-import time
 from datetime import datetime
 from pathlib import Path
 
@@ -10,12 +8,15 @@ import psycopg2
 
 
 BASE_DIR = Path(__file__).resolve().parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from run_pipeline import run_pipeline
+
 REPORTS_DIR = BASE_DIR / "reports"
-LOG_DIR = BASE_DIR / "logs"
 STATUS_PATH = BASE_DIR / "horizon_experiments_status.json"
 REPORT_PATH = REPORTS_DIR / "global_1x2_horizon_report.json"
 HORIZONS = ["FULL_HISTORICAL", "5Y_ROLLING", "3Y_ROLLING"]
-BEST_PARAMS_PATH = REPORTS_DIR / "global_1x2_best_params_seed.json"
 
 
 def utc_now():
@@ -34,36 +35,6 @@ def get_connection():
     return psycopg2.connect(database_url)
 
 
-def run_command(command, stage_name, log_name):
-    LOG_DIR.mkdir(exist_ok=True)
-    log_path = LOG_DIR / log_name
-    with log_path.open("a") as handle:
-        handle.write(f"\n[{utc_now()}] START {' '.join(command)}\n")
-        handle.flush()
-        process = subprocess.Popen(
-            command,
-            cwd=str(BASE_DIR.parent),
-            stdout=handle,
-            stderr=subprocess.STDOUT,
-        )
-        while True:
-            return_code = process.poll()
-            write_status(
-                status="running" if return_code is None else ("completed" if return_code == 0 else "failed"),
-                stage=stage_name,
-                pid=process.pid,
-                return_code=return_code,
-                log_path=str(log_path),
-            )
-            if return_code is not None:
-                handle.write(f"[{utc_now()}] END code={return_code}\n")
-                handle.flush()
-                if return_code != 0:
-                    raise RuntimeError(f"{stage_name} failed with code {return_code}")
-                return
-            time.sleep(30)
-
-
 def latest_registry_entry_for_horizon(horizon_type):
     conn = get_connection()
     try:
@@ -119,21 +90,9 @@ def build_report():
 
 
 def main():
-    for horizon in HORIZONS:
-        command = [
-            sys.executable,
-            "ml-service/train_1x2.py",
-            "--horizon",
-            horizon,
-            "--no-activate",
-        ]
-        if BEST_PARAMS_PATH.exists():
-            command.extend(["--params-file", str(BEST_PARAMS_PATH), "--no-optuna"])
-        run_command(
-            command,
-            f"train_{horizon.lower()}",
-            f"train_1x2_{horizon.lower()}.log",
-        )
+    run = run_pipeline("horizon_experiments", status_path=STATUS_PATH)
+    if run["status"] != "completed":
+        sys.exit(1)
 
     report = build_report()
     write_status(status="completed", stage="done", report=report)
@@ -0,0 +1,63 @@
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from src.pipeline.dag import PipelineRunner, select_stages
+from src.pipeline.stages import PIPELINES, build_stages
+
+REPORTS_DIR = BASE_DIR / "reports"
+LOG_DIR = BASE_DIR / "logs" / "pipeline"
+STATE_PATH = REPORTS_DIR / "pipeline_state.json"
+RUNS_DIR = REPORTS_DIR / "pipeline_runs"
+
+
+def run_pipeline(name, targets=None, status_path=None, budget=None, force=(), dry_run=False):
+    """Run pipeline ``name`` (or explicit ``targets``) and return its report."""
+    stages = select_stages(build_stages(), targets or PIPELINES[name])
+    runner = PipelineRunner(
+        name,
+        stages,
+        state_path=STATE_PATH,
+        report_path=status_path or BASE_DIR / f"{name}_pipeline_status.json",
+        log_dir=LOG_DIR,
+        archive_dir=RUNS_DIR,
+        cwd=str(BASE_DIR.parent),
+        budget=budget,
+        force=force,
+        dry_run=dry_run,
+    )
+    return runner.run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a batch pipeline, skipping stages whose inputs have not changed.")
+    parser.add_argument("pipeline", choices=sorted(PIPELINES), help="Pipeline to run.")
+    parser.add_argument("--targets", nargs="+", default=None, help="Run these stages (and their upstream) instead.")
+    parser.add_argument("--force", nargs="+", default=[], help="Rerun these stages even when up to date.")
+    parser.add_argument("--cpu", type=int, default=os.cpu_count() or 1, help="CPU budget shared by parallel stages.")
+    parser.add_argument("--db", type=int, default=2, help="Stages allowed to load the database at once.")
+    parser.add_argument("--dry-run", action="store_true", help="Only report which stages would run.")
+    args = parser.parse_args()
+
+    report = run_pipeline(
+        args.pipeline,
+        targets=args.targets,
+        budget={"cpu": args.cpu, "db": args.db},
+        force=args.force,
+        dry_run=args.dry_run,
+    )
+    for name, stage in report["stages"].items():
+        print(f"{stage['status']:>10}  {name:<22} {stage.get('reason', '')}")
+    print(json.dumps(report["summary"]))
+    if report["status"] != "completed":
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
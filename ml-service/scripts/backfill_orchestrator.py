@@ -1,61 +1,229 @@
+import argparse
+import json
 import os
 import sys
-from db_config import get_connection
 import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from db_config import get_connection
+
+
+PROGRESS_PATH = ROOT_DIR / "backfill_orchestrator_progress.json"
+LATENCY_PERCENTILES = (50, 95, 99)
+
 
-# Ensure we can import src
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from src.orchestrator.predictor import generate_master_prediction
+def write_progress(payload):
+    PROGRESS_PATH.write_text(json.dumps(payload, indent=2, default=str))
 
 
-def run_backfill():
+def read_progress():
+    if not PROGRESS_PATH.exists():
+        return None
+    return json.loads(PROGRESS_PATH.read_text())
+
+
+def fetch_eligible_fixtures():
     conn = get_connection()
-    
-    # Find all completed fixtures that have PROCESS_V1 features for both teams
+    try:
+        # Find all completed fixtures that have PROCESS_V1 features for both teams
+        query = """
+            SELECT DISTINCT f.fixture_id, f.date
+            FROM V3_Fixtures f
+            JOIN V3_Team_Features_PreMatch p_home ON f.fixture_id = p_home.fixture_id AND f.home_team_id = p_home.team_id AND p_home.feature_set_id = 'PROCESS_V1' AND p_home.horizon_type = 'FULL_HISTORICAL'
+            JOIN V3_Team_Features_PreMatch p_away ON f.fixture_id = p_away.fixture_id AND f.away_team_id = p_away.team_id AND p_away.feature_set_id = 'PROCESS_V1' AND p_away.horizon_type = 'FULL_HISTORICAL'
+            WHERE f.status_short = 'FT'
+            AND f.score_fulltime_home IS NOT NULL
+            ORDER BY f.date ASC, f.fixture_id ASC
+        """
+        cur = conn.cursor()
+        cur.execute(query)
+        fixtures = [row[0] for row in cur.fetchall()]
+        cur.close()
+        return fixtures
+    finally:
+        conn.close()
+
+
+def resume_position(fixtures, progress):
+    """Index of the first fixture after the last checkpointed chunk."""
+    if not progress or progress.get("last_fixture_id") is None:
+        return 0
+    try:
+        return fixtures.index(progress["last_fixture_id"]) + 1
+    except ValueError:
+        return 0
+
+
+def score_chunk(fixture_ids):
+    """Process-pool worker: scores a chunk and returns counts plus per-model latencies (ms)."""
+    from src.orchestrator.predictor import generate_master_predictions
+
+    results, timings = generate_master_predictions(fixture_ids)
+    latencies = {}
+    for fixture_timings in timings:
+        for model_type, seconds in fixture_timings.items():
+            latencies.setdefault(model_type, []).append(seconds * 1000.0)
+    success = sum(1 for result in results if result.get("success"))
+    return {"success": success, "failed": len(results) - success, "latencies_ms": latencies}
+
+
+def latency_percentiles(latencies):
+    return {
+        model_type: {f"p{q}": round(float(np.percentile(values, q)), 1) for q in LATENCY_PERCENTILES}
+        for model_type, values in sorted(latencies.items())
+        if values
+    }
+
+
+def format_eta(seconds):
+    if seconds is None:
+        return "?"
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m{secs:02d}s"
+
+
+def run_backfill(chunk_size=200, workers=None, reset=False):
+    workers = workers or os.cpu_count() or 1
+
     print("Querying for eligible historical fixtures...")
-    query = """
-        SELECT DISTINCT f.fixture_id
-        FROM V3_Fixtures f
-        JOIN V3_Team_Features_PreMatch p_home ON f.fixture_id = p_home.fixture_id AND f.home_team_id = p_home.team_id AND p_home.feature_set_id = 'PROCESS_V1' AND p_home.horizon_type = 'FULL_HISTORICAL'
-        JOIN V3_Team_Features_PreMatch p_away ON f.fixture_id = p_away.fixture_id AND f.away_team_id = p_away.team_id AND p_away.feature_set_id = 'PROCESS_V1' AND p_away.horizon_type = 'FULL_HISTORICAL'
-        WHERE f.status_short = 'FT'
-        AND f.score_fulltime_home IS NOT NULL
-        ORDER BY f.date ASC
-    """
-    
-    cur = conn.cursor()
-    cur.execute(query)
-    fixtures = [row[0] for row in cur.fetchall()]
-    cur.close()
-    conn.close()
-    
+    fixtures = fetch_eligible_fixtures()
     total = len(fixtures)
-    print(f"Found {total} eligible matches. Starting backfill...")
-    
+    start_index = 0 if reset else resume_position(fixtures, read_progress())
+    remaining = fixtures[start_index:]
+    chunks = [remaining[offset:offset + chunk_size] for offset in range(0, len(remaining), chunk_size)]
+    print(
+        f"Found {total} eligible matches, {len(remaining)} left to score "
+        f"in {len(chunks)} chunks of {chunk_size} on {workers} workers."
+    )
+
     start_time = time.time()
+    done = 0
     success_count = 0
     fail_count = 0
-    
-    for i, fixture_id in enumerate(fixtures):
+    latencies = {}
+    finished = set()
+    failed = set()
+    next_checkpoint = 0
+    checkpoint_fixture = fixtures[start_index - 1] if start_index else None
+    payload = {}
+
+    def record(chunk_index, summary):
+        nonlocal done, success_count, fail_count
+        finished.add(chunk_index)
+        failed.discard(chunk_index)
+        done += len(chunks[chunk_index])
+        success_count += summary["success"]
+        fail_count += summary["failed"]
+        for model_type, values in summary["latencies_ms"].items():
+            latencies.setdefault(model_type, []).extend(values)
+
+    def report(status):
+        nonlocal next_checkpoint, checkpoint_fixture, payload
+        # Chunks complete out of order; the checkpoint only advances over a contiguous
+        # prefix of succeeded chunks, so a failed chunk is scored again on resume.
+        while next_checkpoint in finished:
+            finished.discard(next_checkpoint)
+            checkpoint_fixture = chunks[next_checkpoint][-1]
+            next_checkpoint += 1
+        elapsed = time.time() - start_time
+        rate = done / elapsed if elapsed > 0 else 0.0
+        eta = (len(remaining) - done) / rate if rate > 0 else None
+        percentiles = latency_percentiles(latencies)
+        payload = {
+            "status": status,
+            "last_fixture_id": checkpoint_fixture,
+            "completed_chunks": next_checkpoint,
+            "failed_chunks": sorted(failed),
+            "processed_fixtures": start_index + done,
+            "total_fixtures": total,
+            "success": success_count,
+            "failed": fail_count,
+            "fixtures_per_second": round(rate, 2),
+            "eta_seconds": round(eta) if eta is not None else None,
+            "latency_ms": percentiles,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+        write_progress(payload)
+        latency_text = " | ".join(
+            f"{model_type} p50={values['p50']}ms p95={values['p95']}ms" for model_type, values in percentiles.items()
+        )
+        print(
+            f"Progress: {start_index + done}/{total} ({(start_index + done) / max(total, 1) * 100:.1f}%) "
+            f"| Success: {success_count} | Fails: {fail_count} | Rate: {rate:.1f} fixtures/s "
+            f"| ETA: {format_eta(eta)}"
+        )
+        if latency_text:
+            print(f"   Latency: {latency_text}")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+        next_chunk = 0
+        broken = False
+        while (next_chunk < len(chunks) and not broken) or pending:
+            while next_chunk < len(chunks) and not broken and len(pending) < workers * 2:
+                try:
+                    pending[pool.submit(score_chunk, chunks[next_chunk])] = next_chunk
+                except BrokenProcessPool:
+                    broken = True
+                    break
+                next_chunk += 1
+            if not pending:
+                break
+
+            completed, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in completed:
+                chunk_index = pending.pop(future)
+                try:
+                    record(chunk_index, future.result())
+                except Exception as exc:
+                    print(f"❌ Chunk {chunk_index} failed: {exc}")
+                    failed.add(chunk_index)
+                    broken = broken or isinstance(exc, BrokenProcessPool)
+            report("running")
+
+    # Chunks that raised (or were lost with a crashed pool) get one retry in this process
+    # before giving up; chunks never submitted after a crash are left for the next run.
+    for chunk_index in sorted(failed):
+        print(f"🔁 Retrying chunk {chunk_index}...")
         try:
-            res = generate_master_prediction(fixture_id)
-            if res["success"]:
-                success_count += 1
-            else:
-                fail_count += 1
-                
-        except Exception as e:
-            fail_count += 1
-            
-        if (i + 1) % 500 == 0 or (i + 1) == total:
-            elapsed = time.time() - start_time
-            rate = (i + 1) / elapsed
-            print(f"Progress: {i + 1}/{total} ({(i + 1)/total*100:.1f}%) | Success: {success_count} | Fails: {fail_count} | Rate: {rate:.1f} req/s")
-            
+            record(chunk_index, score_chunk(chunks[chunk_index]))
+        except Exception as exc:
+            print(f"❌ Chunk {chunk_index} failed again: {exc}")
+    unscored = len(chunks) - next_checkpoint - len(finished)
+    report("completed" if not unscored else "incomplete")
+
     total_time = time.time() - start_time
-    print(f"\n✅ Backfill complete in {total_time:.1f}s.")
+    write_progress({
+        **payload,
+        "elapsed_seconds": round(total_time, 2),
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+    })
+    if unscored:
+        print(f"\n⚠️ Backfill stopped after {total_time:.1f}s with {unscored} chunks unscored; rerun to resume.")
+    else:
+        print(f"\n✅ Backfill complete in {total_time:.1f}s.")
     print(f"Successfully processed {success_count} matches.")
     print(f"Failed to process {fail_count} matches.")
 
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill master predictions for historical fixtures.")
+    parser.add_argument("--chunk-size", type=int, default=200, help="Fixtures scored per worker task.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument("--reset", action="store_true", help="Ignore the checkpoint and start from the first fixture.")
+    args = parser.parse_args()
+    run_backfill(chunk_size=args.chunk_size, workers=args.workers, reset=args.reset)
+
+
 if __name__ == "__main__":
-    run_backfill()
+    main()
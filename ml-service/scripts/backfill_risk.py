@@ -5,7 +5,9 @@ import time
 
 # Ensure we can import src
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from src.risk.engine import extract_and_save_fair_odds
+from src.risk.engine import recompute_risk_analysis
+
+BATCH_SIZE = 5000
 
 
 def run_risk_backfill():
@@ -23,15 +25,22 @@ def run_risk_backfill():
     print(f"Found {total} fixtures to process for Risk Analysis. Starting backfill...")
     
     start_time = time.time()
-    
-    for i, fixture_id in enumerate(fixtures):
-        extract_and_save_fair_odds(fixture_id)
-            
-        if (i + 1) % 1000 == 0 or (i + 1) == total:
+    upserted = 0
+
+    # Set-based mode: one INSERT ... SELECT per batch of fixtures
+    conn = get_connection()
+    try:
+        for offset in range(0, total, BATCH_SIZE):
+            batch = fixtures[offset:offset + BATCH_SIZE]
+            upserted += recompute_risk_analysis(batch, conn=conn)
+
+            done = offset + len(batch)
             elapsed = time.time() - start_time
-            rate = (i + 1) / elapsed
-            print(f"Progress: {i + 1}/{total} ({(i + 1)/total*100:.1f}%) | Rate: {rate:.1f} req/s")
-            
+            rate = done / elapsed if elapsed > 0 else 0.0
+            print(f"Progress: {done}/{total} ({done/total*100:.1f}%) | Rows: {upserted} | Rate: {rate:.1f} fixtures/s")
+    finally:
+        conn.close()
+
     total_time = time.time() - start_time
     print(f"\n✅ Risk Analysis backfill complete in {total_time:.1f}s.")
 
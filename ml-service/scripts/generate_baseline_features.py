@@ -1,18 +1,29 @@
+import argparse
 import psycopg2
-from db_config import get_connection
 import pandas as pd
 import numpy as np
 import json
 import os
+import sys
 import time
 from datetime import datetime
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from db_config import get_connection
+from frame_utils import compact_frame, log_memory
+from horizon_utils import feature_storage_horizon
+from player_performance import ROLLING_WINDOW, update_player_rolling_perf
 
 # Database path
 
 def get_db_connection():
     return get_connection()
 
-def run_baseline_features_optimized():
+def run_baseline_features_optimized(incremental=False):
     print("🚀 Starting Optimized BASELINE_V1 Feature Generation...")
     start_time = time.time()
     
@@ -27,32 +38,13 @@ def run_baseline_features_optimized():
         ORDER BY date ASC
     """, conn)
     fixtures_df['date'] = pd.to_datetime(fixtures_df['date'])
+    compact_frame(fixtures_df)
 
-    # 2. Pre-calculate Player Performance Scores (Rolling 20)
-    print("   📊 Pre-calculating Player Performance Scores (Rolling 20)...")
-    # Join stats with fixtures to get dates for proper ordering
-    player_stats_raw = pd.read_sql_query("""
-        SELECT fps.player_id, fps.fixture_id, f.date,
-               (2.0 * COALESCE(fps.goals_total, 0)) + 
-               (1.5 * COALESCE(fps.goals_assists, 0)) + 
-               (0.05 * COALESCE(fps.passes_key, 0)) + 
-               (0.03 * COALESCE(fps.duels_won, 0)) + 
-               (0.04 * COALESCE(fps.shots_on, 0)) + 
-               (0.02 * COALESCE(fps.tackles_total, 0)) - 
-               (0.5 * COALESCE(fps.cards_yellow, 0)) - 
-               (2.0 * COALESCE(fps.cards_red, 0)) as perf_score
-        FROM V3_Fixture_Player_Stats fps
-        JOIN V3_Fixtures f ON fps.fixture_id = f.fixture_id
-        ORDER BY fps.player_id, f.date ASC
-    """, conn)
-    
-    # Calculate rolling average using pandas (faster than complex SQL for this volume)
-    player_stats_raw['rolling_perf_avg'] = player_stats_raw.groupby('player_id')['perf_score'].transform(
-        lambda x: x.shift().rolling(20, min_periods=1).mean()
-    )
-    
-    # Keep only the result we need for merging
-    player_perf_lookup = player_stats_raw[['player_id', 'fixture_id', 'rolling_perf_avg']]
+    # 2. Player Performance Scores (Rolling 20), streamed into V3_Player_Rolling_Perf
+    mode = "incremental" if incremental else "full"
+    print(f"   📊 Updating Player Performance Scores (Rolling {ROLLING_WINDOW}, {mode})...")
+    written = update_player_rolling_perf(conn, incremental=incremental)
+    print(f"      ✅ {written} player rolling-performance rows written.")
 
     # 3. Pre-calculate Seasonal Player Scores (Fallback)
     print("   📑 Pre-calculating Seasonal Player Scores...")
@@ -68,17 +60,17 @@ def run_baseline_features_optimized():
                 (2.0 * COALESCE(cards_red, 0))) / GREATEST(1, COALESCE(games_appearences, 1)) as seasonal_avg_score
         FROM V3_Player_Stats
     """, conn)
+    compact_frame(seasonal_stats)
     
     # 4. Load Starters and Merge with Scores
     print("   🏃 Loading Starters and Merging Scores...")
-    starters_df = pd.read_sql_query("""
-        SELECT fixture_id, team_id, player_id
-        FROM V3_Fixture_Lineup_Players
-        WHERE is_starting = 1
+    starters_with_scores = pd.read_sql_query("""
+        SELECT lp.fixture_id, lp.team_id, lp.player_id, rp.rolling_perf_avg
+        FROM V3_Fixture_Lineup_Players lp
+        LEFT JOIN V3_Player_Rolling_Perf rp ON rp.player_id = lp.player_id AND rp.fixture_id = lp.fixture_id
+        WHERE lp.is_starting = 1
     """, conn)
-    
-    # Merge with per-match rolling average
-    starters_with_scores = starters_df.merge(player_perf_lookup, on=['fixture_id', 'player_id'], how='left')
+    compact_frame(starters_with_scores)
     
     # Merge with fixtures to get season for fallback
     starters_with_scores = starters_with_scores.merge(fixtures_df[['fixture_id', 'season_year']], on='fixture_id', how='left')
@@ -102,6 +94,8 @@ def run_baseline_features_optimized():
         missing_stats_count=('final_player_score', lambda x: x.isna().sum())
     ).reset_index()
     lineup_strength['lineup_strength_v1'] = lineup_strength['lineup_strength_v1'].fillna(0)
+    log_memory("lineup strength", starters=starters_with_scores, seasonal=seasonal_stats, lineup_strength=lineup_strength)
+    del starters_with_scores, seasonal_stats
 
     # 4b. Load Reconstructed Standings from V3_ML_Standings
     print("   📊 Loading Reconstructed Standings from V3_ML_Standings...")
@@ -120,15 +114,11 @@ def run_baseline_features_optimized():
     print("   🏗️ Assembling Final Features Table...")
     
     # Create Home and Away entries
-    home_fixtures = fixtures_df.copy()
-    home_fixtures['team_id'] = home_fixtures['home_team_id']
-    home_fixtures['is_home'] = 1
-    
-    away_fixtures = fixtures_df.copy()
-    away_fixtures['team_id'] = away_fixtures['away_team_id']
-    away_fixtures['is_home'] = 0
+    home_fixtures = fixtures_df.assign(team_id=fixtures_df['home_team_id'], is_home=np.int8(1))
+    away_fixtures = fixtures_df.assign(team_id=fixtures_df['away_team_id'], is_home=np.int8(0))
     
     all_team_fixtures = pd.concat([home_fixtures, away_fixtures]).sort_values(['team_id', 'league_id', 'date']).reset_index(drop=True)
+    del home_fixtures, away_fixtures
     all_team_fixtures['date'] = pd.to_datetime(all_team_fixtures['date'], utc=True)
     all_team_fixtures = all_team_fixtures.dropna(subset=['team_id', 'league_id', 'date'])
     
@@ -152,9 +142,9 @@ def run_baseline_features_optimized():
     for df in [all_team_fixtures, elo_df, standings_df]:
         for col in ['team_id', 'league_id']:
             if col in df.columns:
-                df[col] = df[col].astype('int64')
-    all_team_fixtures['season_year'] = all_team_fixtures['season_year'].astype('int64')
-    standings_df['season_year'] = standings_df['season_year'].astype('int64')
+                df[col] = df[col].astype('int32')
+    all_team_fixtures['season_year'] = all_team_fixtures['season_year'].astype('int32')
+    standings_df['season_year'] = standings_df['season_year'].astype('int32')
 
     # Use a loop-based merge if standard merge_asof fails
     try:
@@ -209,12 +199,14 @@ def run_baseline_features_optimized():
     
     # Merge with Lineup Strength
     all_team_fixtures = all_team_fixtures.merge(lineup_strength, on=['fixture_id', 'team_id'], how='left')
+    log_memory("features assembled", all_team_fixtures=all_team_fixtures)
     
     # 7. Bulk Save
     print("   💾 Saving Optimized Features to DB...")
     
     upsert_data = []
-    horizons = ['FULL_HISTORICAL', '5Y_ROLLING', '3Y_ROLLING']
+    # Horizon-independent: one row per team-fixture, resolved for every horizon by readers.
+    storage_horizon = feature_storage_horizon('BASELINE_V1', 'FULL_HISTORICAL')
     
     for _, row in all_team_fixtures.iterrows():
         vector = {
@@ -227,24 +219,23 @@ def run_baseline_features_optimized():
             "missing_starters_count": int(row['missing_stats_count']) if not pd.isna(row['missing_stats_count']) else 11
         }
         
-        for h in horizons:
-            upsert_data.append((
-                int(row['fixture_id']),
-                int(row['team_id']),
-                int(row['league_id']),
-                int(row['season_year']),
-                'BASELINE_V1',
-                h,
-                row['date'].isoformat(),
-                json.dumps(vector)
-            ))
+        upsert_data.append((
+            int(row['fixture_id']),
+            int(row['team_id']),
+            int(row['league_id']),
+            int(row['season_year']),
+            'BASELINE_V1',
+            storage_horizon,
+            row['date'].isoformat(),
+            json.dumps(vector)
+        ))
 
     sql = """
         INSERT INTO V3_Team_Features_PreMatch (
             fixture_id, team_id, league_id, season_year,
             feature_set_id, horizon_type, as_of, features_json
         ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        ON CONFLICT(fixture_id, team_id, feature_set_id, horizon_type) DO UPDATE SET
+        ON CONFLICT(fixture_id, team_id, feature_set_id, horizon_type, season_year) DO UPDATE SET
             features_json = excluded.features_json,
             as_of = excluded.as_of,
             calculated_at = CURRENT_TIMESTAMP
@@ -261,7 +252,13 @@ def run_baseline_features_optimized():
 
     conn.close()
     elapsed = time.time() - start_time
-    print(f"✅ Optimized BASELINE_V1 Pipeline Complete. Processed {len(all_team_fixtures)*3} records in {round(elapsed, 2)} seconds.")
+    print(f"✅ Optimized BASELINE_V1 Pipeline Complete. Processed {len(upsert_data)} records in {round(elapsed, 2)} seconds.")
 
 if __name__ == "__main__":
-    run_baseline_features_optimized()
+    parser = argparse.ArgumentParser(description="Generate BASELINE_V1 team features.")
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Only compute player rolling performance for fixtures not processed yet.",
+    )
+    args = parser.parse_args()
+    run_baseline_features_optimized(incremental=args.incremental)
@@ -13,6 +13,8 @@ if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
 from db_config import get_connection
+from frame_utils import compact_frame, log_memory
+from horizon_utils import feature_storage_horizon
 
 # Database path
 
@@ -34,6 +36,7 @@ def run_process_features():
         ORDER BY date ASC
     """, conn)
     fixtures_df['date'] = pd.to_datetime(fixtures_df['date'])
+    compact_frame(fixtures_df)
     
     # 2. Load Stats (FT and 1H)
     print("   📊 Loading Fixture Stats...")
@@ -45,17 +48,19 @@ def run_process_features():
         FROM V3_Fixture_Stats
         WHERE half IN ('FT', '1H')
     """, conn)
+    # The metric columns keep float64, so the rolling averages written below are the ones computed before.
+    compact_frame(stats_df, categories=('half',))
+    log_memory("sources loaded", fixtures=fixtures_df, stats=stats_df)
     
     # 3. Prepare Long Format
-    home = fixtures_df[['fixture_id', 'date', 'league_id', 'season_year', 'home_team_id']].copy()
-    home.columns = ['fixture_id', 'date', 'league_id', 'season_year', 'team_id']
-    home['is_home'] = 1
-    
-    away = fixtures_df[['fixture_id', 'date', 'league_id', 'season_year', 'away_team_id']].copy()
-    away.columns = ['fixture_id', 'date', 'league_id', 'season_year', 'team_id']
-    away['is_home'] = 0
-    
-    team_games = pd.concat([home, away]).sort_values(['team_id', 'date'])
+    long_columns = ['fixture_id', 'date', 'league_id', 'season_year', 'team_id']
+    home = fixtures_df[['fixture_id', 'date', 'league_id', 'season_year', 'home_team_id']]
+    away = fixtures_df[['fixture_id', 'date', 'league_id', 'season_year', 'away_team_id']]
+    team_games = pd.concat([
+        home.set_axis(long_columns, axis=1).assign(is_home=np.int8(1)),
+        away.set_axis(long_columns, axis=1).assign(is_home=np.int8(0)),
+    ]).sort_values(['team_id', 'date'])
+    del fixtures_df, home, away
     
     # Merge with FT stats
     ft_stats = stats_df[stats_df['half'] == 'FT'].drop(columns=['half'])
@@ -64,6 +69,7 @@ def run_process_features():
     # Merge with 1H stats (prefixed)
     h1_stats = stats_df[stats_df['half'] == '1H'].drop(columns=['half'])
     team_games = team_games.merge(h1_stats, on=['fixture_id', 'team_id'], how='left', suffixes=('', '_1h'))
+    del stats_df, ft_stats, h1_stats
 
     # 4. Rolling Calculations
     print("   📈 Calculating Rolling Averages...")
@@ -102,6 +108,7 @@ def run_process_features():
         (team_games['pass_acc_rate_5'] * 100 * 0.3) + \
         ((team_games['shots_on_goal_avg_5'] / 5 * 100) * 0.3)
     ) / 10 # Scale to roughly 0-10
+    log_memory("rolling features", team_games=team_games)
 
     # 5. Horizon Filtering (Simplified as we store everything in one go, 
     # but the rolling logic automatically respects historical boundaries).
@@ -113,6 +120,7 @@ def run_process_features():
     print("   💾 Saving Features to V3_Team_Features_PreMatch...")
     
     upsert_data = []
+    storage_horizon = feature_storage_horizon('PROCESS_V1', 'FULL_HISTORICAL')
     
     # Convert to JSON and prepare for bulk insert
     for _, row in team_games.iterrows():
@@ -140,25 +148,24 @@ def run_process_features():
             "sot_rate_1h5": round(row['sot_rate_1h5'], 3)
         }
         
-        # We store for horizons (simplification: same value but tagged)
-        for horizon in ['FULL_HISTORICAL', '5Y_ROLLING', '3Y_ROLLING']:
-            upsert_data.append((
-                int(row['fixture_id']),
-                int(row['team_id']),
-                int(row['league_id']),
-                int(row['season_year']),
-                'PROCESS_V1',
-                horizon,
-                row['date'].isoformat(),
-                json.dumps(vector)
-            ))
+        # Same vector for every horizon: stored once and resolved per horizon by readers.
+        upsert_data.append((
+            int(row['fixture_id']),
+            int(row['team_id']),
+            int(row['league_id']),
+            int(row['season_year']),
+            'PROCESS_V1',
+            storage_horizon,
+            row['date'].isoformat(),
+            json.dumps(vector)
+        ))
 
     sql = """
         INSERT INTO V3_Team_Features_PreMatch (
             fixture_id, team_id, league_id, season_year,
             feature_set_id, horizon_type, as_of, features_json
         ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        ON CONFLICT(fixture_id, team_id, feature_set_id, horizon_type) DO UPDATE SET
+        ON CONFLICT(fixture_id, team_id, feature_set_id, horizon_type, season_year) DO UPDATE SET
             features_json = excluded.features_json,
             as_of = excluded.as_of,
             calculated_at = CURRENT_TIMESTAMP
@@ -0,0 +1,722 @@
+"""
+Synthetic StatFoot data for benchmarks and load tests.
+
+Creates the V3 schema (backend/sql/schema/V3_Baseline.sql plus the ML tables
+the service reads) in a disposable Postgres database and fills it with
+leagues, teams, players, double round-robin fixtures with scores, xG, fixture
+stats and lineups, player season ratings, Elo ratings, BASELINE_V1 /
+PROCESS_V1 team features and V3_ML_Feature_Store vectors. Team strengths
+drive goals, shots, corners and cards so the generated rows have realistic
+distributions and correlations. ``--models-dir`` also trains tiny CatBoost
+models on the feature schema and registers them, so every inference path can
+run without production artifacts.
+
+``--fixtures`` sizes the dataset by fixture count (10k to 2M) instead of
+``--leagues``: leagues are added until the target is reached. Rows are
+generated one league-season at a time and streamed with COPY, so memory stays
+flat regardless of scale; ``--workers`` generates leagues in parallel
+processes (each league has its own seed, so the data is the same either way).
+
+The target database is taken from DATABASE_URL. Because the public schema is
+dropped and rebuilt on every run, the script refuses to run against a
+database whose name does not contain "bench", "synthetic" or "test" unless
+--force.
+"""
+
+import argparse
+import csv
+import io
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from psycopg2.extras import execute_values
+
+from db_config import get_connection
+from feature_schema import GLOBAL_1X2_FEATURE_COLUMNS
+from feature_store_layout import apply_feature_store_layout
+from fixture_stats_wide import create_fixture_stats_wide
+from lineup_quality import create_lineup_quality_functions
+
+BASELINE_SCHEMA_PATH = ROOT_DIR.parent / "backend" / "sql" / "schema" / "V3_Baseline.sql"
+DISPOSABLE_MARKERS = ("bench", "synthetic", "test")
+FIXTURE_ID_OFFSET = 1_000_000
+BATCH_SIZE = 5000
+
+CITIES = [
+    "London", "Madrid", "Barcelona", "Paris", "Marseille", "Manchester", "Liverpool", "Milan", "Turin",
+    "Munich", "Dortmund", "Glasgow", "Lisbon", "Porto", "Amsterdam", "Istanbul", "Rome",
+    "Lyon", "Seville", "Valencia", "Naples", "Hamburg", "Berlin", "Rotterdam", "Brussels",
+]
+POSITIONS = ["G", "D", "D", "D", "D", "M", "M", "M", "F", "F", "F"]
+ROUND_TEMPLATE = "Regular Season - {}"
+
+# ML tables created by backend migrations (and V3_ML_Feature_Store, created outside them), before the
+# feature table layout of feature_store_layout.py is applied.
+ML_SCHEMA = [
+    "ALTER TABLE V3_Fixtures ADD COLUMN IF NOT EXISTS xg_home REAL",
+    "ALTER TABLE V3_Fixtures ADD COLUMN IF NOT EXISTS xg_away REAL",
+    "ALTER TABLE V3_Fixture_Stats ADD COLUMN IF NOT EXISTS ball_possession_pct INTEGER",
+    """CREATE TABLE IF NOT EXISTS V3_Fixture_Lineups (
+        id SERIAL PRIMARY KEY,
+        fixture_id INTEGER NOT NULL,
+        team_id INTEGER NOT NULL,
+        coach_id INTEGER,
+        coach_name TEXT,
+        formation TEXT,
+        starting_xi TEXT,
+        substitutes TEXT,
+        created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(fixture_id, team_id)
+    )""",
+    """CREATE TABLE IF NOT EXISTS V3_Fixture_Lineup_Players (
+        fixture_id INTEGER NOT NULL,
+        team_id INTEGER NOT NULL,
+        player_id INTEGER NOT NULL,
+        is_starting INTEGER NOT NULL DEFAULT 0,
+        shirt_number INTEGER,
+        player_name TEXT,
+        position TEXT,
+        grid TEXT,
+        sub_in_minute INTEGER,
+        sub_out_minute INTEGER,
+        PRIMARY KEY (fixture_id, team_id, player_id)
+    )""",
+    """CREATE TABLE IF NOT EXISTS V3_Team_Ratings (
+        id SERIAL PRIMARY KEY,
+        team_id INTEGER NOT NULL,
+        league_id INTEGER,
+        season_year INTEGER,
+        elo_score REAL,
+        date TIMESTAMPTZ,
+        fixture_id INTEGER
+    )""",
+    """CREATE TABLE IF NOT EXISTS V3_Feature_Snapshots (
+        id SERIAL PRIMARY KEY,
+        fixture_id INTEGER NOT NULL,
+        team_id INTEGER NOT NULL,
+        feature_type TEXT NOT NULL,
+        feature_data JSON NOT NULL,
+        snapshot_timestamp TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(fixture_id, team_id, feature_type)
+    )""",
+    """CREATE TABLE IF NOT EXISTS V3_Team_Features_PreMatch (
+        fixture_id INTEGER NOT NULL,
+        team_id INTEGER NOT NULL,
+        league_id INTEGER NOT NULL,
+        season_year INTEGER NOT NULL,
+        feature_set_id TEXT NOT NULL,
+        horizon_type TEXT NOT NULL,
+        as_of TIMESTAMPTZ NOT NULL,
+        features_json TEXT NOT NULL,
+        calculated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (fixture_id, team_id, feature_set_id, horizon_type)
+    )""",
+    """CREATE TABLE IF NOT EXISTS V3_ML_Feature_Store (
+        fixture_id INTEGER NOT NULL,
+        league_id INTEGER,
+        feature_vector TEXT NOT NULL,
+        calculated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_v3_ml_feature_store_fixture ON V3_ML_Feature_Store(fixture_id)",
+    """CREATE TABLE IF NOT EXISTS V3_Submodel_Outputs (
+        fixture_id INTEGER NOT NULL,
+        team_id INTEGER NOT NULL,
+        model_type TEXT NOT NULL,
+        prediction_json TEXT NOT NULL,
+        calculated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (fixture_id, team_id, model_type)
+    )""",
+    """CREATE TABLE IF NOT EXISTS V3_Model_Registry (
+        id SERIAL PRIMARY KEY,
+        name TEXT NOT NULL,
+        version TEXT NOT NULL,
+        type TEXT NOT NULL,
+        path TEXT,
+        is_active INTEGER DEFAULT 0,
+        metadata_json TEXT,
+        created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(name, version)
+    )""",
+    """CREATE TABLE IF NOT EXISTS V3_Risk_Analysis (
+        id SERIAL PRIMARY KEY,
+        fixture_id INTEGER NOT NULL,
+        market_type TEXT NOT NULL,
+        selection TEXT NOT NULL,
+        ml_probability REAL,
+        fair_odd REAL,
+        bookmaker_odd REAL,
+        edge REAL,
+        analyzed_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(fixture_id, market_type, selection)
+    )""",
+    """CREATE TABLE IF NOT EXISTS V3_Forge_Simulations (
+        id SERIAL PRIMARY KEY,
+        league_id INTEGER NOT NULL,
+        season_year INTEGER NOT NULL,
+        model_id INTEGER,
+        status TEXT DEFAULT 'PENDING',
+        current_month TEXT,
+        total_months INTEGER,
+        completed_months INTEGER DEFAULT 0,
+        summary_metrics_json TEXT,
+        created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+        horizon_type TEXT,
+        stage TEXT,
+        last_heartbeat TIMESTAMPTZ,
+        error_log TEXT
+    )""",
+    """CREATE TABLE IF NOT EXISTS V3_Forge_Results (
+        id SERIAL PRIMARY KEY,
+        simulation_id INTEGER NOT NULL REFERENCES V3_Forge_Simulations(id) ON DELETE CASCADE,
+        fixture_id INTEGER NOT NULL,
+        market_type TEXT NOT NULL DEFAULT 'FT_1X2',
+        market_label TEXT,
+        model_version TEXT,
+        prob_home DOUBLE PRECISION,
+        prob_draw DOUBLE PRECISION,
+        prob_away DOUBLE PRECISION,
+        predicted_score TEXT,
+        actual_winner INTEGER,
+        is_correct INTEGER,
+        edge_value DOUBLE PRECISION,
+        retrieved_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+        predicted_outcome TEXT,
+        alternate_outcome TEXT,
+        actual_result TEXT,
+        primary_probability DOUBLE PRECISION,
+        alternate_probability DOUBLE PRECISION,
+        actual_numeric_value DOUBLE PRECISION,
+        expected_total DOUBLE PRECISION
+    )""",
+    """CREATE TABLE IF NOT EXISTS V3_Prediction_Cache (
+        fixture_id INTEGER PRIMARY KEY,
+        cache_key TEXT NOT NULL,
+        result_json TEXT NOT NULL,
+        created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+    )""",
+    """CREATE TABLE IF NOT EXISTS V3_ML_Jobs (
+        id SERIAL PRIMARY KEY,
+        job_type TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'QUEUED',
+        stage TEXT,
+        owner TEXT,
+        pid INTEGER,
+        cancel_requested BOOLEAN NOT NULL DEFAULT FALSE,
+        exit_code INTEGER,
+        error TEXT,
+        log_path TEXT,
+        created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+        started_at TIMESTAMPTZ,
+        finished_at TIMESTAMPTZ,
+        heartbeat_at TIMESTAMPTZ
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_ml_jobs_status_type ON V3_ML_Jobs(status, job_type)",
+    "CREATE INDEX IF NOT EXISTS idx_ml_jobs_type_id ON V3_ML_Jobs(job_type, id DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_ml_features_prematch_team ON V3_Team_Features_PreMatch(team_id)",
+]
+
+
+def check_disposable(conn, force=False):
+    cur = conn.cursor()
+    cur.execute("SELECT current_database()")
+    name = cur.fetchone()[0]
+    cur.close()
+    if not force and not any(marker in name.lower() for marker in DISPOSABLE_MARKERS):
+        raise SystemExit(
+            f"Refusing to write synthetic data into database '{name}'. "
+            f"Use a database whose name contains one of {DISPOSABLE_MARKERS} or pass --force."
+        )
+    return name
+
+
+def create_schema(conn):
+    """Rebuild the public schema from scratch (the database is disposable)."""
+    cur = conn.cursor()
+    cur.execute("DROP SCHEMA public CASCADE; CREATE SCHEMA public;")
+    cur.execute(BASELINE_SCHEMA_PATH.read_text())
+    for statement in ML_SCHEMA:
+        cur.execute(statement)
+    conn.commit()
+    cur.close()
+    # Maintained by its triggers while the stats are loaded, as in the migrated database.
+    create_fixture_stats_wide(conn, backfill=False)
+    create_lineup_quality_functions(conn)
+
+
+def insert_rows(cur, table, columns, rows, batch_size=BATCH_SIZE):
+    if not rows:
+        return 0
+    query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s"
+    for offset in range(0, len(rows), batch_size):
+        execute_values(cur, query, rows[offset:offset + batch_size], page_size=batch_size)
+    return len(rows)
+
+
+def copy_rows(cur, table, columns, rows):
+    """Stream rows into ``table`` with COPY (CSV; ``None`` becomes NULL)."""
+    if not rows:
+        return 0
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    return len(rows)
+
+
+def leagues_for_fixtures(fixtures, teams_per_league, seasons):
+    """Leagues needed to generate at least ``fixtures`` fixtures."""
+    per_league = teams_per_league * (teams_per_league - 1) * seasons
+    return max(1, math.ceil(fixtures / per_league))
+
+
+def round_robin(team_ids):
+    """Double round-robin pairings (circle method): list of rounds of (home, away)."""
+    teams = list(team_ids)
+    if len(teams) % 2:
+        teams.append(None)
+    half = len(teams) // 2
+    rounds = []
+    for round_index in range(len(teams) - 1):
+        pairs = []
+        for i in range(half):
+            home, away = teams[i], teams[-1 - i]
+            if home is not None and away is not None:
+                pairs.append((home, away) if round_index % 2 == 0 else (away, home))
+        rounds.append(pairs)
+        teams = [teams[0], teams[-1]] + teams[1:-1]
+    return rounds + [[(away, home) for home, away in pairs] for pairs in rounds]
+
+
+class SyntheticLeagueData:
+    """Generates one league's teams and seasons; team state carries over between seasons."""
+
+    def __init__(self, rng, league_id, country_id, teams_per_league, team_id_start, player_id_start):
+        self.rng = rng
+        self.league_id = league_id
+        self.country_id = country_id
+        self.team_ids = list(range(team_id_start, team_id_start + teams_per_league))
+        self.attack = {team_id: rng.normal(0.0, 0.25) for team_id in self.team_ids}
+        self.defence = {team_id: rng.normal(0.0, 0.2) for team_id in self.team_ids}
+        self.elo = {team_id: 1500.0 + 400.0 * (self.attack[team_id] - self.defence[team_id]) for team_id in self.team_ids}
+        self.squads = {}
+        next_player = player_id_start
+        for team_id in self.team_ids:
+            self.squads[team_id] = list(range(next_player, next_player + 25))
+            next_player += 25
+        self.player_rating = {
+            player_id: float(np.clip(rng.normal(6.7 + self.attack[team_id], 0.35), 5.5, 8.5))
+            for team_id, squad in self.squads.items()
+            for player_id in squad
+        }
+        self.recent = {team_id: [] for team_id in self.team_ids}
+
+    def reference_rows(self, city_offset):
+        venues, teams, players = [], [], []
+        for index, team_id in enumerate(self.team_ids):
+            city = CITIES[(city_offset + index // 2) % len(CITIES)]
+            venues.append((team_id, team_id, f"Stadium {team_id}", city, int(self.rng.integers(15000, 80000))))
+            teams.append((team_id, team_id, f"Team {team_id}", "Synthetic", team_id, round(self.elo[team_id], 1)))
+            for number, player_id in enumerate(self.squads[team_id], start=1):
+                position = POSITIONS[(number - 1) % len(POSITIONS)]
+                players.append((player_id, player_id, f"Player {player_id}", position, round(self.player_rating[player_id], 2)))
+        return venues, teams, players
+
+    def _team_form(self, team_id):
+        recent = self.recent[team_id][-5:]
+        if not recent:
+            return None
+        return {key: sum(game[key] for game in recent) / len(recent) for key in recent[0]}
+
+    def _process_features(self, team_id):
+        form = self._team_form(team_id)
+        if form is None:
+            return None
+        shots = form["shots"]
+        return {
+            "sot_per_match_5": round(form["sot"], 3),
+            "shots_per_match_5": round(shots, 3),
+            "corners_per_match_5": round(form["corners"], 3),
+            "fouls_per_match_5": round(form["fouls"], 3),
+            "yellow_per_match_5": round(form["yellow"], 3),
+            "red_per_match_5": round(form["red"], 3),
+            "possession_avg_5": round(form["possession"], 2),
+            "pass_acc_rate_5": round(form["pass_acc"], 3),
+            "sot_rate_5": round(form["sot"] / shots, 3) if shots else 0.0,
+            "control_index_5": round(form["possession"] * form["pass_acc"], 2),
+            "sot_per_match_10": round(form["sot"], 3),
+            "corners_per_match_10": round(form["corners"], 3),
+            "sot_rate_10": round(form["sot"] / shots, 3) if shots else 0.0,
+            "sot_per_match_1h5": round(form["sot"] * 0.45, 3),
+            "shots_per_match_1h5": round(shots * 0.45, 3),
+            "corners_per_match_1h5": round(form["corners"] * 0.45, 3),
+            "sot_rate_1h5": round(form["sot"] / shots, 3) if shots else 0.0,
+        }
+
+    def _team_stats(self, fixture_id, team_id, goals, xg, possession):
+        rng = self.rng
+        shots = int(rng.poisson(6 + 5 * xg))
+        sot = min(shots, goals + int(rng.binomial(max(shots - goals, 0), 0.3)))
+        corners = int(rng.poisson(3.5 + 1.5 * xg))
+        fouls = int(rng.poisson(11.5))
+        yellow = int(rng.poisson(1.9))
+        red = int(rng.random() < 0.05)
+        passes = int(rng.normal(300 + 6 * possession, 40))
+        accurate = int(passes * np.clip(rng.normal(0.72 + possession / 500, 0.04), 0.5, 0.95))
+        rows = []
+        for half, share in (("FT", 1.0), ("1H", 0.45), ("2H", 0.55)):
+            rows.append((
+                fixture_id, team_id, half, int(round(sot * share)), int(round((shots - sot) * share)),
+                int(round(shots * share)), int(round(fouls * share)), int(round(corners * share)),
+                f"{possession}%", possession, int(round(yellow * share)), int(round(red * share)),
+                int(round(passes * share)), int(round(accurate * share)),
+                int(100 * accurate / passes) if passes else 0,
+            ))
+        game = {
+            "shots": shots, "sot": sot, "corners": corners, "fouls": fouls, "yellow": yellow, "red": red,
+            "possession": possession, "pass_acc": accurate / passes if passes else 0.0,
+        }
+        return rows, game
+
+    def _lineup(self, team_id):
+        squad = self.squads[team_id]
+        starters = sorted(self.rng.choice(squad, size=11, replace=False).tolist())
+        xi = [
+            {"player": {"id": int(player_id), "name": f"Player {player_id}", "number": index + 1, "pos": POSITIONS[index]}}
+            for index, player_id in enumerate(starters)
+        ]
+        return xi, float(np.mean([self.player_rating[player_id] for player_id in starters]))
+
+    def season(self, season_year, next_fixture_id, upcoming_share=0.0):
+        """Rows for every table for one season, in insertion order."""
+        rng = self.rng
+        rows = {key: [] for key in (
+            "fixtures", "stats", "lineups", "lineup_players", "ratings", "team_features", "feature_store", "player_stats",
+        )}
+        table = {team_id: {"points": 0, "goals_diff": 0, "played": 0} for team_id in self.team_ids}
+        rounds = round_robin(self.team_ids)
+        first_upcoming_round = int(len(rounds) * (1 - upcoming_share))
+        start = datetime(season_year, 8, 1, 15, 0)
+        fixture_id = next_fixture_id
+
+        for round_index, pairs in enumerate(rounds):
+            kickoff = start + timedelta(days=7 * round_index)
+            ranking = sorted(self.team_ids, key=lambda team: (-table[team]["points"], -table[team]["goals_diff"]))
+            for home, away in pairs:
+                finished = round_index < first_upcoming_round
+                date = kickoff + timedelta(hours=int(rng.integers(0, 6)))
+                xg_home = float(math.exp(0.25 + self.attack[home] - self.defence[away]))
+                xg_away = float(math.exp(0.0 + self.attack[away] - self.defence[home]))
+                team_features = {}
+                for team_id in (home, away):
+                    xi, lineup_strength = self._lineup(team_id)
+                    team_features[team_id] = {
+                        "elo": round(self.elo[team_id], 1),
+                        "rank": ranking.index(team_id) + 1,
+                        "points": table[team_id]["points"],
+                        "goals_diff": table[team_id]["goals_diff"],
+                        "played": table[team_id]["played"],
+                        "lineup_strength_v1": round(lineup_strength, 3),
+                        "missing_starters_count": int(rng.integers(0, 3)),
+                    }
+                    rows["lineups"].append((fixture_id, team_id, "4-3-3", json.dumps(xi), json.dumps([])))
+                    rows["lineup_players"].extend(
+                        (fixture_id, team_id, item["player"]["id"], 1, item["player"]["number"],
+                         item["player"]["name"], item["player"]["pos"])
+                        for item in xi
+                    )
+                    rows["team_features"].append((
+                        fixture_id, team_id, self.league_id, season_year, "BASELINE_V1", "FULL_HISTORICAL",
+                        date, json.dumps(team_features[team_id]),
+                    ))
+                    process = self._process_features(team_id)
+                    if process is not None:
+                        rows["team_features"].append((
+                            fixture_id, team_id, self.league_id, season_year, "PROCESS_V1", "FULL_HISTORICAL",
+                            date, json.dumps(process),
+                        ))
+                rows["feature_store"].append((fixture_id, self.league_id, json.dumps(self._feature_vector(home, away, team_features))))
+
+                if finished:
+                    goals_home, goals_away = int(rng.poisson(xg_home)), int(rng.poisson(xg_away))
+                    ht_home = int(rng.binomial(goals_home, 0.45))
+                    ht_away = int(rng.binomial(goals_away, 0.45))
+                    possession = int(np.clip(rng.normal(50 + 25 * (self.attack[home] - self.attack[away]), 6), 25, 75))
+                    for team_id, goals, xg, share in (
+                        (home, goals_home, xg_home, possession), (away, goals_away, xg_away, 100 - possession),
+                    ):
+                        stats, game = self._team_stats(fixture_id, team_id, goals, xg, share)
+                        rows["stats"].extend(stats)
+                        self.recent[team_id].append(game)
+                    self._update_table(table, home, away, goals_home, goals_away)
+                    self._update_elo(home, away, goals_home, goals_away)
+                    for team_id in (home, away):
+                        rows["ratings"].append((team_id, self.league_id, season_year, round(self.elo[team_id], 1), date, fixture_id))
+                    status, score = "FT", (goals_home, goals_away, ht_home, ht_away, goals_home, goals_away)
+                    xg_values = (round(xg_home * rng.uniform(0.8, 1.2), 2), round(xg_away * rng.uniform(0.8, 1.2), 2))
+                else:
+                    status, score, xg_values = "NS", (None,) * 6, (None, None)
+
+                rows["fixtures"].append((
+                    fixture_id, fixture_id + FIXTURE_ID_OFFSET, self.league_id, season_year,
+                    ROUND_TEMPLATE.format(round_index + 1), date, int(date.timestamp()), "UTC", home,
+                    "Match Finished" if status == "FT" else "Not Started", status, home, away, *score, *xg_values,
+                ))
+                fixture_id += 1
+
+        for team_id, squad in self.squads.items():
+            for player_id in squad:
+                rating = self.player_rating[player_id] + rng.normal(0, 0.15)
+                rows["player_stats"].append((
+                    player_id, team_id, self.league_id, season_year, int(rng.integers(5, 38)), f"{rating:.6f}",
+                ))
+        return rows, fixture_id
+
+    def _feature_vector(self, home, away, team_features):
+        home_b, away_b = team_features[home], team_features[away]
+        values = dict(zip(GLOBAL_1X2_FEATURE_COLUMNS, self.rng.normal(0, 1, len(GLOBAL_1X2_FEATURE_COLUMNS)).tolist()))
+        values.update({
+            "home_b_elo": home_b["elo"], "away_b_elo": away_b["elo"], "diff_elo": home_b["elo"] - away_b["elo"],
+            "home_b_rank": home_b["rank"], "away_b_rank": away_b["rank"], "diff_rank": away_b["rank"] - home_b["rank"],
+            "home_b_points": home_b["points"], "away_b_points": away_b["points"],
+            "diff_points": home_b["points"] - away_b["points"],
+            "home_b_lineup_strength_v1": home_b["lineup_strength_v1"],
+            "away_b_lineup_strength_v1": away_b["lineup_strength_v1"],
+        })
+        return {column: round(value, 4) for column, value in values.items()}
+
+    @staticmethod
+    def _update_table(table, home, away, goals_home, goals_away):
+        for team_id, scored, conceded in ((home, goals_home, goals_away), (away, goals_away, goals_home)):
+            table[team_id]["played"] += 1
+            table[team_id]["goals_diff"] += scored - conceded
+            table[team_id]["points"] += 3 if scored > conceded else (1 if scored == conceded else 0)
+
+    def _update_elo(self, home, away, goals_home, goals_away, k=20.0):
+        expected = 1.0 / (1.0 + 10 ** ((self.elo[away] - self.elo[home] - 60) / 400))
+        actual = 1.0 if goals_home > goals_away else (0.5 if goals_home == goals_away else 0.0)
+        self.elo[home] += k * (actual - expected)
+        self.elo[away] -= k * (actual - expected)
+
+
+TABLE_COLUMNS = {
+    "fixtures": ("V3_Fixtures", (
+        "fixture_id", "api_id", "league_id", "season_year", "round", "date", "timestamp", "timezone", "venue_id",
+        "status_long", "status_short", "home_team_id", "away_team_id", "goals_home", "goals_away",
+        "score_halftime_home", "score_halftime_away", "score_fulltime_home", "score_fulltime_away",
+        "xg_home", "xg_away",
+    )),
+    "stats": ("V3_Fixture_Stats", (
+        "fixture_id", "team_id", "half", "shots_on_goal", "shots_off_goal", "shots_total", "fouls",
+        "corner_kicks", "ball_possession", "ball_possession_pct", "yellow_cards", "red_cards",
+        "passes_total", "passes_accurate", "pass_accuracy_pct",
+    )),
+    "lineups": ("V3_Fixture_Lineups", ("fixture_id", "team_id", "formation", "starting_xi", "substitutes")),
+    "lineup_players": ("V3_Fixture_Lineup_Players", (
+        "fixture_id", "team_id", "player_id", "is_starting", "shirt_number", "player_name", "position",
+    )),
+    "ratings": ("V3_Team_Ratings", ("team_id", "league_id", "season_year", "elo_score", "date", "fixture_id")),
+    "team_features": ("V3_Team_Features_PreMatch", (
+        "fixture_id", "team_id", "league_id", "season_year", "feature_set_id", "horizon_type", "as_of", "features_json",
+    )),
+    "feature_store": ("V3_ML_Feature_Store", ("fixture_id", "league_id", "feature_vector")),
+    "player_stats": ("V3_Player_Stats", (
+        "player_id", "team_id", "league_id", "season_year", "games_appearences", "games_rating",
+    )),
+}
+
+
+def generate_league(conn, league_index, teams_per_league=10, seasons=2, start_year=2022, upcoming_share=0.1, seed=7):
+    """Generate and COPY one league (reference rows plus every season); returns row counts."""
+    league_id = league_index + 1
+    # Seeded per league so the data does not depend on how leagues are spread over workers.
+    league = SyntheticLeagueData(
+        np.random.default_rng([seed, league_id]), league_id, 1, teams_per_league,
+        team_id_start=league_index * teams_per_league + 1,
+        player_id_start=league_index * teams_per_league * 25 + 1,
+    )
+    cur = conn.cursor()
+    counts = {key: 0 for key in TABLE_COLUMNS}
+    insert_rows(cur, "V3_Leagues", ("league_id", "api_id", "name", "type", "country_id", "importance_rank"),
+                [(league_id, league_id, f"Synthetic League {league_id}", "League", 1, league_id)])
+    venues, teams, players = league.reference_rows(city_offset=league_index * 3)
+    copy_rows(cur, "V3_Venues", ("venue_id", "api_id", "name", "city", "capacity"), venues)
+    copy_rows(cur, "V3_Teams", ("team_id", "api_id", "name", "country", "venue_id", "scout_rank"), teams)
+    copy_rows(cur, "V3_Players", ("player_id", "api_id", "name", "position", "scout_rank"), players)
+
+    next_fixture_id = league_index * teams_per_league * (teams_per_league - 1) * seasons + 1
+    for season_index in range(seasons):
+        is_last = season_index == seasons - 1
+        rows, next_fixture_id = league.season(
+            start_year + season_index, next_fixture_id, upcoming_share=upcoming_share if is_last else 0.0,
+        )
+        for key, (table, columns) in TABLE_COLUMNS.items():
+            counts[key] += copy_rows(cur, table, columns, rows[key])
+        conn.commit()
+    cur.close()
+    return counts
+
+
+def _generate_league_worker(league_index, options):
+    conn = get_connection()
+    try:
+        return generate_league(conn, league_index, **options)
+    finally:
+        conn.close()
+
+
+def generate(conn, leagues=2, teams_per_league=10, seasons=2, start_year=2022, upcoming_share=0.1, seed=7, workers=1,
+             partition_feature_tables=True):
+    """
+    Fill the schema with synthetic data; returns a summary of inserted row counts.
+    The feature tables are then moved to the partitioned layout of the migrated
+    database unless ``partition_feature_tables`` is False.
+    """
+    options = {
+        "teams_per_league": teams_per_league, "seasons": seasons, "start_year": start_year,
+        "upcoming_share": upcoming_share, "seed": seed,
+    }
+    cur = conn.cursor()
+    insert_rows(cur, "V3_Countries", ("country_id", "name", "code", "importance_rank"), [(1, "Synthetia", "SY", 1)])
+    conn.commit()
+
+    counts = {key: 0 for key in TABLE_COLUMNS}
+    report_every = max(1, leagues // 20)
+    started = time.time()
+
+    def record(done, league_counts):
+        for key, value in league_counts.items():
+            counts[key] += value
+        if done % report_every == 0 or done == leagues:
+            elapsed = time.time() - started
+            rate = counts["fixtures"] / elapsed if elapsed > 0 else 0.0
+            print(f"   {done}/{leagues} leagues, {counts['fixtures']} fixtures ({rate:.0f} fixtures/s)")
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_generate_league_worker, league_index, options) for league_index in range(leagues)]
+            for done, future in enumerate(as_completed(futures), start=1):
+                record(done, future.result())
+    else:
+        for league_index in range(leagues):
+            record(league_index + 1, generate_league(conn, league_index, **options))
+
+    for table, column in (
+        ("V3_Fixtures", "fixture_id"), ("V3_Teams", "team_id"), ("V3_Players", "player_id"),
+        ("V3_Venues", "venue_id"), ("V3_Leagues", "league_id"),
+    ):
+        cur.execute(f"SELECT setval(pg_get_serial_sequence('{table}', '{column}'), (SELECT MAX({column}) FROM {table}))")
+    conn.commit()
+    if partition_feature_tables:
+        apply_feature_store_layout(conn)
+    cur.execute("ANALYZE")
+    conn.commit()
+    cur.close()
+    return counts
+
+
+DUMMY_POISSON_MODELS = {
+    "goals_total": ("get_goals_poisson_paths", (), 1.3),
+    "ht_result": ("get_ht_poisson_paths", ("v2",), 0.6),
+    "corners_total": ("get_corners_poisson_paths", ("v2",), 4.8),
+    "cards_total": ("get_cards_poisson_paths", ("v2",), 2.1),
+}
+
+
+def write_dummy_models(conn, seed=7, rows=400, iterations=30):
+    """
+    Train tiny CatBoost models on random GLOBAL_1X2 feature frames at the paths
+    given by model_paths (point ML_MODELS_ROOT / ML_GLOBAL_1X2_MODEL_PATH at a
+    scratch directory first) and register them as active.
+    """
+    import joblib
+    import pandas as pd
+    from catboost import CatBoostClassifier, CatBoostRegressor
+
+    import model_paths
+
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame(rng.normal(0, 1, size=(rows, len(GLOBAL_1X2_FEATURE_COLUMNS))), columns=GLOBAL_1X2_FEATURE_COLUMNS)
+    params = {"iterations": iterations, "depth": 4, "verbose": False, "allow_writing_files": False, "random_seed": seed}
+    registry_rows = []
+
+    global_path = model_paths.get_global_1x2_model_path()
+    os.makedirs(os.path.dirname(global_path), exist_ok=True)
+    classifier = CatBoostClassifier(loss_function="MultiClass", **params)
+    classifier.fit(frame, rng.integers(0, 3, size=rows))
+    joblib.dump(classifier, global_path)
+    registry_rows.append(("global_1x2", "synthetic", "METAMODEL", global_path, json.dumps({"horizon": "FULL_HISTORICAL"})))
+
+    for name, (path_getter, args, mean) in DUMMY_POISSON_MODELS.items():
+        paths = getattr(model_paths, path_getter)(*args)
+        os.makedirs(paths["dir"], exist_ok=True)
+        for side in ("home", "away"):
+            regressor = CatBoostRegressor(loss_function="Poisson", **params)
+            regressor.fit(frame, rng.poisson(mean, size=rows))
+            regressor.save_model(paths[side])
+        registry_rows.append((name, "synthetic", "SUBMODEL", paths["dir"], json.dumps({
+            "horizon": "FULL_HISTORICAL", "model_paths": {"home": paths["home"], "away": paths["away"]},
+        })))
+
+    cur = conn.cursor()
+    cur.execute("DELETE FROM V3_Model_Registry WHERE version = 'synthetic'")
+    insert_rows(cur, "V3_Model_Registry", ("name", "version", "type", "path", "metadata_json"), registry_rows)
+    cur.execute("UPDATE V3_Model_Registry SET is_active = 1 WHERE version = 'synthetic'")
+    conn.commit()
+    cur.close()
+    return [row[3] for row in registry_rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic StatFoot data into a disposable Postgres database.")
+    parser.add_argument("--leagues", type=int, default=2)
+    parser.add_argument("--fixtures", type=int, default=None, help="Target fixture count (overrides --leagues).")
+    parser.add_argument("--teams", type=int, default=10, help="Teams per league.")
+    parser.add_argument("--seasons", type=int, default=2)
+    parser.add_argument("--start-year", type=int, default=2022)
+    parser.add_argument("--upcoming-share", type=float, default=0.1, help="Share of the last season left unplayed.")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--workers", type=int, default=1, help="Processes generating leagues in parallel.")
+    parser.add_argument("--models-dir", default=None, help="Write dummy CatBoost models here and register them.")
+    parser.add_argument("--force", action="store_true", help="Allow a database name without a disposable marker.")
+    args = parser.parse_args()
+
+    if args.models_dir:
+        # model_paths reads these at import time.
+        os.environ["ML_MODELS_ROOT"] = os.path.abspath(args.models_dir)
+        os.environ["ML_GLOBAL_1X2_MODEL_PATH"] = os.path.join(os.path.abspath(args.models_dir), "model_1x2.joblib")
+
+    if args.fixtures:
+        args.leagues = leagues_for_fixtures(args.fixtures, args.teams, args.seasons)
+
+    conn = get_connection()
+    try:
+        database = check_disposable(conn, force=args.force)
+        print(f"🧪 Generating {args.leagues} synthetic leagues into '{database}'...")
+        started = time.time()
+        create_schema(conn)
+        counts = generate(
+            conn, leagues=args.leagues, teams_per_league=args.teams, seasons=args.seasons,
+            start_year=args.start_year, upcoming_share=args.upcoming_share, seed=args.seed, workers=args.workers,
+        )
+        print(f"✅ Inserted {json.dumps(counts)} in {time.time() - started:.1f}s")
+        if args.models_dir:
+            paths = write_dummy_models(conn, seed=args.seed)
+            print(f"✅ Wrote and registered {len(paths)} dummy models under {args.models_dir}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
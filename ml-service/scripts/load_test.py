@@ -0,0 +1,207 @@
+"""
+HTTP load test for a running ML service.
+
+Replays a mix of ``POST /predict``, ``POST /batch_predict`` and
+``GET /predict/fixture/{id}`` requests at a target rate (open loop: requests
+are scheduled at fixed intervals whatever the response times, and latency is
+measured from the scheduled send time so a saturated service shows up as
+queueing instead of a lower request rate). Fixture ids are sampled from
+V3_ML_Feature_Store in DATABASE_URL, e.g. a database seeded by
+scripts/generate_synthetic_data.py, or read from ``--fixture-ids-file``.
+
+Reports throughput, error rates, status codes and p50/p90/p95/p99 latency per
+endpoint; ``--output`` also writes the report as JSON.
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import requests
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+ENDPOINTS = ("predict", "batch", "fixture")
+DEFAULT_MIX = "predict=0.5,batch=0.2,fixture=0.3"
+LATENCY_PERCENTILES = (50, 90, 95, 99)
+
+
+def parse_mix(text):
+    """``predict=0.5,batch=0.2,fixture=0.3`` -> normalized weights per endpoint."""
+    weights = {}
+    for part in text.split(","):
+        name, _, value = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint '{name}' in mix (expected one of {', '.join(ENDPOINTS)})")
+        weights[name] = float(value)
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("Mix weights must add up to more than 0")
+    return {name: weight / total for name, weight in weights.items() if weight > 0}
+
+
+def fetch_fixture_ids(limit):
+    from db_config import get_connection
+
+    conn = get_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT fixture_id FROM V3_ML_Feature_Store ORDER BY random() LIMIT %s", (limit,))
+        fixture_ids = [row[0] for row in cur.fetchall()]
+        cur.close()
+        return fixture_ids
+    finally:
+        conn.close()
+
+
+def summarize_endpoint(samples, duration):
+    """Throughput, error rate, status codes and latency percentiles (ms) for one endpoint."""
+    latencies = [sample["latency"] * 1000.0 for sample in samples]
+    errors = sum(1 for sample in samples if not sample["ok"])
+    statuses = {}
+    for sample in samples:
+        statuses[str(sample["status"])] = statuses.get(str(sample["status"]), 0) + 1
+    summary = {
+        "requests": len(samples),
+        "rps": round(len(samples) / duration, 2) if duration > 0 else 0.0,
+        "errors": errors,
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "status": statuses,
+    }
+    if latencies:
+        summary["latency_ms"] = {f"p{q}": round(float(np.percentile(latencies, q)), 1) for q in LATENCY_PERCENTILES}
+        summary["latency_ms"]["max"] = round(max(latencies), 1)
+    return summary
+
+
+class LoadTest:
+    def __init__(self, base_url, fixture_ids, mix, batch_size=20, timeout=30.0, seed=7):
+        self.base_url = base_url.rstrip("/")
+        self.fixture_ids = fixture_ids
+        self.mix = mix
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+        self.samples = {name: [] for name in mix}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _session(self):
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def next_request(self):
+        endpoint = self.rng.choices(list(self.mix), weights=list(self.mix.values()))[0]
+        if endpoint == "batch":
+            payload = {"fixture_ids": self.rng.sample(self.fixture_ids, min(self.batch_size, len(self.fixture_ids)))}
+        else:
+            payload = self.rng.choice(self.fixture_ids)
+        return endpoint, payload
+
+    def send(self, endpoint, payload, scheduled_at):
+        session = self._session()
+        try:
+            if endpoint == "predict":
+                response = session.post(f"{self.base_url}/predict", json={"fixture_id": payload}, timeout=self.timeout)
+            elif endpoint == "batch":
+                response = session.post(f"{self.base_url}/batch_predict", json=payload, timeout=self.timeout)
+            else:
+                response = session.get(f"{self.base_url}/predict/fixture/{payload}", timeout=self.timeout)
+            status = response.status_code
+            ok = status < 400 and response.json().get("success", True) is not False
+        except (requests.RequestException, ValueError) as exc:
+            status, ok = type(exc).__name__, False
+        sample = {"latency": time.perf_counter() - scheduled_at, "status": status, "ok": ok}
+        with self._lock:
+            self.samples[endpoint].append(sample)
+
+    def run(self, rps, duration, concurrency):
+        interval = 1.0 / rps
+        started = time.perf_counter()
+        sent = 0
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            while True:
+                scheduled_at = started + sent * interval
+                if scheduled_at - started >= duration:
+                    break
+                delay = scheduled_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                endpoint, payload = self.next_request()
+                pool.submit(self.send, endpoint, payload, scheduled_at)
+                sent += 1
+                if sent % max(int(rps * 10), 1) == 0:
+                    print(f"   {sent} requests sent ({time.perf_counter() - started:.0f}s)")
+        elapsed = time.perf_counter() - started
+        all_samples = [sample for samples in self.samples.values() for sample in samples]
+        return {
+            "target_rps": rps,
+            "duration_seconds": round(elapsed, 2),
+            "total": summarize_endpoint(all_samples, elapsed),
+            "endpoints": {name: summarize_endpoint(samples, elapsed) for name, samples in self.samples.items()},
+        }
+
+
+def print_report(report):
+    print(f"\n{'endpoint':<10} {'requests':>9} {'rps':>8} {'errors':>8} {'p50':>9} {'p90':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    for name, summary in [*report["endpoints"].items(), ("total", report["total"])]:
+        latency = summary.get("latency_ms", {})
+        print(
+            f"{name:<10} {summary['requests']:>9} {summary['rps']:>8} {summary['error_rate']:>7.1%} "
+            + " ".join(f"{latency.get(key, 0):>7.1f}ms" for key in ("p50", "p90", "p95", "p99", "max"))
+        )
+    failing = {
+        name: summary["status"] for name, summary in report["endpoints"].items() if summary["errors"]
+    }
+    if failing:
+        print(f"\n⚠️  Status codes of failing endpoints: {json.dumps(failing)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay mixed prediction traffic against the ML service.")
+    parser.add_argument("--url", default="http://localhost:8008", help="Base URL of the ML service.")
+    parser.add_argument("--rps", type=float, default=20.0, help="Target requests per second.")
+    parser.add_argument("--duration", type=float, default=60.0, help="Test duration in seconds.")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Endpoint weights (default: {DEFAULT_MIX}).")
+    parser.add_argument("--batch-size", type=int, default=20, help="Fixtures per /batch_predict request.")
+    parser.add_argument("--concurrency", type=int, default=64, help="Maximum requests in flight.")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds.")
+    parser.add_argument("--fixtures", type=int, default=5000, help="Fixture ids sampled from the database.")
+    parser.add_argument("--fixture-ids-file", default=None, help="JSON list of fixture ids instead of the database.")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default=None, help="Also write the report to this JSON file.")
+    args = parser.parse_args()
+
+    if args.fixture_ids_file:
+        fixture_ids = json.loads(Path(args.fixture_ids_file).read_text())
+    else:
+        fixture_ids = fetch_fixture_ids(args.fixtures)
+    if not fixture_ids:
+        print("❌ No fixture ids to replay.")
+        sys.exit(1)
+
+    mix = parse_mix(args.mix)
+    print(
+        f"🚀 {args.rps:g} req/s for {args.duration:g}s against {args.url} "
+        f"({', '.join(f'{name} {weight:.0%}' for name, weight in mix.items())}, {len(fixture_ids)} fixtures)"
+    )
+    load_test = LoadTest(args.url, fixture_ids, mix, batch_size=args.batch_size, timeout=args.timeout, seed=args.seed)
+    report = load_test.run(args.rps, args.duration, args.concurrency)
+    print_report(report)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"\n✅ Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
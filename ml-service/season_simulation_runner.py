@@ -8,6 +8,7 @@ import pandas as pd
 from db_config import get_connection
 from feature_schema import GLOBAL_1X2_FEATURE_COLUMNS, normalize_feature_vector
 from model_paths import get_global_1x2_model_path_for_horizon
+from src.models.native_scoring import predict_proba
 from src.models.cards_total.inference import predict_total_cards
 from src.models.corners_total.inference import predict_total_corners
 from src.models.goals_total.inference import predict_total_goals
@@ -114,25 +115,17 @@ def _load_matches(conn, league_id, season_year):
             f.goals_away,
             f.score_halftime_home,
             f.score_halftime_away,
-            COUNT(CASE WHEN fst.half = 'FT' THEN 1 END) AS ft_stats_count,
-            COALESCE(SUM(CASE WHEN fst.half = 'FT' THEN fst.corner_kicks ELSE 0 END), 0) AS total_corners,
-            COALESCE(SUM(CASE WHEN fst.half = 'FT' THEN COALESCE(fst.yellow_cards, 0) + COALESCE(fst.red_cards, 0) ELSE 0 END), 0) AS total_cards,
+            COALESCE(sw.has_home_ft::int + sw.has_away_ft::int, 0) AS ft_stats_count,
+            COALESCE(sw.home_ft_corner_kicks, 0) + COALESCE(sw.away_ft_corner_kicks, 0) AS total_corners,
+            COALESCE(sw.home_ft_yellow_cards, 0) + COALESCE(sw.home_ft_red_cards, 0)
+                + COALESCE(sw.away_ft_yellow_cards, 0) + COALESCE(sw.away_ft_red_cards, 0) AS total_cards,
             fs.feature_vector
         FROM V3_Fixtures f
         JOIN V3_ML_Feature_Store fs ON fs.fixture_id = f.fixture_id
-        LEFT JOIN V3_Fixture_Stats fst ON fst.fixture_id = f.fixture_id
+        LEFT JOIN V3_Fixture_Stats_Wide sw ON sw.fixture_id = f.fixture_id
         WHERE f.league_id = %s
           AND f.season_year = %s
           AND f.status_short IN %s
-        GROUP BY
-            f.fixture_id,
-            f.date,
-            f.round,
-            f.goals_home,
-            f.goals_away,
-            f.score_halftime_home,
-            f.score_halftime_away,
-            fs.feature_vector
         ORDER BY f.date ASC, f.fixture_id ASC
     """
     return pd.read_sql_query(query, conn, params=(league_id, season_year, FINISHED_STATUSES))
@@ -290,11 +283,11 @@ def _build_ou_prediction_row(simulation_id, fixture_id, market_type, market_labe
     )
 
 
-def _compute_ft_prediction(model, row):
-    vector = normalize_feature_vector(json.loads(row["feature_vector"]))
-    features = pd.DataFrame([vector], columns=GLOBAL_1X2_FEATURE_COLUMNS)
-    probabilities = model.predict_proba(features)[0]
-    return {int(label): float(prob) for label, prob in zip(model.classes_, probabilities)}
+def _compute_ft_predictions(model, feature_vectors):
+    vectors = [normalize_feature_vector(json.loads(feature_vector)) for feature_vector in feature_vectors]
+    probabilities = predict_proba(model, vectors, GLOBAL_1X2_FEATURE_COLUMNS)
+    labels = [int(label) for label in model.classes_]
+    return [{label: float(prob) for label, prob in zip(labels, row)} for row in probabilities]
 
 
 def run_season_simulation(simulation_id, league_id, season_year, horizon_type="FULL_HISTORICAL"):
@@ -356,12 +349,13 @@ def run_season_simulation(simulation_id, league_id, season_year, horizon_type="F
         }
 
         buffered_rows = []
+        ft_predictions = _compute_ft_predictions(ft_model, fixtures_df["feature_vector"].tolist())
 
-        for index, row in fixtures_df.iterrows():
+        for position, (index, row) in enumerate(fixtures_df.iterrows()):
             fixture_id = int(row["fixture_id"])
 
             actual_ft = _map_actual_winner(int(row["goals_home"]), int(row["goals_away"]))
-            ft_probabilities = _compute_ft_prediction(ft_model, row)
+            ft_probabilities = ft_predictions[position]
             buffered_rows.append(
                 _build_ft_prediction_row(simulation_id, fixture_id, ft_probabilities, actual_ft, f"global_1x2_{horizon_type.lower()}")
             )
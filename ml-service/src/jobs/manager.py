@@ -0,0 +1,435 @@
+"""
+Durable background jobs (feature builds, retraining) for the ML service.
+
+Jobs are rows in ``V3_ML_Jobs``, so their state survives restarts and is
+shared by every API worker. Each stage of a job runs as a child process whose
+output is appended to ``ML_JOB_LOG_DIR/<job id>.log`` as it is produced; the
+API process never buffers it and the log can be tailed while the job runs.
+
+A scheduler thread claims queued jobs under a Postgres advisory lock, which
+enforces the per-type concurrency limits (``ML_JOB_CONCURRENCY``, e.g.
+``train_1x2=1,features=1``) across workers. A running job updates its
+heartbeat every few seconds and polls its ``cancel_requested`` flag, so a
+cancel issued by any worker stops the stage's process group. Jobs whose
+heartbeat stops (the owning worker died) are marked failed and their process
+group is terminated when it runs on this host.
+"""
+
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from db_config import get_connection
+from src.models.model_utils import get_logger
+
+logger = get_logger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+JOB_LOG_DIR = Path(os.getenv("ML_JOB_LOG_DIR", str(BASE_DIR / "logs" / "jobs")))
+JOB_POLL_SECONDS = float(os.getenv("ML_JOB_POLL_SECONDS", "2"))
+JOB_STALE_SECONDS = float(os.getenv("ML_JOB_STALE_SECONDS", "60"))
+CANCEL_GRACE_SECONDS = 10.0
+
+# Job type -> ordered (stage name, script relative to ml-service) pairs.
+JOB_TYPES = {
+    "train_1x2": [("features", "features.py"), ("train", "train_1x2.py")],
+    "features": [("features", "features.py")],
+}
+DEFAULT_CONCURRENCY = {"train_1x2": 1, "features": 1}
+
+ACTIVE_STATES = ("QUEUED", "RUNNING")
+FINAL_STATES = ("SUCCEEDED", "FAILED", "CANCELLED")
+JOB_COLUMNS = (
+    "id", "job_type", "status", "stage", "owner", "pid", "cancel_requested", "exit_code", "error",
+    "log_path", "created_at", "started_at", "finished_at", "heartbeat_at",
+)
+# Serializes claims so concurrency limits hold across API workers.
+CLAIM_LOCK_KEY = 7_310_421
+
+
+def parse_concurrency(text, defaults=DEFAULT_CONCURRENCY):
+    """``train_1x2=1,features=2`` -> per-type limits on top of ``defaults``."""
+    limits = dict(defaults)
+    for part in filter(None, (text or "").split(",")):
+        job_type, _, value = part.partition("=")
+        limits[job_type.strip()] = max(int(value), 0)
+    return limits
+
+
+JOB_CONCURRENCY = parse_concurrency(os.getenv("ML_JOB_CONCURRENCY"))
+
+
+def pick_claimable(queued, running_counts, limits):
+    """First queued ``(id, job_type)`` whose type still has capacity, or ``None``."""
+    for job_id, job_type in queued:
+        if running_counts.get(job_type, 0) < limits.get(job_type, 1):
+            return job_id, job_type
+    return None
+
+
+def read_log(path, offset=0, limit=65536):
+    """Bytes ``offset..offset+limit`` of a job log (decoded) and the next offset."""
+    path = Path(path)
+    if not path.exists():
+        return "", offset
+    with open(path, "rb") as handle:
+        handle.seek(offset)
+        chunk = handle.read(limit)
+    return chunk.decode("utf-8", errors="replace"), offset + len(chunk)
+
+
+def _serialize(row):
+    job = dict(zip(JOB_COLUMNS, row))
+    for key in ("created_at", "started_at", "finished_at", "heartbeat_at"):
+        if job[key] is not None:
+            job[key] = job[key].isoformat()
+    return job
+
+
+class PostgresJobStore:
+    """``V3_ML_Jobs`` access; every call uses its own short-lived connection."""
+
+    def _run(self, query, params=(), fetch="none"):
+        conn = get_connection()
+        try:
+            cur = conn.cursor()
+            cur.execute(query, params)
+            if fetch == "one":
+                result = cur.fetchone()
+            elif fetch == "all":
+                result = cur.fetchall()
+            else:
+                result = cur.rowcount
+            conn.commit()
+            cur.close()
+            return result
+        finally:
+            conn.close()
+
+    def create(self, job_type):
+        row = self._run(
+            f"INSERT INTO V3_ML_Jobs (job_type, status) VALUES (%s, 'QUEUED') RETURNING {', '.join(JOB_COLUMNS)}",
+            (job_type,), fetch="one",
+        )
+        return _serialize(row)
+
+    def create_exclusive(self, job_type):
+        """
+        Queue ``job_type`` unless a job of that type is already queued or running.
+
+        Check and insert run in one transaction under the claim lock, so concurrent
+        submissions from different workers cannot both insert. Returns ``(job, created)``
+        with the existing job when nothing was queued.
+        """
+        conn = get_connection()
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT pg_advisory_xact_lock(%s)", (CLAIM_LOCK_KEY,))
+            cur.execute(
+                f"SELECT {', '.join(JOB_COLUMNS)} FROM V3_ML_Jobs "
+                "WHERE job_type = %s AND status IN ('QUEUED', 'RUNNING') ORDER BY id LIMIT 1",
+                (job_type,),
+            )
+            row = cur.fetchone()
+            created = row is None
+            if created:
+                cur.execute(
+                    f"INSERT INTO V3_ML_Jobs (job_type, status) VALUES (%s, 'QUEUED') RETURNING {', '.join(JOB_COLUMNS)}",
+                    (job_type,),
+                )
+                row = cur.fetchone()
+            conn.commit()
+            cur.close()
+            return _serialize(row), created
+        finally:
+            conn.close()
+
+    def get(self, job_id):
+        row = self._run(f"SELECT {', '.join(JOB_COLUMNS)} FROM V3_ML_Jobs WHERE id = %s", (job_id,), fetch="one")
+        return _serialize(row) if row else None
+
+    def list(self, job_type=None, limit=50):
+        query = f"SELECT {', '.join(JOB_COLUMNS)} FROM V3_ML_Jobs"
+        params = []
+        if job_type:
+            query += " WHERE job_type = %s"
+            params.append(job_type)
+        query += " ORDER BY id DESC LIMIT %s"
+        params.append(limit)
+        return [_serialize(row) for row in self._run(query, params, fetch="all")]
+
+    def counts(self):
+        rows = self._run(
+            "SELECT job_type, status, COUNT(*) FROM V3_ML_Jobs WHERE status IN ('QUEUED', 'RUNNING') GROUP BY job_type, status",
+            fetch="all",
+        )
+        return {(job_type, status): count for job_type, status, count in rows}
+
+    def claim(self, limits, owner, log_dir):
+        conn = get_connection()
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT pg_advisory_xact_lock(%s)", (CLAIM_LOCK_KEY,))
+            cur.execute("SELECT job_type, COUNT(*) FROM V3_ML_Jobs WHERE status = 'RUNNING' GROUP BY job_type")
+            running = dict(cur.fetchall())
+            cur.execute("SELECT id, job_type FROM V3_ML_Jobs WHERE status = 'QUEUED' ORDER BY id")
+            picked = pick_claimable(cur.fetchall(), running, limits)
+            row = None
+            if picked:
+                job_id = picked[0]
+                cur.execute(
+                    f"""
+                    UPDATE V3_ML_Jobs
+                    SET status = 'RUNNING', owner = %s, log_path = %s,
+                        started_at = NOW(), heartbeat_at = NOW()
+                    WHERE id = %s
+                    RETURNING {', '.join(JOB_COLUMNS)}
+                    """,
+                    (owner, str(Path(log_dir) / f"{job_id}.log"), job_id),
+                )
+                row = cur.fetchone()
+            conn.commit()
+            cur.close()
+            return _serialize(row) if row else None
+        finally:
+            conn.close()
+
+    def heartbeat(self, job_id, **fields):
+        """Refresh the heartbeat (plus ``fields``); returns whether a cancel was requested."""
+        assignments = ", ".join(f"{key} = %s" for key in fields)
+        row = self._run(
+            f"UPDATE V3_ML_Jobs SET heartbeat_at = NOW(){', ' + assignments if assignments else ''} "
+            "WHERE id = %s RETURNING cancel_requested",
+            (*fields.values(), job_id), fetch="one",
+        )
+        return bool(row and row[0])
+
+    def finish(self, job_id, owner, status, exit_code=None, error=None):
+        """
+        Record the outcome of a job still running under ``owner``; returns whether it was recorded.
+
+        A job already failed by ``fail_stale`` (or claimed by another worker) keeps its state.
+        """
+        updated = self._run(
+            "UPDATE V3_ML_Jobs SET status = %s, exit_code = %s, error = %s, pid = NULL, "
+            "finished_at = NOW(), heartbeat_at = NOW() WHERE id = %s AND status = 'RUNNING' AND owner = %s",
+            (status, exit_code, error, job_id, owner),
+        )
+        return updated > 0
+
+    def request_cancel(self, job_id):
+        """Flag a job for cancellation; queued jobs are cancelled immediately."""
+        row = self._run(
+            f"""
+            UPDATE V3_ML_Jobs
+            SET cancel_requested = TRUE,
+                status = CASE WHEN status = 'QUEUED' THEN 'CANCELLED' ELSE status END,
+                finished_at = CASE WHEN status = 'QUEUED' THEN NOW() ELSE finished_at END
+            WHERE id = %s
+            RETURNING {', '.join(JOB_COLUMNS)}
+            """,
+            (job_id,), fetch="one",
+        )
+        return _serialize(row) if row else None
+
+    def fail_stale(self, stale_seconds):
+        """Mark running jobs without a recent heartbeat as failed; returns them."""
+        rows = self._run(
+            f"""
+            UPDATE V3_ML_Jobs
+            SET status = 'FAILED', error = 'Job stopped reporting (worker restarted or died)', finished_at = NOW()
+            WHERE status = 'RUNNING' AND heartbeat_at < NOW() - make_interval(secs => %s)
+            RETURNING {', '.join(JOB_COLUMNS)}
+            """,
+            (stale_seconds,), fetch="all",
+        )
+        return [_serialize(row) for row in rows]
+
+
+class JobManager:
+    def __init__(self, store=None, limits=None, log_dir=JOB_LOG_DIR, poll_seconds=JOB_POLL_SECONDS,
+                 stale_seconds=JOB_STALE_SECONDS, job_types=JOB_TYPES):
+        self.store = store or PostgresJobStore()
+        self.limits = limits or JOB_CONCURRENCY
+        self.log_dir = Path(log_dir)
+        self.poll_seconds = poll_seconds
+        self.stale_seconds = stale_seconds
+        self.job_types = job_types
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._listeners = []
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._runners = {}
+
+    def add_listener(self, callback):
+        """Call ``callback(job)`` when a job run by this process finishes."""
+        self._listeners.append(callback)
+
+    def submit(self, job_type):
+        if job_type not in self.job_types:
+            raise ValueError(f"Unknown job type: {job_type}")
+        job = self.store.create(job_type)
+        self._wake.set()
+        return job
+
+    def submit_exclusive(self, job_type):
+        """Queue ``job_type`` unless one is already queued or running; returns ``(job, created)``."""
+        if job_type not in self.job_types:
+            raise ValueError(f"Unknown job type: {job_type}")
+        job, created = self.store.create_exclusive(job_type)
+        if created:
+            self._wake.set()
+        return job, created
+
+    def cancel(self, job_id):
+        return self.store.request_cancel(job_id)
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+    def list(self, job_type=None, limit=50):
+        return self.store.list(job_type=job_type, limit=limit)
+
+    def stats(self):
+        counts = self.store.counts()
+        stats = {}
+        for job_type in self.job_types:
+            stats[f"{job_type}_queued"] = counts.get((job_type, "QUEUED"), 0)
+            stats[f"{job_type}_running"] = counts.get((job_type, "RUNNING"), 0)
+        return stats
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._schedule, name="ml-job-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _schedule(self):
+        while not self._stop.is_set():
+            try:
+                self.recover_stale()
+                while not self._stop.is_set():
+                    job = self.store.claim(self.limits, self.owner, self.log_dir)
+                    if job is None:
+                        break
+                    self._start_runner(job)
+            except Exception as exc:
+                logger.warning(f"Job scheduler failed: {exc}")
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+
+    def recover_stale(self):
+        for job in self.store.fail_stale(self.stale_seconds):
+            logger.warning(f"Job {job['id']} ({job['job_type']}) stopped reporting; marked failed")
+            host = (job["owner"] or "").rsplit(":", 1)[0]
+            if job["pid"] and host == socket.gethostname():
+                _terminate_group(job["pid"])
+
+    def _start_runner(self, job):
+        thread = threading.Thread(target=self.run_job, args=(job,), name=f"ml-job-{job['id']}", daemon=True)
+        self._runners[job["id"]] = thread
+        thread.start()
+
+    def run_job(self, job):
+        """
+        Run every stage of a claimed job in child processes and record the outcome.
+
+        Returns ``None`` without notifying listeners when the job was no longer this
+        worker's to finish (e.g. it was marked failed as stale meanwhile).
+        """
+        job_id = job["id"]
+        log_path = Path(job["log_path"] or self.log_dir / f"{job_id}.log")
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        status, exit_code, error = "SUCCEEDED", 0, None
+        try:
+            with open(log_path, "ab", buffering=0) as log:
+                for stage, script in self.job_types[job["job_type"]]:
+                    log.write(f"=== [{time.strftime('%Y-%m-%d %H:%M:%S')}] stage {stage}: {script}\n".encode())
+                    exit_code, cancelled = self._run_stage(job_id, stage, script, log)
+                    if cancelled:
+                        status, error = "CANCELLED", f"Cancelled during stage {stage}"
+                        break
+                    if exit_code != 0:
+                        status, error = "FAILED", f"Stage {stage} exited with code {exit_code}"
+                        break
+                log.write(f"=== [{time.strftime('%Y-%m-%d %H:%M:%S')}] {status}\n".encode())
+        except Exception as exc:
+            status, error = "FAILED", str(exc)
+            logger.error(f"Job {job_id} failed: {exc}")
+        finally:
+            self._runners.pop(job_id, None)
+
+        recorded = self.store.finish(job_id, self.owner, status, exit_code=exit_code, error=error)
+        self._wake.set()
+        if not recorded:
+            logger.warning(f"Job {job_id} is no longer running under {self.owner}; {status} not recorded")
+            return None
+        finished = {**job, "status": status, "exit_code": exit_code, "error": error}
+        for callback in list(self._listeners):
+            try:
+                callback(finished)
+            except Exception as exc:
+                logger.error(f"Job listener failed: {exc}")
+        return finished
+
+    def _run_stage(self, job_id, stage, script, log):
+        if self.store.heartbeat(job_id, stage=stage):
+            return None, True
+        process = subprocess.Popen(
+            [sys.executable, "-u", str(BASE_DIR / script)],
+            cwd=str(BASE_DIR),
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            start_new_session=True,
+            env={**os.environ, "PYTHONUNBUFFERED": "1"},
+        )
+        self.store.heartbeat(job_id, pid=process.pid)
+        while True:
+            try:
+                return process.wait(timeout=self.poll_seconds), False
+            except subprocess.TimeoutExpired:
+                pass
+            try:
+                cancel_requested = self.store.heartbeat(job_id)
+            except Exception as exc:
+                logger.warning(f"Job {job_id} heartbeat failed: {exc}")
+                continue
+            if cancel_requested:
+                _terminate_group(process.pid)
+                try:
+                    process.wait(timeout=CANCEL_GRACE_SECONDS)
+                except subprocess.TimeoutExpired:
+                    _terminate_group(process.pid, signal.SIGKILL)
+                    process.wait()
+                return process.returncode, True
+
+
+def _terminate_group(pid, sig=signal.SIGTERM):
+    try:
+        os.killpg(pid, sig)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+_MANAGER = None
+_MANAGER_LOCK = threading.Lock()
+
+
+def get_job_manager():
+    global _MANAGER
+    if _MANAGER is None:
+        with _MANAGER_LOCK:
+            if _MANAGER is None:
+                _MANAGER = JobManager()
+    return _MANAGER
@@ -12,22 +12,35 @@ if ML_SERVICE_ROOT not in sys.path:
 
 from db_config import get_connection
 from feature_schema import GLOBAL_1X2_FEATURE_COLUMNS, normalize_feature_vector
+from horizon_utils import resolve_horizon_sql, with_dataset_size
 
 
 def get_db_connection():
     return get_connection()
 
-def fetch_cards_dataset():
+def fetch_cards_dataset(horizon_type="FULL_HISTORICAL", league_id=None, min_date=None, max_date=None):
     """
     Fetches the dataset for CARDS_TOTAL modeling.
     We join both BASELINE_V1 and PROCESS_V1 and calculate total cards (yellow + red).
+    League, date bounds and the training horizon are applied in SQL; returns
+    ``(df, horizon_window)``.
     """
     conn = get_db_connection()
     
     # Base query for matches and targets.
     # Note: If a red card is worth more than 1, we could multiply it here. 
     # For predicting absolute raw number of cards, we just sum them.
-    query = """
+    from_sql = """
+        FROM V3_Fixtures f
+        JOIN V3_Fixture_Stats_Wide sw ON sw.fixture_id = f.fixture_id
+        WHERE f.status_short = 'FT'
+          AND sw.home_ft_yellow_cards IS NOT NULL
+          AND sw.away_ft_yellow_cards IS NOT NULL
+    """
+    conditions, params, horizon_window = resolve_horizon_sql(
+        conn, horizon_type, from_sql, league_id=league_id, min_date=min_date, max_date=max_date
+    )
+    query = f"""
         SELECT 
             f.fixture_id,
             f.league_id,
@@ -35,19 +48,14 @@ def fetch_cards_dataset():
             f.date as match_date,
             f.home_team_id,
             f.away_team_id,
-            COALESCE(fs_home.yellow_cards, 0) + COALESCE(fs_home.red_cards, 0) as home_cards,
-            COALESCE(fs_away.yellow_cards, 0) + COALESCE(fs_away.red_cards, 0) as away_cards
-        FROM V3_Fixtures f
-        JOIN V3_Fixture_Stats fs_home ON f.fixture_id = fs_home.fixture_id AND f.home_team_id = fs_home.team_id AND fs_home.half = 'FT'
-        JOIN V3_Fixture_Stats fs_away ON f.fixture_id = fs_away.fixture_id AND f.away_team_id = fs_away.team_id AND fs_away.half = 'FT'
-        WHERE f.status_short = 'FT'
-          AND fs_home.yellow_cards IS NOT NULL
-          AND fs_away.yellow_cards IS NOT NULL
+            COALESCE(sw.home_ft_yellow_cards, 0) + COALESCE(sw.home_ft_red_cards, 0) as home_cards,
+            COALESCE(sw.away_ft_yellow_cards, 0) + COALESCE(sw.away_ft_red_cards, 0) as away_cards
+        {from_sql}{conditions}
         ORDER BY f.date ASC
     """
     
     print("Fetching matches and card targets...")
-    matches_df = pd.read_sql_query(query, conn)
+    matches_df = pd.read_sql_query(query, conn, params=params)
     matches_df['match_date'] = pd.to_datetime(matches_df['match_date'], utc=True)
     
     matches_df['target_home_cards'] = matches_df['home_cards'].astype(int)
@@ -55,12 +63,13 @@ def fetch_cards_dataset():
     
     # Load BASELINE_V1
     print("Loading BASELINE_V1...")
-    baseline_query = """
+    baseline_query = f"""
         SELECT fixture_id, team_id, features_json
         FROM V3_Team_Features_PreMatch
         WHERE feature_set_id = 'BASELINE_V1' AND horizon_type = 'FULL_HISTORICAL'
+          AND fixture_id IN (SELECT f.fixture_id {from_sql}{conditions})
     """
-    baseline_df = pd.read_sql_query(baseline_query, conn)
+    baseline_df = pd.read_sql_query(baseline_query, conn, params=params)
     
     print("Parsing BASELINE_V1 JSON...")
     baseline_parsed = pd.json_normalize(baseline_df['features_json'].apply(json.loads))
@@ -97,12 +106,13 @@ def fetch_cards_dataset():
     
     # Load PROCESS_V1 features
     print("Loading PROCESS_V1 features...")
-    process_query = """
+    process_query = f"""
         SELECT fixture_id, team_id, features_json
         FROM V3_Team_Features_PreMatch
         WHERE feature_set_id = 'PROCESS_V1' AND horizon_type = 'FULL_HISTORICAL'
+          AND fixture_id IN (SELECT f.fixture_id {from_sql}{conditions})
     """
-    process_df = pd.read_sql_query(process_query, conn)
+    process_df = pd.read_sql_query(process_query, conn, params=params)
     
     print("Parsing PROCESS_V1 JSON...")
     process_parsed = pd.json_normalize(process_df['features_json'].apply(json.loads))
@@ -146,40 +156,40 @@ def fetch_cards_dataset():
     conn.close()
     
     print(f"Final dataset shape: {matches_df.shape}")
-    return matches_df
+    return matches_df, with_dataset_size(horizon_window, matches_df)
 
 
-def fetch_cards_dataset_v2():
+def fetch_cards_dataset_v2(horizon_type="FULL_HISTORICAL", league_id=None, min_date=None, max_date=None):
     """
-    Fetches the cards dataset from the enriched feature store v2.
+    Fetches the cards dataset from the enriched feature store v2, bounded in SQL;
+    returns ``(df, horizon_window)``.
     """
     conn = get_db_connection()
     try:
-        query = """
+        from_sql = """
+            FROM V3_Fixtures f
+            JOIN V3_Fixture_Stats_Wide sw ON sw.fixture_id = f.fixture_id
+            JOIN V3_ML_Feature_Store feature_store
+              ON f.fixture_id = feature_store.fixture_id
+            WHERE f.status_short IN ('FT', 'AET', 'PEN')
+              AND sw.home_ft_yellow_cards IS NOT NULL
+              AND sw.away_ft_yellow_cards IS NOT NULL
+        """
+        conditions, params, horizon_window = resolve_horizon_sql(
+            conn, horizon_type, from_sql, league_id=league_id, min_date=min_date, max_date=max_date
+        )
+        query = f"""
             SELECT
                 f.fixture_id,
                 f.league_id,
                 f.date AS match_date,
-                COALESCE(fs_home.yellow_cards, 0) + COALESCE(fs_home.red_cards, 0) AS home_cards,
-                COALESCE(fs_away.yellow_cards, 0) + COALESCE(fs_away.red_cards, 0) AS away_cards,
+                COALESCE(sw.home_ft_yellow_cards, 0) + COALESCE(sw.home_ft_red_cards, 0) AS home_cards,
+                COALESCE(sw.away_ft_yellow_cards, 0) + COALESCE(sw.away_ft_red_cards, 0) AS away_cards,
                 feature_store.feature_vector
-            FROM V3_Fixtures f
-            JOIN V3_Fixture_Stats fs_home
-              ON f.fixture_id = fs_home.fixture_id
-             AND f.home_team_id = fs_home.team_id
-             AND fs_home.half = 'FT'
-            JOIN V3_Fixture_Stats fs_away
-              ON f.fixture_id = fs_away.fixture_id
-             AND f.away_team_id = fs_away.team_id
-             AND fs_away.half = 'FT'
-            JOIN V3_ML_Feature_Store feature_store
-              ON f.fixture_id = feature_store.fixture_id
-            WHERE f.status_short IN ('FT', 'AET', 'PEN')
-              AND fs_home.yellow_cards IS NOT NULL
-              AND fs_away.yellow_cards IS NOT NULL
+            {from_sql}{conditions}
             ORDER BY f.date ASC
         """
-        df = pd.read_sql_query(query, conn)
+        df = pd.read_sql_query(query, conn, params=params)
         df["match_date"] = pd.to_datetime(df["match_date"], utc=True)
         raw_features = df["feature_vector"].apply(json.loads).tolist()
         feature_frame = pd.DataFrame(
@@ -189,10 +199,10 @@ def fetch_cards_dataset_v2():
         df = pd.concat([df.drop(columns=["feature_vector"]), feature_frame], axis=1)
         df["target_home_cards"] = pd.to_numeric(df["home_cards"], errors="coerce").astype(int)
         df["target_away_cards"] = pd.to_numeric(df["away_cards"], errors="coerce").astype(int)
-        return df
+        return df, with_dataset_size(horizon_window, df)
     finally:
         conn.close()
 
 if __name__ == "__main__":
-    df = fetch_cards_dataset()
+    df, _ = fetch_cards_dataset()
     print(f"✅ Cards Dataset ready: {df.shape[0]} matches")
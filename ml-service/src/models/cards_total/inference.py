@@ -2,8 +2,8 @@ import json
 import os
 import sys
 
+import numpy as np
 import pandas as pd
-from catboost import CatBoostRegressor
 
 MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
 ML_SERVICE_ROOT = os.path.abspath(os.path.join(MODEL_DIR, "..", "..", ".."))
@@ -15,13 +15,27 @@ from feature_schema import GLOBAL_1X2_FEATURE_COLUMNS, normalize_feature_vector
 from league_adjustments import get_market_adjustment_factor
 from league_model_policy import get_market_decision, get_market_policy_for_league
 from model_paths import get_cards_poisson_paths
-from src.models.model_utils import get_logger, poisson_prob
+from src.models.league_adjustment_solver import TotalAdjustmentSpec, apply_total_adjustments
+from src.models.model_cache import load_catboost_pair, load_registry_catboost_pair
+from src.models.model_registry import get_registry_entry
+from src.models.model_utils import get_logger, group_by_league
+from src.models.native_scoring import predict
+from src.models.poisson_markets import total_markets
+from src.monitoring.metrics import observe_stage
 
 logger = get_logger(__name__)
 
-_MODELS = {}
-_LEAGUE_MODELS = {}
-_REGISTRY_CACHE = {}
+CARDS_MAX_TOTAL = 20
+CARDS_LINES = (2.5, 3.5, 4.5, 5.5, 6.5)
+CARDS_ADJUSTMENT = TotalAdjustmentSpec(
+    market="cards_ou",
+    unit="cards",
+    line=4.5,
+    max_total=CARDS_MAX_TOTAL,
+    min_total=0.2,
+    min_side=0.05,
+    default_cap=0.04,
+)
 
 
 def get_db_connection():
@@ -50,74 +64,20 @@ def get_fixture_context(fixture_id):
 
 
 def load_models(version="v2"):
-    global _MODELS
-    if version not in _MODELS:
-        paths = get_cards_poisson_paths(version)
-        if os.path.exists(paths["home"]) and os.path.exists(paths["away"]):
-            home_model = CatBoostRegressor()
-            home_model.load_model(paths["home"])
-            away_model = CatBoostRegressor()
-            away_model.load_model(paths["away"])
-            _MODELS[version] = {"type": "poisson", "home": home_model, "away": away_model}
-        else:
-            _MODELS[version] = {"type": "heuristic"}
-    return _MODELS[version]
+    paths = get_cards_poisson_paths(version)
+    return load_catboost_pair(f"cards_poisson_{version}", paths["home"], paths["away"]) or {"type": "heuristic"}
 
 
 def load_registry_entry(model_name):
-    if model_name in _REGISTRY_CACHE:
-        return _REGISTRY_CACHE[model_name]
-
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
-        cur.execute(
-            """
-            SELECT version, path, metadata_json
-            FROM v3_model_registry
-            WHERE name = %s AND is_active = 1
-            ORDER BY created_at DESC
-            LIMIT 1
-            """,
-            (model_name,),
-        )
-        row = cur.fetchone()
-    finally:
-        conn.close()
-
-    if not row:
-        _REGISTRY_CACHE[model_name] = None
-        return None
-
-    version, path, metadata_json = row
-    metadata = json.loads(metadata_json) if isinstance(metadata_json, str) else metadata_json
-    entry = {"version": version, "path": path, "metadata": metadata}
-    _REGISTRY_CACHE[model_name] = entry
-    return entry
+    return get_registry_entry(model_name)
 
 
 def load_league_models(league_id):
-    if league_id in _LEAGUE_MODELS:
-        return _LEAGUE_MODELS[league_id]
-
-    entry = load_registry_entry(f"league_cards_ou_{league_id}")
+    model_name = f"league_cards_ou_{league_id}"
+    entry = load_registry_entry(model_name)
     if not entry:
-        _LEAGUE_MODELS[league_id] = (None, None)
-        return _LEAGUE_MODELS[league_id]
-
-    model_paths = entry["metadata"].get("model_paths") or {}
-    home_path = model_paths.get("home")
-    away_path = model_paths.get("away")
-    if not home_path or not away_path or not os.path.exists(home_path) or not os.path.exists(away_path):
-        _LEAGUE_MODELS[league_id] = (None, entry)
-        return _LEAGUE_MODELS[league_id]
-
-    home_model = CatBoostRegressor()
-    home_model.load_model(home_path)
-    away_model = CatBoostRegressor()
-    away_model.load_model(away_path)
-    _LEAGUE_MODELS[league_id] = ({"type": "poisson", "home": home_model, "away": away_model}, entry)
-    return _LEAGUE_MODELS[league_id]
+        return None, None
+    return load_registry_catboost_pair(model_name, entry), entry
 
 
 def fetch_features_for_inference_v2(fixture_id):
@@ -132,25 +92,16 @@ def fetch_features_for_inference_v2(fixture_id):
         row = pd.read_sql_query(query, conn, params=(fixture_id,))
         if row.empty:
             raise ValueError(f"Feature vector for fixture {fixture_id} not found.")
-        vector = json.loads(row.iloc[0]["feature_vector"])
-        normalized = normalize_feature_vector(vector)
-        return pd.DataFrame([normalized], columns=GLOBAL_1X2_FEATURE_COLUMNS)
+        with observe_stage("CARDS_TOTAL", "feature_decode"):
+            vector = json.loads(row.iloc[0]["feature_vector"])
+            return normalize_feature_vector(vector)
     finally:
         conn.close()
 
 
 def build_prediction(fixture_id, h_mu, a_mu, model_version, model_scope, is_shadow=False):
     total_mu = h_mu + a_mu
-    probabilities = {k: poisson_prob(total_mu, k) for k in range(21)}
-    total_prob = sum(probabilities.values()) or 1.0
-    probabilities = {k: p / total_prob for k, p in probabilities.items()}
-
-    lines = [2.5, 3.5, 4.5, 5.5, 6.5]
-    over_under = {}
-    for line in lines:
-        prob_under = sum(p for k, p in probabilities.items() if k < line)
-        over_under[f"Over {line}"] = float(1.0 - prob_under)
-        over_under[f"Under {line}"] = float(prob_under)
+    over_under = total_markets([total_mu], CARDS_MAX_TOTAL, CARDS_LINES)[0]
 
     return {
         "fixture_id": fixture_id,
@@ -165,93 +116,27 @@ def build_prediction(fixture_id, h_mu, a_mu, model_version, model_scope, is_shad
 
 
 def apply_cards_adjustment(prediction, factor):
-    if not factor:
-        return None
-
-    base_total = float(prediction["expected_cards"]["total"])
-    base_home = float(prediction["expected_cards"]["home"])
-    base_away = float(prediction["expected_cards"]["away"])
-    total_delta = float(factor.get("recommended_total_cards_delta", 0.0))
-    cap = float(factor.get("recommended_adjustment_cap", 0.04))
-
-    if base_total <= 0:
-        return None
-
-    base_over_4_5 = float(prediction["over_under_probabilities"].get("Over 4.5", 0.0))
-    home_share = base_home / base_total if base_total > 0 else 0.5
-    away_share = base_away / base_total if base_total > 0 else 0.5
-
-    adjusted = None
-    applied_total_delta = 0.0
-    adjusted_over_4_5 = base_over_4_5
-    for scale in (1.0, 0.85, 0.7, 0.55, 0.4, 0.25, 0.1):
-        candidate_total = max(0.2, base_total + total_delta * scale)
-        candidate_home = max(0.05, candidate_total * home_share)
-        candidate_away = max(0.05, candidate_total * away_share)
-        candidate = build_prediction(
-            prediction["fixture_id"],
-            candidate_home,
-            candidate_away,
-            prediction["model_version"],
-            "league_adjusted_shadow",
-            is_shadow=True,
-        )
-        candidate_over_4_5 = float(candidate["over_under_probabilities"].get("Over 4.5", 0.0))
-        if abs(candidate_over_4_5 - base_over_4_5) <= cap + 1e-9:
-            adjusted = candidate
-            applied_total_delta = candidate_total - base_total
-            adjusted_over_4_5 = candidate_over_4_5
-            break
-
-    if adjusted is None:
-        adjusted = build_prediction(
-            prediction["fixture_id"],
-            base_home,
-            base_away,
-            prediction["model_version"],
-            "league_adjusted_shadow",
-            is_shadow=True,
-        )
-
-    adjusted["adjustment_context"] = {
-        "market": "cards_ou",
-        "league_id": factor["league_id"],
-        "league_name": factor["league_name"],
-        "window": factor.get("window"),
-        "style_metrics": factor.get("style_metrics", {}),
-        "indices": factor.get("indices", {}),
-        "recommended_total_cards_delta": total_delta,
-        "recommended_over_4_5_delta": float(factor.get("recommended_over_4_5_delta", 0.0)),
-        "recommended_adjustment_cap": cap,
-        "applied_total_cards_delta": applied_total_delta,
-        "applied_over_4_5_delta": adjusted_over_4_5 - base_over_4_5,
-    }
-    return adjusted
+    return apply_total_adjustments([prediction], [factor], CARDS_ADJUSTMENT, build_prediction)[0]
 
 
-def _get_cards_mu(df, model_data, version):
+def _get_cards_mu(vectors, model_data, version):
+    """(home, away) expected cards for each vector; the Poisson pair scores them in one call per model."""
     if model_data["type"] == "poisson":
-        h_mu = max(0.1, float(model_data["home"].predict(df)[0]))
-        a_mu = max(0.1, float(model_data["away"].predict(df)[0]))
-    else:
-        h_mu = float((df.iloc[0]["home_p_yellow_per_match_5"] or 1.9) + (df.iloc[0]["home_p_red_per_match_5"] or 0.1))
-        a_mu = float((df.iloc[0]["away_p_yellow_per_match_5"] or 1.7) + (df.iloc[0]["away_p_red_per_match_5"] or 0.1))
-    return h_mu, a_mu
-
-def predict_total_cards(fixture_id, version="v2"):
-    context = get_fixture_context(fixture_id)
-    model_data = load_models(version)
-    df = fetch_features_for_inference_v2(fixture_id)
+        with observe_stage("CARDS_TOTAL", "scoring"):
+            home = np.maximum(0.1, predict(model_data["home"], vectors, GLOBAL_1X2_FEATURE_COLUMNS))
+            away = np.maximum(0.1, predict(model_data["away"], vectors, GLOBAL_1X2_FEATURE_COLUMNS))
+        return list(zip(home.tolist(), away.tolist()))
+    return [
+        (
+            float((vector["home_p_yellow_per_match_5"] or 1.9) + (vector["home_p_red_per_match_5"] or 0.1)),
+            float((vector["away_p_yellow_per_match_5"] or 1.7) + (vector["away_p_red_per_match_5"] or 0.1)),
+        )
+        for vector in vectors
+    ]
 
-    h_mu, a_mu = _get_cards_mu(df, model_data, version)
-    
-    if model_data["type"] == "poisson":
-        global_entry = load_registry_entry("global_cards_ou")
-        model_version = global_entry["version"] if global_entry else f"{version}_poisson"
-        prediction_status = "success_model"
-    else:
-        model_version = f"dynamic_heuristic_{version}"
-        prediction_status = "success_fallback"
+def _assemble_cards_prediction(fixture_id, context, mu, model_data, model_version, league_scored):
+    h_mu, a_mu = mu
+    prediction_status = "success_model" if model_data["type"] == "poisson" else "success_fallback"
 
     result = build_prediction(
         fixture_id,
@@ -267,30 +152,54 @@ def predict_total_cards(fixture_id, version="v2"):
     if adjustment_factor:
         result = apply_cards_adjustment(result, adjustment_factor)
 
-    policy_mode = get_market_policy_for_league("cards_ou", context["league_id"])
-    if policy_mode == "active":
-        league_model_data, league_entry = load_league_models(context["league_id"])
-        if league_model_data:
-            lh_mu, la_mu = _get_cards_mu(df, league_model_data, version)
-            league_prediction = build_prediction(
-                fixture_id, lh_mu, la_mu, league_entry["version"], "league_specific"
-            )
-            league_prediction["league_id"] = context["league_id"]
-            shadow_eval = {"global_baseline": result}
-            result = league_prediction
-            result["shadow_evaluation"] = shadow_eval
+    if league_scored is not None:
+        (lh_mu, la_mu), league_entry = league_scored
+        league_prediction = build_prediction(
+            fixture_id, lh_mu, la_mu, league_entry["version"], "league_specific"
+        )
+        league_prediction["league_id"] = context["league_id"]
+        shadow_eval = {"global_baseline": result}
+        result = league_prediction
+        result["shadow_evaluation"] = shadow_eval
 
     return result
 
-    if adjusted_global_prediction is not None:
-        result = dict(global_prediction)
-        result["adjustment_evaluation"] = {
-            "without_adjustment": global_prediction,
-            "with_league_adjustment": adjusted_global_prediction,
-        }
-        return result
+def predict_total_cards_batch(contexts, vectors, version="v2"):
+    """
+    Cards predictions for fixtures whose context and feature vector are already loaded
+    (``{fixture_id: ...}``), one call per model over all fixtures it scores.
+    """
+    fixture_ids = list(vectors)
+    model_data = load_models(version)
+    mus = _get_cards_mu([vectors[fixture_id] for fixture_id in fixture_ids], model_data, version)
+
+    if model_data["type"] == "poisson":
+        global_entry = load_registry_entry("global_cards_ou")
+        model_version = global_entry["version"] if global_entry else f"{version}_poisson"
+    else:
+        model_version = f"dynamic_heuristic_{version}"
+
+    league_scored = {}
+    for league_id, league_fixture_ids in group_by_league(fixture_ids, contexts).items():
+        if get_market_policy_for_league("cards_ou", league_id) != "active":
+            continue
+        league_model_data, league_entry = load_league_models(league_id)
+        if not league_model_data:
+            continue
+        league_mus = _get_cards_mu([vectors[fixture_id] for fixture_id in league_fixture_ids], league_model_data, version)
+        league_scored.update((fixture_id, (mu, league_entry)) for fixture_id, mu in zip(league_fixture_ids, league_mus))
 
-    return global_prediction
+    return {
+        fixture_id: _assemble_cards_prediction(
+            fixture_id, contexts[fixture_id], mu, model_data, model_version, league_scored.get(fixture_id)
+        )
+        for fixture_id, mu in zip(fixture_ids, mus)
+    }
+
+def predict_total_cards(fixture_id, version="v2"):
+    context = get_fixture_context(fixture_id)
+    vector = fetch_features_for_inference_v2(fixture_id)
+    return predict_total_cards_batch({fixture_id: context}, {fixture_id: vector}, version)[fixture_id]
 
 
 if __name__ == "__main__":
@@ -16,7 +16,7 @@ if ML_SERVICE_ROOT not in sys.path:
 
 from db_config import get_connection
 from feature_schema import GLOBAL_1X2_FEATURE_COLUMNS, GLOBAL_1X2_FEATURE_SCHEMA_VERSION
-from horizon_utils import filter_dataframe_by_horizon, normalize_horizon_type
+from horizon_utils import normalize_horizon_type
 from model_paths import get_cards_poisson_paths, with_horizon_suffix
 from src.models.model_utils import get_valid_cat_features
 
@@ -57,10 +57,10 @@ def run_training(version="v1", horizon_type="FULL_HISTORICAL", activate=True):
     os.makedirs(model_paths["dir"], exist_ok=True)
 
     if version == "v2":
-        df = fetch_cards_dataset_v2().sort_values("match_date")
+        df, horizon_window = fetch_cards_dataset_v2(horizon_type=horizon_type)
         features = list(GLOBAL_1X2_FEATURE_COLUMNS)
     else:
-        df = fetch_cards_dataset().sort_values("match_date")
+        df, horizon_window = fetch_cards_dataset(horizon_type=horizon_type)
         features = [
             "league_id",
             "diff_elo", "diff_points", "diff_rank", "diff_lineup_strength",
@@ -72,7 +72,7 @@ def run_training(version="v1", horizon_type="FULL_HISTORICAL", activate=True):
             "home_p_yellow_per_match_5", "away_p_yellow_per_match_5",
             "home_p_red_per_match_5", "away_p_red_per_match_5",
         ]
-    df, horizon_window = filter_dataframe_by_horizon(df, "match_date", horizon_type)
+    df = df.sort_values("match_date").reset_index(drop=True)
 
     cat_features = ["league_id"] if "league_id" in features else []
     split_idx = int(len(df) * 0.8)
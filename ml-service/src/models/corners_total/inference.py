@@ -2,8 +2,8 @@ import json
 import os
 import sys
 
+import numpy as np
 import pandas as pd
-from catboost import CatBoostRegressor
 
 MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
 ML_SERVICE_ROOT = os.path.abspath(os.path.join(MODEL_DIR, "..", "..", ".."))
@@ -14,12 +14,36 @@ from db_config import get_connection
 from feature_schema import GLOBAL_1X2_FEATURE_COLUMNS, normalize_feature_vector
 from league_adjustments import get_market_adjustment_factor
 from model_paths import get_corners_poisson_paths
-from src.models.model_utils import get_logger, poisson_prob
+from src.models.league_adjustment_solver import TotalAdjustmentSpec, apply_total_adjustments
+from src.models.model_cache import load_catboost_pair
+from src.models.model_registry import get_registry_entry
+from src.models.model_utils import get_logger
+from src.models.native_scoring import predict
+from src.models.poisson_markets import total_markets
+from src.monitoring.metrics import observe_stage
 
 logger = get_logger(__name__)
 
-_MODELS = {}
-_REGISTRY_CACHE = {}
+CORNERS_MAX_TOTAL = 30
+CORNERS_LINES = (7.5, 8.5, 9.5, 10.5, 11.5)
+CORNERS_ADJUSTMENT = TotalAdjustmentSpec(
+    market="corners_ou",
+    unit="corners",
+    line=9.5,
+    max_total=CORNERS_MAX_TOTAL,
+    min_total=0.5,
+    min_side=0.1,
+    default_cap=0.04,
+)
+CORNERS_V1_COLUMNS = [
+    "league_id", "diff_elo", "diff_points", "diff_rank", "diff_lineup_strength",
+    "home_b_elo", "away_b_elo", "home_b_lineup_strength_v1", "away_b_lineup_strength_v1",
+    "diff_possession_l5", "diff_control_l5", "diff_shots_l5", "diff_sot_l5", "diff_corners_l5",
+    "home_p_possession_avg_5", "away_p_possession_avg_5",
+    "home_p_control_index_5", "away_p_control_index_5",
+    "home_p_corners_per_match_5", "away_p_corners_per_match_5",
+    "home_p_shots_per_match_5", "away_p_shots_per_match_5",
+]
 
 
 def get_db_connection():
@@ -48,50 +72,12 @@ def get_fixture_context(fixture_id):
 
 
 def load_registry_entry(model_name):
-    if model_name in _REGISTRY_CACHE:
-        return _REGISTRY_CACHE[model_name]
-
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
-        cur.execute(
-            """
-            SELECT version, path, metadata_json
-            FROM v3_model_registry
-            WHERE name = %s AND is_active = 1
-            ORDER BY created_at DESC
-            LIMIT 1
-            """,
-            (model_name,),
-        )
-        row = cur.fetchone()
-    finally:
-        conn.close()
-
-    if not row:
-        _REGISTRY_CACHE[model_name] = None
-        return None
-
-    version, path, metadata_json = row
-    metadata = json.loads(metadata_json) if isinstance(metadata_json, str) else metadata_json
-    entry = {"version": version, "path": path, "metadata": metadata}
-    _REGISTRY_CACHE[model_name] = entry
-    return entry
+    return get_registry_entry(model_name)
 
 
 def load_models(version="v2"):
-    global _MODELS
-    if version not in _MODELS:
-        paths = get_corners_poisson_paths(version)
-        if os.path.exists(paths["home"]) and os.path.exists(paths["away"]):
-            home_model = CatBoostRegressor()
-            home_model.load_model(paths["home"])
-            away_model = CatBoostRegressor()
-            away_model.load_model(paths["away"])
-            _MODELS[version] = {"type": "poisson", "home": home_model, "away": away_model}
-        else:
-            _MODELS[version] = {"type": "heuristic"}
-    return _MODELS[version]
+    paths = get_corners_poisson_paths(version)
+    return load_catboost_pair(f"corners_poisson_{version}", paths["home"], paths["away"]) or {"type": "heuristic"}
 
 
 def fetch_features_for_inference_v2(fixture_id):
@@ -106,9 +92,9 @@ def fetch_features_for_inference_v2(fixture_id):
         row = pd.read_sql_query(query, conn, params=(fixture_id,))
         if row.empty:
             raise ValueError(f"Feature vector for fixture {fixture_id} not found.")
-        vector = json.loads(row.iloc[0]["feature_vector"])
-        normalized = normalize_feature_vector(vector)
-        return pd.DataFrame([normalized], columns=GLOBAL_1X2_FEATURE_COLUMNS)
+        with observe_stage("CORNERS_TOTAL", "feature_decode"):
+            vector = json.loads(row.iloc[0]["feature_vector"])
+            return normalize_feature_vector(vector)
     finally:
         conn.close()
 
@@ -174,33 +160,14 @@ def fetch_features_for_inference_v1(fixture_id):
         process_query = "SELECT team_id, features_json FROM V3_Team_Features_PreMatch WHERE fixture_id = %s AND feature_set_id = 'PROCESS_V1' AND horizon_type = 'FULL_HISTORICAL'"
         p_df = pd.read_sql_query(process_query, conn, params=(fixture_id,))
         features.update(_extract_process_features(h_tid, a_tid, p_df))
-
-        cols = [
-            "league_id", "diff_elo", "diff_points", "diff_rank", "diff_lineup_strength",
-            "home_b_elo", "away_b_elo", "home_b_lineup_strength_v1", "away_b_lineup_strength_v1",
-            "diff_possession_l5", "diff_control_l5", "diff_shots_l5", "diff_sot_l5", "diff_corners_l5",
-            "home_p_possession_avg_5", "away_p_possession_avg_5",
-            "home_p_control_index_5", "away_p_control_index_5",
-            "home_p_corners_per_match_5", "away_p_corners_per_match_5",
-            "home_p_shots_per_match_5", "away_p_shots_per_match_5",
-        ]
-        return pd.DataFrame([features], columns=cols)
+        return features
     finally:
         conn.close()
 
 
 def _build_corners_result(fixture_id, h_mu, a_mu, model_version, prediction_status, is_fallback):
     total_mu = h_mu + a_mu
-    probabilities = {k: poisson_prob(total_mu, k) for k in range(31)}
-    total_prob = sum(probabilities.values()) or 1.0
-    probabilities = {k: p / total_prob for k, p in probabilities.items()}
-
-    lines = [7.5, 8.5, 9.5, 10.5, 11.5]
-    over_under = {}
-    for line in lines:
-        prob_under = sum(p for k, p in probabilities.items() if k < line)
-        over_under[f"Over {line}"] = float(1.0 - prob_under)
-        over_under[f"Under {line}"] = float(prob_under)
+    over_under = total_markets([total_mu], CORNERS_MAX_TOTAL, CORNERS_LINES)[0]
 
     return {
         "fixture_id": fixture_id,
@@ -213,15 +180,7 @@ def _build_corners_result(fixture_id, h_mu, a_mu, model_version, prediction_stat
 
 def _build_corners_prediction(fixture_id, h_mu, a_mu, model_version, model_scope, is_shadow=False):
     total_mu = h_mu + a_mu
-    probabilities = {k: poisson_prob(total_mu, k) for k in range(31)}
-    total_prob = sum(probabilities.values()) or 1.0
-    probabilities = {k: p / total_prob for k, p in probabilities.items()}
-    lines = [7.5, 8.5, 9.5, 10.5, 11.5]
-    over_under = {}
-    for line in lines:
-        prob_under = sum(p for k, p in probabilities.items() if k < line)
-        over_under[f"Over {line}"] = float(1.0 - prob_under)
-        over_under[f"Under {line}"] = float(prob_under)
+    over_under = total_markets([total_mu], CORNERS_MAX_TOTAL, CORNERS_LINES)[0]
     return {
         "fixture_id": fixture_id,
         "model_version": model_version,
@@ -235,93 +194,50 @@ def _build_corners_prediction(fixture_id, h_mu, a_mu, model_version, model_scope
 
 
 def apply_corners_adjustment(prediction, factor):
-    if not factor:
-        return None
-
-    base_total = float(prediction["expected_corners"]["total"])
-    base_home = float(prediction["expected_corners"]["home"])
-    base_away = float(prediction["expected_corners"]["away"])
-    total_delta = float(factor.get("recommended_total_corners_delta", 0.0))
-    cap = float(factor.get("recommended_adjustment_cap", 0.04))
-
-    if base_total <= 0:
-        return None
-
-    base_over_9_5 = float(prediction["over_under_probabilities"].get("Over 9.5", 0.0))
-    home_share = base_home / base_total if base_total > 0 else 0.5
-    away_share = base_away / base_total if base_total > 0 else 0.5
-
-    adjusted = None
-    applied_total_delta = 0.0
-    adjusted_over_9_5 = base_over_9_5
-    for scale in (1.0, 0.85, 0.7, 0.55, 0.4, 0.25, 0.1):
-        candidate_total = max(0.5, base_total + total_delta * scale)
-        candidate_home = max(0.1, candidate_total * home_share)
-        candidate_away = max(0.1, candidate_total * away_share)
-        candidate = _build_corners_prediction(
-            prediction["fixture_id"],
-            candidate_home,
-            candidate_away,
-            prediction["model_version"],
-            "league_adjusted_shadow",
-            is_shadow=True,
-        )
-        candidate_over_9_5 = float(candidate["over_under_probabilities"].get("Over 9.5", 0.0))
-        if abs(candidate_over_9_5 - base_over_9_5) <= cap + 1e-9:
-            adjusted = candidate
-            applied_total_delta = candidate_total - base_total
-            adjusted_over_9_5 = candidate_over_9_5
-            break
-
-    if adjusted is None:
-        adjusted = _build_corners_prediction(
-            prediction["fixture_id"],
-            base_home,
-            base_away,
-            prediction["model_version"],
-            "league_adjusted_shadow",
-            is_shadow=True,
-        )
-        assert adjusted is not None
-
-    adjusted["adjustment_context"] = {
-        "market": "corners_ou",
-        "league_id": factor["league_id"],
-        "league_name": factor["league_name"],
-        "window": factor.get("window"),
-        "style_metrics": factor.get("style_metrics", {}),
-        "indices": factor.get("indices", {}),
-        "recommended_total_corners_delta": total_delta,
-        "recommended_over_9_5_delta": float(factor.get("recommended_over_9_5_delta", 0.0)),
-        "recommended_adjustment_cap": cap,
-        "applied_total_corners_delta": applied_total_delta,
-        "applied_over_9_5_delta": adjusted_over_9_5 - base_over_9_5,
-    }
-    return adjusted
+    return apply_total_adjustments([prediction], [factor], CORNERS_ADJUSTMENT, _build_corners_prediction)[0]
 
 
-def predict_total_corners(fixture_id, version="v2"):
-    context = get_fixture_context(fixture_id)
+def predict_total_corners_batch(contexts, features_by_fixture, version="v2"):
+    """
+    Corners predictions for fixtures whose context and features are already loaded
+    (``{fixture_id: ...}``, v2 feature vectors or v1 legacy features), one call per model.
+    """
+    fixture_ids = list(features_by_fixture)
+    rows = [features_by_fixture[fixture_id] for fixture_id in fixture_ids]
     model_data = load_models(version)
-    df = fetch_features_for_inference_v2(fixture_id) if version == "v2" else fetch_features_for_inference_v1(fixture_id)
-    heuristic_home = float(df.iloc[0]["home_p_corners_per_match_5"] or 5.2)
-    heuristic_away = float(df.iloc[0]["away_p_corners_per_match_5"] or 4.3)
 
     if model_data["type"] == "poisson":
-        h_mu = max(0.1, float(model_data["home"].predict(df)[0]))
-        a_mu = max(0.1, float(model_data["away"].predict(df)[0]))
+        columns = GLOBAL_1X2_FEATURE_COLUMNS if version == "v2" else CORNERS_V1_COLUMNS
+        with observe_stage("CORNERS_TOTAL", "scoring"):
+            home = np.maximum(0.1, predict(model_data["home"], rows, columns))
+            away = np.maximum(0.1, predict(model_data["away"], rows, columns))
+        mus = zip(home.tolist(), away.tolist())
         global_entry = load_registry_entry("global_corners_ou")
         model_version = global_entry["version"] if global_entry else f"{version}_poisson"
         prediction_status, is_fallback = "success_model", False
     else:
-        h_mu, a_mu = heuristic_home, heuristic_away
+        mus = [
+            (float(features["home_p_corners_per_match_5"] or 5.2), float(features["away_p_corners_per_match_5"] or 4.3))
+            for features in rows
+        ]
         model_version, prediction_status, is_fallback = f"dynamic_heuristic_{version}", "success_fallback", True
 
-    result = _build_corners_result(fixture_id, h_mu, a_mu, model_version, prediction_status, is_fallback)
-    adjustment_factor = get_market_adjustment_factor("corners_ou", context["league_id"])
-    if adjustment_factor:
-        result = apply_corners_adjustment(result, adjustment_factor)
-    return result
+    results = {}
+    for fixture_id, (h_mu, a_mu) in zip(fixture_ids, mus):
+        result = _build_corners_result(fixture_id, h_mu, a_mu, model_version, prediction_status, is_fallback)
+        adjustment_factor = get_market_adjustment_factor("corners_ou", contexts[fixture_id]["league_id"])
+        if adjustment_factor:
+            result = apply_corners_adjustment(result, adjustment_factor)
+        results[fixture_id] = result
+    return results
+
+def predict_total_corners(fixture_id, version="v2"):
+    context = get_fixture_context(fixture_id)
+    if version == "v2":
+        features = fetch_features_for_inference_v2(fixture_id)
+    else:
+        features = fetch_features_for_inference_v1(fixture_id)
+    return predict_total_corners_batch({fixture_id: context}, {fixture_id: features}, version)[fixture_id]
 
 if __name__ == "__main__":
     import sys as _sys
@@ -1,12 +1,9 @@
 import json
-import math
 import os
 import sys
 
-import joblib
 import numpy as np
 import pandas as pd
-from catboost import CatBoostRegressor
 
 MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
 ML_SERVICE_ROOT = os.path.abspath(os.path.join(MODEL_DIR, "..", "..", ".."))
@@ -17,13 +14,23 @@ from db_config import get_connection
 from feature_schema import GLOBAL_1X2_FEATURE_COLUMNS, normalize_feature_vector
 from league_model_policy import get_ft_policy_for_league
 from model_paths import get_ft_poisson_paths, get_global_1x2_model_path
-from src.models.model_utils import get_logger, poisson_prob
+from src.models.model_cache import (
+    load_catboost_pair,
+    load_joblib_model,
+    load_registry_joblib,
+)
+from src.models.model_registry import get_registry_entry
+from src.models.model_utils import get_logger, group_by_league
+from src.models.native_scoring import predict, predict_proba
+from src.models.poisson_markets import score_markets
+from src.monitoring.metrics import observe_stage
 
 logger = get_logger(__name__)
 
-
-_MODEL_CACHE = {}
-_REGISTRY_CACHE = {}
+LEGACY_POISSON_COLUMNS = [
+    "league_id", "diff_elo", "diff_points", "diff_rank", "diff_lineup_strength",
+    "home_b_elo", "away_b_elo", "home_b_lineup_strength_v1", "away_b_lineup_strength_v1",
+]
 
 
 def get_db_connection():
@@ -97,11 +104,7 @@ def fetch_legacy_poisson_features(fixture_id, context):
                 "home_b_lineup_strength_v1": vector["lqi_h"],
                 "away_b_lineup_strength_v1": vector["lqi_a"],
             }
-        cols = [
-            "league_id", "diff_elo", "diff_points", "diff_rank", "diff_lineup_strength",
-            "home_b_elo", "away_b_elo", "home_b_lineup_strength_v1", "away_b_lineup_strength_v1",
-        ]
-        return pd.DataFrame([features], columns=cols)
+        return features
     finally:
         conn.close()
 
@@ -113,79 +116,31 @@ def fetch_feature_vector_v2(fixture_id):
         feature_row = pd.read_sql_query(feature_query, conn, params=(fixture_id,))
         if feature_row.empty:
             raise ValueError(f"Global 1X2 feature vector not found for fixture {fixture_id}.")
-        vector = normalize_feature_vector(json.loads(feature_row.iloc[0]["feature_vector"]))
-        return pd.DataFrame([vector], columns=GLOBAL_1X2_FEATURE_COLUMNS)
+        with observe_stage("FT_RESULT", "feature_decode"):
+            return normalize_feature_vector(json.loads(feature_row.iloc[0]["feature_vector"]))
     finally:
         conn.close()
 
 
 def load_registry_entry(model_name):
-    if model_name in _REGISTRY_CACHE:
-        return _REGISTRY_CACHE[model_name]
-
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
-        cur.execute(
-            """
-            SELECT version, path, metadata_json
-            FROM V3_Model_Registry
-            WHERE name = %s AND is_active = 1
-            ORDER BY created_at DESC
-            LIMIT 1
-            """,
-            (model_name,),
-        )
-        row = cur.fetchone()
-    finally:
-        conn.close()
-
-    if not row:
-        _REGISTRY_CACHE[model_name] = None
-        return None
-
-    version, path, metadata_json = row
-    metadata = json.loads(metadata_json) if isinstance(metadata_json, str) else metadata_json
-    entry = {"version": version, "path": path, "metadata": metadata}
-    _REGISTRY_CACHE[model_name] = entry
-    return entry
+    return get_registry_entry(model_name)
 
 
 def load_global_classifier():
-    cache_key = "global_classifier"
-    if cache_key not in _MODEL_CACHE:
-        path = get_global_1x2_model_path()
-        _MODEL_CACHE[cache_key] = joblib.load(path) if os.path.exists(path) else None
-    return _MODEL_CACHE[cache_key]
+    return load_joblib_model("global_1x2_classifier", get_global_1x2_model_path())
 
 
 def load_league_classifier(league_id):
-    entry = load_registry_entry(f"league_1x2_ft_{league_id}")
+    model_name = f"league_1x2_ft_{league_id}"
+    entry = load_registry_entry(model_name)
     if not entry:
         return None, None
-    cache_key = f"league_classifier_{league_id}"
-    if cache_key not in _MODEL_CACHE:
-        model_path = entry["path"]
-        if os.path.exists(model_path):
-            _MODEL_CACHE[cache_key] = joblib.load(model_path)
-        else:
-            _MODEL_CACHE[cache_key] = None
-    return _MODEL_CACHE[cache_key], entry
+    return load_registry_joblib(model_name, entry), entry
 
 
 def load_legacy_poisson_models():
-    cache_key = "legacy_poisson"
-    if cache_key not in _MODEL_CACHE:
-        paths = get_ft_poisson_paths()
-        if os.path.exists(paths["home"]) and os.path.exists(paths["away"]):
-            home_model = CatBoostRegressor()
-            home_model.load_model(paths["home"])
-            away_model = CatBoostRegressor()
-            away_model.load_model(paths["away"])
-            _MODEL_CACHE[cache_key] = {"home": home_model, "away": away_model}
-        else:
-            _MODEL_CACHE[cache_key] = None
-    return _MODEL_CACHE[cache_key]
+    paths = get_ft_poisson_paths()
+    return load_catboost_pair("ft_legacy_poisson", paths["home"], paths["away"])
 
 
 def build_joblib_prediction(fixture_id, probs, model_version, model_scope, is_shadow=False):
@@ -211,19 +166,7 @@ def build_joblib_prediction(fixture_id, probs, model_version, model_scope, is_sh
 
 
 def build_poisson_prediction(fixture_id, h_mu, a_mu, model_version, model_scope):
-    p_1 = p_n = p_2 = 0.0
-    exact_scores = {}
-    for h in range(9):
-        for a in range(9):
-            prob = poisson_prob(h_mu, h) * poisson_prob(a_mu, a)
-            exact_scores[f"{h}-{a}"] = float(prob)
-            if h > a:
-                p_1 += prob
-            elif h == a:
-                p_n += prob
-            else:
-                p_2 += prob
-    total = max(0.0001, p_1 + p_n + p_2)
+    markets = score_markets([h_mu], [a_mu], max_goals=8)
     return {
         "fixture_id": fixture_id,
         "model_version": model_version,
@@ -231,32 +174,16 @@ def build_poisson_prediction(fixture_id, h_mu, a_mu, model_version, model_scope)
         "prediction_status": "success_model",
         "is_fallback": False,
         "expected_goals_ft": {"home": float(h_mu), "away": float(a_mu)},
-        "probabilities_1n2": {"1": p_1 / total, "N": p_n / total, "2": p_2 / total},
-        "exact_score_probabilities": {k: v / total for k, v in sorted(exact_scores.items(), key=lambda item: item[1], reverse=True)[:15]},
+        "probabilities_1n2": markets.outcome_dicts()[0],
+        "exact_score_probabilities": markets.exact_scores(top_n=15)[0],
     }
 
 
-def predict_ft_result(fixture_id):
-    context = get_fixture_context(fixture_id)
-    feature_df = fetch_feature_vector_v2(fixture_id)
-
-    global_model = load_global_classifier()
-    global_prediction = None
-    if global_model is not None:
-        global_probs = global_model.predict_proba(feature_df)[0]
-        global_entry = load_registry_entry("global_1x2")
-        global_prediction = build_joblib_prediction(
-            fixture_id,
-            global_probs,
-            global_entry["version"] if global_entry else "global_joblib",
-            "global",
-        )
-
+def _assemble_ft_prediction(fixture_id, context, global_prediction, league_scored):
     policy_mode = get_ft_policy_for_league(context["league_id"])
-    league_model, league_entry = load_league_classifier(context["league_id"])
     league_prediction = None
-    if league_model is not None:
-        league_probs = league_model.predict_proba(feature_df)[0]
+    if league_scored is not None:
+        league_probs, league_entry = league_scored
         league_prediction = build_joblib_prediction(
             fixture_id,
             league_probs,
@@ -281,11 +208,16 @@ def predict_ft_result(fixture_id):
     if global_prediction is not None:
         return global_prediction
 
+    return _predict_ft_without_classifier(fixture_id, context)
+
+
+def _predict_ft_without_classifier(fixture_id, context):
     legacy_poisson = load_legacy_poisson_models()
     if legacy_poisson is not None:
-        legacy_df = fetch_legacy_poisson_features(fixture_id, context)
-        h_mu = max(0.01, legacy_poisson["home"].predict(legacy_df)[0])
-        a_mu = max(0.01, legacy_poisson["away"].predict(legacy_df)[0])
+        legacy_features = fetch_legacy_poisson_features(fixture_id, context)
+        with observe_stage("FT_RESULT", "scoring"):
+            h_mu = max(0.01, predict(legacy_poisson["home"], legacy_features, LEGACY_POISSON_COLUMNS)[0])
+            a_mu = max(0.01, predict(legacy_poisson["away"], legacy_features, LEGACY_POISSON_COLUMNS)[0])
         return build_poisson_prediction(fixture_id, h_mu, a_mu, "v0_poisson", "legacy_global")
 
     from time_travel import TemporalFeatureFactory
@@ -300,6 +232,57 @@ def predict_ft_result(fixture_id):
     return fallback
 
 
+def predict_ft_result_batch(contexts, vectors):
+    """
+    FT predictions for fixtures whose context and feature vector are already loaded
+    (``{fixture_id: ...}``). The global classifier scores every fixture in one call and
+    each league classifier its league's fixtures in one call; fixtures left without any
+    classifier fall back to the legacy Poisson pair or the heuristic one by one.
+    """
+    fixture_ids = list(vectors)
+    global_predictions = {}
+    global_model = load_global_classifier()
+    if global_model is not None:
+        with observe_stage("FT_RESULT", "scoring"):
+            global_probs = predict_proba(
+                global_model, [vectors[fixture_id] for fixture_id in fixture_ids], GLOBAL_1X2_FEATURE_COLUMNS
+            )
+        global_entry = load_registry_entry("global_1x2")
+        for fixture_id, probs in zip(fixture_ids, global_probs):
+            global_predictions[fixture_id] = build_joblib_prediction(
+                fixture_id,
+                probs,
+                global_entry["version"] if global_entry else "global_joblib",
+                "global",
+            )
+
+    league_scored = {}
+    for league_id, league_fixture_ids in group_by_league(fixture_ids, contexts).items():
+        league_model, league_entry = load_league_classifier(league_id)
+        if league_model is None:
+            continue
+        with observe_stage("FT_RESULT", "scoring"):
+            league_probs = predict_proba(
+                league_model, [vectors[fixture_id] for fixture_id in league_fixture_ids], GLOBAL_1X2_FEATURE_COLUMNS
+            )
+        league_scored.update(
+            (fixture_id, (probs, league_entry)) for fixture_id, probs in zip(league_fixture_ids, league_probs)
+        )
+
+    return {
+        fixture_id: _assemble_ft_prediction(
+            fixture_id, contexts[fixture_id], global_predictions.get(fixture_id), league_scored.get(fixture_id)
+        )
+        for fixture_id in fixture_ids
+    }
+
+
+def predict_ft_result(fixture_id):
+    context = get_fixture_context(fixture_id)
+    feature_vector = fetch_feature_vector_v2(fixture_id)
+    return predict_ft_result_batch({fixture_id: context}, {fixture_id: feature_vector})[fixture_id]
+
+
 if __name__ == "__main__":
     import sys as _sys
 
@@ -11,7 +11,8 @@ ML_SERVICE_ROOT = os.path.abspath(os.path.join(MODEL_DIR, "..", "..", ".."))
 if ML_SERVICE_ROOT not in sys.path:
     sys.path.insert(0, ML_SERVICE_ROOT)
 
-from src.models.model_utils import get_valid_cat_features, poisson_prob
+from src.models.model_utils import get_valid_cat_features
+from src.models.poisson_markets import result_probabilities
 
 # Import dataset loader
 from dataset import fetch_ft_dataset
@@ -48,25 +49,6 @@ def train_poisson_model(X_train, y_train, X_test, y_test, cat_features, label):
     
     return model, preds
 
-def calculate_1n2_probs(home_mu, away_mu, max_goals=8):
-    """
-    Calculate 1, N, 2 probabilities from Expected Goals using Poisson distribution.
-    """
-    p_1, p_n, p_2 = 0.0, 0.0, 0.0
-    
-    for h in range(max_goals + 1):
-        for a in range(max_goals + 1):
-            prob = poisson_prob(home_mu, h) * poisson_prob(away_mu, a)
-            if h > a:
-                p_1 += prob
-            elif h == a:
-                p_n += prob
-            else:
-                p_2 += prob
-                
-    total = p_1 + p_n + p_2
-    return p_1 / total, p_n / total, p_2 / total
-
 def run_training():
     model_paths = get_ft_poisson_paths()
     os.makedirs(model_paths["dir"], exist_ok=True)
@@ -110,11 +92,8 @@ def run_training():
         elif h == a: y_true_1n2.append(1) # N
         else: y_true_1n2.append(2)        # 2
         
-    y_pred_probs = []
-    for h_mu, a_mu in zip(preds_home, preds_away):
-        p1, pn, p2 = calculate_1n2_probs(h_mu, a_mu)
-        y_pred_probs.append([p1, pn, p2])
-        
+    y_pred_probs = result_probabilities(preds_home, preds_away, max_goals=8)
+
     ll = log_loss(y_true_1n2, y_pred_probs)
     preds_classes = np.argmax(y_pred_probs, axis=1)
     acc = np.mean(preds_classes == y_true_1n2)
@@ -11,20 +11,32 @@ if ML_SERVICE_ROOT not in sys.path:
 
 from db_config import get_connection
 from feature_schema import GLOBAL_1X2_FEATURE_COLUMNS, normalize_feature_vector
+from horizon_utils import resolve_horizon_sql, with_dataset_size
 
 
 def get_db_connection():
     return get_connection()
 
 
-def fetch_goals_dataset():
+def fetch_goals_dataset(horizon_type="FULL_HISTORICAL", league_id=None, min_date=None, max_date=None):
     """
     Fetches the dataset for GOALS_OU modeling from the enriched feature store.
-    Targets are full-time home and away goals.
+    Targets are full-time home and away goals. League, date bounds and the
+    training horizon are applied in SQL; returns ``(df, horizon_window)``.
     """
     conn = get_db_connection()
     try:
-        query = """
+        from_sql = """
+            FROM V3_Fixtures f
+            JOIN V3_ML_Feature_Store fs ON f.fixture_id = fs.fixture_id
+            WHERE f.status_short IN ('FT', 'AET', 'PEN')
+              AND f.goals_home IS NOT NULL
+              AND f.goals_away IS NOT NULL
+        """
+        conditions, params, horizon_window = resolve_horizon_sql(
+            conn, horizon_type, from_sql, league_id=league_id, min_date=min_date, max_date=max_date
+        )
+        query = f"""
             SELECT
                 f.fixture_id,
                 f.league_id,
@@ -32,18 +44,14 @@ def fetch_goals_dataset():
                 f.goals_home,
                 f.goals_away,
                 fs.feature_vector
-            FROM V3_Fixtures f
-            JOIN V3_ML_Feature_Store fs ON f.fixture_id = fs.fixture_id
-            WHERE f.status_short IN ('FT', 'AET', 'PEN')
-              AND f.goals_home IS NOT NULL
-              AND f.goals_away IS NOT NULL
+            {from_sql}{conditions}
             ORDER BY f.date ASC
         """
-        df = pd.read_sql_query(query, conn)
+        df = pd.read_sql_query(query, conn, params=params)
         df['match_date'] = pd.to_datetime(df['match_date'], utc=True)
         df['goals_home'] = pd.to_numeric(df['goals_home'], errors='coerce')
         df['goals_away'] = pd.to_numeric(df['goals_away'], errors='coerce')
-        df = df.dropna(subset=['goals_home', 'goals_away']).copy()
+        df = df.dropna(subset=['goals_home', 'goals_away']).reset_index(drop=True)
 
         raw_features = df['feature_vector'].apply(json.loads).tolist()
         feature_frame = pd.DataFrame(
@@ -54,11 +62,11 @@ def fetch_goals_dataset():
         df = pd.concat([df.drop(columns=['feature_vector']), feature_frame], axis=1)
         df['target_home_goals'] = df['goals_home'].astype(int)
         df['target_away_goals'] = df['goals_away'].astype(int)
-        return df
+        return df, with_dataset_size(horizon_window, df)
     finally:
         conn.close()
 
 
 if __name__ == "__main__":
-    dataset = fetch_goals_dataset()
+    dataset, _ = fetch_goals_dataset()
     print(f"✅ Goals Dataset ready: {dataset.shape[0]} matches")
@@ -5,7 +5,6 @@ import sys
 
 import numpy as np
 import pandas as pd
-from catboost import CatBoostRegressor
 
 MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
 ML_SERVICE_ROOT = os.path.abspath(os.path.join(MODEL_DIR, "..", "..", ".."))
@@ -17,14 +16,27 @@ from feature_schema import GLOBAL_1X2_FEATURE_COLUMNS, normalize_feature_vector
 from league_adjustments import clamp, get_market_adjustment_factor
 from league_model_policy import get_market_decision, get_market_policy_for_league
 from model_paths import get_goals_poisson_paths
-from src.models.model_utils import get_logger, poisson_prob
+from src.models.league_adjustment_solver import TotalAdjustmentSpec, apply_total_adjustments
+from src.models.model_cache import load_catboost_pair, load_registry_catboost_pair
+from src.models.model_registry import get_registry_entry
+from src.models.model_utils import get_logger, group_by_league
+from src.models.native_scoring import predict
+from src.models.poisson_markets import total_markets
+from src.monitoring.metrics import observe_stage
 
 logger = get_logger(__name__)
 
-
-_MODELS = None
-_LEAGUE_MODELS = {}
-_REGISTRY_CACHE = {}
+GOALS_MAX_TOTAL = 10
+GOALS_LINES = (1.5, 2.5, 3.5, 4.5)
+GOALS_ADJUSTMENT = TotalAdjustmentSpec(
+    market="goals_ou",
+    unit="goals",
+    line=2.5,
+    max_total=GOALS_MAX_TOTAL,
+    min_total=0.2,
+    min_side=0.05,
+    default_cap=0.03,
+)
 
 
 def get_db_connection():
@@ -55,74 +67,20 @@ def get_fixture_context(fixture_id):
 
 
 def load_models():
-    global _MODELS
-    if _MODELS is None:
-        model_paths = get_goals_poisson_paths()
-        if os.path.exists(model_paths["home"]) and os.path.exists(model_paths["away"]):
-            home_model = CatBoostRegressor()
-            home_model.load_model(model_paths["home"])
-            away_model = CatBoostRegressor()
-            away_model.load_model(model_paths["away"])
-            _MODELS = {"type": "poisson", "home": home_model, "away": away_model}
-        else:
-            _MODELS = {"type": "heuristic"}
-    return _MODELS
+    model_paths = get_goals_poisson_paths()
+    return load_catboost_pair("goals_poisson", model_paths["home"], model_paths["away"]) or {"type": "heuristic"}
 
 
 def load_registry_entry(model_name):
-    if model_name in _REGISTRY_CACHE:
-        return _REGISTRY_CACHE[model_name]
-
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
-        cur.execute(
-            """
-            SELECT version, path, metadata_json
-            FROM v3_model_registry
-            WHERE name = %s AND is_active = 1
-            ORDER BY created_at DESC
-            LIMIT 1
-            """,
-            (model_name,),
-        )
-        row = cur.fetchone()
-    finally:
-        conn.close()
-
-    if not row:
-        _REGISTRY_CACHE[model_name] = None
-        return None
-
-    version, path, metadata_json = row
-    metadata = json.loads(metadata_json) if isinstance(metadata_json, str) else metadata_json
-    entry = {"version": version, "path": path, "metadata": metadata}
-    _REGISTRY_CACHE[model_name] = entry
-    return entry
+    return get_registry_entry(model_name)
 
 
 def load_league_models(league_id):
-    if league_id in _LEAGUE_MODELS:
-        return _LEAGUE_MODELS[league_id]
-
-    entry = load_registry_entry(f"league_goals_ou_{league_id}")
+    model_name = f"league_goals_ou_{league_id}"
+    entry = load_registry_entry(model_name)
     if not entry:
-        _LEAGUE_MODELS[league_id] = (None, None)
-        return _LEAGUE_MODELS[league_id]
-
-    model_paths = entry["metadata"].get("model_paths") or {}
-    home_path = model_paths.get("home")
-    away_path = model_paths.get("away")
-    if not home_path or not away_path or not os.path.exists(home_path) or not os.path.exists(away_path):
-        _LEAGUE_MODELS[league_id] = (None, entry)
-        return _LEAGUE_MODELS[league_id]
-
-    home_model = CatBoostRegressor()
-    home_model.load_model(home_path)
-    away_model = CatBoostRegressor()
-    away_model.load_model(away_path)
-    _LEAGUE_MODELS[league_id] = ({"type": "poisson", "home": home_model, "away": away_model}, entry)
-    return _LEAGUE_MODELS[league_id]
+        return None, None
+    return load_registry_catboost_pair(model_name, entry), entry
 
 
 def fetch_features_for_inference(fixture_id):
@@ -132,29 +90,15 @@ def fetch_features_for_inference(fixture_id):
         feature_row = pd.read_sql_query(feature_query, conn, params=(fixture_id,))
         if feature_row.empty:
             raise ValueError(f"Goals feature vector not found for fixture {fixture_id}.")
-        vector = normalize_feature_vector(json.loads(feature_row.iloc[0]["feature_vector"]))
-        return pd.DataFrame([vector], columns=GLOBAL_1X2_FEATURE_COLUMNS)
+        with observe_stage("GOALS_TOTAL", "feature_decode"):
+            return normalize_feature_vector(json.loads(feature_row.iloc[0]["feature_vector"]))
     finally:
         conn.close()
 
 
 def build_prediction(fixture_id, h_mu, a_mu, model_version, model_scope, is_shadow=False):
     total_mu = h_mu + a_mu
-    probabilities = {}
-    total_prob = 0.0
-    for k in range(11):
-        prob = poisson_prob(total_mu, k)
-        probabilities[k] = prob
-        total_prob += prob
-    for k in probabilities:
-        probabilities[k] /= max(0.0001, total_prob)
-
-    lines = [1.5, 2.5, 3.5, 4.5]
-    over_under = {}
-    for line in lines:
-        prob_under = sum(p for k, p in probabilities.items() if k < line)
-        over_under[f"Over {line}"] = float(1.0 - prob_under)
-        over_under[f"Under {line}"] = float(prob_under)
+    over_under = total_markets([total_mu], GOALS_MAX_TOTAL, GOALS_LINES)[0]
 
     return {
         "fixture_id": fixture_id,
@@ -169,110 +113,43 @@ def build_prediction(fixture_id, h_mu, a_mu, model_version, model_scope, is_shad
 
 
 def apply_goals_adjustment(prediction, factor):
-    if not factor:
-        return None
-
-    base_total = float(prediction["expected_goals"]["total"])
-    base_home = float(prediction["expected_goals"]["home"])
-    base_away = float(prediction["expected_goals"]["away"])
-    total_delta = float(factor.get("recommended_total_goals_delta", 0.0))
-    cap = float(factor.get("recommended_adjustment_cap", 0.03))
-
-    if base_total <= 0:
-        return None
-
-    base_over_2_5 = float(prediction["over_under_probabilities"].get("Over 2.5", 0.0))
-    home_share = base_home / base_total if base_total > 0 else 0.5
-    away_share = base_away / base_total if base_total > 0 else 0.5
-
-    adjusted = None
-    applied_total_delta = 0.0
-    adjusted_over_2_5 = base_over_2_5
-    for scale in (1.0, 0.85, 0.7, 0.55, 0.4, 0.25, 0.1):
-        candidate_total = max(0.2, base_total + total_delta * scale)
-        candidate_home = max(0.05, candidate_total * home_share)
-        candidate_away = max(0.05, candidate_total * away_share)
-        candidate = build_prediction(
-            prediction["fixture_id"],
-            candidate_home,
-            candidate_away,
-            prediction["model_version"],
-            "league_adjusted_shadow",
-            is_shadow=True,
-        )
-        candidate_over_2_5 = float(candidate["over_under_probabilities"].get("Over 2.5", 0.0))
-        if abs(candidate_over_2_5 - base_over_2_5) <= cap + 1e-9:
-            adjusted = candidate
-            applied_total_delta = candidate_total - base_total
-            adjusted_over_2_5 = candidate_over_2_5
-            break
-
-    if adjusted is None:
-        adjusted = build_prediction(
-            prediction["fixture_id"],
-            base_home,
-            base_away,
-            prediction["model_version"],
-            "league_adjusted_shadow",
-            is_shadow=True,
-        )
-
-    adjusted["adjustment_context"] = {
-        "market": "goals_ou",
-        "league_id": factor["league_id"],
-        "league_name": factor["league_name"],
-        "window": factor.get("window"),
-        "style_metrics": factor.get("style_metrics", {}),
-        "indices": factor.get("indices", {}),
-        "recommended_total_goals_delta": total_delta,
-        "recommended_over_2_5_delta": float(factor.get("recommended_over_2_5_delta", 0.0)),
-        "recommended_adjustment_cap": cap,
-        "applied_total_goals_delta": applied_total_delta,
-        "applied_over_2_5_delta": adjusted_over_2_5 - base_over_2_5,
-    }
-    return adjusted
+    return apply_total_adjustments([prediction], [factor], GOALS_ADJUSTMENT, build_prediction)[0]
 
 
-def _get_goals_poisson_mu(df, model_data):
-    h_mu = max(0.05, float(model_data["home"].predict(df)[0]))
-    a_mu = max(0.05, float(model_data["away"].predict(df)[0]))
-    return h_mu, a_mu
+def _get_goals_poisson_mu(vectors, model_data):
+    """(home, away) expected goals for each vector, one call per model."""
+    with observe_stage("GOALS_TOTAL", "scoring"):
+        home = np.maximum(0.05, predict(model_data["home"], vectors, GLOBAL_1X2_FEATURE_COLUMNS))
+        away = np.maximum(0.05, predict(model_data["away"], vectors, GLOBAL_1X2_FEATURE_COLUMNS))
+    return list(zip(home.tolist(), away.tolist()))
 
-def _get_goals_heuristic_mu(df):
-    h_mu = max(0.2, float(df.iloc[0].get("mom_xg_f_h5", 1.2)))
-    a_mu = max(0.2, float(df.iloc[0].get("mom_xg_f_a5", 1.0)))
+def _get_goals_heuristic_mu(vector):
+    h_mu = max(0.2, float(vector.get("mom_xg_f_h5", 1.2)))
+    a_mu = max(0.2, float(vector.get("mom_xg_f_a5", 1.0)))
     return h_mu, a_mu
 
-def predict_total_goals(fixture_id):
-    context = get_fixture_context(fixture_id)
-    df = fetch_features_for_inference(fixture_id)
-    model_data = load_models()
-
-    if model_data["type"] == "poisson":
-        h_mu, a_mu = _get_goals_poisson_mu(df, model_data)
-        global_entry = load_registry_entry("global_goals_ou")
-        global_prediction = build_prediction(
-            fixture_id,
-            h_mu,
-            a_mu,
-            global_entry["version"] if global_entry else "global_goals_poisson",
-            "global",
-        )
-    else:
-        h_mu, a_mu = _get_goals_heuristic_mu(df)
-        fallback = build_prediction(fixture_id, h_mu, a_mu, "dynamic_heuristic_v1", "fallback")
-        fallback["prediction_status"] = "success_fallback"
-        fallback["is_fallback"] = True
-        return fallback
+def _goals_fallback(fixture_id, vector):
+    h_mu, a_mu = _get_goals_heuristic_mu(vector)
+    fallback = build_prediction(fixture_id, h_mu, a_mu, "dynamic_heuristic_v1", "fallback")
+    fallback["prediction_status"] = "success_fallback"
+    fallback["is_fallback"] = True
+    return fallback
+
+def _assemble_goals_prediction(fixture_id, context, global_mu, global_entry, league_scored):
+    global_prediction = build_prediction(
+        fixture_id,
+        *global_mu,
+        global_entry["version"] if global_entry else "global_goals_poisson",
+        "global",
+    )
 
     policy_mode = get_market_policy_for_league("goals_ou", context["league_id"])
     adjustment_factor = get_market_adjustment_factor("goals_ou", context["league_id"])
     adjusted_global_prediction = apply_goals_adjustment(global_prediction, adjustment_factor)
-    
-    league_model_data, league_entry = load_league_models(context["league_id"])
+
     league_prediction = None
-    if league_model_data is not None:
-        lh_mu, la_mu = _get_goals_poisson_mu(df, league_model_data)
+    if league_scored is not None:
+        (lh_mu, la_mu), league_entry = league_scored
         league_prediction = build_prediction(
             fixture_id,
             lh_mu,
@@ -299,18 +176,41 @@ def predict_total_goals(fixture_id):
             "without_adjustment": global_prediction,
             "with_league_adjustment": adjusted_global_prediction,
         }
-    
+
     return result
 
-    if adjusted_global_prediction is not None:
-        result = dict(global_prediction)
-        result["adjustment_evaluation"] = {
-            "without_adjustment": global_prediction,
-            "with_league_adjustment": adjusted_global_prediction,
-        }
-        return result
+def predict_total_goals_batch(contexts, vectors):
+    """
+    Goals predictions for fixtures whose context and feature vector are already loaded
+    (``{fixture_id: ...}``). The global pair scores every fixture in one call and each
+    league pair scores its league's fixtures in one call.
+    """
+    fixture_ids = list(vectors)
+    model_data = load_models()
+    if model_data["type"] != "poisson":
+        return {fixture_id: _goals_fallback(fixture_id, vectors[fixture_id]) for fixture_id in fixture_ids}
+
+    global_mus = _get_goals_poisson_mu([vectors[fixture_id] for fixture_id in fixture_ids], model_data)
+    global_entry = load_registry_entry("global_goals_ou")
+    league_scored = {}
+    for league_id, league_fixture_ids in group_by_league(fixture_ids, contexts).items():
+        league_model_data, league_entry = load_league_models(league_id)
+        if league_model_data is None:
+            continue
+        league_mus = _get_goals_poisson_mu([vectors[fixture_id] for fixture_id in league_fixture_ids], league_model_data)
+        league_scored.update((fixture_id, (mu, league_entry)) for fixture_id, mu in zip(league_fixture_ids, league_mus))
 
-    return global_prediction
+    return {
+        fixture_id: _assemble_goals_prediction(
+            fixture_id, contexts[fixture_id], global_mu, global_entry, league_scored.get(fixture_id)
+        )
+        for fixture_id, global_mu in zip(fixture_ids, global_mus)
+    }
+
+def predict_total_goals(fixture_id):
+    context = get_fixture_context(fixture_id)
+    vector = fetch_features_for_inference(fixture_id)
+    return predict_total_goals_batch({fixture_id: context}, {fixture_id: vector})[fixture_id]
 
 
 if __name__ == "__main__":
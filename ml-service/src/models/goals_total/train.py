@@ -15,7 +15,7 @@ if ML_SERVICE_ROOT not in sys.path:
 
 from db_config import get_connection
 from feature_schema import GLOBAL_1X2_FEATURE_COLUMNS, GLOBAL_1X2_FEATURE_SCHEMA_VERSION
-from horizon_utils import filter_dataframe_by_horizon, normalize_horizon_type
+from horizon_utils import normalize_horizon_type
 from model_paths import get_goals_poisson_paths, with_horizon_suffix
 
 from dataset import fetch_goals_dataset
@@ -53,8 +53,7 @@ def run_training(horizon_type="FULL_HISTORICAL", activate=True):
     model_paths = with_horizon_suffix(get_goals_poisson_paths(), horizon_slug)
     os.makedirs(model_paths["dir"], exist_ok=True)
 
-    df = fetch_goals_dataset().sort_values('match_date')
-    df, horizon_window = filter_dataframe_by_horizon(df, "match_date", horizon_type)
+    df, horizon_window = fetch_goals_dataset(horizon_type=horizon_type)
     split_idx = int(len(df) * 0.8)
 
     features = list(GLOBAL_1X2_FEATURE_COLUMNS)
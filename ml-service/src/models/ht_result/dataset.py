@@ -11,21 +11,34 @@ if ML_SERVICE_ROOT not in sys.path:
 
 from db_config import get_connection
 from feature_schema import GLOBAL_1X2_FEATURE_COLUMNS, normalize_feature_vector
+from horizon_utils import resolve_horizon_sql, with_dataset_size
 
 
 def get_db_connection():
     return get_connection()
 
-def fetch_ht_dataset(include_process_features=False):
+def fetch_ht_dataset(include_process_features=False, horizon_type="FULL_HISTORICAL", league_id=None,
+                     min_date=None, max_date=None):
     """
     Fetches the dataset for HT_RESULT modeling.
     If include_process_features is True, returns dataset_v1 (Baseline + Process).
     If False, returns dataset_v0 (Baseline only, much larger history).
+    League, date bounds and the training horizon are applied in SQL; returns
+    ``(df, horizon_window)``.
     """
     conn = get_db_connection()
     
     # Base query for matches and targets
-    query = """
+    from_sql = """
+        FROM V3_Fixtures f
+        WHERE f.status_short = 'FT'
+          AND f.score_halftime_home IS NOT NULL
+          AND f.score_halftime_away IS NOT NULL
+    """
+    conditions, params, horizon_window = resolve_horizon_sql(
+        conn, horizon_type, from_sql, league_id=league_id, min_date=min_date, max_date=max_date
+    )
+    query = f"""
         SELECT 
             f.fixture_id,
             f.league_id,
@@ -35,41 +48,27 @@ def fetch_ht_dataset(include_process_features=False):
             f.away_team_id,
             f.score_halftime_home,
             f.score_halftime_away
-        FROM V3_Fixtures f
-        WHERE f.status_short = 'FT'
-          AND f.score_halftime_home IS NOT NULL
-          AND f.score_halftime_away IS NOT NULL
+        {from_sql}{conditions}
         ORDER BY f.date ASC
     """
     
     print("Fetching matches and targets...")
-    matches_df = pd.read_sql_query(query, conn)
+    matches_df = pd.read_sql_query(query, conn, params=params)
     matches_df['match_date'] = pd.to_datetime(matches_df['match_date'], utc=True)
     
     # Add target variables
     matches_df['target_ht_home_goals'] = matches_df['score_halftime_home'].astype(int)
     matches_df['target_ht_away_goals'] = matches_df['score_halftime_away'].astype(int)
     
-    # Load BASELINE_V1 Home
-    print("Loading BASELINE_V1 for Home teams...")
-    home_baseline = pd.read_sql_query("""
-        SELECT fixture_id, features_json as home_baseline_json
-        FROM V3_Team_Features_PreMatch
-        WHERE feature_set_id = 'BASELINE_V1' AND horizon_type = 'FULL_HISTORICAL'
-    """, conn)
-    
-    # Optimization: Filter to only the fixtures we need before parsing JSON
-    home_baseline = home_baseline[home_baseline['fixture_id'].isin(matches_df['fixture_id'])]
-    
-    # We need to distinguish home vs away baseline. We can join on fixture_id AND team_id.
-    # Actually, V3_Team_Features_PreMatch has team_id. Let's pull that.
-    
-    baseline_query = """
+    # Home and away rows are told apart by joining on (fixture_id, team_id).
+    print("Loading BASELINE_V1...")
+    baseline_query = f"""
         SELECT fixture_id, team_id, features_json
         FROM V3_Team_Features_PreMatch
         WHERE feature_set_id = 'BASELINE_V1' AND horizon_type = 'FULL_HISTORICAL'
+          AND fixture_id IN (SELECT f.fixture_id {from_sql}{conditions})
     """
-    baseline_df = pd.read_sql_query(baseline_query, conn)
+    baseline_df = pd.read_sql_query(baseline_query, conn, params=params)
     
     # Parse JSON
     print("Parsing BASELINE_V1 JSON...")
@@ -115,12 +114,13 @@ def fetch_ht_dataset(include_process_features=False):
     
     if include_process_features:
         print("Loading PROCESS_V1 features...")
-        process_query = """
+        process_query = f"""
             SELECT fixture_id, team_id, features_json
             FROM V3_Team_Features_PreMatch
             WHERE feature_set_id = 'PROCESS_V1' AND horizon_type = 'FULL_HISTORICAL'
+              AND fixture_id IN (SELECT f.fixture_id {from_sql}{conditions})
         """
-        process_df = pd.read_sql_query(process_query, conn)
+        process_df = pd.read_sql_query(process_query, conn, params=params)
         
         print("Parsing PROCESS_V1 JSON...")
         process_parsed = pd.json_normalize(process_df['features_json'].apply(json.loads))
@@ -156,16 +156,27 @@ def fetch_ht_dataset(include_process_features=False):
     conn.close()
     
     print(f"Final dataset shape: {matches_df.shape}")
-    return matches_df
+    return matches_df, with_dataset_size(horizon_window, matches_df)
 
 
-def fetch_ht_dataset_v2():
+def fetch_ht_dataset_v2(horizon_type="FULL_HISTORICAL", league_id=None, min_date=None, max_date=None):
     """
-    Fetches the HT dataset from the enriched feature store v2.
+    Fetches the HT dataset from the enriched feature store v2, bounded in SQL;
+    returns ``(df, horizon_window)``.
     """
     conn = get_db_connection()
     try:
-        query = """
+        from_sql = """
+            FROM V3_Fixtures f
+            JOIN V3_ML_Feature_Store fs ON f.fixture_id = fs.fixture_id
+            WHERE f.status_short IN ('FT', 'AET', 'PEN')
+              AND f.score_halftime_home IS NOT NULL
+              AND f.score_halftime_away IS NOT NULL
+        """
+        conditions, params, horizon_window = resolve_horizon_sql(
+            conn, horizon_type, from_sql, league_id=league_id, min_date=min_date, max_date=max_date
+        )
+        query = f"""
             SELECT
                 f.fixture_id,
                 f.league_id,
@@ -173,14 +184,10 @@ def fetch_ht_dataset_v2():
                 f.score_halftime_home,
                 f.score_halftime_away,
                 fs.feature_vector
-            FROM V3_Fixtures f
-            JOIN V3_ML_Feature_Store fs ON f.fixture_id = fs.fixture_id
-            WHERE f.status_short IN ('FT', 'AET', 'PEN')
-              AND f.score_halftime_home IS NOT NULL
-              AND f.score_halftime_away IS NOT NULL
+            {from_sql}{conditions}
             ORDER BY f.date ASC
         """
-        df = pd.read_sql_query(query, conn)
+        df = pd.read_sql_query(query, conn, params=params)
         df['match_date'] = pd.to_datetime(df['match_date'], utc=True)
         raw_features = df['feature_vector'].apply(json.loads).tolist()
         feature_frame = pd.DataFrame(
@@ -190,13 +197,13 @@ def fetch_ht_dataset_v2():
         df = pd.concat([df.drop(columns=['feature_vector']), feature_frame], axis=1)
         df['target_ht_home_goals'] = df['score_halftime_home'].astype(int)
         df['target_ht_away_goals'] = df['score_halftime_away'].astype(int)
-        return df
+        return df, with_dataset_size(horizon_window, df)
     finally:
         conn.close()
 
 if __name__ == "__main__":
-    df_v0 = fetch_ht_dataset(include_process_features=False)
+    df_v0, _ = fetch_ht_dataset(include_process_features=False)
     print(f"✅ V0 Dataset ready (BASELINE only): {df_v0.shape[0]} matches")
     
-    df_v1 = fetch_ht_dataset(include_process_features=True)
+    df_v1, _ = fetch_ht_dataset(include_process_features=True)
     print(f"✅ V1 Dataset ready (BASELINE + PROCESS): {df_v1.shape[0]} matches")
@@ -3,7 +3,6 @@ import json
 import math
 import numpy as np
 import pandas as pd
-from catboost import CatBoostRegressor
 import sys
 
 MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -14,31 +13,24 @@ if ML_SERVICE_ROOT not in sys.path:
 from db_config import get_connection
 from feature_schema import GLOBAL_1X2_FEATURE_COLUMNS, normalize_feature_vector
 from model_paths import get_ht_poisson_paths
-from src.models.model_utils import get_logger, poisson_prob
+from src.models.model_cache import load_catboost_pair
+from src.models.model_utils import get_logger
+from src.models.native_scoring import predict
+from src.models.poisson_markets import score_markets
+from src.monitoring.metrics import observe_stage
 
 logger = get_logger(__name__)
 
-# Global cache for loaded models
-_MODELS = {}
+HT_V0_COLUMNS = ['league_id', 'diff_elo', 'diff_points', 'diff_rank', 'diff_lineup_strength', 'home_b_elo', 'away_b_elo', 'home_b_lineup_strength_v1', 'away_b_lineup_strength_v1']
+HT_V1_COLUMNS = HT_V0_COLUMNS + ['diff_possession_l5', 'diff_control_l5', 'home_p_possession_avg_5', 'away_p_possession_avg_5', 'home_p_control_index_5', 'away_p_control_index_5']
 
 def get_db_connection():
     return get_connection()
 
 def load_models(version='v0'):
-    """Loads and caches the CatBoost models for a given version."""
-    if version not in _MODELS:
-        poisson_paths = get_ht_poisson_paths(version)
-        
-        if os.path.exists(poisson_paths["home"]) and os.path.exists(poisson_paths["away"]):
-            home_model = CatBoostRegressor()
-            home_model.load_model(poisson_paths["home"])
-            away_model = CatBoostRegressor()
-            away_model.load_model(poisson_paths["away"])
-            _MODELS[version] = {"type": "poisson", "home": home_model, "away": away_model}
-        else:
-            _MODELS[version] = {"type": "heuristic"}
-            
-    return _MODELS[version]
+    """Loads the CatBoost models for a given version through the shared model cache."""
+    poisson_paths = get_ht_poisson_paths(version)
+    return load_catboost_pair(f"ht_poisson_{version}", poisson_paths["home"], poisson_paths["away"]) or {"type": "heuristic"}
 
 
 def fetch_features_for_inference(fixture_id, include_process=False):
@@ -129,9 +121,7 @@ def fetch_features_for_inference(fixture_id, include_process=False):
             raise ValueError(f"Feature generation failed for {fixture_id}: {e}")
             
     conn.close()
-    cols_v0 = ['league_id', 'diff_elo', 'diff_points', 'diff_rank', 'diff_lineup_strength', 'home_b_elo', 'away_b_elo', 'home_b_lineup_strength_v1', 'away_b_lineup_strength_v1']
-    cols_v1 = cols_v0 + ['diff_possession_l5', 'diff_control_l5', 'home_p_possession_avg_5', 'away_p_possession_avg_5', 'home_p_control_index_5', 'away_p_control_index_5']
-    return pd.DataFrame([features], columns=cols_v1 if include_process else cols_v0)
+    return features
 
 
 def fetch_features_for_inference_v2(fixture_id):
@@ -141,8 +131,8 @@ def fetch_features_for_inference_v2(fixture_id):
         feature_row = pd.read_sql_query(feature_query, conn, params=(fixture_id,))
         if len(feature_row) == 0:
             raise ValueError(f"HT feature vector not found for fixture {fixture_id}.")
-        vector = normalize_feature_vector(json.loads(feature_row.iloc[0]["feature_vector"]))
-        return pd.DataFrame([vector], columns=GLOBAL_1X2_FEATURE_COLUMNS)
+        with observe_stage("HT_RESULT", "feature_decode"):
+            return normalize_feature_vector(json.loads(feature_row.iloc[0]["feature_vector"]))
     finally:
         conn.close()
 
@@ -157,47 +147,61 @@ def _get_ht_heuristic_mu(fixture_id, version):
     except Exception:
         return 0.5, 0.4
 
-def predict_ht_result(fixture_id, version='v0'):
+def _build_ht_result(fixture_id, h_mu, a_mu, model_data, version, probabilities, exact_scores):
+    is_model = model_data["type"] == "poisson"
+    return {
+        "fixture_id": fixture_id, "model_version": version if is_model else f"dynamic_heuristic_{version}",
+        "prediction_status": "success_model" if is_model else "success_fallback",
+        "is_fallback": not is_model,
+        "expected_goals_ht": {"home": float(h_mu), "away": float(a_mu)},
+        "probabilities_1n2": probabilities,
+        "exact_score_probabilities": exact_scores
+    }
+
+def predict_ht_result_batch(features_by_fixture, version='v2'):
     """
-    Predicts the half-time result for a given fixture.
-    Supports Poisson (.cbm) and heuristic fallbacks.
+    Half-time predictions for fixtures whose features are already loaded
+    (``{fixture_id: features}`` in the layout of ``version``). The Poisson pair scores
+    every fixture in one call and the markets are priced in one vectorized pass.
     """
+    fixture_ids = list(features_by_fixture)
     model_data = load_models(version)
-    
+
     if model_data["type"] == "poisson":
-        if version == 'v2':
-            df = fetch_features_for_inference_v2(fixture_id)
-        else:
-            df = fetch_features_for_inference(fixture_id, include_process=(version=='v1'))
-        h_mu = max(0.01, model_data["home"].predict(df)[0])
-        a_mu = max(0.01, model_data["away"].predict(df)[0])
-        res_version = version
+        columns = {'v2': GLOBAL_1X2_FEATURE_COLUMNS, 'v1': HT_V1_COLUMNS}.get(version, HT_V0_COLUMNS)
+        rows = [features_by_fixture[fixture_id] for fixture_id in fixture_ids]
+        with observe_stage("HT_RESULT", "scoring"):
+            h_mus = np.maximum(0.01, predict(model_data["home"], rows, columns))
+            a_mus = np.maximum(0.01, predict(model_data["away"], rows, columns))
     else:
-        h_mu, a_mu = _get_ht_heuristic_mu(fixture_id, version)
-        res_version = f"dynamic_heuristic_{version}"
-    
-    p_1, p_n, p_2 = 0.0, 0.0, 0.0
-    exact_scores = {}
-    max_goals = 5
-    for h in range(max_goals + 1):
-        for a in range(max_goals + 1):
-            prob = poisson_prob(h_mu, h) * poisson_prob(a_mu, a)
-            exact_scores[f"{h}-{a}"] = float(prob)
-            if h > a: p_1 += prob
-            elif h == a: p_n += prob
-            else: p_2 += prob
-                
-    total = max(0.0001, p_1 + p_n + p_2)
-    
+        mus = [_get_ht_heuristic_mu(fixture_id, version) for fixture_id in fixture_ids]
+        h_mus = np.array([mu[0] for mu in mus])
+        a_mus = np.array([mu[1] for mu in mus])
+
+    markets = score_markets(h_mus, a_mus, max_goals=5)
+    outcomes, exact_scores = markets.outcome_dicts(), markets.exact_scores()
     return {
-        "fixture_id": fixture_id, "model_version": res_version,
-        "prediction_status": "success_model" if model_data["type"] == "poisson" else "success_fallback",
-        "is_fallback": model_data["type"] != "poisson",
-        "expected_goals_ht": {"home": float(h_mu), "away": float(a_mu)},
-        "probabilities_1n2": {"1": float(p_1 / total), "N": float(p_n / total), "2": float(p_2 / total)},
-        "exact_score_probabilities": {k: float(v / total) for k, v in exact_scores.items()}
+        fixture_id: _build_ht_result(
+            fixture_id, h_mus[index], a_mus[index], model_data, version, outcomes[index], exact_scores[index]
+        )
+        for index, fixture_id in enumerate(fixture_ids)
     }
 
+def predict_ht_result(fixture_id, version='v0'):
+    """
+    Predicts the half-time result for a given fixture.
+    Supports Poisson (.cbm) and heuristic fallbacks.
+    """
+    model_data = load_models(version)
+
+    if model_data["type"] != "poisson":
+        features = None
+    elif version == 'v2':
+        features = fetch_features_for_inference_v2(fixture_id)
+    else:
+        features = fetch_features_for_inference(fixture_id, include_process=(version=='v1'))
+    return predict_ht_result_batch({fixture_id: features}, version)[fixture_id]
+
 if __name__ == "__main__":
     import sys
     # For testing: pass a fixture_id via CLI
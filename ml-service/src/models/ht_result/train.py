@@ -15,9 +15,10 @@ if ML_SERVICE_ROOT not in sys.path:
 
 from db_config import get_connection
 from feature_schema import GLOBAL_1X2_FEATURE_COLUMNS, GLOBAL_1X2_FEATURE_SCHEMA_VERSION
-from horizon_utils import filter_dataframe_by_horizon, normalize_horizon_type
+from horizon_utils import normalize_horizon_type
 from model_paths import get_ht_poisson_paths, with_horizon_suffix
-from src.models.model_utils import get_valid_cat_features, poisson_prob
+from src.models.model_utils import get_valid_cat_features
+from src.models.poisson_markets import result_probabilities
 
 # Import dataset loader
 from dataset import fetch_ht_dataset, fetch_ht_dataset_v2
@@ -53,26 +54,6 @@ def train_poisson_model(X_train, y_train, X_test, y_test, cat_features, label):
     
     return model, preds
 
-def calculate_1n2_probs(home_mu, away_mu, max_goals=5):
-    """
-    Calculate 1, N, 2 probabilities from Expected Goals using Poisson distribution.
-    """
-    p_1, p_n, p_2 = 0.0, 0.0, 0.0
-    
-    for h in range(max_goals + 1):
-        for a in range(max_goals + 1):
-            prob = poisson_prob(home_mu, h) * poisson_prob(away_mu, a)
-            if h > a:
-                p_1 += prob
-            elif h == a:
-                p_n += prob
-            else:
-                p_2 += prob
-                
-    # Normalize to 1 (to account for truncation at max_goals)
-    total = p_1 + p_n + p_2
-    return p_1 / total, p_n / total, p_2 / total
-
 def run_training(version='v0', horizon_type="FULL_HISTORICAL", activate=True):
     horizon_type = normalize_horizon_type(horizon_type)
     horizon_slug = horizon_type.lower()
@@ -82,10 +63,9 @@ def run_training(version='v0', horizon_type="FULL_HISTORICAL", activate=True):
     # 1. Load Data
     include_process = (version == 'v1')
     if version == 'v2':
-        df = fetch_ht_dataset_v2()
+        df, horizon_window = fetch_ht_dataset_v2(horizon_type=horizon_type)
     else:
-        df = fetch_ht_dataset(include_process_features=include_process)
-    df, horizon_window = filter_dataframe_by_horizon(df, "match_date", horizon_type)
+        df, horizon_window = fetch_ht_dataset(include_process_features=include_process, horizon_type=horizon_type)
     
     # 2. Define Features
     features = [
@@ -132,11 +112,8 @@ def run_training(version='v0', horizon_type="FULL_HISTORICAL", activate=True):
         elif h == a: y_true_1n2.append(1) # N
         else: y_true_1n2.append(2)        # 2
         
-    y_pred_probs = []
-    for h_mu, a_mu in zip(preds_home, preds_away):
-        p1, pn, p2 = calculate_1n2_probs(h_mu, a_mu)
-        y_pred_probs.append([p1, pn, p2])
-        
+    y_pred_probs = result_probabilities(preds_home, preds_away, max_goals=5)
+
     ll = log_loss(y_true_1n2, y_pred_probs)
     preds_classes = np.argmax(y_pred_probs, axis=1)
     acc = np.mean(preds_classes == y_true_1n2)
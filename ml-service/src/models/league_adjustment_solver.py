@@ -0,0 +1,160 @@
+"""
+Batched solver for the league style adjustment on over/under markets.
+
+A league factor recommends a shift of the expected match total, but the
+shift is only admissible while the reference "Over" line moves by at most
+``recommended_adjustment_cap``. The over probability is monotone in the
+expected total, so the largest admissible share of the recommended delta
+is found by bracket bisection on the truncated Poisson CDF (evaluated in
+closed form through the regularized incomplete gamma function), for every
+fixture of a batch at once, and the adjusted prediction is built a single
+time.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+from scipy.special import gammaincc
+
+
+SECTIONS = 16
+REFINEMENTS = 5
+CAP_TOLERANCE = 1e-9
+
+
+@dataclass(frozen=True)
+class TotalAdjustmentSpec:
+    market: str
+    unit: str
+    line: float
+    max_total: int
+    min_total: float
+    min_side: float
+    default_cap: float
+
+    @property
+    def expected_key(self):
+        return f"expected_{self.unit}"
+
+    @property
+    def over_key(self):
+        return f"Over {self.line}"
+
+    @property
+    def line_slug(self):
+        return str(self.line).replace(".", "_")
+
+
+def _over_probability(total_mu, spec: TotalAdjustmentSpec):
+    # P(X <= k) = Q(k + 1, mu); renormalized over 0..max_total like total_distribution.
+    under_k = math.ceil(spec.line) - 1
+    return 1.0 - gammaincc(under_k + 1, total_mu) / gammaincc(spec.max_total + 1, total_mu)
+
+
+def solve_total_adjustment(base_home, base_away, base_over, total_delta, cap, spec: TotalAdjustmentSpec):
+    """
+    Return ``(home_mu, away_mu, applied_total_delta)`` arrays for a batch.
+
+    Each fixture receives the largest fraction of ``total_delta`` whose
+    "Over" shift stays within ``cap``. Fixtures where no shift is admissible
+    keep their base means and an applied delta of zero.
+    """
+    base_home = np.asarray(base_home, dtype=np.float64)[:, None]
+    base_away = np.asarray(base_away, dtype=np.float64)[:, None]
+    base_over = np.asarray(base_over, dtype=np.float64)[:, None]
+    total_delta = np.asarray(total_delta, dtype=np.float64)[:, None]
+    limit = np.asarray(cap, dtype=np.float64)[:, None] + CAP_TOLERANCE
+
+    base_total = base_home + base_away
+    home_share = base_home / base_total
+    away_share = base_away / base_total
+
+    def candidate(scale):
+        total = np.maximum(spec.min_total, base_total + total_delta * scale)
+        home = np.maximum(spec.min_side, total * home_share)
+        away = np.maximum(spec.min_side, total * away_share)
+        return total, home, away
+
+    def admissible(scale):
+        _total, home, away = candidate(scale)
+        return np.abs(_over_probability(home + away, spec) - base_over) <= limit
+
+    # The Over shift grows monotonically with the scale, so each pass keeps the
+    # last admissible point of a SECTIONS-wide grid and narrows the bracket.
+    steps = np.arange(SECTIONS + 1) / SECTIONS
+    low = np.zeros((base_total.shape[0], 1))
+    width = 1.0
+    for _ in range(REFINEMENTS):
+        grid = np.minimum(low + width * steps[None, :], 1.0)
+        leading = np.cumprod(admissible(grid), axis=1).sum(axis=1, keepdims=True)
+        low = np.minimum(low + width * np.maximum(leading - 1, 0) / SECTIONS, 1.0)
+        width /= SECTIONS
+
+    total, home, away = candidate(low)
+    valid = admissible(low)
+    return (
+        np.where(valid, home, base_home)[:, 0],
+        np.where(valid, away, base_away)[:, 0],
+        np.where(valid, total - base_total, 0.0)[:, 0],
+    )
+
+
+def apply_total_adjustments(predictions, factors, spec: TotalAdjustmentSpec, build_prediction):
+    """
+    Apply league factors to a batch of over/under predictions.
+
+    ``build_prediction`` is the market's own payload builder. Returns one
+    adjusted shadow prediction per input, or ``None`` where no factor
+    applies, matching the single-fixture ``apply_*_adjustment`` contract.
+    """
+    delta_key = f"recommended_total_{spec.unit}_delta"
+    rows = [
+        index for index, (prediction, factor) in enumerate(zip(predictions, factors))
+        if factor and float(prediction[spec.expected_key]["total"]) > 0
+    ]
+    adjusted = [None] * len(predictions)
+    if not rows:
+        return adjusted
+
+    expected = [predictions[index][spec.expected_key] for index in rows]
+    base_over = [float(predictions[index]["over_under_probabilities"].get(spec.over_key, 0.0)) for index in rows]
+    total_deltas = [float(factors[index].get(delta_key, 0.0)) for index in rows]
+    caps = [float(factors[index].get("recommended_adjustment_cap", spec.default_cap)) for index in rows]
+    home_mu, away_mu, applied = solve_total_adjustment(
+        [float(item["home"]) for item in expected],
+        [float(item["away"]) for item in expected],
+        base_over,
+        total_deltas,
+        caps,
+        spec,
+    )
+
+    for position, index in enumerate(rows):
+        prediction, factor = predictions[index], factors[index]
+        result = build_prediction(
+            prediction["fixture_id"],
+            float(home_mu[position]),
+            float(away_mu[position]),
+            prediction["model_version"],
+            "league_adjusted_shadow",
+            is_shadow=True,
+        )
+        adjusted_over = float(result["over_under_probabilities"].get(spec.over_key, 0.0))
+        result["adjustment_context"] = {
+            "market": spec.market,
+            "league_id": factor["league_id"],
+            "league_name": factor["league_name"],
+            "window": factor.get("window"),
+            "style_metrics": factor.get("style_metrics", {}),
+            "indices": factor.get("indices", {}),
+            delta_key: total_deltas[position],
+            f"recommended_over_{spec.line_slug}_delta": float(factor.get(f"recommended_over_{spec.line_slug}_delta", 0.0)),
+            "recommended_adjustment_cap": caps[position],
+            f"applied_total_{spec.unit}_delta": float(applied[position]),
+            f"applied_over_{spec.line_slug}_delta": adjusted_over - base_over[position],
+        }
+        adjusted[index] = result
+    return adjusted
@@ -0,0 +1,234 @@
+"""
+Process-wide cache for loaded submodels.
+
+Entries are keyed by ``(name, version, path)``. File-backed models use the
+file modification times as version, registry-backed models use the
+``V3_Model_Registry`` version, so a retrained model always gets a new key.
+The cache is an LRU bounded by ``ML_MODEL_CACHE_MAX_MB`` (sized from the
+model files on disk) and loads every key at most once, outside the cache
+lock, publishing the model only once it is fully loaded.
+
+When the registry snapshot (``src.models.model_registry``) reports a version
+flip, the cache preloads the new model and only then drops the stale entry,
+so in-flight requests keep the complete old model and later requests get
+the complete new one.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import joblib
+
+from src.models.model_registry import get_registry, register_registry_listener
+from src.models.model_utils import get_logger
+
+logger = get_logger(__name__)
+
+MODEL_CACHE_MAX_MB = float(os.getenv("ML_MODEL_CACHE_MAX_MB", "2048"))
+
+
+class _CacheEntry:
+    __slots__ = ("model", "size_bytes")
+
+    def __init__(self, model, size_bytes):
+        self.model = model
+        self.size_bytes = size_bytes
+
+
+class ModelCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, loader, size_paths=(), supersede=False):
+        """
+        Return the model cached under ``key``, loading it with ``loader`` once.
+
+        With ``supersede`` the other versions cached under the same name are
+        dropped once the new one is in place.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.model
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry.model
+
+            try:
+                model = loader()
+                size_bytes = sum(os.path.getsize(path) for path in size_paths if path and os.path.exists(path))
+
+                with self._lock:
+                    self.misses += 1
+                    self._entries[key] = _CacheEntry(model, size_bytes)
+                    self._bytes += size_bytes
+                    if supersede:
+                        self._discard_locked(lambda other: other[0] == key[0] and other != key)
+                    self._evict_locked(keep=key)
+            finally:
+                # Also after a failed load, so a path that keeps failing leaves no lock behind.
+                with self._lock:
+                    if self._load_locks.get(key) is load_lock:
+                        del self._load_locks[key]
+        return model
+
+    def contains(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def names(self):
+        with self._lock:
+            return {key[0] for key in self._entries}
+
+    def discard(self, predicate):
+        with self._lock:
+            return self._discard_locked(predicate)
+
+    def clear(self):
+        return self.discard(lambda _key: True)
+
+    def _discard_locked(self, predicate):
+        stale = [key for key in self._entries if predicate(key)]
+        for key in stale:
+            self._bytes -= self._entries.pop(key).size_bytes
+        return len(stale)
+
+    def _evict_locked(self, keep):
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            if key == keep:
+                self._entries.move_to_end(key)
+                key = next(iter(self._entries))
+            self._bytes -= self._entries.pop(key).size_bytes
+            self.evictions += 1
+            logger.info(f"Evicted model {key[0]} ({key[1]}) from cache")
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else None,
+            }
+
+
+_CACHE = ModelCache(int(MODEL_CACHE_MAX_MB * 1024 * 1024))
+_REGISTRY_LOADERS = {}
+
+
+def get_model_cache():
+    return _CACHE
+
+
+def file_version(*paths):
+    return tuple(os.stat(path).st_mtime_ns for path in paths)
+
+
+def _load_catboost(path):
+    from catboost import CatBoostRegressor
+
+    model = CatBoostRegressor()
+    model.load_model(path)
+    return model
+
+
+def _catboost_pair_loader(home_path, away_path):
+    return lambda: {"type": "poisson", "home": _load_catboost(home_path), "away": _load_catboost(away_path)}
+
+
+def load_catboost_pair(name, home_path, away_path):
+    """Cached ``{"type": "poisson", "home", "away"}`` pair, or ``None`` if a file is missing."""
+    if not home_path or not away_path or not os.path.exists(home_path) or not os.path.exists(away_path):
+        return None
+    key = (name, file_version(home_path, away_path), (home_path, away_path))
+    return _CACHE.get(key, _catboost_pair_loader(home_path, away_path), size_paths=(home_path, away_path), supersede=True)
+
+
+def load_joblib_model(name, path):
+    """Cached joblib model, or ``None`` if the file is missing."""
+    if not path or not os.path.exists(path):
+        return None
+    key = (name, file_version(path), path)
+    return _CACHE.get(key, lambda: joblib.load(path), size_paths=(path,), supersede=True)
+
+
+def _registry_joblib_spec(entry):
+    path = entry["path"]
+    if not path or not os.path.exists(path):
+        return None
+    return path, lambda: joblib.load(path), (path,)
+
+
+def _registry_catboost_pair_spec(entry):
+    model_paths = (entry.get("metadata") or {}).get("model_paths") or {}
+    home_path, away_path = model_paths.get("home"), model_paths.get("away")
+    if not home_path or not away_path or not os.path.exists(home_path) or not os.path.exists(away_path):
+        return None
+    return (home_path, away_path), _catboost_pair_loader(home_path, away_path), (home_path, away_path)
+
+
+def _load_registry_model(name, entry, spec_builder):
+    _REGISTRY_LOADERS[name] = spec_builder
+    spec = spec_builder(entry)
+    if spec is None:
+        return None
+    path, loader, size_paths = spec
+    return _CACHE.get((name, entry["version"], path), loader, size_paths=size_paths)
+
+
+def load_registry_joblib(name, entry):
+    """Cached joblib model stored at a registry entry's ``path``."""
+    return _load_registry_model(name, entry, _registry_joblib_spec)
+
+
+def load_registry_catboost_pair(name, entry):
+    """Cached CatBoost pair listed in a registry entry's ``metadata.model_paths``."""
+    return _load_registry_model(name, entry, _registry_catboost_pair_spec)
+
+
+def _refresh_registry_models(changed):
+    """Preload the new versions of changed cached models, then drop the stale ones."""
+    registry = get_registry()
+    for name in changed & _CACHE.names():
+        entry = registry.get(name)
+        if entry is None or name not in _REGISTRY_LOADERS:
+            continue
+        started = time.time()
+        try:
+            _load_registry_model(name, entry, _REGISTRY_LOADERS[name])
+            logger.info(f"Preloaded {name} {entry['version']} in {time.time() - started:.2f}s")
+        except Exception as exc:
+            logger.error(f"Failed to preload {name} {entry['version']}: {exc}")
+
+    def is_stale(key):
+        if key[0] not in changed:
+            return False
+        entry = registry.get(key[0])
+        return entry is None or key[1] != entry["version"]
+
+    _CACHE.discard(is_stale)
+
+
+register_registry_listener(_refresh_registry_models)
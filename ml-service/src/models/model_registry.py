@@ -0,0 +1,186 @@
+"""
+In-memory snapshot of the active ``V3_Model_Registry`` entries.
+
+All active rows are loaded with a single query and indexed by model name and
+by ``(name, metadata.horizon)``, so inference lookups are plain dictionary
+reads. The snapshot is replaced as a whole, never mutated, so readers always
+see a consistent registry.
+
+``start_registry_listener`` keeps the snapshot fresh: it ``LISTEN``s on
+``model_registry_changed``, which the ``V3_Model_Registry`` trigger notifies
+whenever a trainer or ``activate_recommended_horizons`` writes the table,
+and reloads the snapshot once per notified transaction. It also reloads every
+``ML_MODEL_REGISTRY_POLL_SECONDS`` in case a notification was missed while
+the listening connection was down.
+"""
+
+import hashlib
+import json
+import os
+import select
+import threading
+from dataclasses import dataclass, field
+
+from db_config import get_connection
+from src.models.model_utils import get_logger
+
+logger = get_logger(__name__)
+
+REGISTRY_CHANNEL = "model_registry_changed"
+REGISTRY_POLL_SECONDS = float(os.getenv("ML_MODEL_REGISTRY_POLL_SECONDS", "60"))
+
+
+@dataclass(frozen=True)
+class RegistrySnapshot:
+    by_name: dict = field(default_factory=dict)
+    by_horizon: dict = field(default_factory=dict)
+    fingerprint: str = ""
+
+    def changed_names(self, other):
+        names = set(self.by_name) | set(other.by_name)
+        return {name for name in names if self.by_name.get(name) != other.by_name.get(name)}
+
+
+def fetch_active_rows():
+    conn = get_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT name, version, path, metadata_json
+            FROM V3_Model_Registry
+            WHERE is_active = 1
+            ORDER BY name, created_at DESC
+            """
+        )
+        rows = cur.fetchall()
+        cur.close()
+    finally:
+        conn.close()
+    return rows
+
+
+def build_snapshot(rows):
+    """Index registry rows, newest first per name, into a ``RegistrySnapshot``."""
+    by_name = {}
+    by_horizon = {}
+    for name, version, path, metadata_json in rows:
+        metadata = json.loads(metadata_json) if isinstance(metadata_json, str) else metadata_json
+        entry = {"version": version, "path": path, "metadata": metadata}
+        by_name.setdefault(name, entry)
+        horizon = (metadata or {}).get("horizon")
+        if horizon:
+            by_horizon.setdefault((name, horizon), entry)
+    versions = sorted((name, str(entry["version"])) for name, entry in by_name.items())
+    fingerprint = hashlib.sha1(json.dumps(versions).encode()).hexdigest()
+    return RegistrySnapshot(by_name, by_horizon, fingerprint)
+
+
+class ModelRegistry:
+    def __init__(self, fetch_rows=fetch_active_rows, poll_seconds=REGISTRY_POLL_SECONDS):
+        self.fetch_rows = fetch_rows
+        self.poll_seconds = poll_seconds
+        self._snapshot = None
+        self._refresh_lock = threading.Lock()
+        self._listeners = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def snapshot(self):
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._refresh_lock:
+                if self._snapshot is None:
+                    self._snapshot = build_snapshot(self.fetch_rows())
+                snapshot = self._snapshot
+        return snapshot
+
+    def get(self, name):
+        """Latest active entry ``{"version", "path", "metadata"}`` for ``name``, or ``None``."""
+        return self.snapshot().by_name.get(name)
+
+    def get_for_horizon(self, name, horizon):
+        return self.snapshot().by_horizon.get((name, horizon))
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def refresh(self):
+        """Reload the snapshot and notify listeners; returns the changed model names."""
+        with self._refresh_lock:
+            fresh = build_snapshot(self.fetch_rows())
+            previous, self._snapshot = self._snapshot, fresh
+        if previous is None:
+            return set()
+
+        changed = fresh.changed_names(previous)
+        if changed:
+            logger.info(f"Model registry changed for {sorted(changed)}")
+            for callback in list(self._listeners):
+                try:
+                    callback(changed)
+                except Exception as exc:
+                    logger.error(f"Model registry listener failed: {exc}")
+        return changed
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="model-registry-listener", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = get_connection()
+                conn.autocommit = True
+                conn.cursor().execute(f"LISTEN {REGISTRY_CHANNEL}")
+                self.refresh()
+                self._listen(conn)
+            except Exception as exc:
+                logger.warning(f"Model registry listener failed: {exc}")
+                self._stop.wait(self.poll_seconds)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    def _listen(self, conn):
+        while not self._stop.is_set():
+            ready, _, _ = select.select([conn], [], [], self.poll_seconds)
+            if ready:
+                conn.poll()
+                if not conn.notifies:
+                    continue
+                models = sorted({notify.payload for notify in conn.notifies})
+                conn.notifies.clear()
+                logger.info(f"Model registry notification for {models}")
+            self.refresh()
+
+
+_REGISTRY = ModelRegistry()
+
+
+def get_registry():
+    return _REGISTRY
+
+
+def get_registry_entry(name):
+    return _REGISTRY.get(name)
+
+
+def get_registry_entry_for_horizon(name, horizon):
+    return _REGISTRY.get_for_horizon(name, horizon)
+
+
+def register_registry_listener(callback):
+    """Call ``callback(changed_names)`` whenever active registry versions change."""
+    _REGISTRY.add_listener(callback)
+
+
+def start_registry_listener():
+    _REGISTRY.start()
+    return _REGISTRY
@@ -1,6 +1,4 @@
-import math
 import logging
-import numpy as np
 
 # Configure logging for the ML service
 logging.basicConfig(
@@ -15,8 +13,9 @@ def get_valid_cat_features(columns, cat_features=None):
     available = set(columns)
     return [feature for feature in (cat_features or []) if feature in available]
 
-
-def poisson_prob(mu, k):
-    if mu <= 0:
-        return 1.0 if k == 0 else 0.0
-    return (np.exp(-mu) * (mu ** k)) / math.factorial(k)
+def group_by_league(fixture_ids, contexts):
+    """{league_id: [fixture_id, ...]} in input order, from ``{fixture_id: context}``."""
+    groups = {}
+    for fixture_id in fixture_ids:
+        groups.setdefault(contexts[fixture_id]["league_id"], []).append(fixture_id)
+    return groups
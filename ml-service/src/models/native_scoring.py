@@ -0,0 +1,165 @@
+"""
+Scoring of CatBoost submodels without building pandas frames.
+
+Every inference path used to wrap its feature vector in
+``pd.DataFrame([vector], columns=...)`` only for CatBoost to convert it back
+into a float matrix; for a single fixture that round trip costs several times
+the tree evaluation itself. Here each model's feature order
+(``feature_names_``) and categorical feature indices are read once per loaded
+model object, the rows are laid out in that order in a C-contiguous float32
+array and handed straight to ``predict`` / ``predict_proba``.
+
+Models trained with categorical features (``league_id`` in the legacy
+Poisson pair) get a ``Pool`` instead, with those columns passed as the
+strings CatBoost hashed during training. Small batches are scored on one
+thread: for a handful of rows thread start-up costs more than it saves.
+
+Rows can be a feature dict, a list of dicts, a DataFrame or a 2-D array
+already in model order; missing or ``None`` values become NaN, the same as
+in the DataFrame path.
+"""
+
+import threading
+import weakref
+
+import numpy as np
+
+SINGLE_THREAD_MAX_ROWS = 256
+
+
+class ModelLayout:
+    __slots__ = ("feature_names", "cat_indices")
+
+    def __init__(self, feature_names, cat_indices):
+        self.feature_names = feature_names
+        self.cat_indices = cat_indices
+
+
+_layouts = {}
+_layouts_lock = threading.Lock()
+
+
+def _is_catboost(model):
+    return hasattr(model, "get_cat_feature_indices")
+
+
+def _default_names(names):
+    return all(str(name) == str(position) for position, name in enumerate(names))
+
+
+def _read_layout(model, columns):
+    names = list(getattr(model, "feature_names_", None) or [])
+    if not names or (columns is not None and _default_names(names)):
+        # Models fitted on bare arrays only know positional names.
+        names = list(columns or [])
+    if not names:
+        raise ValueError(f"{type(model).__name__} has no feature names and no columns were given")
+    cat_indices = tuple(int(index) for index in model.get_cat_feature_indices())
+    return ModelLayout(tuple(names), cat_indices)
+
+
+def model_layout(model, columns=None):
+    """
+    Feature order and categorical indices of ``model``, cached for the lifetime of the model object.
+
+    ``columns`` is part of the cache key: for a model fitted on a bare array they replace
+    the positional names, so a call without them must not fix the layout for later calls.
+    """
+    key = (id(model), None if columns is None else tuple(columns))
+    cached = _layouts.get(key)
+    if cached is not None and cached[0]() is model:
+        return cached[1]
+    layout = _read_layout(model, columns)
+
+    def _forget(_ref, key=key):
+        with _layouts_lock:
+            current = _layouts.get(key)
+            if current is not None and current[0] is _ref:
+                del _layouts[key]
+
+    with _layouts_lock:
+        _layouts[key] = (weakref.ref(model, _forget), layout)
+    return layout
+
+
+def _float_or_nan(value):
+    return np.nan if value is None else value
+
+
+def feature_matrix(rows, feature_names):
+    """Lay ``rows`` out as a C-contiguous float32 matrix with columns in ``feature_names`` order."""
+    if isinstance(rows, dict):
+        rows = [rows]
+    if isinstance(rows, np.ndarray):
+        matrix = rows.reshape(1, -1) if rows.ndim == 1 else rows
+        if matrix.shape[1] != len(feature_names):
+            raise ValueError(f"Expected {len(feature_names)} features, got {matrix.shape[1]}")
+        return np.ascontiguousarray(matrix, dtype=np.float32)
+    if hasattr(rows, "columns"):
+        return np.ascontiguousarray(rows[list(feature_names)].to_numpy(dtype=np.float32, na_value=np.nan))
+
+    matrix = np.empty((len(rows), len(feature_names)), dtype=np.float32)
+    for position, row in enumerate(rows):
+        matrix[position] = [_float_or_nan(row.get(name)) for name in feature_names]
+    return matrix
+
+
+def _category(value):
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return "nan"
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _model_input(model, rows, columns):
+    layout = model_layout(model, columns)
+    if not layout.cat_indices:
+        return feature_matrix(rows, layout.feature_names)
+
+    from catboost import Pool
+
+    if isinstance(rows, dict):
+        rows = [rows]
+    if hasattr(rows, "columns"):
+        rows = rows[list(layout.feature_names)].to_dict("records")
+    if isinstance(rows, np.ndarray):
+        rows = [dict(zip(layout.feature_names, row)) for row in np.atleast_2d(rows)]
+    cat_indices = set(layout.cat_indices)
+    data = [
+        [
+            _category(row.get(name)) if index in cat_indices else _float_or_nan(row.get(name))
+            for index, name in enumerate(layout.feature_names)
+        ]
+        for row in rows
+    ]
+    return Pool(data, cat_features=list(layout.cat_indices), feature_names=list(layout.feature_names))
+
+
+def _frame(rows, columns):
+    import pandas as pd
+
+    if isinstance(rows, dict):
+        rows = [rows]
+    if isinstance(rows, pd.DataFrame):
+        return rows if columns is None else rows[list(columns)]
+    return pd.DataFrame(rows, columns=columns)
+
+
+def _score(model, method, rows, columns):
+    if not _is_catboost(model):
+        return getattr(model, method)(_frame(rows, columns))
+    data = _model_input(model, rows, columns)
+    row_count = data.num_row() if hasattr(data, "num_row") else data.shape[0]
+    thread_count = 1 if row_count <= SINGLE_THREAD_MAX_ROWS else -1
+    return getattr(model, method)(data, thread_count=thread_count)
+
+
+def predict(model, rows, columns=None):
+    """``model.predict`` over ``rows``; one value per row."""
+    return np.asarray(_score(model, "predict", rows, columns))
+
+
+def predict_proba(model, rows, columns=None):
+    """``model.predict_proba`` over ``rows``; one row of class probabilities per row."""
+    return np.asarray(_score(model, "predict_proba", rows, columns))
@@ -0,0 +1,165 @@
+"""
+Vectorized Poisson market maths shared by every submodel.
+
+All helpers take arrays of expected counts (one entry per fixture) and
+return NumPy arrays, so a single call prices a whole batch of fixtures.
+Probabilities are computed in log space against a precomputed
+log-factorial table instead of calling ``math.factorial`` per value.
+
+Outcome columns are always ordered HOME, DRAW, AWAY (``"1"``, ``"N"``, ``"2"``).
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+
+OUTCOME_KEYS = ("1", "N", "2")
+HOME, DRAW, AWAY = 0, 1, 2
+
+_LOG_FACTORIAL = np.array([math.lgamma(k + 1) for k in range(64)])
+
+
+def _log_factorials(max_k: int) -> np.ndarray:
+    global _LOG_FACTORIAL
+    if max_k >= len(_LOG_FACTORIAL):
+        _LOG_FACTORIAL = np.array([math.lgamma(k + 1) for k in range(max_k + 1)])
+    return _LOG_FACTORIAL[: max_k + 1]
+
+
+def _as_mu_array(mu) -> np.ndarray:
+    return np.atleast_1d(np.asarray(mu, dtype=np.float64))
+
+
+def poisson_pmf_table(mu, max_k: int) -> np.ndarray:
+    """Return an ``(n, max_k + 1)`` array of ``P(X = k)`` for each mean in ``mu``.
+
+    Non-positive means collapse to a point mass at zero.
+    """
+    mu = _as_mu_array(mu)
+    positive = mu > 0
+    safe_mu = np.where(positive, mu, 1.0)
+    k = np.arange(max_k + 1)
+    log_pmf = np.log(safe_mu)[:, None] * k[None, :] - safe_mu[:, None] - _log_factorials(max_k)[None, :]
+    point_mass = (k == 0).astype(np.float64)
+    return np.where(positive[:, None], np.exp(log_pmf), point_mass[None, :])
+
+
+def _normalize_rows(values: np.ndarray) -> np.ndarray:
+    axes = tuple(range(1, values.ndim))
+    totals = values.sum(axis=axes, keepdims=True)
+    return values / np.where(totals > 0, totals, 1.0)
+
+
+def score_matrix(home_mu, away_mu, max_goals: int, normalize: bool = True) -> np.ndarray:
+    """Return ``(n, max_goals + 1, max_goals + 1)`` joint score probabilities.
+
+    ``matrix[i, h, a]`` is the probability of fixture ``i`` ending ``h-a``.
+    With ``normalize`` the truncated grid is rescaled to sum to one.
+    """
+    matrix = poisson_pmf_table(home_mu, max_goals)[:, :, None] * poisson_pmf_table(away_mu, max_goals)[:, None, :]
+    return _normalize_rows(matrix) if normalize else matrix
+
+
+def outcome_probabilities(matrix: np.ndarray) -> np.ndarray:
+    """Collapse score matrices into an ``(n, 3)`` HOME/DRAW/AWAY array."""
+    size = matrix.shape[-1]
+    home_mask = np.tri(size, size, -1, dtype=bool)
+    draw_mask = np.eye(size, dtype=bool)
+    away_mask = ~(home_mask | draw_mask)
+    return np.stack(
+        [matrix[:, home_mask].sum(axis=1), matrix[:, draw_mask].sum(axis=1), matrix[:, away_mask].sum(axis=1)],
+        axis=1,
+    )
+
+
+def result_probabilities(home_mu, away_mu, max_goals: int) -> np.ndarray:
+    """Shortcut for normalized HOME/DRAW/AWAY probabilities of a batch."""
+    return outcome_probabilities(score_matrix(home_mu, away_mu, max_goals))
+
+
+def top_exact_scores(matrix: np.ndarray, top_n: int | None = None) -> list[dict]:
+    """Return one ``{"h-a": probability}`` dict per fixture.
+
+    With ``top_n`` the dict holds the most likely scores in descending order,
+    otherwise every cell of the grid in home-major order.
+    """
+    size = matrix.shape[-1]
+    labels = [f"{h}-{a}" for h in range(size) for a in range(size)]
+    flat = matrix.reshape(matrix.shape[0], -1)
+    if top_n is None:
+        order = np.broadcast_to(np.arange(flat.shape[1]), flat.shape)
+    else:
+        order = np.argsort(-flat, axis=1, kind="stable")[:, :top_n]
+    picked = np.take_along_axis(flat, order, axis=1)
+    return [
+        {labels[idx]: float(prob) for idx, prob in zip(row_order, row_probs)}
+        for row_order, row_probs in zip(order, picked)
+    ]
+
+
+def total_distribution(total_mu, max_total: int) -> np.ndarray:
+    """Return normalized ``(n, max_total + 1)`` probabilities of the match total."""
+    return _normalize_rows(poisson_pmf_table(total_mu, max_total))
+
+
+def under_probabilities(distribution: np.ndarray, lines) -> np.ndarray:
+    """Return an ``(n, len(lines))`` array of ``P(total < line)``."""
+    lines = np.asarray(lines, dtype=np.float64)
+    k = np.arange(distribution.shape[1])
+    below = (k[None, :] < lines[:, None]).astype(np.float64)
+    return distribution @ below.T
+
+
+def over_under_dicts(under: np.ndarray, lines) -> list[dict]:
+    """Format an under-probability array as the ``"Over x"/"Under x"`` payload."""
+    return [
+        {
+            key: value
+            for line, prob_under in zip(lines, row)
+            for key, value in ((f"Over {line}", float(1.0 - prob_under)), (f"Under {line}", float(prob_under)))
+        }
+        for row in under
+    ]
+
+
+@dataclass(frozen=True)
+class ScoreMarkets:
+    matrix: np.ndarray
+    outcomes: np.ndarray
+    under: np.ndarray
+    lines: tuple
+
+    def outcome_dicts(self) -> list[dict]:
+        return [dict(zip(OUTCOME_KEYS, map(float, row))) for row in self.outcomes]
+
+    def over_under_dicts(self) -> list[dict]:
+        return over_under_dicts(self.under, self.lines)
+
+    def exact_scores(self, top_n: int | None = None) -> list[dict]:
+        return top_exact_scores(self.matrix, top_n)
+
+
+def score_markets(home_mu, away_mu, max_goals: int, lines=()) -> ScoreMarkets:
+    """Price 1X2, total-goal lines and exact scores for a batch in one pass."""
+    matrix = score_matrix(home_mu, away_mu, max_goals)
+    size = max_goals + 1
+    totals = np.add.outer(np.arange(size), np.arange(size)).ravel()
+    total_onehot = (totals[:, None] == np.arange(2 * max_goals + 1)[None, :]).astype(np.float64)
+    total_probs = matrix.reshape(matrix.shape[0], -1) @ total_onehot
+    lines = tuple(lines)
+    return ScoreMarkets(
+        matrix=matrix,
+        outcomes=outcome_probabilities(matrix),
+        under=under_probabilities(total_probs, lines),
+        lines=lines,
+    )
+
+
+def total_markets(total_mu, max_total: int, lines) -> list[dict]:
+    """Over/under payloads for a batch of expected match totals."""
+    lines = tuple(lines)
+    return over_under_dicts(under_probabilities(total_distribution(total_mu, max_total), lines), lines)
@@ -0,0 +1,167 @@
+"""
+Prometheus metrics for the ML service, exposed on ``GET /metrics``.
+
+Request metrics (latency per route, in-flight requests, DB queries per
+request) are recorded by ``MetricsMiddleware``. Master predictions are
+broken down per submodel into ``db_fetch`` (connections and queries, from
+``db_config.track_queries``), ``feature_decode`` and ``scoring`` stages.
+Cache sizes, hit rates and job states are read from their owners at scrape
+time through ``register_state_provider``.
+"""
+
+import time
+from contextlib import contextmanager
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from starlette.routing import Match
+
+from db_config import track_queries
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+REQUEST_LATENCY = Histogram(
+    "ml_http_request_duration_seconds",
+    "HTTP request latency by route.",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "ml_http_requests_in_progress",
+    "HTTP requests currently being served.",
+    ["method", "route"],
+)
+REQUEST_DB_QUERIES = Histogram(
+    "ml_http_request_db_queries",
+    "Database queries issued per HTTP request.",
+    ["route"],
+    buckets=QUERY_BUCKETS,
+)
+REQUEST_DB_CONNECTIONS = Histogram(
+    "ml_http_request_db_connections",
+    "Database connections opened per HTTP request.",
+    ["route"],
+    buckets=QUERY_BUCKETS,
+)
+PREDICTION_STAGE_LATENCY = Histogram(
+    "ml_prediction_stage_seconds",
+    "Master prediction latency per submodel and stage (db_fetch, feature_decode, scoring).",
+    ["model", "stage"],
+    buckets=STAGE_BUCKETS,
+)
+PREDICTION_MODEL_LATENCY = Histogram(
+    "ml_prediction_model_seconds",
+    "Total master prediction latency per submodel.",
+    ["model"],
+    buckets=LATENCY_BUCKETS,
+)
+PREDICTION_MODEL_ERRORS = Counter(
+    "ml_prediction_model_errors_total",
+    "Submodel failures during master predictions.",
+    ["model"],
+)
+
+_STATE_PROVIDERS = {}
+
+
+@contextmanager
+def observe_stage(model, stage):
+    """Time a ``feature_decode`` or ``scoring`` stage of ``model``."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        PREDICTION_STAGE_LATENCY.labels(model, stage).observe(time.perf_counter() - started)
+
+
+@contextmanager
+def observe_model(model):
+    """Time a whole submodel call and record its DB time as the ``db_fetch`` stage."""
+    started = time.perf_counter()
+    failed = False
+    with track_queries() as stats:
+        try:
+            yield
+        except Exception:
+            failed = True
+            raise
+        finally:
+            PREDICTION_MODEL_LATENCY.labels(model).observe(time.perf_counter() - started)
+            PREDICTION_STAGE_LATENCY.labels(model, "db_fetch").observe(stats["seconds"])
+            if failed:
+                PREDICTION_MODEL_ERRORS.labels(model).inc()
+
+
+def register_state_provider(name, provider):
+    """
+    Expose ``provider()`` as gauges at scrape time. The provider returns a
+    flat dict of numbers (``None`` values are skipped), exported as
+    ``ml_<name>_<key>``.
+    """
+    _STATE_PROVIDERS[name] = provider
+
+
+class _StateCollector:
+    def collect(self):
+        for name, provider in list(_STATE_PROVIDERS.items()):
+            try:
+                values = provider()
+            except Exception:
+                continue
+            for key, value in values.items():
+                if isinstance(value, bool):
+                    value = int(value)
+                if isinstance(value, (int, float)):
+                    yield GaugeMetricFamily(f"ml_{name}_{key}", f"{name} {key.replace('_', ' ')}.", value=value)
+
+
+REGISTRY.register(_StateCollector())
+
+
+def route_template(scope):
+    """Path template of the route matching ``scope`` (``/predict/fixture/{fixture_id}``)."""
+    app = scope.get("app")
+    for route in getattr(app, "routes", ()):
+        match, _child_scope = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, in-flight requests and DB usage per route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        route = route_template(scope)
+        in_progress = REQUESTS_IN_PROGRESS.labels(method, route)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            with track_queries() as stats:
+                await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            REQUEST_LATENCY.labels(method, route, str(status["code"])).observe(time.perf_counter() - started)
+            REQUEST_DB_QUERIES.labels(route).observe(stats["queries"])
+            REQUEST_DB_CONNECTIONS.labels(route).observe(stats["connections"])
+
+
+def render_metrics():
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,150 @@
+"""
+Opt-in cProfile profiling of individual prediction requests.
+
+Profiling is off unless ``ML_PROFILING=1``; when off the middleware is not
+installed and ``profile_request`` is a single context-variable lookup. When
+on, a request is profiled if it carries ``X-ML-Profile: 1`` or is drawn by
+``ML_PROFILE_SAMPLE_RATE`` (0..1). The profile covers the endpoint body in
+the worker thread (connection setup, ``pd.read_sql_query``, JSON decoding,
+CatBoost scoring) and is written to ``ML_PROFILE_DIR`` as ``<id>.prof``
+(loadable with ``pstats``/snakeviz) next to ``<id>.json`` with the route,
+fixture id and duration. Only the newest ``ML_PROFILE_KEEP`` profiles are
+kept; the profile id is returned in the ``X-ML-Profile-Id`` response header.
+"""
+
+import contextvars
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import re
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+from src.models.model_utils import get_logger
+
+logger = get_logger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+PROFILING_ENABLED = os.getenv("ML_PROFILING", "0") == "1"
+PROFILE_SAMPLE_RATE = float(os.getenv("ML_PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = Path(os.getenv("ML_PROFILE_DIR", str(BASE_DIR / "logs" / "profiles")))
+PROFILE_KEEP = int(os.getenv("ML_PROFILE_KEEP", "200"))
+PROFILE_HEADER = b"x-ml-profile"
+PROFILE_ID_HEADER = b"x-ml-profile-id"
+
+_PROFILE_ID = re.compile(r"^[0-9TZ]+_[a-z0-9_]+$")
+_REQUEST = contextvars.ContextVar("ml_profile_request", default=None)
+
+
+def _slug(route):
+    return re.sub(r"[^a-z0-9]+", "_", route.lower()).strip("_") or "root"
+
+
+def _prune(directory, keep):
+    profiles = sorted(directory.glob("*.prof"))
+    for path in profiles[:max(len(profiles) - keep, 0)]:
+        path.unlink(missing_ok=True)
+        path.with_suffix(".json").unlink(missing_ok=True)
+
+
+@contextmanager
+def profile_request(route, fixture_id=None, directory=None):
+    """Profile the enclosed block when the current request opted in."""
+    request = _REQUEST.get()
+    if request is None or not request["profile"]:
+        yield
+        return
+
+    directory = Path(directory or PROFILE_DIR)
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        duration_ms = (time.perf_counter() - started) * 1000.0
+        created_at = datetime.now(timezone.utc)
+        profile_id = f"{created_at.strftime('%Y%m%dT%H%M%S%fZ')}_{_slug(route)}"
+        if fixture_id is not None:
+            profile_id += f"_{fixture_id}"
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(str(directory / f"{profile_id}.prof"))
+            (directory / f"{profile_id}.json").write_text(json.dumps({
+                "id": profile_id,
+                "route": route,
+                "fixture_id": fixture_id,
+                "duration_ms": round(duration_ms, 2),
+                "trigger": request["trigger"],
+                "created_at": created_at.isoformat().replace("+00:00", "Z"),
+            }, indent=2))
+            _prune(directory, PROFILE_KEEP)
+            request["profile_id"] = profile_id
+        except OSError as exc:
+            logger.warning(f"Could not store profile {profile_id}: {exc}")
+
+
+def list_profiles(limit=50, directory=None):
+    directory = Path(directory or PROFILE_DIR)
+    if not directory.exists():
+        return []
+    profiles = []
+    for path in sorted(directory.glob("*.json"), reverse=True)[:limit]:
+        try:
+            profiles.append(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            continue
+    return profiles
+
+
+def profile_path(profile_id, directory=None):
+    """Path of a stored ``.prof`` file, or ``None`` for unknown or malformed ids."""
+    if not _PROFILE_ID.match(profile_id):
+        return None
+    path = Path(directory or PROFILE_DIR) / f"{profile_id}.prof"
+    return path if path.exists() else None
+
+
+def profile_summary(path, sort="cumulative", limit=40):
+    out = io.StringIO()
+    pstats.Stats(str(path), stream=out).strip_dirs().sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+class ProfilingMiddleware:
+    """Marks requests for profiling (header or sampling) and reports the stored profile id."""
+
+    def __init__(self, app, sample_rate=PROFILE_SAMPLE_RATE):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trigger = None
+        if dict(scope["headers"]).get(PROFILE_HEADER) in (b"1", b"true"):
+            trigger = "header"
+        elif self.sample_rate > 0 and random.random() < self.sample_rate:
+            trigger = "sample"
+        request = {"profile": trigger is not None, "trigger": trigger, "profile_id": None}
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start" and request["profile_id"]:
+                headers = list(message.get("headers", []))
+                headers.append((PROFILE_ID_HEADER, request["profile_id"].encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = _REQUEST.set(request)
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            _REQUEST.reset(token)
@@ -0,0 +1,200 @@
+"""
+Two-tier cache for master predictions (``/predict/fixture/{id}``).
+
+A prediction is keyed by ``(fixture_id, feature calculated_at, model
+fingerprint)``. The fingerprint covers the active registry versions, the
+global model files and the league policy/adjustment files, so a rebuilt
+feature row, a retrained or re-activated model or a new policy all produce a
+new key and the old entry is simply never read again.
+
+The first tier is an in-process LRU of ``ML_PREDICTION_CACHE_SIZE`` entries.
+The second tier is ``V3_Prediction_Cache`` in Postgres (one row per fixture),
+shared between workers and restarts; it can be turned off with
+``ML_PREDICTION_CACHE_DB=0``. Only predictions where every submodel
+succeeded are cached, so transient failures are retried on the next call.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from db_config import get_connection
+from league_adjustments import FACTORS_PATH
+from league_model_policy import POLICY_PATH
+from model_paths import (
+    get_cards_poisson_paths,
+    get_corners_poisson_paths,
+    get_ft_poisson_paths,
+    get_global_1x2_model_path,
+    get_goals_poisson_paths,
+    get_ht_poisson_paths,
+)
+from src.models.model_registry import get_registry, register_registry_listener
+from src.models.model_utils import get_logger
+
+logger = get_logger(__name__)
+
+PREDICTION_CACHE_SIZE = int(os.getenv("ML_PREDICTION_CACHE_SIZE", "5000"))
+PREDICTION_CACHE_DB = os.getenv("ML_PREDICTION_CACHE_DB", "1") != "0"
+
+
+def _versioned_files():
+    paths = [get_global_1x2_model_path(), POLICY_PATH, FACTORS_PATH]
+    for pair in (
+        get_ft_poisson_paths(),
+        get_ht_poisson_paths("v2"),
+        get_corners_poisson_paths("v2"),
+        get_cards_poisson_paths("v2"),
+        get_goals_poisson_paths(),
+    ):
+        paths.extend([pair["home"], pair["away"]])
+    return paths
+
+
+def model_fingerprint():
+    """Digest of every model and policy version a master prediction depends on."""
+    stamps = [
+        [path, os.stat(path).st_mtime_ns if os.path.exists(path) else None]
+        for path in _versioned_files()
+    ]
+    payload = json.dumps([get_registry().snapshot().fingerprint, stamps])
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def fetch_feature_version(fixture_id):
+    conn = get_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT MAX(calculated_at) FROM V3_ML_Feature_Store WHERE fixture_id = %s", (fixture_id,))
+        row = cur.fetchone()
+        cur.close()
+    finally:
+        conn.close()
+    return row[0].isoformat() if row and row[0] is not None else None
+
+
+def is_cacheable(result):
+    return bool(result.get("success")) and not any(
+        isinstance(model, dict) and "error" in model for model in result.get("models", {}).values()
+    )
+
+
+class PredictionCache:
+    def __init__(self, max_entries=PREDICTION_CACHE_SIZE, use_db=PREDICTION_CACHE_DB):
+        self.max_entries = max_entries
+        self.use_db = use_db
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.uncacheable = 0
+
+    def get_or_compute(self, fixture_id, compute):
+        """Return the cached prediction for the current versions, or ``compute(fixture_id)``."""
+        feature_version = fetch_feature_version(fixture_id)
+        if feature_version is None:
+            with self._lock:
+                self.uncacheable += 1
+            return compute(fixture_id)
+
+        cache_key = f"{feature_version}|{model_fingerprint()}"
+        with self._lock:
+            entry = self._entries.get(fixture_id)
+            if entry is not None and entry[0] == cache_key:
+                self._entries.move_to_end(fixture_id)
+                self.memory_hits += 1
+                return entry[1]
+
+        result = self._db_get(fixture_id, cache_key) if self.use_db else None
+        if result is not None:
+            with self._lock:
+                self.db_hits += 1
+            self._remember(fixture_id, cache_key, result)
+            return result
+
+        result = compute(fixture_id)
+        with self._lock:
+            self.misses += 1
+        if is_cacheable(result):
+            self._remember(fixture_id, cache_key, result)
+            if self.use_db:
+                self._db_put(fixture_id, cache_key, result)
+        return result
+
+    def _remember(self, fixture_id, cache_key, result):
+        with self._lock:
+            self._entries[fixture_id] = (cache_key, result)
+            self._entries.move_to_end(fixture_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _db_get(self, fixture_id, cache_key):
+        try:
+            conn = get_connection()
+            try:
+                cur = conn.cursor()
+                cur.execute(
+                    "SELECT result_json FROM V3_Prediction_Cache WHERE fixture_id = %s AND cache_key = %s",
+                    (fixture_id, cache_key),
+                )
+                row = cur.fetchone()
+                cur.close()
+            finally:
+                conn.close()
+        except Exception as exc:
+            logger.warning(f"Prediction cache read failed for {fixture_id}: {exc}")
+            return None
+        return json.loads(row[0]) if row else None
+
+    def _db_put(self, fixture_id, cache_key, result):
+        try:
+            conn = get_connection()
+            try:
+                cur = conn.cursor()
+                cur.execute(
+                    """
+                    INSERT INTO V3_Prediction_Cache (fixture_id, cache_key, result_json, created_at)
+                    VALUES (%s, %s, %s, CURRENT_TIMESTAMP)
+                    ON CONFLICT(fixture_id)
+                    DO UPDATE SET cache_key=excluded.cache_key, result_json=excluded.result_json, created_at=CURRENT_TIMESTAMP;
+                    """,
+                    (fixture_id, cache_key, json.dumps(result)),
+                )
+                conn.commit()
+                cur.close()
+            finally:
+                conn.close()
+        except Exception as exc:
+            logger.warning(f"Prediction cache write failed for {fixture_id}: {exc}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            hits = self.memory_hits + self.db_hits
+            lookups = hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "db_tier": self.use_db,
+                "memory_hits": self.memory_hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "uncacheable": self.uncacheable,
+                "hit_rate": hits / lookups if lookups else None,
+                "memory_hit_rate": self.memory_hits / lookups if lookups else None,
+            }
+
+
+_CACHE = PredictionCache()
+# Entries keyed on the old registry versions can never be hit again.
+register_registry_listener(lambda _names: _CACHE.clear())
+
+
+def get_prediction_cache():
+    return _CACHE
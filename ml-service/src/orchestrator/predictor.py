@@ -1,20 +1,46 @@
 import os
 import json
+import time
 from db_config import get_connection
+from feature_schema import normalize_feature_vector
+from psycopg2.extras import execute_values
 import traceback
 
 # Import our four submodels
-from src.models.cards_total.inference import predict_total_cards
-from src.models.corners_total.inference import predict_total_corners
-from src.models.ft_result.inference import predict_ft_result
-from src.models.goals_total.inference import predict_total_goals
-from src.models.ht_result.inference import predict_ht_result
+from src.models.cards_total.inference import predict_total_cards, predict_total_cards_batch
+from src.models.corners_total.inference import predict_total_corners, predict_total_corners_batch
+from src.models.ft_result.inference import predict_ft_result, predict_ft_result_batch
+from src.models.goals_total.inference import predict_total_goals, predict_total_goals_batch
+from src.models.ht_result.inference import predict_ht_result, predict_ht_result_batch
 from src.models.model_utils import get_logger
+from src.monitoring.metrics import observe_model
+from src.orchestrator.prediction_cache import get_prediction_cache
 
 logger = get_logger(__name__)
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
 
+CORE_MODELS = ["FT_RESULT", "HT_RESULT", "CORNERS_TOTAL", "CARDS_TOTAL", "GOALS_TOTAL"]
+
+# (model type, batch scorer over {fixture_id: context}/{fixture_id: vector}, single-fixture path);
+# same versions as generate_master_prediction.
+BATCH_SUBMODELS = [
+    ("FT_RESULT", predict_ft_result_batch, predict_ft_result),
+    ("HT_RESULT", lambda contexts, vectors: predict_ht_result_batch(vectors, version='v2'),
+     lambda fixture_id: predict_ht_result(fixture_id, version='v2')),
+    ("CORNERS_TOTAL", predict_total_corners_batch, predict_total_corners),
+    ("CARDS_TOTAL", predict_total_cards_batch, predict_total_cards),
+    ("GOALS_TOTAL", predict_total_goals_batch, predict_total_goals),
+]
+
+BATCH_OUTPUT_QUERY = """
+    INSERT INTO V3_Submodel_Outputs (fixture_id, team_id, model_type, prediction_json, calculated_at)
+    VALUES %s
+    ON CONFLICT(fixture_id, team_id, model_type)
+    DO UPDATE SET prediction_json=excluded.prediction_json, calculated_at=CURRENT_TIMESTAMP;
+"""
+BATCH_OUTPUT_TEMPLATE = "(%s, %s, %s, %s, CURRENT_TIMESTAMP)"
+
 def get_db_connection():
     return get_connection()
 
@@ -31,7 +57,9 @@ def save_to_submodel_outputs(fixture_id, model_type, prediction_dict):
         row = cur.fetchone()
         team_id = row[0] if row else 0
         
-        json_str = json.dumps(prediction_dict)
+        from src.risk.engine import prediction_json
+
+        json_str = prediction_json(prediction_dict)
         
         query = """
             INSERT INTO V3_Submodel_Outputs (fixture_id, team_id, model_type, prediction_json, calculated_at)
@@ -54,82 +82,184 @@ def is_persistable_model_prediction(prediction_dict):
         and not prediction_dict.get("is_fallback", False)
     )
 
-def generate_master_prediction(fixture_id):
+def generate_master_prediction(fixture_id, timings=None):
     """
     Calls all four CatBoost Poisson submodels, aggregates their JSON results,
     saves them to the DB, and returns the master unified dictionary.
+    When a `timings` dict is given, the seconds spent per model are recorded in it.
     """
     results = {
         "fixture_id": fixture_id,
         "success": True,
         "models": {}
     }
-    
-    # FT_RESULT
-    try:
-        res_ft = predict_ft_result(fixture_id)
-        results["models"]["FT_RESULT"] = res_ft
-        if is_persistable_model_prediction(res_ft):
-            save_to_submodel_outputs(fixture_id, "FT_RESULT", res_ft)
-    except Exception as e:
-        logger.error(f"Error in FT_RESULT model: {e}", exc_info=True)
-        results["models"]["FT_RESULT"] = {"error": str(e), "prediction_status": "error", "is_fallback": False}
-        
-    # HT_RESULT
-    try:
-        res_ht = predict_ht_result(fixture_id, version='v2')
-        results["models"]["HT_RESULT"] = res_ht
-        if is_persistable_model_prediction(res_ht):
-            save_to_submodel_outputs(fixture_id, "HT_RESULT", res_ht)
-    except Exception as e:
-        logger.error(f"Error in HT_RESULT model: {e}", exc_info=True)
-        results["models"]["HT_RESULT"] = {"error": str(e), "prediction_status": "error", "is_fallback": False}
-        
-    # CORNERS_TOTAL
-    try:
-        res_corners = predict_total_corners(fixture_id)
-        results["models"]["CORNERS_TOTAL"] = res_corners
-        if is_persistable_model_prediction(res_corners):
-            save_to_submodel_outputs(fixture_id, "CORNERS_TOTAL", res_corners)
-    except Exception as e:
-        logger.error(f"Error in CORNERS_TOTAL model: {e}", exc_info=True)
-        results["models"]["CORNERS_TOTAL"] = {"error": str(e), "prediction_status": "error", "is_fallback": False}
-        
-    # CARDS_TOTAL
-    try:
-        res_cards = predict_total_cards(fixture_id)
-        results["models"]["CARDS_TOTAL"] = res_cards
-        if is_persistable_model_prediction(res_cards):
-            save_to_submodel_outputs(fixture_id, "CARDS_TOTAL", res_cards)
-    except Exception as e:
-        logger.error(f"Error in CARDS_TOTAL model: {e}", exc_info=True)
-        results["models"]["CARDS_TOTAL"] = {"error": str(e), "prediction_status": "error", "is_fallback": False}
-        
-    # GOALS_TOTAL
-    try:
-        res_goals = predict_total_goals(fixture_id)
-        results["models"]["GOALS_TOTAL"] = res_goals
-        if is_persistable_model_prediction(res_goals):
-            save_to_submodel_outputs(fixture_id, "GOALS_TOTAL", res_goals)
-    except Exception as e:
-        logger.error(f"Error in GOALS_TOTAL model: {e}", exc_info=True)
-        results["models"]["GOALS_TOTAL"] = {"error": str(e), "prediction_status": "error", "is_fallback": False}
 
-    # Run Risk Engine (Fair Odds calculations) based on the newly saved outputs
+    submodels = [
+        ("FT_RESULT", lambda: predict_ft_result(fixture_id)),
+        ("HT_RESULT", lambda: predict_ht_result(fixture_id, version='v2')),
+        ("CORNERS_TOTAL", lambda: predict_total_corners(fixture_id)),
+        ("CARDS_TOTAL", lambda: predict_total_cards(fixture_id)),
+        ("GOALS_TOTAL", lambda: predict_total_goals(fixture_id)),
+    ]
+    for model_type, predict in submodels:
+        started = time.perf_counter()
+        try:
+            with observe_model(model_type):
+                res = predict()
+            results["models"][model_type] = res
+            if is_persistable_model_prediction(res):
+                save_to_submodel_outputs(fixture_id, model_type, res)
+        except Exception as e:
+            logger.error(f"Error in {model_type} model: {e}", exc_info=True)
+            results["models"][model_type] = {"error": str(e), "prediction_status": "error", "is_fallback": False}
+        if timings is not None:
+            timings[model_type] = time.perf_counter() - started
+
+    # Run Risk Engine (Fair Odds calculations) on the in-memory submodel outputs
+    started = time.perf_counter()
     try:
         from src.risk.engine import extract_and_save_fair_odds
-        extract_and_save_fair_odds(fixture_id)
+        extract_and_save_fair_odds(fixture_id, predictions=dict(results["models"]))
         results["models"]["RISK_ANALYSIS"] = {"success": True, "message": "Fair odds calculated and stored."}
     except Exception as e:
         results["models"]["RISK_ANALYSIS"] = {"error": str(e)}
+    if timings is not None:
+        timings["RISK_ANALYSIS"] = time.perf_counter() - started
         
     # If all core models failed, marking orchestrator as failed
-    core_models = ["FT_RESULT", "HT_RESULT", "CORNERS_TOTAL", "CARDS_TOTAL", "GOALS_TOTAL"]
-    if all("error" in results["models"].get(v, {}) for v in core_models):
+    if all("error" in results["models"].get(v, {}) for v in CORE_MODELS):
         results["success"] = False
         
     return results
 
+def load_batch_inputs(fixture_ids):
+    """
+    Contexts and normalized v2 feature vectors ({fixture_id: ...}) of the fixtures that
+    have a stored feature vector, read in one query.
+    """
+    conn = get_db_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT f.fixture_id, f.league_id, f.home_team_id, f.away_team_id, f.round, fs.feature_vector
+            FROM V3_Fixtures f
+            JOIN V3_ML_Feature_Store fs ON fs.fixture_id = f.fixture_id
+            WHERE f.fixture_id = ANY(%s)
+        """, (list(fixture_ids),))
+        rows = cur.fetchall()
+        cur.close()
+    finally:
+        conn.close()
+    contexts, vectors = {}, {}
+    for fixture_id, league_id, home_team_id, away_team_id, round_name, feature_vector in rows:
+        contexts[fixture_id] = {
+            "league_id": int(league_id),
+            "home_team_id": int(home_team_id),
+            "away_team_id": int(away_team_id),
+            "round": round_name or "",
+        }
+        vectors[fixture_id] = normalize_feature_vector(json.loads(feature_vector))
+    return contexts, vectors
+
+def save_batch_outputs(contexts, results):
+    """Upserts the persistable submodel outputs and their fair odds for a batch in one transaction."""
+    from src.risk.engine import compute_fair_odds, prediction_json, save_fair_odds
+
+    output_rows, odds_rows = [], []
+    for fixture_id, result in results.items():
+        for model_type, prediction in result["models"].items():
+            if is_persistable_model_prediction(prediction):
+                output_rows.append((fixture_id, contexts[fixture_id]["home_team_id"], model_type, prediction_json(prediction)))
+        odds_rows.extend(compute_fair_odds(fixture_id, result["models"]))
+    conn = get_db_connection()
+    try:
+        cur = conn.cursor()
+        if output_rows:
+            execute_values(cur, BATCH_OUTPUT_QUERY, output_rows, template=BATCH_OUTPUT_TEMPLATE, page_size=1000)
+        save_fair_odds(cur, odds_rows)
+        conn.commit()
+        cur.close()
+    finally:
+        conn.close()
+
+def generate_master_predictions(fixture_ids):
+    """
+    Multi-fixture path used by batch jobs: returns (results, timings), one
+    entry per fixture, where timings holds the seconds spent per model.
+
+    Contexts and feature vectors are read in one query, every submodel scores the
+    whole batch through its ``*_batch`` function, and outputs and fair odds are
+    written in one transaction. The time of a batch call is split evenly over its
+    fixtures. Fixtures without a stored feature vector, and every fixture of a
+    market whose batch call fails, go through the single-fixture path.
+    """
+    contexts, vectors = load_batch_inputs(fixture_ids)
+    batch_ids = [fixture_id for fixture_id in fixture_ids if fixture_id in vectors]
+    results = {fixture_id: {"fixture_id": fixture_id, "success": True, "models": {}} for fixture_id in batch_ids}
+    timings = {fixture_id: {} for fixture_id in batch_ids}
+
+    if batch_ids:
+        batch_contexts = {fixture_id: contexts[fixture_id] for fixture_id in batch_ids}
+        batch_vectors = {fixture_id: vectors[fixture_id] for fixture_id in batch_ids}
+        for model_type, predict_batch, predict_one in BATCH_SUBMODELS:
+            started = time.perf_counter()
+            try:
+                with observe_model(model_type):
+                    predictions = predict_batch(batch_contexts, batch_vectors)
+            except Exception as e:
+                logger.error(f"Batch {model_type} failed, scoring fixtures one by one: {e}", exc_info=True)
+                predictions = None
+            if predictions is not None:
+                share = (time.perf_counter() - started) / len(batch_ids)
+                for fixture_id in batch_ids:
+                    results[fixture_id]["models"][model_type] = predictions[fixture_id]
+                    timings[fixture_id][model_type] = share
+                continue
+            for fixture_id in batch_ids:
+                started = time.perf_counter()
+                try:
+                    with observe_model(model_type):
+                        results[fixture_id]["models"][model_type] = predict_one(fixture_id)
+                except Exception as e:
+                    logger.error(f"Error in {model_type} model: {e}", exc_info=True)
+                    results[fixture_id]["models"][model_type] = {"error": str(e), "prediction_status": "error", "is_fallback": False}
+                timings[fixture_id][model_type] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        try:
+            save_batch_outputs(contexts, results)
+            risk = {"success": True, "message": "Fair odds calculated and stored."}
+        except Exception as e:
+            logger.error(f"Failed to save batch outputs: {e}", exc_info=True)
+            risk = {"error": str(e)}
+        share = (time.perf_counter() - started) / len(batch_ids)
+        for fixture_id in batch_ids:
+            results[fixture_id]["models"]["RISK_ANALYSIS"] = dict(risk)
+            timings[fixture_id]["RISK_ANALYSIS"] = share
+            if all("error" in results[fixture_id]["models"].get(v, {}) for v in CORE_MODELS):
+                results[fixture_id]["success"] = False
+
+    ordered_results, ordered_timings = [], []
+    for fixture_id in fixture_ids:
+        if fixture_id not in results:
+            fixture_timings = {}
+            try:
+                results[fixture_id] = generate_master_prediction(fixture_id, timings=fixture_timings)
+            except Exception as e:
+                logger.error(f"Master prediction failed for {fixture_id}: {e}", exc_info=True)
+                results[fixture_id] = {"fixture_id": fixture_id, "success": False, "error": str(e), "models": {}}
+            timings[fixture_id] = fixture_timings
+        ordered_results.append(results[fixture_id])
+        ordered_timings.append(timings[fixture_id])
+    return ordered_results, ordered_timings
+
+def get_master_prediction(fixture_id):
+    """
+    Returns the master prediction from the prediction cache when neither the
+    fixture features nor any model changed, otherwise recomputes and stores it.
+    """
+    return get_prediction_cache().get_or_compute(fixture_id, generate_master_prediction)
+
 if __name__ == "__main__":
     import sys
     if len(sys.argv) > 1:
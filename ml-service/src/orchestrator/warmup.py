@@ -0,0 +1,173 @@
+"""
+Startup warmup for the prediction service.
+
+Loads the registry snapshot, the league policy and adjustment files and every
+model the predictor can reach into the shared model cache, then runs one
+dummy prediction per model so native libraries and lazily built model state
+are initialized before the first real request. ``ML_WARMUP`` selects the
+scope: ``all`` (default, global and league-specific models), ``global`` or
+``off``.
+"""
+
+import importlib
+import os
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from src.models import native_scoring
+from src.models.model_utils import get_logger
+
+logger = get_logger(__name__)
+
+WARMUP_MODE = os.getenv("ML_WARMUP", "all").strip().lower()
+
+# Registry name prefix -> (inference module, league loader) for league models; all of them
+# score GLOBAL_1X2_FEATURE_COLUMNS.
+LEAGUE_LOADERS = {
+    "league_1x2_ft_": ("src.models.ft_result.inference", "load_league_classifier"),
+    "league_cards_ou_": ("src.models.cards_total.inference", "load_league_models"),
+    "league_goals_ou_": ("src.models.goals_total.inference", "load_league_models"),
+}
+
+warmup_status = {
+    "mode": WARMUP_MODE,
+    "state": "pending",
+    "started_at": None,
+    "finished_at": None,
+    "duration_seconds": None,
+    "models": [],
+    "errors": [],
+}
+
+
+def is_ready():
+    return warmup_status["state"] in ("ready", "disabled")
+
+
+def _dummy_frame(model):
+    columns = getattr(model, "feature_names_in_", None)
+    if columns is None:
+        return None
+    columns = list(columns)
+    return pd.DataFrame([[0.0] * len(columns)], columns=columns)
+
+
+def _dummy_predict(model, columns=None):
+    if hasattr(model, "get_cat_feature_indices"):
+        # Same scoring path and columns as the inference modules, so the layout cached here is theirs.
+        layout = native_scoring.model_layout(model, columns)
+        score = native_scoring.predict_proba if hasattr(model, "predict_proba") else native_scoring.predict
+        score(model, {name: 0.0 for name in layout.feature_names}, columns)
+        return True
+    frame = _dummy_frame(model)
+    if frame is None:
+        return False
+    predict = getattr(model, "predict_proba", None) or model.predict
+    predict(frame)
+    return True
+
+
+def _step(name, action):
+    try:
+        return action()
+    except Exception as exc:
+        logger.warning(f"Warmup failed for {name}: {exc}")
+        warmup_status["errors"].append({"name": name, "error": str(exc)})
+        return None
+
+
+def _warm(name, loader, columns=None):
+    started = time.time()
+    model = loader()
+    if model is None or (isinstance(model, dict) and model.get("type") == "heuristic"):
+        return
+    parts = [model["home"], model["away"]] if isinstance(model, dict) else [model]
+    predicted = all([_dummy_predict(part, columns) for part in parts])
+    warmup_status["models"].append({
+        "name": name,
+        "dummy_prediction": predicted,
+        "seconds": round(time.time() - started, 3),
+    })
+
+
+def _global_models():
+    from feature_schema import GLOBAL_1X2_FEATURE_COLUMNS
+    from src.models.cards_total import inference as cards
+    from src.models.corners_total import inference as corners
+    from src.models.ft_result import inference as ft
+    from src.models.goals_total import inference as goals
+    from src.models.ht_result import inference as ht
+
+    # Same versions and feature columns as src.orchestrator.predictor.generate_master_prediction.
+    return [
+        ("global_1x2_classifier", ft.load_global_classifier, GLOBAL_1X2_FEATURE_COLUMNS),
+        ("ft_legacy_poisson", ft.load_legacy_poisson_models, ft.LEGACY_POISSON_COLUMNS),
+        ("ht_poisson_v2", lambda: ht.load_models("v2"), GLOBAL_1X2_FEATURE_COLUMNS),
+        ("corners_poisson_v2", corners.load_models, GLOBAL_1X2_FEATURE_COLUMNS),
+        ("cards_poisson_v2", cards.load_models, GLOBAL_1X2_FEATURE_COLUMNS),
+        ("goals_poisson", goals.load_models, GLOBAL_1X2_FEATURE_COLUMNS),
+    ]
+
+
+def _league_models(registry):
+    from feature_schema import GLOBAL_1X2_FEATURE_COLUMNS
+
+    models = []
+    for name in sorted(registry.snapshot().by_name):
+        for prefix, (module_name, loader_name) in LEAGUE_LOADERS.items():
+            if name.startswith(prefix) and name[len(prefix):].isdigit():
+                loader = getattr(importlib.import_module(module_name), loader_name)
+                league_id = int(name[len(prefix):])
+                models.append((
+                    name,
+                    lambda loader=loader, league_id=league_id: loader(league_id)[0],
+                    GLOBAL_1X2_FEATURE_COLUMNS,
+                ))
+    return models
+
+
+def run_warmup(mode=None):
+    """Preload registry, policy files and models; returns ``warmup_status``."""
+    mode = (mode or WARMUP_MODE).strip().lower()
+    warmup_status.update(mode=mode, models=[], errors=[])
+    if mode == "off":
+        warmup_status["state"] = "disabled"
+        return warmup_status
+
+    warmup_status.update(state="warming", started_at=datetime.now().isoformat())
+    started = time.time()
+
+    from league_adjustments import load_adjustment_factors
+    from league_model_policy import get_policy
+    from src.models.model_registry import get_registry
+
+    registry = get_registry()
+    _step("model_registry", registry.snapshot)
+    _step("league_model_policy", get_policy)
+    _step("league_adjustment_factors", load_adjustment_factors)
+
+    models = _step("global_models", _global_models) or []
+    if mode == "all":
+        models += _step("league_models", lambda: _league_models(registry)) or []
+    for name, loader, columns in models:
+        _step(name, lambda name=name, loader=loader, columns=columns: _warm(name, loader, columns))
+
+    warmup_status.update(
+        state="ready",
+        finished_at=datetime.now().isoformat(),
+        duration_seconds=round(time.time() - started, 3),
+    )
+    logger.info(
+        f"Warmup finished in {warmup_status['duration_seconds']}s: "
+        f"{len(warmup_status['models'])} models, {len(warmup_status['errors'])} errors"
+    )
+    return warmup_status
+
+
+def start_warmup(mode=None):
+    thread = threading.Thread(target=run_warmup, args=(mode,), name="model-warmup", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,359 @@
+"""
+Small DAG executor for the batch pipelines (features, ratings, training,
+league policy).
+
+A ``Stage`` declares its command, the stages it depends on and the inputs
+that determine its result (code files, table signatures, report files,
+plain values). Its fingerprint hashes those inputs together with the
+fingerprints of its dependencies, so a change anywhere upstream reaches every
+downstream stage. A stage whose fingerprint matches the last successful run
+recorded in the state file (and whose ``verify`` check, if any, still holds)
+is skipped.
+
+Ready stages run in parallel as child processes as long as their declared
+``resources`` (e.g. ``{"cpu": 4, "db": 1}``) fit in the budget; a failed
+stage blocks its dependents while independent branches keep going. The
+whole run is described by one report (per-stage status, reason, fingerprint,
+timings, return code and log) rewritten on every transition and archived
+when the run ends. A lock file keeps two runs from overlapping.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+from src.models.model_utils import get_logger
+
+logger = get_logger(__name__)
+
+SMALL_FILE_BYTES = 4 * 1024 * 1024
+
+
+def utc_now():
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+@dataclass(frozen=True)
+class FileInput:
+    """A file's content hash (``mtime``/size above 4 MB); missing files hash as ``None``."""
+    path: Path
+
+    @property
+    def key(self):
+        return f"file:{self.path}"
+
+    def value(self):
+        path = Path(self.path)
+        if not path.exists():
+            return None
+        stat = path.stat()
+        if stat.st_size > SMALL_FILE_BYTES:
+            return [stat.st_size, stat.st_mtime_ns]
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+@dataclass(frozen=True)
+class SqlInput:
+    """Result of a cheap signature query (row counts, max ids, max ``updated_at``)."""
+    name: str
+    query: str
+
+    @property
+    def key(self):
+        return f"sql:{self.name}"
+
+    def value(self):
+        from db_config import get_connection
+
+        conn = get_connection()
+        try:
+            cur = conn.cursor()
+            cur.execute(self.query)
+            row = cur.fetchone()
+            cur.close()
+            return [str(item) for item in row] if row else None
+        finally:
+            conn.close()
+
+
+@dataclass(frozen=True)
+class ValueInput:
+    name: str
+    data: object
+
+    @property
+    def key(self):
+        return f"value:{self.name}"
+
+    def value(self):
+        return self.data
+
+
+@dataclass
+class Stage:
+    name: str
+    command: object
+    deps: tuple = ()
+    inputs: tuple = ()
+    resources: dict = field(default_factory=lambda: {"cpu": 1})
+    verify: object = None
+
+    def resolve_command(self):
+        return list(self.command() if callable(self.command) else self.command)
+
+
+def stage_fingerprint(stage, dep_fingerprints, command):
+    payload = {
+        "command": command,
+        "inputs": {source.key: source.value() for source in stage.inputs},
+        "deps": {name: dep_fingerprints[name] for name in sorted(stage.deps)},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def select_stages(stages, targets=None):
+    """``targets`` and all their ancestors, in declaration order (all stages when ``targets`` is empty)."""
+    by_name = {stage.name: stage for stage in stages}
+    if not targets:
+        return list(stages)
+    unknown = [name for name in targets if name not in by_name]
+    if unknown:
+        raise ValueError(f"Unknown stages: {', '.join(unknown)}")
+    wanted = set()
+    pending = list(targets)
+    while pending:
+        name = pending.pop()
+        if name not in wanted:
+            wanted.add(name)
+            pending.extend(by_name[name].deps)
+    return [stage for stage in stages if stage.name in wanted]
+
+
+def validate_graph(stages):
+    names = {stage.name for stage in stages}
+    for stage in stages:
+        missing = [dep for dep in stage.deps if dep not in names]
+        if missing:
+            raise ValueError(f"Stage {stage.name} depends on undeclared stages: {', '.join(missing)}")
+    visiting, visited = set(), set()
+    by_name = {stage.name: stage for stage in stages}
+
+    def visit(name):
+        if name in visited:
+            return
+        if name in visiting:
+            raise ValueError(f"Dependency cycle through stage {name}")
+        visiting.add(name)
+        for dep in by_name[name].deps:
+            visit(dep)
+        visiting.discard(name)
+        visited.add(name)
+
+    for stage in stages:
+        visit(stage.name)
+
+
+class PipelineRunner:
+    def __init__(self, name, stages, state_path, report_path, log_dir, archive_dir=None, cwd=None,
+                 budget=None, force=(), dry_run=False, poll_seconds=1.0):
+        validate_graph(stages)
+        self.name = name
+        self.stages = list(stages)
+        self.state_path = Path(state_path)
+        self.report_path = Path(report_path)
+        self.log_dir = Path(log_dir)
+        self.archive_dir = Path(archive_dir) if archive_dir else None
+        self.cwd = cwd
+        self.budget = dict(budget or {"cpu": os.cpu_count() or 1})
+        self.force = set(force)
+        self.dry_run = dry_run
+        self.poll_seconds = poll_seconds
+        self.run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        self.report = None
+        self._processes = {}
+        self._lock = threading.Lock()
+
+    def _read_state(self):
+        if not self.state_path.exists():
+            return {}
+        try:
+            return json.loads(self.state_path.read_text())
+        except json.JSONDecodeError:
+            return {}
+
+    def _write_state(self, state):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        self.state_path.write_text(json.dumps(state, indent=2, sort_keys=True))
+
+    def _write_report(self):
+        self.report["updated_at"] = utc_now()
+        self.report_path.parent.mkdir(parents=True, exist_ok=True)
+        self.report_path.write_text(json.dumps(self.report, indent=2, default=str))
+
+    def _demand(self, stage):
+        """Declared resources, capped at the budget so an oversized stage still runs (alone)."""
+        return {key: min(amount, self.budget.get(key, amount)) for key, amount in stage.resources.items()}
+
+    def _fits(self, demand, in_use):
+        return all(in_use.get(key, 0) + amount <= self.budget.get(key, amount) for key, amount in demand.items())
+
+    def _execute(self, stage, command):
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        log_path = self.log_dir / f"{stage.name}.log"
+        with open(log_path, "ab", buffering=0) as log:
+            log.write(f"\n[{utc_now()}] START {' '.join(command)}\n".encode())
+            process = subprocess.Popen(command, cwd=self.cwd, stdout=log, stderr=subprocess.STDOUT,
+                                       stdin=subprocess.DEVNULL)
+            with self._lock:
+                self._processes[stage.name] = process
+            return_code = process.wait()
+            with self._lock:
+                self._processes.pop(stage.name, None)
+            log.write(f"[{utc_now()}] END code={return_code}\n".encode())
+        if return_code == 0 and stage.verify is not None and not stage.verify():
+            return return_code, "verification failed after a successful exit"
+        return return_code, None
+
+    def run(self):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.state_path.with_suffix(".lock"), "w") as lock_handle:
+            try:
+                fcntl.flock(lock_handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise RuntimeError(f"Another pipeline run holds {self.state_path.with_suffix('.lock')}")
+            try:
+                return self._run()
+            except BaseException:
+                with self._lock:
+                    for process in self._processes.values():
+                        process.terminate()
+                raise
+
+    def _run(self):
+        state = self._read_state()
+        by_name = {stage.name: stage for stage in self.stages}
+        self.report = {
+            "pipeline": self.name,
+            "run_id": self.run_id,
+            "status": "running",
+            "started_at": utc_now(),
+            "finished_at": None,
+            "budget": self.budget,
+            "dry_run": self.dry_run,
+            "stages": {stage.name: {"status": "pending", "deps": list(stage.deps)} for stage in self.stages},
+        }
+        self._write_report()
+        fingerprints = {}
+        outcome = {}
+        in_use = {}
+        running = {}
+        start_times = {}
+        started = time.time()
+
+        with ThreadPoolExecutor(max_workers=max(len(self.stages), 1)) as pool:
+            while len(outcome) < len(self.stages):
+                progressed = False
+                for stage in self.stages:
+                    if stage.name in outcome or stage.name in running.values():
+                        continue
+                    entry = self.report["stages"][stage.name]
+                    failed_deps = [dep for dep in stage.deps if outcome.get(dep) in ("failed", "blocked")]
+                    if failed_deps:
+                        outcome[stage.name] = "blocked"
+                        entry.update(status="blocked", reason=f"upstream failed: {', '.join(failed_deps)}")
+                        progressed = True
+                        continue
+                    if any(dep not in outcome for dep in stage.deps):
+                        continue
+
+                    if stage.name not in fingerprints:
+                        # Decided once, when the dependencies are done, so upstream outputs are visible.
+                        command = stage.resolve_command()
+                        fingerprints[stage.name] = stage_fingerprint(stage, fingerprints, command)
+                        entry.update(command=command, fingerprint=fingerprints[stage.name])
+                        previous = state.get(stage.name, {})
+                        if stage.name in self.force:
+                            entry["reason"] = "forced"
+                        elif previous.get("fingerprint") != fingerprints[stage.name]:
+                            entry["reason"] = "inputs changed" if previous else "never ran"
+                        elif stage.verify is not None and not stage.verify():
+                            entry["reason"] = "outputs missing or invalid"
+                        else:
+                            outcome[stage.name] = "skipped"
+                            entry.update(status="skipped", reason="up to date", last_success=previous.get("finished_at"))
+                            progressed = True
+                            continue
+                        if self.dry_run:
+                            outcome[stage.name] = "would_run"
+                            entry["status"] = "would_run"
+                            progressed = True
+                            continue
+
+                    demand = self._demand(stage)
+                    if not self._fits(demand, in_use):
+                        entry["status"] = "waiting"
+                        continue
+                    for key, amount in demand.items():
+                        in_use[key] = in_use.get(key, 0) + amount
+                    entry.update(status="running", started_at=utc_now(), log_path=str(self.log_dir / f"{stage.name}.log"))
+                    logger.info(f"▶️  {stage.name} ({entry['reason']})")
+                    start_times[stage.name] = time.time()
+                    running[pool.submit(self._execute, stage, entry["command"])] = stage.name
+                    progressed = True
+
+                self._write_report()
+                if len(outcome) == len(self.stages):
+                    break
+                if not running:
+                    if not progressed:
+                        raise RuntimeError("Pipeline is stuck: no stage can start")
+                    continue
+
+                done, _ = wait(running, timeout=self.poll_seconds, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    stage = by_name[name]
+                    for key, amount in self._demand(stage).items():
+                        in_use[key] -= amount
+                    entry = self.report["stages"][name]
+                    try:
+                        return_code, error = future.result()
+                    except Exception as exc:
+                        return_code, error = None, str(exc)
+                    entry.update(
+                        finished_at=utc_now(),
+                        return_code=return_code,
+                        duration_seconds=round(time.time() - start_times[name], 1),
+                    )
+                    if return_code == 0 and error is None:
+                        outcome[name] = "succeeded"
+                        entry["status"] = "succeeded"
+                        state[name] = {"fingerprint": fingerprints[name], "finished_at": entry["finished_at"]}
+                        self._write_state(state)
+                        logger.info(f"✅ {name} in {entry['duration_seconds']}s")
+                    else:
+                        outcome[name] = "failed"
+                        entry.update(status="failed", error=error or f"exit code {return_code}")
+                        logger.error(f"❌ {name} failed: {entry['error']}")
+
+        failed = sorted(name for name, status in outcome.items() if status in ("failed", "blocked"))
+        self.report.update(
+            status="failed" if failed else "completed",
+            finished_at=utc_now(),
+            duration_seconds=round(time.time() - started, 1),
+            summary={status: sorted(name for name, value in outcome.items() if value == status)
+                     for status in sorted(set(outcome.values()))},
+        )
+        self._write_report()
+        if self.archive_dir is not None and not self.dry_run:
+            self.archive_dir.mkdir(parents=True, exist_ok=True)
+            (self.archive_dir / f"{self.name}_{self.run_id}.json").write_text(json.dumps(self.report, indent=2, default=str))
+        return self.report
@@ -0,0 +1,184 @@
+"""
+Stage declarations for the batch pipelines, run by ``run_pipeline.py``.
+
+One graph covers the whole chain: ELO and standings from the fixtures,
+BASELINE_V1 / PROCESS_V1 team features, the global feature store, global
+training per market and horizon, league eligibility and metrics, league
+batch training per market and the league model policy. A named pipeline is
+a set of target stages; running it also runs (or skips, when up to date)
+every stage those targets depend on.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+from src.pipeline.dag import FileInput, SqlInput, Stage, ValueInput
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+REPORTS_DIR = BASE_DIR / "reports"
+ELIGIBILITY_REPORT_PATH = REPORTS_DIR / "league_specific_eligibility.json"
+BEST_PARAMS_PATH = REPORTS_DIR / "global_1x2_best_params_seed.json"
+
+HORIZONS = ["FULL_HISTORICAL", "5Y_ROLLING", "3Y_ROLLING"]
+HORIZON_SLUGS = {"FULL_HISTORICAL": "full", "5Y_ROLLING": "5y", "3Y_ROLLING": "3y"}
+DEFAULT_LEAGUE_IDS = [2, 11, 19, 15, 1, 34, 30, 32]
+
+FIXTURES = SqlInput(
+    "fixtures",
+    "SELECT COUNT(*), COUNT(*) FILTER (WHERE status_short = 'FT'), MAX(updated_at) FROM V3_Fixtures",
+)
+FIXTURE_STATS = SqlInput("fixture_stats", "SELECT COUNT(*), MAX(updated_at) FROM V3_Fixture_Stats")
+LINEUPS = SqlInput("lineups", "SELECT COUNT(*) FROM V3_Fixture_Lineups")
+PLAYER_STATS = SqlInput("player_stats", "SELECT COUNT(*) FROM V3_Player_Stats")
+SHARED_CODE = ("db_config.py", "feature_schema.py", "horizon_utils.py", "src/models/model_utils.py")
+
+# Market -> (training script, extra args, registry name of the activated FULL_HISTORICAL model).
+GLOBAL_MARKETS = {
+    "1x2": ("train_1x2.py", [], "global_1x2"),
+    "ht": ("src/models/ht_result/train.py", ["--version", "v2"], "global_ht_1x2"),
+    "goals": ("src/models/goals_total/train.py", [], "global_goals_ou"),
+    "corners": ("src/models/corners_total/train.py", ["--version", "v2"], "global_corners_ou"),
+    "cards": ("src/models/cards_total/train.py", ["--version", "v2"], "global_cards_ou"),
+}
+LEAGUE_MARKETS = ("1x2", "ht", "goals", "corners", "cards")
+
+
+def code(*paths):
+    return tuple(FileInput(BASE_DIR / path) for path in (*paths, *SHARED_CODE))
+
+
+def script(path, *args):
+    return [sys.executable, f"ml-service/{path}", *args]
+
+
+def registry_has_active(name):
+    def check():
+        from db_config import get_connection
+
+        conn = get_connection()
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1 FROM V3_Model_Registry WHERE name = %s AND is_active = 1 LIMIT 1", (name,))
+            found = cur.fetchone() is not None
+            cur.close()
+            return found
+        finally:
+            conn.close()
+    return check
+
+
+def feature_store_matches_schema():
+    from db_config import get_connection
+    from feature_schema import GLOBAL_1X2_FEATURE_COLUMNS, inspect_feature_vector
+
+    conn = get_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT feature_vector FROM V3_ML_Feature_Store ORDER BY calculated_at DESC NULLS LAST, fixture_id DESC LIMIT 1"
+        )
+        row = cur.fetchone()
+        cur.close()
+    finally:
+        conn.close()
+    if not row:
+        return False
+    issues = inspect_feature_vector(json.loads(row[0]), GLOBAL_1X2_FEATURE_COLUMNS)
+    return not issues["missing"] and not issues["extra"]
+
+
+def pick_leagues():
+    """Priority leagues of the eligibility report restricted to the supported set (all of it by default)."""
+    league_ids = []
+    if ELIGIBILITY_REPORT_PATH.exists():
+        report = json.loads(ELIGIBILITY_REPORT_PATH.read_text())
+        league_ids = [
+            int(row["league_id"]) for row in report.get("priority_leagues", [])
+            if row.get("league_id") in DEFAULT_LEAGUE_IDS
+        ]
+    return league_ids or DEFAULT_LEAGUE_IDS
+
+
+def global_training_stages():
+    stages = []
+    for market, (path, args, registry_name) in GLOBAL_MARKETS.items():
+        for horizon in HORIZONS:
+            command = script(path, *args)
+            inputs = code(path)
+            verify = None
+            if horizon == "FULL_HISTORICAL":
+                verify = registry_has_active(registry_name)
+            else:
+                command += ["--horizon", horizon, "--no-activate"]
+                if market == "1x2" and BEST_PARAMS_PATH.exists():
+                    command += ["--params-file", str(BEST_PARAMS_PATH), "--no-optuna"]
+                    inputs += (FileInput(BEST_PARAMS_PATH),)
+            stages.append(Stage(
+                f"train_{market}_{HORIZON_SLUGS[horizon]}", command, deps=("features",), inputs=inputs,
+                resources={"cpu": 4}, verify=verify,
+            ))
+    return stages
+
+
+def league_training_stages():
+    def command(market):
+        return lambda: script(f"train_{market}_league_batch.py", "--league-ids", *map(str, pick_leagues()))
+
+    return [
+        Stage(
+            f"league_{market}", command(market), deps=("eligibility",),
+            inputs=code(f"train_{market}_league.py", f"train_{market}_league_batch.py") + (FileInput(ELIGIBILITY_REPORT_PATH),),
+            resources={"cpu": 2, "db": 1},
+        )
+        for market in LEAGUE_MARKETS
+    ]
+
+
+def build_stages():
+    global_full = tuple(f"train_{market}_full" for market in GLOBAL_MARKETS)
+    return [
+        Stage("elo", script("ratings.py"), inputs=code("ratings.py") + (FIXTURES,), resources={"cpu": 1, "db": 1}),
+        Stage(
+            "standings", script("scripts/reconstruct_standings.py"),
+            inputs=code("scripts/reconstruct_standings.py") + (FIXTURES,), resources={"cpu": 1, "db": 1},
+        ),
+        Stage(
+            "baseline", script("scripts/generate_baseline_features.py"), deps=("elo", "standings"),
+            inputs=code("scripts/generate_baseline_features.py", "player_performance.py") + (LINEUPS, PLAYER_STATS), resources={"cpu": 2, "db": 1},
+        ),
+        Stage(
+            "process", script("scripts/generate_process_features.py"),
+            inputs=code("scripts/generate_process_features.py") + (FIXTURES, FIXTURE_STATS), resources={"cpu": 2, "db": 1},
+        ),
+        Stage(
+            "features", [sys.executable, "-W", "ignore", "ml-service/features.py", "--reset"], deps=("baseline", "process"),
+            inputs=code("features.py", "feature_store_layout.py", "frame_utils.py", "time_travel.py", "lineup_quality.py") + (LINEUPS, PLAYER_STATS), resources={"cpu": 2, "db": 1},
+            verify=feature_store_matches_schema,
+        ),
+        *global_training_stages(),
+        Stage(
+            "eligibility", script("evaluate_league_eligibility.py", "--workers", "2"), deps=global_full,
+            inputs=code("evaluate_league_eligibility.py"), resources={"cpu": 2, "db": 1},
+        ),
+        Stage(
+            "compare_metrics", script("compare_active_model_metrics.py"), deps=global_full,
+            inputs=code("compare_active_model_metrics.py"), resources={"cpu": 1, "db": 1},
+        ),
+        *league_training_stages(),
+        Stage(
+            "policy", script("build_league_model_policy.py"), deps=tuple(f"league_{market}" for market in LEAGUE_MARKETS),
+            inputs=code("build_league_model_policy.py") + (ValueInput("leagues", DEFAULT_LEAGUE_IDS),),
+        ),
+    ]
+
+
+# Pipeline name -> target stages (their upstream stages are included automatically).
+PIPELINES = {
+    "nightly": ["policy", "compare_metrics", *[f"train_{market}_{slug}" for market in GLOBAL_MARKETS for slug in ("5y", "3y")]],
+    "overnight": ["train_1x2_full"],
+    "historical_retrain": [f"train_{market}_full" for market in GLOBAL_MARKETS],
+    "horizon_experiments": [f"train_1x2_{slug}" for slug in HORIZON_SLUGS.values()],
+    "market_league_refresh": ["policy"],
+    "post_global": ["compare_metrics", "policy"],
+}
@@ -1,63 +1,119 @@
 import os
 import json
+import math
 from db_config import get_connection
+from psycopg2.extras import execute_values
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
 
+# Mapping model types to market identifiers and their corresponding JSON keys
+MODEL_CONFIGS = {
+    'FT_RESULT': ('1N2_FT', 'probabilities_1n2'),
+    'HT_RESULT': ('1N2_HT', 'probabilities_1n2'),
+    'CORNERS_TOTAL': ('CORNERS_OU', 'over_under_probabilities'),
+    'CARDS_TOTAL': ('CARDS_OU', 'over_under_probabilities'),
+    'GOALS_TOTAL': ('GOALS_OU', 'over_under_probabilities'),
+}
+
+UPSERT_QUERY = """
+    INSERT INTO V3_Risk_Analysis
+    (fixture_id, market_type, selection, ml_probability, fair_odd, analyzed_at)
+    VALUES %s
+    ON CONFLICT(fixture_id, market_type, selection)
+    DO UPDATE SET
+        ml_probability=excluded.ml_probability,
+        fair_odd=excluded.fair_odd,
+        analyzed_at=CURRENT_TIMESTAMP;
+"""
+UPSERT_TEMPLATE = "(%s, %s, %s, %s, %s, CURRENT_TIMESTAMP)"
+
+# Same rules as compute_fair_odds, evaluated by Postgres over V3_Submodel_Outputs.
+SET_BASED_QUERY = """
+    INSERT INTO V3_Risk_Analysis
+    (fixture_id, market_type, selection, ml_probability, fair_odd, analyzed_at)
+    SELECT DISTINCT ON (o.fixture_id, m.market_type, p.selection)
+        o.fixture_id, m.market_type, p.selection, p.probability, 1.0 / p.probability, CURRENT_TIMESTAMP
+    FROM V3_Submodel_Outputs o
+    JOIN unnest(%s::text[], %s::text[], %s::text[]) AS m(model_type, market_type, data_key)
+        ON m.model_type = o.model_type
+    CROSS JOIN LATERAL (
+        SELECT key AS selection, value::float8 AS probability
+        FROM json_each_text(o.prediction_json::json -> m.data_key)
+    ) p
+    WHERE o.fixture_id = ANY(%s)
+      AND o.prediction_json::json ->> 'prediction_status' = 'success_model'
+      AND COALESCE((o.prediction_json::json ->> 'is_fallback')::boolean, FALSE) = FALSE
+      AND p.probability > 0
+    ORDER BY o.fixture_id, m.market_type, p.selection, o.calculated_at DESC
+    ON CONFLICT(fixture_id, market_type, selection)
+    DO UPDATE SET
+        ml_probability=excluded.ml_probability,
+        fair_odd=excluded.fair_odd,
+        analyzed_at=CURRENT_TIMESTAMP;
+"""
+
 def get_db_connection():
     return get_connection()
 
-def save_risk_data(cur, query, fixture_id, market_type, data, key):
-    """Helper to parse probabilities and save to DB if data exists."""
-    if key in data:
-        for sel, prob in data[key].items():
-            if prob > 0:
-                cur.execute(query, (fixture_id, market_type, sel, float(prob), 1.0 / prob))
+def _json_safe(value):
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {key: _json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(item) for item in value]
+    return value
 
-def extract_and_save_fair_odds(fixture_id):
+def prediction_json(prediction):
     """
-    Reads submodel JSONs for a fixture_id, generates fair odds, 
-    and saves them to V3_Risk_Analysis.
+    JSON text of a submodel prediction for V3_Submodel_Outputs, with NaN and infinities as null.
+    json.dumps would write them as NaN/Infinity, which Postgres rejects: one such row would
+    fail the ::json casts of SET_BASED_QUERY (and a batch write) as a whole.
     """
-    conn = get_db_connection()
-    
-    # Mapping model types to market identifiers and their corresponding JSON keys
-    MODEL_CONFIGS = {
-        'FT_RESULT': ('1N2_FT', 'probabilities_1n2'),
-        'HT_RESULT': ('1N2_HT', 'probabilities_1n2'),
-        'CORNERS_TOTAL': ('CORNERS_OU', 'over_under_probabilities'),
-        'CARDS_TOTAL': ('CARDS_OU', 'over_under_probabilities'),
-        'GOALS_TOTAL': ('GOALS_OU', 'over_under_probabilities'),
-    }
+    return json.dumps(_json_safe(prediction), allow_nan=False)
+
+def compute_fair_odds(fixture_id, predictions):
+    """
+    Turns the submodel prediction dicts of a fixture ({model_type: prediction})
+    into V3_Risk_Analysis rows (fixture_id, market_type, selection, probability, fair_odd).
+    Fallback and failed predictions are skipped.
+    """
+    rows = []
+    for model_type, data in predictions.items():
+        if model_type not in MODEL_CONFIGS or not isinstance(data, dict):
+            continue
+        if data.get("prediction_status") != "success_model" or data.get("is_fallback", False):
+            continue
+        market_type, data_key = MODEL_CONFIGS[model_type]
+        for sel, prob in (data.get(data_key) or {}).items():
+            if prob is not None and 0 < prob < math.inf:
+                rows.append((fixture_id, market_type, sel, float(prob), 1.0 / prob))
+    return rows
+
+def save_fair_odds(cur, rows):
+    """Upserts fair-odds rows in a single statement; the last row wins per selection."""
+    unique_rows = list({(row[0], row[1], row[2]): row for row in rows}.values())
+    if unique_rows:
+        execute_values(cur, UPSERT_QUERY, unique_rows, template=UPSERT_TEMPLATE, page_size=len(unique_rows))
+    return len(unique_rows)
 
+def load_submodel_outputs(cur, fixture_id):
+    query = "SELECT model_type, prediction_json FROM V3_Submodel_Outputs WHERE fixture_id = %s"
+    cur.execute(query, (fixture_id,))
+    return {model_type: json.loads(json_str) for model_type, json_str in cur.fetchall()}
+
+def extract_and_save_fair_odds(fixture_id, predictions=None):
+    """
+    Generates fair odds for a fixture and saves them to V3_Risk_Analysis.
+    Uses the in-memory submodel predictions when given, otherwise reads the
+    submodel JSONs stored in V3_Submodel_Outputs.
+    """
+    conn = get_db_connection()
     try:
         cur = conn.cursor()
-        # Fetch all submodel outputs for this fixture
-        query = "SELECT model_type, prediction_json FROM V3_Submodel_Outputs WHERE fixture_id = %s"
-        cur.execute(query, (fixture_id,))
-        rows = cur.fetchall()
-        
-        insert_query = """
-            INSERT INTO V3_Risk_Analysis 
-            (fixture_id, market_type, selection, ml_probability, fair_odd, analyzed_at)
-            VALUES (%s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
-            ON CONFLICT(fixture_id, market_type, selection) 
-            DO UPDATE SET 
-                ml_probability=excluded.ml_probability, 
-                fair_odd=excluded.fair_odd, 
-                analyzed_at=CURRENT_TIMESTAMP;
-        """
-        
-        for model_type, json_str in rows:
-            if model_type not in MODEL_CONFIGS:
-                continue
-                
-            data = json.loads(json_str)
-            if data.get("prediction_status") != "success_model" or data.get("is_fallback", False):
-                continue
-            market_type, data_key = MODEL_CONFIGS[model_type]
-            save_risk_data(cur, insert_query, fixture_id, market_type, data, data_key)
-            
+        if predictions is None:
+            predictions = load_submodel_outputs(cur, fixture_id)
+        save_fair_odds(cur, compute_fair_odds(fixture_id, predictions))
         conn.commit()
         cur.close()
     except Exception as e:
@@ -65,6 +121,27 @@ def extract_and_save_fair_odds(fixture_id):
     finally:
         conn.close()
 
+def recompute_risk_analysis(fixture_ids, conn=None):
+    """
+    Set-based mode: recomputes V3_Risk_Analysis for a batch of fixtures from
+    their stored submodel outputs in one statement. Returns the upserted row count.
+    """
+    owns_connection = conn is None
+    conn = conn or get_db_connection()
+    try:
+        cur = conn.cursor()
+        model_types = list(MODEL_CONFIGS)
+        market_types = [MODEL_CONFIGS[model_type][0] for model_type in model_types]
+        data_keys = [MODEL_CONFIGS[model_type][1] for model_type in model_types]
+        cur.execute(SET_BASED_QUERY, (model_types, market_types, data_keys, list(fixture_ids)))
+        count = cur.rowcount
+        conn.commit()
+        cur.close()
+        return count
+    finally:
+        if owns_connection:
+            conn.close()
+
 if __name__ == "__main__":
     import sys
     if len(sys.argv) > 1:
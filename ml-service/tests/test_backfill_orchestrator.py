@@ -0,0 +1,54 @@
+import os
+import sys
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts import backfill_orchestrator as backfill
+
+
+class TestBackfillCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        progress = patch.object(backfill, "PROGRESS_PATH", Path(self.tmp.name) / "progress.json")
+        fixtures = patch.object(backfill, "fetch_eligible_fixtures", return_value=list(range(1, 7)))
+        pool = patch.object(backfill, "ProcessPoolExecutor", ThreadPoolExecutor)
+        for patcher in (progress, fixtures, pool):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def run_with(self, failures):
+        attempts = {}
+
+        def score_chunk(fixture_ids):
+            attempts[fixture_ids[0]] = attempts.get(fixture_ids[0], 0) + 1
+            if attempts[fixture_ids[0]] <= failures.get(fixture_ids[0], 0):
+                raise RuntimeError("worker crashed")
+            return {"success": len(fixture_ids), "failed": 0, "latencies_ms": {"FT_RESULT": [1.0]}}
+
+        with patch.object(backfill, "score_chunk", score_chunk):
+            backfill.run_backfill(chunk_size=2, workers=2)
+        return backfill.read_progress()
+
+    def test_a_failed_chunk_is_retried_before_the_checkpoint_moves_past_it(self):
+        progress = self.run_with({3: 1})
+        self.assertEqual(progress["status"], "completed")
+        self.assertEqual(progress["last_fixture_id"], 6)
+        self.assertEqual(progress["success"], 6)
+
+    def test_a_chunk_that_keeps_failing_holds_the_checkpoint(self):
+        progress = self.run_with({3: 2})
+        self.assertEqual(progress["status"], "incomplete")
+        self.assertEqual(progress["last_fixture_id"], 2)
+        self.assertEqual(progress["failed_chunks"], [1])
+        self.assertEqual(backfill.resume_position(list(range(1, 7)), progress), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
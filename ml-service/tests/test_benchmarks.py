@@ -0,0 +1,79 @@
+import os
+import sys
+import unittest
+from collections import Counter
+from unittest import mock
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# The runner sets model path defaults on import; keep them out of the test process.
+with mock.patch.dict(os.environ):
+    from benchmarks.run_benchmarks import compare, summarize
+from benchmarks.cases import BenchmarkContext, build_cases
+from scripts.generate_synthetic_data import round_robin
+
+
+class TestBenchmarkRunner(unittest.TestCase):
+
+    def test_summarize_reports_median_and_per_item(self):
+        stats = summarize([0.4, 0.1, 0.2, 0.3, 0.5], items=10)
+        self.assertEqual(stats["rounds"], 5)
+        self.assertAlmostEqual(stats["min"], 0.1)
+        self.assertAlmostEqual(stats["median"], 0.3)
+        self.assertAlmostEqual(stats["p95"], 0.5)
+        self.assertAlmostEqual(stats["per_item_median"], 0.03)
+
+    def test_compare_flags_only_slowdowns_above_threshold(self):
+        baseline = {"fast": {"median": 1.0}, "slow": {"median": 1.0}, "same": {"median": 1.0}}
+        results = {"fast": {"median": 0.5}, "slow": {"median": 1.3}, "same": {"median": 1.1}, "new": {"median": 1.0}}
+        comparison = compare(results, baseline, threshold=0.15)
+        self.assertNotIn("new", comparison)
+        self.assertTrue(comparison["slow"]["regression"])
+        self.assertFalse(comparison["same"]["regression"])
+        self.assertFalse(comparison["fast"]["regression"])
+
+
+class TestBenchmarkCases(unittest.TestCase):
+
+    def test_team_feature_cases_call_the_loader_with_its_signature(self):
+        import features
+
+        def load_team_feature_set(feature_set_id, horizon_type='FULL_HISTORICAL', prefix='',
+                                  chunk_rows=features.TEAM_FEATURE_CHUNK_ROWS):
+            # Same argument handling as the real loader, without the database.
+            features.feature_storage_horizon(feature_set_id, horizon_type)
+            return pd.DataFrame({"fixture_id": [1, 1], "team_id": [10, 20], f"{prefix}shots_per_match_5": [12.0, 9.0]})
+
+        advanced = pd.DataFrame({"fixture_id": [1], "team_id_h": [10], "team_id_a": [20], "round": ["Final"]})
+        ctx = BenchmarkContext(conn=None, fixture_ids=[1], league_id=39, season_year=2025, simulation_id=1)
+        with mock.patch.object(features, "load_team_feature_set", side_effect=load_team_feature_set) as loader, \
+                mock.patch.object(features, "compute_advanced_features", return_value=advanced):
+            cases = [case for case in build_cases(ctx)
+                     if "load_team_feature_set" in case.name or case.name == "features.row_features"]
+            self.assertEqual(len(cases), 3)
+            arguments = {case.name: case.setup(ctx) if case.setup else ctx for case in cases}
+            for case in cases:
+                case.run(arguments[case.name])
+        self.assertEqual(loader.call_count, 3)
+        row = arguments["features.row_features"][0]
+        self.assertEqual((row["home_p_shots_per_match_5"], row["away_p_shots_per_match_5"]), (12.0, 9.0))
+
+
+class TestSyntheticFixtures(unittest.TestCase):
+
+    def test_round_robin_plays_every_pair_home_and_away(self):
+        teams = list(range(1, 8))
+        rounds = round_robin(teams)
+        self.assertEqual(len(rounds), 2 * len(teams))
+        pairs = Counter(pair for pairs in rounds for pair in pairs)
+        self.assertEqual(len(pairs), len(teams) * (len(teams) - 1))
+        self.assertTrue(all(count == 1 for count in pairs.values()))
+        for pairs in rounds:
+            playing = [team for pair in pairs for team in pair]
+            self.assertEqual(len(playing), len(set(playing)))
+
+
+if __name__ == '__main__':
+    unittest.main()
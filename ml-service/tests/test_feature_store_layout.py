@@ -0,0 +1,164 @@
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.feature_store_plans import summarize_plan
+from feature_schema import GLOBAL_1X2_FEATURE_COLUMNS, normalize_feature_vector
+from feature_store_layout import (
+    partition_seasons,
+    renamed_index,
+    retarget_index_definition,
+    season_partition,
+    shadow_constraint_statement,
+    swap_feature_store,
+    team_features_partition_ddl,
+    validate_feature_store,
+)
+
+
+class TestFeatureStoreLayout(unittest.TestCase):
+
+    def test_seasons_are_deduplicated_and_extended(self):
+        self.assertEqual(partition_seasons([2023, None, 2021, 2023], lookahead=2), [2021, 2023, 2024, 2025])
+        self.assertEqual(partition_seasons([]), [])
+
+    def test_partitions_by_feature_set_then_season_with_defaults(self):
+        statements = team_features_partition_ddl([2024], feature_sets=("BASELINE_V1",))
+        self.assertIn("PARTITION BY LIST (feature_set_id)", statements[0])
+        self.assertIn("PRIMARY KEY (fixture_id, team_id, feature_set_id, horizon_type, season_year)", statements[0])
+        self.assertIn("FOR VALUES IN ('BASELINE_V1') PARTITION BY RANGE (season_year)", statements[1])
+        self.assertEqual(season_partition("BASELINE_V1", 2024), "v3_team_features_prematch_baseline_v1_s2024")
+        self.assertTrue(any(
+            statement.startswith("CREATE TABLE v3_team_features_prematch_baseline_v1_s2024 ")
+            and statement.endswith("FOR VALUES FROM (2024) TO (2025)")
+            for statement in statements
+        ))
+        self.assertTrue(statements[-2].endswith("PARTITION OF v3_team_features_prematch_baseline_v1 DEFAULT"))
+        self.assertTrue(statements[-1].endswith("PARTITION OF V3_Team_Features_PreMatch DEFAULT"))
+        # One feature set partition, three seasons (2024 plus the lookahead), two defaults.
+        self.assertEqual(len(statements), 1 + 1 + 3 + 2)
+
+
+class FakeCursor:
+    def __init__(self, indexes, rows=()):
+        self.indexes = indexes
+        self.rows = list(rows)
+        self.statements = []
+        self.itersize = None
+        self.rowcount = 2
+
+    def execute(self, query, params=None):
+        self.statements.append(query)
+        self.last_table = params[0] if params else None
+
+    def fetchall(self):
+        return list(self.indexes.get(self.last_table, []))
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self.cursor_obj = cursor
+        self.commits = 0
+
+    def cursor(self, name=None):
+        return self.cursor_obj
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+
+class TestFeatureStoreSwap(unittest.TestCase):
+
+    def test_index_definitions_are_retargeted_to_the_shadow_table(self):
+        indexdef = "CREATE UNIQUE INDEX idx_v3_ml_feature_store_fixture ON public.v3_ml_feature_store USING btree (fixture_id)"
+        self.assertEqual(
+            retarget_index_definition(indexdef, "idx_v3_ml_feature_store_fixture_shadow", "V3_ML_Feature_Store_Shadow"),
+            "CREATE UNIQUE INDEX idx_v3_ml_feature_store_fixture_shadow ON V3_ML_Feature_Store_Shadow USING btree (fixture_id)",
+        )
+        self.assertEqual(renamed_index("idx_a_shadow", "_shadow", ""), "idx_a")
+        self.assertEqual(renamed_index("idx_a", "", "_previous"), "idx_a_previous")
+
+    def test_keys_and_foreign_keys_are_recreated_on_the_shadow_table(self):
+        self.assertEqual(
+            shadow_constraint_statement("v3_ml_feature_store_pkey", "p", "PRIMARY KEY (fixture_id)"),
+            "ALTER TABLE V3_ML_Feature_Store_Shadow ADD CONSTRAINT v3_ml_feature_store_pkey_shadow PRIMARY KEY (fixture_id)",
+        )
+        foreign_key = "FOREIGN KEY (fixture_id) REFERENCES v3_fixtures(fixture_id) ON DELETE CASCADE"
+        self.assertEqual(
+            shadow_constraint_statement("v3_ml_feature_store_fixture_id_fkey", "f", foreign_key),
+            f"ALTER TABLE V3_ML_Feature_Store_Shadow ADD CONSTRAINT v3_ml_feature_store_fixture_id_fkey {foreign_key}",
+        )
+
+    def test_swap_keeps_the_live_table_as_previous_in_one_transaction(self):
+        cursor = FakeCursor({
+            "v3_ml_feature_store": [("idx_store", "")],
+            "v3_ml_feature_store_shadow": [("idx_store_shadow", "")],
+        })
+        conn = FakeConnection(cursor)
+        self.assertEqual(swap_feature_store(conn), 2)
+        renames = [statement for statement in cursor.statements if "RENAME" in statement]
+        self.assertEqual(renames, [
+            "ALTER INDEX idx_store RENAME TO idx_store_previous",
+            "ALTER TABLE V3_ML_Feature_Store RENAME TO V3_ML_Feature_Store_Previous",
+            "ALTER INDEX idx_store_shadow RENAME TO idx_store",
+            "ALTER TABLE V3_ML_Feature_Store_Shadow RENAME TO V3_ML_Feature_Store",
+        ])
+        self.assertEqual(conn.commits, 1)
+        # Writers are locked out and their rows carried over before anything is renamed.
+        lock = cursor.statements.index("LOCK TABLE V3_ML_Feature_Store IN EXCLUSIVE MODE")
+        copy = next(index for index, statement in enumerate(cursor.statements) if "INSERT INTO V3_ML_Feature_Store_Shadow" in statement)
+        self.assertLess(lock, copy)
+        self.assertLess(copy, cursor.statements.index(renames[0]))
+
+    def test_validation_flags_schema_mismatches_and_missing_rows(self):
+        valid = json.dumps(normalize_feature_vector({}))
+        stale = json.dumps({GLOBAL_1X2_FEATURE_COLUMNS[0]: 1.0, "retired_feature": 0.0})
+        conn = FakeConnection(FakeCursor({}, rows=[(1, valid), (2, stale)]))
+        report = validate_feature_store(conn, "V3_ML_Feature_Store_Shadow", expected_rows=3)
+        self.assertEqual(report["rows"], 2)
+        self.assertEqual(report["invalid_sample"], [2])
+        self.assertEqual(len(report["errors"]), 2)
+
+        conn = FakeConnection(FakeCursor({}, rows=[(1, valid)]))
+        self.assertEqual(validate_feature_store(conn, "V3_ML_Feature_Store_Shadow", expected_rows=1)["errors"], [])
+
+
+class TestPlanSummary(unittest.TestCase):
+
+    def test_summarize_plan_collects_nodes_relations_and_buffers(self):
+        explained = [{
+            "Plan": {
+                "Node Type": "Append",
+                "Total Cost": 12.5,
+                "Actual Rows": 2,
+                "Shared Hit Blocks": 7,
+                "Shared Read Blocks": 1,
+                "Plans": [
+                    {"Node Type": "Index Scan", "Relation Name": "v3_team_features_prematch_baseline_v1_s2024"},
+                    {"Node Type": "Index Scan", "Relation Name": "v3_team_features_prematch_baseline_v1_default"},
+                ],
+            },
+            "Planning Time": 0.2,
+            "Execution Time": 0.05,
+        }]
+        summary = summarize_plan(explained)
+        self.assertEqual(summary["node_types"], ["Append", "Index Scan", "Index Scan"])
+        self.assertEqual(len(summary["relations_scanned"]), 2)
+        self.assertEqual(summary["shared_hit_blocks"] + summary["shared_read_blocks"], 8)
+        self.assertEqual(summary["execution_ms"], 0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fixture_stats_wide import (
+    STAT_COLUMNS,
+    create_table_sql,
+    refresh_function_sql,
+    trigger_sql,
+    wide_column,
+    wide_columns,
+)
+
+
+class TestFixtureStatsWide(unittest.TestCase):
+
+    def test_one_column_per_side_half_and_stat(self):
+        flags, stats = wide_columns()
+        self.assertEqual(flags, ["has_home_ft", "has_home_1h", "has_home_2h", "has_away_ft", "has_away_1h", "has_away_2h"])
+        self.assertEqual(len(stats), 2 * 3 * len(STAT_COLUMNS))
+        self.assertEqual(wide_column("away", "2H", "shots_total"), "away_2h_shots_total")
+        self.assertIn("home_ft_corner_kicks INTEGER", create_table_sql())
+
+    def test_refresh_pivots_by_fixture_team_and_half(self):
+        sql = refresh_function_sql()
+        self.assertIn("MAX(s.corner_kicks) FILTER (WHERE s.team_id = f.home_team_id AND s.half = 'FT')", sql)
+        self.assertIn("WHERE f.fixture_id = ANY(fixture_ids)", sql)
+        self.assertIn("ON CONFLICT (fixture_id) DO UPDATE SET", sql)
+        # The migration runner rewrites '?' placeholders, so the shared SQL must not contain any.
+        self.assertNotIn("?", sql + "".join(trigger_sql()))
+
+    def test_stats_triggers_are_statement_level_with_transition_tables(self):
+        creates = [statement for statement in trigger_sql() if statement.startswith("CREATE TRIGGER")]
+        self.assertEqual(len(creates), 4)
+        for statement in creates[:3]:
+            self.assertIn("ON V3_Fixture_Stats REFERENCING", statement)
+            self.assertIn("FOR EACH STATEMENT", statement)
+        self.assertIn("AFTER UPDATE OF home_team_id, away_team_id ON V3_Fixtures", creates[3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import json
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from frame_utils import JsonColumnBuilder, compact_frame, log_memory
+
+
+class TestFrameUtils(unittest.TestCase):
+
+    def test_compact_frame_downcasts_and_categorizes(self):
+        df = pd.DataFrame({
+            "fixture_id": np.arange(1000, dtype=np.int64),
+            "big_id": np.full(1000, 2 ** 40, dtype=np.int64),
+            "score": np.linspace(0, 1, 1000),
+            "status_short": ["FT", "NS"] * 500,
+            "date": pd.date_range("2024-01-01", periods=1000, freq="h"),
+        })
+        before = df.memory_usage(deep=True).sum()
+        compact_frame(df, categories=("status_short",))
+        self.assertEqual(df["fixture_id"].dtype, np.int32)
+        self.assertEqual(df["big_id"].dtype, np.int64)
+        # Floats keep float64 so the values written to JSON stay exact.
+        self.assertEqual(df["score"].dtype, np.float64)
+        self.assertIsInstance(df["status_short"].dtype, pd.CategoricalDtype)
+        self.assertEqual(df["date"].dtype.kind, "M")
+        self.assertLess(df.memory_usage(deep=True).sum(), before / 2)
+
+    def test_log_memory_reports_frames_and_peak(self):
+        report = log_memory("stage", frame=pd.DataFrame({"a": np.zeros(131072)}), missing=None)
+        self.assertEqual(report["frames_mb"], {"frame": 1.0})
+        self.assertGreater(report["peak_rss_mb"], 0)
+
+    def test_json_column_builder_matches_json_normalize(self):
+        uniform = [(fixture_id, 7, json.dumps({"elo": 1500.1 + fixture_id, "rank": 3, "lineup_strength_v1": None}))
+                   for fixture_id in range(4)]
+        mixed = [
+            (10, 8, json.dumps({"elo": 1480.4, "coach": "A", "form": {"points": 7}})),
+            (11, 8, json.dumps({"rank": 12, "venue_id": 2 ** 40})),
+        ]
+        # Same keys in every document, but numeric-looking strings must stay strings.
+        strings = [(20 + offset, 9, json.dumps({"elo": 1.4, "coach": value})) for offset, value in enumerate(["1.5", "2"])]
+        builder = JsonColumnBuilder(3, key_columns=("fixture_id", "team_id"))
+        builder.add_rows(uniform)
+        builder.add_rows(mixed)
+        builder.add_rows(strings)
+        frame = builder.frame(prefix="b_")
+
+        expected = pd.json_normalize([json.loads(raw) for _, _, raw in uniform + mixed + strings])
+        self.assertEqual(frame["fixture_id"].tolist(), [0, 1, 2, 3, 10, 11, 20, 21])
+        self.assertEqual(sorted(frame.columns[2:]), sorted(f"b_{column}" for column in expected.columns))
+        for column in ("elo", "rank", "form.points", "venue_id"):
+            self.assertEqual(frame[f"b_{column}"].dtype, np.float64)
+            np.testing.assert_array_equal(frame[f"b_{column}"].to_numpy(), expected[column].to_numpy(dtype=float))
+        # The values written back to JSON are the ones that were read.
+        self.assertEqual(float(frame["b_elo"].iloc[6]), 1.4)
+        self.assertEqual(frame["b_coach"].tolist()[6:], ["1.5", "2"])
+        self.assertTrue(frame["b_lineup_strength_v1"].isna().all())
+        self.assertEqual(frame["b_coach"].tolist()[4], "A")
+        # The frame wraps the builder's arrays instead of copying them.
+        self.assertTrue(np.shares_memory(frame["b_elo"].to_numpy(), builder.columns["elo"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import sys
+import unittest
+from datetime import datetime, timezone
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from horizon_utils import (
+    SUPPORTED_HORIZONS,
+    feature_storage_horizon,
+    filter_dataframe_by_horizon,
+    fixture_bounds_sql,
+    resolve_horizon_sql,
+    with_dataset_size,
+)
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, query, params=None):
+        self.conn.queries.append((query, list(params or [])))
+
+    def fetchone(self):
+        return (self.conn.max_date,)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, max_date):
+        self.max_date = max_date
+        self.queries = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+
+class TestFeatureStorageHorizon(unittest.TestCase):
+
+    def test_horizon_independent_sets_resolve_to_one_stored_row(self):
+        for feature_set_id in ("BASELINE_V1", "PROCESS_V1"):
+            for horizon in SUPPORTED_HORIZONS:
+                self.assertEqual(feature_storage_horizon(feature_set_id, horizon), "FULL_HISTORICAL")
+
+    def test_other_sets_keep_their_horizon(self):
+        self.assertEqual(feature_storage_horizon("CUSTOM_V2", "5y_rolling"), "5Y_ROLLING")
+        with self.assertRaises(ValueError):
+            feature_storage_horizon("BASELINE_V1", "10Y_ROLLING")
+
+
+
+class TestHorizonSql(unittest.TestCase):
+    FROM_SQL = "FROM V3_Fixtures f WHERE f.status_short = %s"
+
+    def test_bounds_are_parameterized(self):
+        conditions, params = fixture_bounds_sql(league_id="39", min_date="2024-01-01", max_date=None)
+        self.assertEqual(conditions, " AND f.date IS NOT NULL AND f.league_id = %s AND f.date >= %s")
+        self.assertEqual(params, [39, datetime(2024, 1, 1, tzinfo=timezone.utc)])
+
+    def test_rolling_cutoff_comes_from_the_bounded_max_date(self):
+        conn = FakeConnection(datetime(2026, 4, 1, 18, 0, tzinfo=timezone.utc))
+        conditions, params, window = resolve_horizon_sql(conn, "3y_rolling", self.FROM_SQL, params=["FT"], league_id=39)
+
+        query, query_params = conn.queries[0]
+        self.assertTrue(query.startswith("SELECT MAX(f.date) FROM V3_Fixtures f"))
+        self.assertIn("f.league_id = %s", query)
+        self.assertEqual(query_params, ["FT", 39])
+        self.assertTrue(conditions.endswith(" AND f.date >= %s"))
+        self.assertEqual(params, [39, datetime(2023, 4, 1, 18, 0, tzinfo=timezone.utc)])
+        self.assertEqual(window.horizon_type, "3Y_ROLLING")
+        self.assertEqual(window.min_date_included, pd.Timestamp("2023-04-01 18:00", tz="UTC"))
+
+    def test_matches_the_dataframe_filter(self):
+        dates = pd.Series(pd.date_range("2018-02-28", "2026-02-28", freq="MS", tz="UTC"))
+        frame = pd.DataFrame({"match_date": dates})
+        expected, expected_window = filter_dataframe_by_horizon(frame, "match_date", "5Y_ROLLING")
+
+        conn = FakeConnection(dates.max().to_pydatetime())
+        _, params, window = resolve_horizon_sql(conn, "5Y_ROLLING", self.FROM_SQL, params=["FT"])
+        loaded = frame[frame["match_date"] >= pd.Timestamp(params[-1])]
+
+        self.assertEqual(with_dataset_size(window, loaded), expected_window)
+        self.assertEqual(len(loaded), len(expected))
+
+    def test_full_history_and_empty_tables_add_no_cutoff(self):
+        conditions, params, window = resolve_horizon_sql(FakeConnection(datetime(2026, 1, 1)), "FULL_HISTORICAL", self.FROM_SQL)
+        self.assertEqual(conditions, " AND f.date IS NOT NULL")
+        self.assertEqual(params, [])
+        self.assertEqual(window.max_date, pd.Timestamp("2026-01-01", tz="UTC"))
+        self.assertIsNone(window.min_date_included)
+
+        conditions, params, window = resolve_horizon_sql(FakeConnection(None), "5Y_ROLLING", self.FROM_SQL)
+        self.assertEqual(params, [])
+        self.assertIs(window.max_date, pd.NaT)
+
+
+if __name__ == '__main__':
+    unittest.main()
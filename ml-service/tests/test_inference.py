@@ -12,7 +12,8 @@ from src.models.cards_total.inference import predict_total_cards
 from src.models.corners_total.inference import predict_total_corners
 from src.models.ft_result.inference import predict_ft_result
 from src.models.ht_result.inference import predict_ht_result
-from src.orchestrator.predictor import generate_master_prediction
+from src.orchestrator import predictor
+from src.orchestrator.predictor import generate_master_prediction, generate_master_predictions
 
 class TestMLInference(unittest.TestCase):
 
@@ -91,5 +92,36 @@ class TestMLInference(unittest.TestCase):
         self.assertIn('GOALS_TOTAL', result['models'])
         self.assertEqual(mock_save.call_count, 5)
 
+    @patch('src.orchestrator.predictor.generate_master_prediction')
+    @patch('src.orchestrator.predictor.save_batch_outputs')
+    @patch('src.orchestrator.predictor.load_batch_inputs')
+    def test_master_predictions_score_each_market_once_per_batch(self, mock_inputs, mock_save, mock_single):
+        context = {"league_id": 39, "home_team_id": 1, "away_team_id": 2, "round": ""}
+        mock_inputs.return_value = ({1: context, 2: context}, {1: {}, 2: {}})
+        mock_single.return_value = {"fixture_id": 3, "success": False, "models": {}}
+        batch_calls = []
+
+        def batch(contexts, vectors):
+            batch_calls.append(sorted(vectors))
+            return {fixture_id: {"prediction_status": "success_model", "is_fallback": False} for fixture_id in vectors}
+
+        def failing_batch(contexts, vectors):
+            raise RuntimeError("league model missing")
+
+        single = MagicMock(return_value={"prediction_status": "success_model", "is_fallback": False})
+        submodels = [(model_type, batch, single) for model_type in predictor.CORE_MODELS[:-1]]
+        submodels.append(("GOALS_TOTAL", failing_batch, single))
+        with patch.object(predictor, "BATCH_SUBMODELS", submodels):
+            results, timings = generate_master_predictions([1, 2, 3])
+
+        self.assertEqual(batch_calls, [[1, 2]] * 4)
+        self.assertEqual([call.args[0] for call in single.call_args_list], [1, 2])
+        self.assertEqual([result["fixture_id"] for result in results], [1, 2, 3])
+        self.assertTrue(results[0]["success"])
+        self.assertEqual(results[1]["models"]["RISK_ANALYSIS"]["success"], True)
+        self.assertEqual(set(timings[0]), set(predictor.CORE_MODELS) | {"RISK_ANALYSIS"})
+        mock_single.assert_called_once_with(3, timings={})
+        mock_save.assert_called_once()
+
 if __name__ == '__main__':
     unittest.main()
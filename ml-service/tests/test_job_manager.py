@@ -0,0 +1,138 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.jobs.manager import JobManager, parse_concurrency, pick_claimable, read_log
+
+
+class MemoryJobStore:
+    def __init__(self):
+        self.jobs = {}
+
+    def create(self, job_type):
+        job_id = len(self.jobs) + 1
+        self.jobs[job_id] = {"id": job_id, "job_type": job_type, "status": "QUEUED", "cancel_requested": False,
+                             "log_path": None, "stage": None, "pid": None}
+        return dict(self.jobs[job_id])
+
+    def create_exclusive(self, job_type):
+        active = [job for job in self.jobs.values() if job["job_type"] == job_type and job["status"] in ("QUEUED", "RUNNING")]
+        if active:
+            return dict(active[0]), False
+        return self.create(job_type), True
+
+    def heartbeat(self, job_id, **fields):
+        self.jobs[job_id].update(fields)
+        return self.jobs[job_id]["cancel_requested"]
+
+    def finish(self, job_id, owner, status, exit_code=None, error=None):
+        job = self.jobs[job_id]
+        if job["status"] != "RUNNING" or job.get("owner") != owner:
+            return False
+        job.update(status=status, exit_code=exit_code, error=error)
+        return True
+
+    def request_cancel(self, job_id):
+        self.jobs[job_id]["cancel_requested"] = True
+        return dict(self.jobs[job_id])
+
+
+class TestJobManager(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = MemoryJobStore()
+
+    def script(self, name, body):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w") as handle:
+            handle.write(body)
+        return path
+
+    def manager(self, stages):
+        return JobManager(store=self.store, log_dir=self.tmp.name, poll_seconds=0.05, job_types={"demo": stages})
+
+    def claimed(self, manager):
+        job = manager.submit("demo")
+        job.update(status="RUNNING", owner=manager.owner, log_path=os.path.join(self.tmp.name, f"{job['id']}.log"))
+        self.store.jobs[job["id"]].update(status="RUNNING", owner=manager.owner)
+        return job
+
+    def test_stages_stream_to_the_log_and_stop_at_the_first_failure(self):
+        first = self.script("first.py", "print('building features')\n")
+        failing = self.script("failing.py", "import sys\nprint('training broke')\nsys.exit(3)\n")
+        never = self.script("never.py", "print('should not run')\n")
+        manager = self.manager([("features", first), ("train", failing), ("reload", never)])
+        finished = []
+        manager.add_listener(finished.append)
+
+        job = self.claimed(manager)
+        result = manager.run_job(job)
+
+        self.assertEqual(result["status"], "FAILED")
+        self.assertEqual(self.store.jobs[job["id"]]["exit_code"], 3)
+        self.assertIn("Stage train", self.store.jobs[job["id"]]["error"])
+        self.assertEqual([item["status"] for item in finished], ["FAILED"])
+        log, offset = read_log(job["log_path"])
+        self.assertIn("building features", log)
+        self.assertIn("training broke", log)
+        self.assertNotIn("should not run", log)
+        self.assertEqual(read_log(job["log_path"], offset), ("", offset))
+
+    def test_cancel_terminates_the_running_stage(self):
+        slow = self.script("slow.py", "import time\nprint('started', flush=True)\ntime.sleep(30)\n")
+        manager = self.manager([("train", slow)])
+        job = self.claimed(manager)
+
+        runner = threading.Thread(target=manager.run_job, args=(job,))
+        started = time.time()
+        runner.start()
+        while self.store.jobs[job["id"]]["pid"] is None:
+            time.sleep(0.01)
+        manager.cancel(job["id"])
+        runner.join(timeout=10)
+
+        self.assertFalse(runner.is_alive())
+        self.assertLess(time.time() - started, 10)
+        self.assertEqual(self.store.jobs[job["id"]]["status"], "CANCELLED")
+
+    def test_a_job_failed_as_stale_is_not_overwritten_by_its_late_finish(self):
+        stage = self.script("stage.py", "print('done')\n")
+        manager = self.manager([("features", stage)])
+        finished = []
+        manager.add_listener(finished.append)
+        job = self.claimed(manager)
+        self.store.jobs[job["id"]].update(status="FAILED", error="Job stopped reporting")
+
+        self.assertIsNone(manager.run_job(job))
+        self.assertEqual(self.store.jobs[job["id"]]["status"], "FAILED")
+        self.assertEqual(self.store.jobs[job["id"]]["error"], "Job stopped reporting")
+        self.assertEqual(finished, [])
+
+    def test_exclusive_submit_returns_the_active_job(self):
+        manager = self.manager([])
+        first, created = manager.submit_exclusive("demo")
+        self.assertTrue(created)
+        again, created = manager.submit_exclusive("demo")
+        self.assertFalse(created)
+        self.assertEqual(again["id"], first["id"])
+        self.store.jobs[first["id"]]["status"] = "SUCCEEDED"
+        self.assertTrue(manager.submit_exclusive("demo")[1])
+
+    def test_claims_respect_per_type_concurrency(self):
+        limits = parse_concurrency("train_1x2=1,features=2", defaults={"train_1x2": 1})
+        self.assertEqual(limits, {"train_1x2": 1, "features": 2})
+        queued = [(1, "train_1x2"), (2, "features"), (3, "features")]
+        self.assertEqual(pick_claimable(queued, {"train_1x2": 1}, limits), (2, "features"))
+        self.assertIsNone(pick_claimable(queued, {"train_1x2": 1, "features": 2}, limits))
+        self.assertEqual(pick_claimable([(4, "other")], {}, limits), (4, "other"))
+
+
+if __name__ == '__main__':
+    unittest.main()
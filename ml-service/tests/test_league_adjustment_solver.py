@@ -0,0 +1,48 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.corners_total.inference import apply_corners_adjustment, _build_corners_result
+from src.models.goals_total.inference import GOALS_ADJUSTMENT, build_prediction as build_goals_prediction
+from src.models.league_adjustment_solver import apply_total_adjustments
+
+
+def corners_factor(delta, cap=0.04):
+    return {
+        "league_id": 39,
+        "league_name": "Premier League",
+        "recommended_total_corners_delta": delta,
+        "recommended_adjustment_cap": cap,
+    }
+
+
+class TestLeagueAdjustmentSolver(unittest.TestCase):
+
+    def test_small_delta_is_applied_in_full(self):
+        base = _build_corners_result(1, 5.2, 4.3, "v2", "success_model", False)
+        adjusted = apply_corners_adjustment(base, corners_factor(0.3))
+        context = adjusted["adjustment_context"]
+        self.assertAlmostEqual(context["applied_total_corners_delta"], 0.3, places=9)
+        self.assertEqual(adjusted["model_scope"], "league_adjusted_shadow")
+        self.assertTrue(adjusted["is_shadow"])
+
+    def test_large_delta_is_capped_at_the_over_line_limit(self):
+        base = _build_corners_result(1, 5.2, 4.3, "v2", "success_model", False)
+        context = apply_corners_adjustment(base, corners_factor(1.5))["adjustment_context"]
+        self.assertGreater(context["applied_total_corners_delta"], 0.15)
+        self.assertLess(context["applied_total_corners_delta"], 1.5)
+        self.assertAlmostEqual(context["applied_over_9_5_delta"], 0.04, places=4)
+
+    def test_batch_keeps_positions_and_skips_missing_factors(self):
+        predictions = [build_goals_prediction(i, 1.4, 1.1, "v1", "global") for i in range(3)]
+        factor = {"league_id": 61, "league_name": "Ligue 1", "recommended_total_goals_delta": -0.4}
+        adjusted = apply_total_adjustments(predictions, [factor, None, factor], GOALS_ADJUSTMENT, build_goals_prediction)
+        self.assertIsNone(adjusted[1])
+        self.assertEqual(adjusted[2]["fixture_id"], 2)
+        self.assertLessEqual(abs(adjusted[0]["adjustment_context"]["applied_over_2_5_delta"]), 0.03 + 1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import evaluate_league_eligibility as eligibility
+from feature_schema import GLOBAL_1X2_FEATURE_COLUMNS
+
+
+class CountingClassifier:
+    def __init__(self):
+        self.rows_scored = 0
+
+    def predict_proba(self, X):
+        self.rows_scored += len(X)
+        return np.tile([0.2, 0.5, 0.3], (len(X), 1))
+
+
+def ft_frame(calculated_at):
+    frame = pd.DataFrame({
+        "fixture_id": [1, 2, 3],
+        "league_id": [39, 39, 39],
+        "league_name": ["Premier League"] * 3,
+        "canonical_name": ["Premier League"] * 3,
+        "feature_calculated_at": calculated_at,
+        "actual_ft": [1, 0, 2],
+    })
+    features = pd.DataFrame(0.0, index=frame.index, columns=GLOBAL_1X2_FEATURE_COLUMNS)
+    return pd.concat([frame, features], axis=1)
+
+
+class TestHoldoutPredictionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.original_dir = eligibility.HOLDOUT_CACHE_DIR
+        eligibility.HOLDOUT_CACHE_DIR = self.tmp.name
+
+    def tearDown(self):
+        eligibility.HOLDOUT_CACHE_DIR = self.original_dir
+        eligibility._WORKER_MODELS.clear()
+        self.tmp.cleanup()
+
+    def test_cache_is_keyed_by_model_version_and_feature_timestamp(self):
+        cached = pd.DataFrame(
+            {"feature_calculated_at": ["t1", "t1"], "prob_draw": [0.1, 0.1], "prob_home": [0.8, 0.8], "prob_away": [0.1, 0.1]},
+            index=pd.Index([1, 2], name="fixture_id"),
+        )
+        eligibility.save_cached_predictions("global_1x2", "global_1x2@3-abc", cached)
+        stale = eligibility.load_cached_predictions("global_1x2", "global_1x2@4-def", eligibility.FT_COLUMNS)
+        self.assertTrue(stale.empty)
+
+        loaded = eligibility.load_cached_predictions("global_1x2", "global_1x2@3-abc", eligibility.FT_COLUMNS)
+        # Fixture 2 was rebuilt (new calculated_at) and fixture 3 was never scored.
+        test_df = eligibility.attach_cached_predictions(ft_frame(["t1", "t2", "t1"]), loaded, eligibility.FT_COLUMNS)
+        self.assertEqual(test_df["prob_home"].notna().tolist(), [True, False, False])
+
+    def test_evaluate_league_scores_only_uncached_rows(self):
+        model = CountingClassifier()
+        eligibility._WORKER_MODELS["ft"] = model
+        group = eligibility.attach_cached_predictions(
+            ft_frame(["t1", "t1", "t1"]),
+            pd.DataFrame(
+                {"feature_calculated_at": ["t1"], "prob_draw": [0.2], "prob_home": [0.5], "prob_away": [0.3]},
+                index=pd.Index([1], name="fixture_id"),
+            ),
+            eligibility.FT_COLUMNS,
+        )
+        result = eligibility.evaluate_league({"league_id": 39, "identity": {"league_id": 39}, "markets": {"ft": group}})
+
+        self.assertEqual(model.rows_scored, 2)
+        self.assertEqual(result["rescored"], 2)
+        self.assertEqual(result["scored"]["ft"]["fixture_id"].tolist(), [2, 3])
+        self.assertEqual(result["metrics"]["ft_matches"], 3)
+        self.assertAlmostEqual(result["metrics"]["ft_accuracy"], 1 / 3)
+        self.assertGreaterEqual(result["seconds"], 0.0)
+
+    def test_league_tasks_group_markets_and_start_with_the_largest_league(self):
+        small = ft_frame(["t1"] * 3).assign(league_id=[61, 39, 39])
+        tasks = eligibility.build_league_tasks({"ft": small})
+        self.assertEqual([task["league_id"] for task in tasks], [39, 61])
+        self.assertEqual(tasks[0]["identity"]["canonical_name"], "Premier League")
+
+
+if __name__ == '__main__':
+    unittest.main()
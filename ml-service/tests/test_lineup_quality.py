@@ -0,0 +1,79 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from lineup_quality import DEFAULT_LQI, TRY_PARSE_JSONB_SQL, _query, lookup_lineup_quality
+from time_travel import ContextAdapter
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rows = []
+
+    def execute(self, query, params=None):
+        self.conn.queries.append((query, params))
+        self.rows = self.conn.rows if "V3_Fixture_Lineup_Players" in query else []
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+
+class TestLineupQuality(unittest.TestCase):
+
+    def test_bulk_query_has_no_fixture_filter(self):
+        query, params = _query()
+        self.assertNotIn("fixture_ids", query)
+        self.assertEqual(params, {"default": DEFAULT_LQI})
+
+    def test_lineup_json_is_parsed_without_a_raising_cast(self):
+        query, _ = _query()
+        # A bare ::jsonb cast aborts the whole query on the first malformed starting_xi.
+        self.assertNotIn("::jsonb", query)
+        self.assertIn("try_parse_jsonb(l.starting_xi)", query)
+        self.assertIn("invalid_text_representation", TRY_PARSE_JSONB_SQL)
+
+    def test_lookup_filters_both_lineup_sources_in_one_query(self):
+        conn = FakeConnection([(10, 1, 6.912, 11, 9), (10, 2, 7.1, 11, 11)])
+        result = lookup_lineup_quality(conn, [10])
+        self.assertEqual(result, {(10, 1): 6.912, (10, 2): 7.1})
+        self.assertEqual(len(conn.queries), 1)
+        query, params = conn.queries[0]
+        self.assertEqual(query.count("ANY(%(fixture_ids)s)"), 2)
+        self.assertEqual(params["fixture_ids"], [10])
+
+    def test_lookup_without_fixtures_skips_the_database(self):
+        conn = FakeConnection([])
+        self.assertEqual(lookup_lineup_quality(conn, []), {})
+        self.assertEqual(conn.queries, [])
+
+    def test_context_adapter_falls_back_for_teams_without_lineups(self):
+        conn = FakeConnection([(10, 1, 7.25, 11, 11)])
+        adapter = ContextAdapter("context")
+        adapter._get_rest_days = lambda *args: 7.0
+        adapter._get_venue_stats = lambda *args: {'pts_home': 1.0, 'pts_away': 1.0}
+        adapter._get_h2h_context = lambda *args: {'h_wins': 0.33, 'draws': 0.33, 'a_wins': 0.33}
+        adapter._get_team_elo = lambda *args: 1500.0
+        adapter._is_derby = lambda *args: 0
+        features = adapter.get_features(conn, 1, 2, "2026-04-01", fixture_id=10)
+        self.assertEqual(features["lqi_h"], 7.25)
+        self.assertEqual(features["lqi_a"], DEFAULT_LQI)
+        self.assertEqual(len(conn.queries), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.generate_synthetic_data import leagues_for_fixtures
+from scripts.load_test import parse_mix, summarize_endpoint
+
+
+class TestLoadTest(unittest.TestCase):
+
+    def test_parse_mix_normalizes_and_drops_zero_weights(self):
+        mix = parse_mix("predict=2,batch=0,fixture=2")
+        self.assertEqual(mix, {"predict": 0.5, "fixture": 0.5})
+        with self.assertRaises(ValueError):
+            parse_mix("predict=1,unknown=1")
+
+    def test_summarize_endpoint_reports_errors_and_percentiles(self):
+        samples = [{"latency": i / 1000.0, "status": 200, "ok": True} for i in range(1, 100)]
+        samples.append({"latency": 1.0, "status": 500, "ok": False})
+        summary = summarize_endpoint(samples, duration=10.0)
+        self.assertEqual(summary["requests"], 100)
+        self.assertEqual(summary["rps"], 10.0)
+        self.assertEqual(summary["error_rate"], 0.01)
+        self.assertEqual(summary["status"], {"200": 99, "500": 1})
+        self.assertAlmostEqual(summary["latency_ms"]["p50"], 50.5, places=1)
+        self.assertEqual(summary["latency_ms"]["max"], 1000.0)
+
+    def test_leagues_cover_the_target_fixture_count(self):
+        self.assertEqual(leagues_for_fixtures(10_000, 20, 2), 14)
+        self.assertEqual(leagues_for_fixtures(2_000_000, 20, 2), 2632)
+        self.assertEqual(leagues_for_fixtures(10, 20, 2), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from prometheus_client import REGISTRY
+
+from db_config import _record, track_queries
+from src.monitoring.metrics import observe_model, observe_stage, register_state_provider
+
+
+def sample(name, labels=None):
+    return REGISTRY.get_sample_value(name, labels or {}) or 0.0
+
+
+class TestQueryTracking(unittest.TestCase):
+
+    def test_nested_contexts_report_to_parents(self):
+        with track_queries() as outer:
+            _record('connections', 0.01)
+            with track_queries() as inner:
+                _record('queries', 0.02)
+                _record('queries', 0.03)
+            _record('queries', 0.04)
+        self.assertEqual((inner['connections'], inner['queries']), (0, 2))
+        self.assertAlmostEqual(inner['seconds'], 0.05)
+        self.assertEqual((outer['connections'], outer['queries']), (1, 3))
+        self.assertAlmostEqual(outer['seconds'], 0.10)
+
+    def test_queries_outside_a_context_are_ignored(self):
+        with track_queries() as finished:
+            pass
+        _record('queries', 1.0)
+        self.assertEqual((finished['connections'], finished['queries'], finished['seconds']), (0, 0, 0.0))
+        with track_queries() as stats:
+            pass
+        self.assertEqual((stats['queries'], stats['seconds']), (0, 0.0))
+
+
+class TestPredictionMetrics(unittest.TestCase):
+
+    def test_model_stages_are_recorded(self):
+        labels = {"model": "TEST_MODEL"}
+        before = sample("ml_prediction_model_seconds_count", labels)
+        with observe_model("TEST_MODEL"):
+            _record('queries', 0.25)
+            with observe_stage("TEST_MODEL", "scoring"):
+                pass
+        self.assertEqual(sample("ml_prediction_model_seconds_count", labels), before + 1)
+        self.assertAlmostEqual(
+            sample("ml_prediction_stage_seconds_sum", {"model": "TEST_MODEL", "stage": "db_fetch"}), 0.25
+        )
+        self.assertEqual(sample("ml_prediction_stage_seconds_count", {"model": "TEST_MODEL", "stage": "scoring"}), 1)
+
+    def test_failed_model_is_counted(self):
+        with self.assertRaises(ValueError):
+            with observe_model("FAILING_MODEL"):
+                raise ValueError("boom")
+        self.assertEqual(sample("ml_prediction_model_errors_total", {"model": "FAILING_MODEL"}), 1)
+
+    def test_state_providers_are_exported_at_scrape_time(self):
+        state = {"running": 0, "enabled": True, "hit_rate": None}
+        register_state_provider("test_jobs", lambda: state)
+        state["running"] = 2
+        self.assertEqual(sample("ml_test_jobs_running"), 2)
+        self.assertEqual(sample("ml_test_jobs_enabled"), 1)
+        self.assertIsNone(REGISTRY.get_sample_value("ml_test_jobs_hit_rate"))
+
+
+if __name__ == '__main__':
+    unittest.main()
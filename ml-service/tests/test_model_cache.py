@@ -0,0 +1,71 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.model_cache import ModelCache
+
+
+class TestModelCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.paths = []
+        for index in range(3):
+            path = os.path.join(self.tmpdir.name, f"model_{index}.bin")
+            with open(path, "wb") as handle:
+                handle.write(b"x" * 100)
+            self.paths.append(path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_loads_each_key_once(self):
+        cache = ModelCache(max_bytes=1000)
+        calls = []
+        loader = lambda: calls.append(1) or object()
+        threads = [threading.Thread(target=cache.get, args=(("m", 1, "p"), loader)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.stats()["hits"], 7)
+
+    def test_failed_loads_leave_no_load_lock_behind(self):
+        cache = ModelCache(max_bytes=1000)
+
+        def failing():
+            raise OSError("model file missing")
+
+        for _ in range(3):
+            with self.assertRaises(OSError):
+                cache.get(("m", 1, "missing"), failing)
+        self.assertEqual(cache._load_locks, {})
+        self.assertFalse(cache.contains(("m", 1, "missing")))
+
+    def test_evicts_least_recently_used_over_budget(self):
+        cache = ModelCache(max_bytes=250)
+        cache.get(("a", 1, self.paths[0]), object, size_paths=(self.paths[0],))
+        cache.get(("b", 1, self.paths[1]), object, size_paths=(self.paths[1],))
+        cache.get(("a", 1, self.paths[0]), object, size_paths=(self.paths[0],))
+        cache.get(("c", 1, self.paths[2]), object, size_paths=(self.paths[2],))
+        self.assertTrue(cache.contains(("a", 1, self.paths[0])))
+        self.assertFalse(cache.contains(("b", 1, self.paths[1])))
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertEqual(cache.stats()["bytes"], 200)
+
+    def test_supersede_replaces_older_versions(self):
+        cache = ModelCache(max_bytes=1000)
+        old_model = cache.get(("m", 1, "p"), object)
+        new_model = cache.get(("m", 2, "p"), object, supersede=True)
+        self.assertIsNot(old_model, new_model)
+        self.assertFalse(cache.contains(("m", 1, "p")))
+        self.assertEqual(cache.names(), {"m"})
+
+
+if __name__ == '__main__':
+    unittest.main()
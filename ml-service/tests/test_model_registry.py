@@ -0,0 +1,55 @@
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.model_registry import ModelRegistry
+
+
+def registry_row(name, version, horizon=None):
+    metadata = {"horizon": horizon} if horizon else {}
+    return name, version, f"/models/{name}_{version}.joblib", json.dumps(metadata)
+
+
+class TestModelRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.fetches = 0
+        self.rows = [
+            registry_row("global_goals_ou", "v3", "5Y_ROLLING"),
+            registry_row("global_goals_ou", "v2", "3Y_ROLLING"),
+            registry_row("league_1x2_ft_39", "v1"),
+        ]
+
+    def fetch_rows(self):
+        self.fetches += 1
+        return list(self.rows)
+
+    def test_single_query_serves_name_and_horizon_lookups(self):
+        registry = ModelRegistry(fetch_rows=self.fetch_rows)
+        self.assertEqual(registry.get("global_goals_ou")["version"], "v3")
+        self.assertEqual(registry.get_for_horizon("global_goals_ou", "3Y_ROLLING")["version"], "v2")
+        self.assertEqual(registry.get("league_1x2_ft_39")["metadata"], {})
+        self.assertIsNone(registry.get("league_1x2_ft_140"))
+        self.assertEqual(self.fetches, 1)
+
+    def test_refresh_reports_changed_names_to_listeners(self):
+        registry = ModelRegistry(fetch_rows=self.fetch_rows)
+        notified = []
+        registry.add_listener(notified.append)
+        registry.get("global_goals_ou")
+
+        self.rows = [registry_row("global_goals_ou", "v3", "5Y_ROLLING"), registry_row("league_1x2_ft_39", "v2")]
+        self.assertEqual(registry.refresh(), {"league_1x2_ft_39"})
+        self.assertEqual(notified, [{"league_1x2_ft_39"}])
+        self.assertEqual(registry.get("league_1x2_ft_39")["version"], "v2")
+        self.assertIsNone(registry.get_for_horizon("global_goals_ou", "3Y_ROLLING"))
+
+        self.assertEqual(registry.refresh(), set())
+        self.assertEqual(len(notified), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
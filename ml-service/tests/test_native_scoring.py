@@ -0,0 +1,83 @@
+import gc
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+from catboost import CatBoostClassifier, CatBoostRegressor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models import native_scoring
+
+
+def training_frame(rows=120):
+    rng = np.random.default_rng(7)
+    frame = pd.DataFrame(rng.normal(size=(rows, 4)), columns=["diff_elo", "diff_points", "home_xg", "away_xg"])
+    frame["league_id"] = rng.choice([39, 61, 140], rows)
+    return frame, rng
+
+
+class TestNativeScoring(unittest.TestCase):
+
+    def test_classifier_matches_dataframe_scoring_for_one_and_many_rows(self):
+        frame, rng = training_frame()
+        columns = ["diff_elo", "diff_points", "home_xg", "away_xg"]
+        model = CatBoostClassifier(iterations=20, verbose=0, allow_writing_files=False)
+        model.fit(frame[columns], rng.integers(0, 3, len(frame)))
+
+        vector = frame.iloc[0][columns].to_dict()
+        # Dict key order does not matter, the model's feature order does.
+        shuffled = dict(reversed(list(vector.items())))
+        np.testing.assert_allclose(
+            native_scoring.predict_proba(model, shuffled, columns),
+            model.predict_proba(pd.DataFrame([vector], columns=columns)),
+        )
+        np.testing.assert_allclose(
+            native_scoring.predict_proba(model, frame.head(300), columns),
+            model.predict_proba(frame[columns].head(300)),
+        )
+
+    def test_categorical_league_id_goes_through_a_pool(self):
+        frame, rng = training_frame()
+        model = CatBoostRegressor(
+            iterations=20, loss_function="Poisson", verbose=0, cat_features=["league_id"], allow_writing_files=False
+        )
+        model.fit(frame, rng.poisson(1.4, len(frame)))
+
+        vector = frame.iloc[3].to_dict()
+        vector["league_id"] = float(vector["league_id"])
+        vector["home_xg"] = None
+        expected_row = dict(vector, league_id=int(vector["league_id"]))
+        self.assertEqual(native_scoring.model_layout(model).cat_indices, (4,))
+        np.testing.assert_allclose(
+            native_scoring.predict(model, vector),
+            model.predict(pd.DataFrame([expected_row], columns=frame.columns)),
+        )
+
+    def test_positional_feature_names_fall_back_to_columns(self):
+        frame, rng = training_frame()
+        columns = ["diff_elo", "diff_points", "home_xg", "away_xg"]
+        model = CatBoostRegressor(iterations=10, verbose=0, allow_writing_files=False)
+        model.fit(frame[columns].to_numpy(), rng.normal(size=len(frame)))
+
+        vector = frame.iloc[5][columns].to_dict()
+        np.testing.assert_allclose(
+            native_scoring.predict(model, vector, columns),
+            model.predict(frame[columns].iloc[[5]].to_numpy()),
+        )
+        matrix = native_scoring.feature_matrix([vector, {"diff_elo": 1.0}], columns)
+        self.assertEqual(matrix.dtype, np.float32)
+        self.assertTrue(matrix.flags["C_CONTIGUOUS"])
+        self.assertTrue(np.isnan(matrix[1, 1]))
+
+        key = (id(model), tuple(columns))
+        self.assertIn(key, native_scoring._layouts)
+        del model
+        gc.collect()
+        self.assertNotIn(key, native_scoring._layouts)
+
+
+if __name__ == '__main__':
+    unittest.main()
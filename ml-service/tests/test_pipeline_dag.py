@@ -0,0 +1,109 @@
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.pipeline.dag import FileInput, PipelineRunner, Stage, ValueInput, select_stages
+from src.pipeline.stages import PIPELINES, build_stages
+
+
+class TestPipelineDag(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.source = os.path.join(self.tmp.name, "source.txt")
+        with open(self.source, "w") as handle:
+            handle.write("v1")
+
+    def append(self, marker):
+        code = f"open({os.path.join(self.tmp.name, 'trace')!r}, 'a').write({marker!r} + '\\n')"
+        return [sys.executable, "-c", code]
+
+    def trace(self):
+        path = os.path.join(self.tmp.name, "trace")
+        if not os.path.exists(path):
+            return []
+        with open(path) as handle:
+            return handle.read().split()
+
+    def run_stages(self, stages, **kwargs):
+        runner = PipelineRunner(
+            "demo", stages,
+            state_path=os.path.join(self.tmp.name, "state.json"),
+            report_path=os.path.join(self.tmp.name, "report.json"),
+            log_dir=os.path.join(self.tmp.name, "logs"),
+            poll_seconds=0.05,
+            **kwargs,
+        )
+        return runner.run()
+
+    def chain(self):
+        return [
+            Stage("extract", self.append("extract"), inputs=(FileInput(self.source),)),
+            Stage("train", self.append("train"), deps=("extract",)),
+            Stage("report", self.append("report"), inputs=(ValueInput("format", "json"),)),
+        ]
+
+    def test_up_to_date_stages_are_skipped_and_changes_cascade(self):
+        first = self.run_stages(self.chain())
+        self.assertEqual(first["status"], "completed")
+        self.assertEqual(sorted(self.trace()), ["extract", "report", "train"])
+
+        second = self.run_stages(self.chain())
+        self.assertEqual(second["summary"], {"skipped": ["extract", "report", "train"]})
+        self.assertEqual(len(self.trace()), 3)
+
+        with open(self.source, "w") as handle:
+            handle.write("v2")
+        third = self.run_stages(self.chain())
+        self.assertEqual(third["summary"], {"skipped": ["report"], "succeeded": ["extract", "train"]})
+        self.assertEqual(third["stages"]["extract"]["reason"], "inputs changed")
+
+        with open(os.path.join(self.tmp.name, "report.json")) as handle:
+            self.assertEqual(json.load(handle)["status"], "completed")
+
+    def test_failure_blocks_dependents_but_not_independent_branches(self):
+        stages = [
+            Stage("broken", [sys.executable, "-c", "import sys; sys.exit(2)"]),
+            Stage("downstream", self.append("downstream"), deps=("broken",)),
+            Stage("independent", self.append("independent")),
+        ]
+        report = self.run_stages(stages)
+        self.assertEqual(report["status"], "failed")
+        self.assertEqual(report["stages"]["broken"]["return_code"], 2)
+        self.assertEqual(report["stages"]["downstream"]["status"], "blocked")
+        self.assertEqual(self.trace(), ["independent"])
+
+        # The failed stage has no recorded success, so it runs again next time.
+        report = self.run_stages(stages)
+        self.assertEqual(report["stages"]["broken"]["reason"], "never ran")
+
+    def test_independent_stages_run_in_parallel_within_the_budget(self):
+        sleep = [sys.executable, "-c", "import time; time.sleep(0.6)"]
+        stages = [Stage(name, sleep, resources={"cpu": 1}) for name in ("a", "b")]
+
+        started = time.time()
+        self.run_stages(stages, budget={"cpu": 2}, force=("a", "b"))
+        parallel = time.time() - started
+        started = time.time()
+        self.run_stages(stages, budget={"cpu": 1}, force=("a", "b"))
+        serial = time.time() - started
+        self.assertLess(parallel, serial - 0.3)
+
+    def test_pipelines_select_declared_stages_and_their_upstream(self):
+        stages = build_stages()
+        for targets in PIPELINES.values():
+            select_stages(stages, targets)
+        overnight = [stage.name for stage in select_stages(stages, PIPELINES["overnight"])]
+        self.assertEqual(overnight, ["elo", "standings", "baseline", "process", "features", "train_1x2_full"])
+        with self.assertRaises(ValueError):
+            select_stages(stages, ["missing"])
+
+
+if __name__ == '__main__':
+    unittest.main()
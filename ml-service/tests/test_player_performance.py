@@ -0,0 +1,49 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from player_performance import stream_rolling_perf
+
+
+class TestStreamRollingPerf(unittest.TestCase):
+
+    def test_matches_the_pandas_rolling_mean(self):
+        rng = np.random.default_rng(3)
+        frame = pd.DataFrame({
+            "player_id": np.repeat([1, 2, 3], [45, 3, 1]),
+            "fixture_id": np.arange(49),
+            "date": np.arange(49),
+            "perf_score": rng.normal(1.0, 0.8, 49).round(3),
+        })
+        expected = frame.groupby("player_id")["perf_score"].transform(
+            lambda x: x.shift().rolling(20, min_periods=1).mean()
+        )
+        rows = ((*row, True) for row in frame.itertuples(index=False, name=None))
+        result = [row[4] for row in stream_rolling_perf(rows, window=20)]
+        self.assertEqual(len(result), len(frame))
+        for got, want in zip(result, expected):
+            if pd.isna(want):
+                self.assertIsNone(got)
+            else:
+                self.assertAlmostEqual(got, want, places=9)
+
+    def test_seed_rows_fill_the_buffer_without_being_emitted(self):
+        rows = [
+            (7, 100, 1, 1.0, False),
+            (7, 101, 2, 3.0, False),
+            (7, 102, 3, 5.0, True),
+            (7, 103, 4, 0.0, True),
+            (8, 104, 4, 2.0, True),
+        ]
+        result = list(stream_rolling_perf(rows, window=2))
+        self.assertEqual([row[1] for row in result], [102, 103, 104])
+        self.assertEqual([row[4] for row in result], [2.0, 4.0, None])
+
+
+if __name__ == '__main__':
+    unittest.main()
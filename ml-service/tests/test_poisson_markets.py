@@ -0,0 +1,57 @@
+import math
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.poisson_markets import (
+    score_markets,
+    score_matrix,
+    total_distribution,
+    total_markets,
+    under_probabilities,
+)
+
+
+def scalar_pmf(mu, k):
+    if mu <= 0:
+        return 1.0 if k == 0 else 0.0
+    return math.exp(-mu) * mu ** k / math.factorial(k)
+
+
+class TestPoissonMarkets(unittest.TestCase):
+
+    def test_score_matrix_matches_scalar_pmf(self):
+        matrix = score_matrix([1.4, 0.0], [0.9, 2.1], max_goals=6, normalize=False)
+        self.assertEqual(matrix.shape, (2, 7, 7))
+        self.assertAlmostEqual(matrix[0, 2, 1], scalar_pmf(1.4, 2) * scalar_pmf(0.9, 1), places=12)
+        self.assertAlmostEqual(matrix[1, 0, 3], scalar_pmf(2.1, 3), places=12)
+        self.assertEqual(matrix[1, 1, 0], 0.0)
+
+    def test_outcomes_are_normalized_and_ordered(self):
+        markets = score_markets([2.5, 0.4], [0.4, 2.5], max_goals=8, lines=(2.5,))
+        np.testing.assert_allclose(markets.outcomes.sum(axis=1), 1.0)
+        home, away = markets.outcome_dicts()
+        self.assertGreater(home["1"], home["2"])
+        self.assertAlmostEqual(home["1"], away["2"], places=12)
+        self.assertEqual(list(markets.over_under_dicts()[0]), ["Over 2.5", "Under 2.5"])
+
+    def test_top_exact_scores_are_sorted(self):
+        scores = score_markets([1.2], [1.0], max_goals=8).exact_scores(top_n=5)[0]
+        self.assertEqual(len(scores), 5)
+        self.assertEqual(list(scores.values()), sorted(scores.values(), reverse=True))
+        self.assertEqual(next(iter(scores)), "1-0")
+
+    def test_total_lines_match_cumulative_distribution(self):
+        distribution = total_distribution([9.8], max_total=30)
+        under = under_probabilities(distribution, [9.5])[0, 0]
+        self.assertAlmostEqual(under, distribution[0, :10].sum(), places=12)
+        payload = total_markets([9.8], 30, (9.5,))[0]
+        self.assertAlmostEqual(payload["Over 9.5"] + payload["Under 9.5"], 1.0, places=12)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.orchestrator.prediction_cache import PredictionCache
+
+
+def master_prediction(fixture_id, failed_model=None):
+    models = {"FT_RESULT": {"prediction_status": "success_model"}}
+    if failed_model:
+        models[failed_model] = {"error": "boom", "prediction_status": "error"}
+    return {"fixture_id": fixture_id, "success": True, "models": models}
+
+
+@patch('src.orchestrator.prediction_cache.model_fingerprint', return_value="models-v1")
+@patch('src.orchestrator.prediction_cache.fetch_feature_version', return_value="2026-04-01T10:00:00")
+class TestPredictionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+
+    def compute(self, fixture_id):
+        self.calls.append(fixture_id)
+        return master_prediction(fixture_id)
+
+    def test_repeated_requests_hit_memory_tier(self, _features, _models):
+        cache = PredictionCache(max_entries=10, use_db=False)
+        first = cache.get_or_compute(7, self.compute)
+        second = cache.get_or_compute(7, self.compute)
+        self.assertIs(first, second)
+        self.assertEqual(self.calls, [7])
+        self.assertEqual(cache.stats()["hit_rate"], 0.5)
+
+    def test_new_feature_or_model_version_recomputes(self, features, models):
+        cache = PredictionCache(max_entries=10, use_db=False)
+        cache.get_or_compute(7, self.compute)
+        features.return_value = "2026-04-02T10:00:00"
+        cache.get_or_compute(7, self.compute)
+        models.return_value = "models-v2"
+        cache.get_or_compute(7, self.compute)
+        self.assertEqual(self.calls, [7, 7, 7])
+
+    def test_failed_submodels_are_not_cached(self, _features, _models):
+        cache = PredictionCache(max_entries=10, use_db=False)
+        compute = lambda fixture_id: self.calls.append(fixture_id) or master_prediction(fixture_id, "HT_RESULT")
+        cache.get_or_compute(7, compute)
+        cache.get_or_compute(7, compute)
+        self.assertEqual(self.calls, [7, 7])
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_lru_is_bounded(self, _features, _models):
+        cache = PredictionCache(max_entries=2, use_db=False)
+        for fixture_id in (1, 2, 1, 3):
+            cache.get_or_compute(fixture_id, self.compute)
+        cache.get_or_compute(2, self.compute)
+        self.assertEqual(self.calls, [1, 2, 3, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.monitoring.profiling import _REQUEST, list_profiles, profile_path, profile_request, profile_summary
+
+
+def busy():
+    return sum(i * i for i in range(1000))
+
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def run_request(self, profile):
+        request = {"profile": profile, "trigger": "header" if profile else None, "profile_id": None}
+        token = _REQUEST.set(request)
+        try:
+            with profile_request("/predict/fixture", 42, directory=self.tmp.name):
+                busy()
+        finally:
+            _REQUEST.reset(token)
+        return request
+
+    def test_nothing_is_stored_when_not_requested(self):
+        with profile_request("/predict/fixture", 42, directory=self.tmp.name):
+            busy()
+        self.assertIsNone(self.run_request(False)["profile_id"])
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_profile_is_stored_listed_and_readable(self):
+        request = self.run_request(True)
+        profile_id = request["profile_id"]
+        self.assertTrue(profile_id.endswith("_predict_fixture_42"))
+
+        profiles = list_profiles(directory=self.tmp.name)
+        self.assertEqual([p["id"] for p in profiles], [profile_id])
+        self.assertEqual(profiles[0]["fixture_id"], 42)
+        self.assertEqual(profiles[0]["route"], "/predict/fixture")
+
+        path = profile_path(profile_id, directory=self.tmp.name)
+        self.assertIn("busy", profile_summary(path))
+
+    def test_malformed_profile_ids_are_rejected(self):
+        self.assertIsNone(profile_path("../main", directory=self.tmp.name))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import json
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.risk.engine import compute_fair_odds, prediction_json, save_fair_odds
+
+
+class TestRiskEngine(unittest.TestCase):
+
+    def test_fair_odds_from_in_memory_predictions(self):
+        predictions = {
+            "FT_RESULT": {
+                "prediction_status": "success_model",
+                "is_fallback": False,
+                "probabilities_1n2": {"1": 0.5, "N": 0.25, "2": 0.25},
+            },
+            "GOALS_TOTAL": {
+                "prediction_status": "success_model",
+                "over_under_probabilities": {"Over 2.5": 0.6, "Under 2.5": 0.0},
+            },
+            "CARDS_TOTAL": {
+                "prediction_status": "success_fallback",
+                "is_fallback": True,
+                "over_under_probabilities": {"Over 4.5": 0.5},
+            },
+            "HT_RESULT": {"error": "boom", "prediction_status": "error", "is_fallback": False},
+            "RISK_ANALYSIS": {"success": True},
+        }
+        rows = compute_fair_odds(123, predictions)
+        self.assertEqual(
+            rows,
+            [
+                (123, "1N2_FT", "1", 0.5, 2.0),
+                (123, "1N2_FT", "N", 0.25, 4.0),
+                (123, "1N2_FT", "2", 0.25, 4.0),
+                (123, "GOALS_OU", "Over 2.5", 0.6, 1.0 / 0.6),
+            ],
+        )
+
+    def test_non_finite_probabilities_are_stored_as_null_and_skipped(self):
+        prediction = {
+            "prediction_status": "success_model",
+            "expected_goals": {"home": float("nan"), "away": 1.2},
+            "over_under_probabilities": {"Over 2.5": float("inf"), "Under 2.5": 0.4, "Over 3.5": float("nan")},
+        }
+        stored = json.loads(prediction_json(prediction))
+        self.assertIsNone(stored["expected_goals"]["home"])
+        self.assertIsNone(stored["over_under_probabilities"]["Over 2.5"])
+        self.assertNotIn("NaN", prediction_json(prediction))
+        expected = [(5, "GOALS_OU", "Under 2.5", 0.4, 2.5)]
+        self.assertEqual(compute_fair_odds(5, {"GOALS_TOTAL": prediction}), expected)
+        # The same rows from the stored JSON, where the NaN became null.
+        self.assertEqual(compute_fair_odds(5, {"GOALS_TOTAL": stored}), expected)
+
+    @patch('src.risk.engine.execute_values')
+    def test_rows_are_upserted_in_one_statement(self, mock_execute_values):
+        rows = [(1, "1N2_FT", "1", 0.5, 2.0), (1, "1N2_FT", "1", 0.4, 2.5), (1, "1N2_FT", "2", 0.3, 1 / 0.3)]
+        self.assertEqual(save_fair_odds(MagicMock(), rows), 2)
+        self.assertEqual(mock_execute_values.call_count, 1)
+        self.assertEqual(mock_execute_values.call_args[0][2][0], (1, "1N2_FT", "1", 0.4, 2.5))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+from catboost import CatBoostRegressor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models import native_scoring
+from src.orchestrator import warmup
+
+
+class TestWarmup(unittest.TestCase):
+
+    def test_disabled_warmup_is_ready(self):
+        status = warmup.run_warmup("off")
+        self.assertEqual(status["state"], "disabled")
+        self.assertTrue(warmup.is_ready())
+
+    def test_dummy_prediction_fills_categorical_features(self):
+        features = pd.DataFrame({"diff_elo": np.linspace(-200, 200, 40), "league_id": ["39", "140"] * 20})
+        model = CatBoostRegressor(iterations=5, verbose=0, cat_features=["league_id"], allow_writing_files=False)
+        model.fit(features, np.linspace(0.5, 2.5, 40))
+
+        warmup.warmup_status["models"] = []
+        warmup._warm("goals_poisson", lambda: {"type": "poisson", "home": model, "away": model})
+        self.assertEqual(warmup.warmup_status["models"][0]["name"], "goals_poisson")
+        self.assertTrue(warmup.warmup_status["models"][0]["dummy_prediction"])
+
+    def test_warmup_does_not_fix_positional_names_for_later_scoring(self):
+        columns = ["diff_elo", "diff_points", "home_xg"]
+        rng = np.random.default_rng(3)
+        features = rng.normal(size=(60, 3))
+        model = CatBoostRegressor(iterations=10, verbose=0, allow_writing_files=False)
+        # Fitted on a bare array, so the model only knows the names '0', '1', '2'.
+        model.fit(features, features[:, 0] * 3 + 1)
+
+        warmup.warmup_status["models"] = []
+        warmup._warm("goals_poisson", lambda: {"type": "poisson", "home": model, "away": model})
+        warmup._warm("goals_poisson", lambda: {"type": "poisson", "home": model, "away": model}, columns)
+        row = dict(zip(columns, features[7]))
+        np.testing.assert_allclose(native_scoring.predict(model, row, columns), model.predict(features[[7]]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,6 +7,7 @@ import logging
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 from db_config import get_connection
+from lineup_quality import DEFAULT_LQI, lookup_lineup_quality
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -71,14 +72,15 @@ class ContextAdapter(FeatureAdapter):
         home_venue = self._get_venue_stats(conn, h_id, morning_of)
         away_venue = self._get_venue_stats(conn, a_id, morning_of)
         round_name = kwargs.get('round_name', '')
+        lqi = lookup_lineup_quality(conn, [fixture_id]) if fixture_id is not None else {}
         return {
             "rest_h": self._get_rest_days(conn, h_id, morning_of),
             "rest_a": self._get_rest_days(conn, a_id, morning_of),
             "h2h_h_wins": h2h['h_wins'], "h2h_draws": h2h['draws'], "h2h_a_wins": h2h['a_wins'],
             "venue_diff_h": home_venue['pts_home'] - home_venue['pts_away'],
             "venue_diff_a": away_venue['pts_home'] - away_venue['pts_away'],
-            "lqi_h": self._get_lqi(conn, fixture_id, h_id),
-            "lqi_a": self._get_lqi(conn, fixture_id, a_id),
+            "lqi_h": lqi.get((fixture_id, h_id), DEFAULT_LQI),
+            "lqi_a": lqi.get((fixture_id, a_id), DEFAULT_LQI),
             "elo_h": self._get_team_elo(conn, h_id, morning_of),
             "elo_a": self._get_team_elo(conn, a_id, morning_of),
             "is_derby": self._is_derby(conn, h_id, a_id),
@@ -121,27 +123,6 @@ class ContextAdapter(FeatureAdapter):
         total = len(df)
         return {k: v/total for k, v in counts.items()} if total > 0 else {'h_wins': 0.33, 'draws': 0.33, 'a_wins': 0.33}
 
-    def _get_lqi(self, conn, fixture_id, team_id):
-        cur = conn.cursor()
-        cur.execute("SELECT feature_data FROM V3_Feature_Snapshots WHERE fixture_id = %s AND team_id = %s AND feature_type = 'SQUAD'", (fixture_id, team_id))
-        row = cur.fetchone()
-        if row:
-            try:
-                data = json.loads(row[0])
-                return data.get('lqi', data.get('rating_avg', 6.5))
-            except: pass
-        cur.execute("SELECT starting_xi FROM V3_Fixture_Lineups WHERE fixture_id = %s AND team_id = %s", (fixture_id, team_id))
-        row = cur.fetchone()
-        if row and row[0]:
-            try:
-                xi = json.loads(row[0]); player_ids = [p.get('player', {}).get('id') for p in xi if p.get('player', {}).get('id')]
-                if player_ids:
-                    cur.execute(f"SELECT scout_rank FROM V3_Players WHERE api_id IN ({','.join(['%s']*len(player_ids))})", player_ids)
-                    ratings = [r[0] for r in cur.fetchall() if r[0] is not None]
-                    if ratings: return sum(ratings + [6.5]*(11-len(ratings))) / 11
-            except: pass
-        return 6.5
-
     def _get_team_elo(self, conn, team_id, morning_of):
         cur = conn.cursor(); cur.execute("SELECT elo_score FROM V3_Team_Ratings WHERE team_id = %s AND date < %s ORDER BY date DESC LIMIT 1", (team_id, morning_of))
         row = cur.fetchone()
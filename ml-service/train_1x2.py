@@ -19,7 +19,7 @@ from feature_schema import (
     inspect_feature_vector,
     normalize_feature_vector,
 )
-from horizon_utils import filter_dataframe_by_horizon, normalize_horizon_type
+from horizon_utils import normalize_horizon_type, resolve_horizon_sql, with_dataset_size
 
 # Path setup
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -94,15 +94,20 @@ def train_model(use_optuna=True, horizon_type="FULL_HISTORICAL", activate=True,
     try:
         write_train_progress(status="running", stage="loading_data", horizon=horizon_type, activate=activate)
         # 1. Load Data
-        query = """
-            SELECT f.fixture_id, f.date AS match_date, f.goals_home, f.goals_away, fs.feature_vector
+        from_sql = """
             FROM V3_Fixtures f
             JOIN V3_ML_Feature_Store fs ON f.fixture_id = fs.fixture_id
             WHERE f.status_short IN ('FT', 'AET', 'PEN')
+        """
+        conditions, params, horizon_window = resolve_horizon_sql(conn, horizon_type, from_sql)
+        query = f"""
+            SELECT f.fixture_id, f.date AS match_date, f.goals_home, f.goals_away, fs.feature_vector
+            {from_sql}{conditions}
             ORDER BY f.date ASC
         """
-        df = pd.read_sql_query(query, conn)
-        df, horizon_window = filter_dataframe_by_horizon(df, "match_date", horizon_type)
+        df = pd.read_sql_query(query, conn, params=params)
+        df["match_date"] = pd.to_datetime(df["match_date"], utc=True)
+        horizon_window = with_dataset_size(horizon_window, df)
 
         if df.empty:
             print("❌ No features found in Feature Store. Run features.py first.")
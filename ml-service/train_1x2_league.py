@@ -19,7 +19,7 @@ from feature_schema import (
     inspect_feature_vector,
     normalize_feature_vector,
 )
-from horizon_utils import filter_dataframe_by_horizon, normalize_horizon_type
+from horizon_utils import normalize_horizon_type, resolve_horizon_sql, with_dataset_size
 
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -73,10 +73,19 @@ def objective(trial, X, y):
     return float(np.mean(scores))
 
 
-def fetch_league_dataset(league_id: int):
+def fetch_league_dataset(league_id: int, horizon_type: str = "FULL_HISTORICAL", min_date=None, max_date=None):
     conn = get_db_connection()
     try:
-        query = """
+        from_sql = """
+            FROM V3_Fixtures f
+            JOIN V3_ML_Feature_Store fs ON f.fixture_id = fs.fixture_id
+            LEFT JOIN V3_Leagues l ON f.league_id = l.league_id
+            WHERE f.status_short IN ('FT', 'AET', 'PEN')
+        """
+        conditions, params, horizon_window = resolve_horizon_sql(
+            conn, horizon_type, from_sql, league_id=league_id, min_date=min_date, max_date=max_date
+        )
+        query = f"""
             SELECT
                 f.fixture_id,
                 f.league_id,
@@ -85,14 +94,10 @@ def fetch_league_dataset(league_id: int):
                 f.goals_home,
                 f.goals_away,
                 fs.feature_vector
-            FROM V3_Fixtures f
-            JOIN V3_ML_Feature_Store fs ON f.fixture_id = fs.fixture_id
-            LEFT JOIN V3_Leagues l ON f.league_id = l.league_id
-            WHERE f.status_short IN ('FT', 'AET', 'PEN')
-              AND f.league_id = %s
+            {from_sql}{conditions}
             ORDER BY f.date ASC
         """
-        df = pd.read_sql_query(query, conn, params=(league_id,))
+        df = pd.read_sql_query(query, conn, params=params)
     finally:
         conn.close()
 
@@ -114,7 +119,7 @@ def fetch_league_dataset(league_id: int):
         columns=GLOBAL_1X2_FEATURE_COLUMNS,
     )
     y = np.where(df["goals_home"] > df["goals_away"], 1, np.where(df["goals_home"] < df["goals_away"], 2, 0))
-    return df, X, pd.Series(y)
+    return df, X, pd.Series(y), with_dataset_size(horizon_window, df)
 
 
 def train_league_model(
@@ -126,11 +131,7 @@ def train_league_model(
 ):
     horizon_type = normalize_horizon_type(horizon_type)
     horizon_slug = horizon_type.lower()
-    df, X, y = fetch_league_dataset(league_id)
-    df, horizon_window = filter_dataframe_by_horizon(df, "match_date", horizon_type)
-    X = X.loc[df.index].reset_index(drop=True)
-    y = y.loc[df.index].reset_index(drop=True)
-    df = df.reset_index(drop=True)
+    df, X, y, horizon_window = fetch_league_dataset(league_id, horizon_type=horizon_type)
     league_name = str(df.iloc[0]["league_name"])
     paths = get_league_model_paths(league_id, horizon_slug)
     os.makedirs(paths["dir"], exist_ok=True)
@@ -11,7 +11,7 @@ from sklearn.metrics import mean_squared_error
 
 from db_config import get_connection
 from feature_schema import GLOBAL_1X2_FEATURE_COLUMNS, GLOBAL_1X2_FEATURE_SCHEMA_VERSION, normalize_feature_vector
-from horizon_utils import filter_dataframe_by_horizon, normalize_horizon_type
+from horizon_utils import normalize_horizon_type, resolve_horizon_sql, with_dataset_size
 from src.models.model_utils import get_valid_cat_features
 
 
@@ -39,37 +39,35 @@ def get_league_model_paths(league_id: int, horizon_slug: Optional[str] = None):
     }
 
 
-def fetch_cards_league_dataset(league_id: int):
+def fetch_cards_league_dataset(league_id: int, horizon_type: str = "FULL_HISTORICAL", min_date=None, max_date=None):
     conn = get_connection_db()
     try:
-        query = """
+        from_sql = """
+            FROM V3_Fixtures f
+            JOIN V3_Fixture_Stats_Wide sw ON sw.fixture_id = f.fixture_id
+            JOIN V3_ML_Feature_Store feature_store
+              ON f.fixture_id = feature_store.fixture_id
+            LEFT JOIN V3_Leagues l ON f.league_id = l.league_id
+            WHERE f.status_short IN ('FT', 'AET', 'PEN')
+              AND sw.home_ft_yellow_cards IS NOT NULL
+              AND sw.away_ft_yellow_cards IS NOT NULL
+        """
+        conditions, params, horizon_window = resolve_horizon_sql(
+            conn, horizon_type, from_sql, league_id=league_id, min_date=min_date, max_date=max_date
+        )
+        query = f"""
             SELECT
                 f.fixture_id,
                 f.league_id,
                 l.name AS league_name,
                 f.date AS match_date,
-                COALESCE(fs_home.yellow_cards, 0) + COALESCE(fs_home.red_cards, 0) AS target_home_cards,
-                COALESCE(fs_away.yellow_cards, 0) + COALESCE(fs_away.red_cards, 0) AS target_away_cards,
+                COALESCE(sw.home_ft_yellow_cards, 0) + COALESCE(sw.home_ft_red_cards, 0) AS target_home_cards,
+                COALESCE(sw.away_ft_yellow_cards, 0) + COALESCE(sw.away_ft_red_cards, 0) AS target_away_cards,
                 feature_store.feature_vector
-            FROM V3_Fixtures f
-            JOIN V3_Fixture_Stats fs_home
-              ON f.fixture_id = fs_home.fixture_id
-             AND f.home_team_id = fs_home.team_id
-             AND fs_home.half = 'FT'
-            JOIN V3_Fixture_Stats fs_away
-              ON f.fixture_id = fs_away.fixture_id
-             AND f.away_team_id = fs_away.team_id
-             AND fs_away.half = 'FT'
-            JOIN V3_ML_Feature_Store feature_store
-              ON f.fixture_id = feature_store.fixture_id
-            LEFT JOIN V3_Leagues l ON f.league_id = l.league_id
-            WHERE f.status_short IN ('FT', 'AET', 'PEN')
-              AND f.league_id = %s
-              AND fs_home.yellow_cards IS NOT NULL
-              AND fs_away.yellow_cards IS NOT NULL
+            {from_sql}{conditions}
             ORDER BY f.date ASC
         """
-        df = pd.read_sql_query(query, conn, params=(league_id,))
+        df = pd.read_sql_query(query, conn, params=params)
     finally:
         conn.close()
 
@@ -83,7 +81,7 @@ def fetch_cards_league_dataset(league_id: int):
     )
     df = pd.concat([df.drop(columns=["feature_vector"]), feature_frame], axis=1)
     df["match_date"] = pd.to_datetime(df["match_date"], utc=True)
-    return df
+    return df, with_dataset_size(horizon_window, df)
 
 
 def train_poisson_model(X_train, y_train, X_test, y_test, cat_features):
@@ -109,8 +107,7 @@ def train_poisson_model(X_train, y_train, X_test, y_test, cat_features):
 def train_league_cards_model(league_id: int, horizon_type: str = "FULL_HISTORICAL", activate: bool = True):
     horizon_type = normalize_horizon_type(horizon_type)
     horizon_slug = horizon_type.lower()
-    df = fetch_cards_league_dataset(league_id).sort_values("match_date")
-    df, horizon_window = filter_dataframe_by_horizon(df, "match_date", horizon_type)
+    df, horizon_window = fetch_cards_league_dataset(league_id, horizon_type=horizon_type)
     league_name = str(df.iloc[0]["league_name"])
     paths = get_league_model_paths(league_id, horizon_slug)
     os.makedirs(paths["dir"], exist_ok=True)
@@ -45,25 +45,18 @@ def fetch_corners_league_dataset(league_id: int):
                 f.league_id,
                 l.name AS league_name,
                 f.date AS match_date,
-                fs_home.corner_kicks AS target_home_corners,
-                fs_away.corner_kicks AS target_away_corners,
+                sw.home_ft_corner_kicks AS target_home_corners,
+                sw.away_ft_corner_kicks AS target_away_corners,
                 feature_store.feature_vector
             FROM V3_Fixtures f
-            JOIN V3_Fixture_Stats fs_home
-              ON f.fixture_id = fs_home.fixture_id
-             AND f.home_team_id = fs_home.team_id
-             AND fs_home.half = 'FT'
-            JOIN V3_Fixture_Stats fs_away
-              ON f.fixture_id = fs_away.fixture_id
-             AND f.away_team_id = fs_away.team_id
-             AND fs_away.half = 'FT'
+            JOIN V3_Fixture_Stats_Wide sw ON sw.fixture_id = f.fixture_id
             JOIN V3_ML_Feature_Store feature_store
               ON f.fixture_id = feature_store.fixture_id
             LEFT JOIN V3_Leagues l ON f.league_id = l.league_id
             WHERE f.status_short IN ('FT', 'AET', 'PEN')
               AND f.league_id = %s
-              AND fs_home.corner_kicks IS NOT NULL
-              AND fs_away.corner_kicks IS NOT NULL
+              AND sw.home_ft_corner_kicks IS NOT NULL
+              AND sw.away_ft_corner_kicks IS NOT NULL
             ORDER BY f.date ASC
         """
         df = pd.read_sql_query(query, conn, params=(league_id,))
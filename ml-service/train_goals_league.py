@@ -11,7 +11,7 @@ from sklearn.metrics import mean_squared_error
 
 from db_config import get_connection
 from feature_schema import GLOBAL_1X2_FEATURE_COLUMNS, GLOBAL_1X2_FEATURE_SCHEMA_VERSION, normalize_feature_vector
-from horizon_utils import filter_dataframe_by_horizon, normalize_horizon_type
+from horizon_utils import normalize_horizon_type, resolve_horizon_sql, with_dataset_size
 
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -38,10 +38,19 @@ def get_league_model_paths(league_id: int, horizon_slug: Optional[str] = None):
     }
 
 
-def fetch_goals_league_dataset(league_id: int):
+def fetch_goals_league_dataset(league_id: int, horizon_type: str = "FULL_HISTORICAL", min_date=None, max_date=None):
     conn = get_connection_db()
     try:
-        query = """
+        from_sql = """
+            FROM V3_Fixtures f
+            JOIN V3_ML_Feature_Store fs ON f.fixture_id = fs.fixture_id
+            LEFT JOIN V3_Leagues l ON f.league_id = l.league_id
+            WHERE f.status_short IN ('FT', 'AET', 'PEN')
+        """
+        conditions, params, horizon_window = resolve_horizon_sql(
+            conn, horizon_type, from_sql, league_id=league_id, min_date=min_date, max_date=max_date
+        )
+        query = f"""
             SELECT
                 f.fixture_id,
                 f.league_id,
@@ -50,14 +59,10 @@ def fetch_goals_league_dataset(league_id: int):
                 f.goals_home AS target_home_goals,
                 f.goals_away AS target_away_goals,
                 fs.feature_vector
-            FROM V3_Fixtures f
-            JOIN V3_ML_Feature_Store fs ON f.fixture_id = fs.fixture_id
-            LEFT JOIN V3_Leagues l ON f.league_id = l.league_id
-            WHERE f.status_short IN ('FT', 'AET', 'PEN')
-              AND f.league_id = %s
+            {from_sql}{conditions}
             ORDER BY f.date ASC
         """
-        df = pd.read_sql_query(query, conn, params=(league_id,))
+        df = pd.read_sql_query(query, conn, params=params)
     finally:
         conn.close()
 
@@ -71,7 +76,7 @@ def fetch_goals_league_dataset(league_id: int):
     )
     df = pd.concat([df.drop(columns=["feature_vector"]), feature_frame], axis=1)
     df["match_date"] = pd.to_datetime(df["match_date"], utc=True)
-    return df
+    return df, with_dataset_size(horizon_window, df)
 
 
 def train_poisson_model(X_train, y_train, X_test, y_test):
@@ -96,8 +101,7 @@ def train_poisson_model(X_train, y_train, X_test, y_test):
 def train_league_goals_model(league_id: int, horizon_type: str = "FULL_HISTORICAL", activate: bool = True):
     horizon_type = normalize_horizon_type(horizon_type)
     horizon_slug = horizon_type.lower()
-    df = fetch_goals_league_dataset(league_id).sort_values("match_date")
-    df, horizon_window = filter_dataframe_by_horizon(df, "match_date", horizon_type)
+    df, horizon_window = fetch_goals_league_dataset(league_id, horizon_type=horizon_type)
     league_name = str(df.iloc[0]["league_name"])
     paths = get_league_model_paths(league_id, horizon_slug)
     os.makedirs(paths["dir"], exist_ok=True)
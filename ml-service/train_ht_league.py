@@ -11,7 +11,7 @@ from sklearn.metrics import log_loss, mean_poisson_deviance, mean_squared_error
 from db_config import get_connection
 from feature_schema import GLOBAL_1X2_FEATURE_COLUMNS, GLOBAL_1X2_FEATURE_SCHEMA_VERSION
 from src.models.ht_result.dataset import fetch_ht_dataset_v2
-from src.models.model_utils import poisson_prob
+from src.models.poisson_markets import AWAY, DRAW, HOME, result_probabilities
 
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -59,24 +59,8 @@ def train_poisson_model(X_train, y_train, X_test, y_test, label):
     return model, preds, rmse, deviance
 
 
-def calculate_1n2_probs(home_mu, away_mu, max_goals=5):
-    p_1 = p_n = p_2 = 0.0
-    for h in range(max_goals + 1):
-        for a in range(max_goals + 1):
-            prob = poisson_prob(home_mu, h) * poisson_prob(away_mu, a)
-            if h > a:
-                p_1 += prob
-            elif h == a:
-                p_n += prob
-            else:
-                p_2 += prob
-    total = p_1 + p_n + p_2 or 1.0
-    return [p_n / total, p_1 / total, p_2 / total]
-
-
 def train_league_model(league_id: int):
-    df = fetch_ht_dataset_v2()
-    df = df[df["league_id"] == league_id].sort_values("match_date")
+    df, _ = fetch_ht_dataset_v2(league_id=league_id)
     if df.empty:
         raise RuntimeError(f"No HT fixtures found for league {league_id}")
 
@@ -99,7 +83,7 @@ def train_league_model(league_id: int):
     away_model, preds_away, rmse_away, dev_away = train_poisson_model(X_train, y_train_a, X_test, y_test_a, "Away HT Goals")
 
     y_true = np.where(y_test_h > y_test_a, 0, np.where(y_test_h == y_test_a, 1, 2))
-    probs = np.array([calculate_1n2_probs(h, a) for h, a in zip(preds_home, preds_away)])
+    probs = result_probabilities(preds_home, preds_away, max_goals=5)[:, [DRAW, HOME, AWAY]]
     preds = np.argmax(probs, axis=1)
     acc = float(np.mean(preds == y_true))
     ll = float(log_loss(y_true, probs))